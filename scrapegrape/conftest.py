@@ -1,7 +1,40 @@
+from unittest.mock import MagicMock
+
 import pytest
 from publishers.factories import PublisherFactory, ResolutionJobFactory
 
 
+@pytest.fixture(autouse=True)
+def redis_client(monkeypatch):
+    """An in-process stand-in for the shared Redis server.
+
+    The fetch and terms caches, politeness limiter and LLM governor keep their
+    shipped settings but talk to this mock: every limiter script grants its
+    slot at once and every cache lookup misses.  Tests that need a feature
+    off override its setting themselves.
+    """
+    from ingestion import terms_cache
+    from publishers.fetchers import cache
+    from publishers.fetchers.politeness import politeness
+    from publishers.fetchers.telemetry import attempt_recorder, strategy_scorer
+    from publishers.llm_governor import llm_governor
+
+    client = MagicMock(name="redis")
+    client.get.return_value = None
+    client.hget.return_value = None
+    client.register_script.return_value = MagicMock(return_value=b"0")
+    monkeypatch.setattr("publishers.pipeline.events.get_redis_client", lambda: client)
+    monkeypatch.setattr(politeness, "_client", None)
+    monkeypatch.setattr(politeness, "_script", None)
+    monkeypatch.setattr(llm_governor, "_client", None)
+    monkeypatch.setattr(llm_governor, "_scripts", {})
+    monkeypatch.setattr(cache, "_response_cache", cache._UNSET)
+    monkeypatch.setattr(terms_cache, "_terms_cache", terms_cache._UNSET)
+    yield client
+    attempt_recorder.clear()
+    strategy_scorer.clear()
+
+
 @pytest.fixture
 def publisher(db):
     return PublisherFactory()
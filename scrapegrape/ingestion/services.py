@@ -9,25 +9,32 @@ from typing import TYPE_CHECKING
 import requests
 from loguru import logger
 
-from publishers.fetchers.exceptions import AllStrategiesExhausted
+from publishers.fetchers.exceptions import AllStrategiesExhausted, PolitenessTimeout
 from publishers.fetchers.manager import FetchStrategyManager
 from .models import TermsDiscoveryResult, TermsEvaluationResult
 from .terms_discovery import discover_terms_and_privacy
 from .terms_evaluation import evaluate_terms_and_conditions
 
 if TYPE_CHECKING:
+    from publishers.fetchers.documents import DocumentStore
     from publishers.models import Publisher
 
 _fetch_manager = FetchStrategyManager()
 
 
-def fetch_html_via_proxy(url: str, publisher: Publisher | None = None) -> str:
+def fetch_html_via_proxy(
+    url: str,
+    publisher: Publisher | None = None,
+    documents: DocumentStore | None = None,
+) -> str:
     """
     Fetch HTML content from a given URL using FetchStrategyManager.
 
     Args:
         url: The URL to fetch HTML content from
         publisher: Optional publisher for per-publisher strategy memory
+        documents: Optional pipeline job document store; pages already
+            fetched by the job are reused instead of downloaded again
 
     Returns:
         HTML content as string
@@ -36,9 +43,12 @@ def fetch_html_via_proxy(url: str, publisher: Publisher | None = None) -> str:
         requests.RequestException: If all fetch strategies fail
     """
     try:
-        result = _fetch_manager.fetch(url, publisher=publisher)
+        if documents is not None:
+            result = documents.fetch(url, publisher=publisher)
+        else:
+            result = _fetch_manager.fetch(url, publisher=publisher)
         return result.html
-    except AllStrategiesExhausted as e:
+    except (AllStrategiesExhausted, PolitenessTimeout) as e:
         logger.error(f"Failed to fetch HTML from {url}: {e}")
         raise requests.RequestException(str(e)) from e
 
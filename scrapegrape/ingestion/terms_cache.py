@@ -0,0 +1,157 @@
+"""
+Terms Cache Module
+
+Caches terms evaluation results by the content of the evaluated document.
+Publisher networks serve the same Terms of Service on dozens of domains and a
+ToS rarely changes between freshness cycles, so an evaluation is keyed by:
+
+- a fingerprint of the cleaned document text, normalized for Unicode form,
+  case, typographic quotes/dashes and whitespace;
+- the evaluator version: a hash of the system prompt, the model name and the
+  output schema.  Editing ``TERMS_EVALUATION_PROMPT``, switching models or
+  changing ``TermsEvaluationResult`` therefore misses every old entry without
+  any manual step; ``TERMS_CACHE["VERSION"]`` (bump it) and
+  ``manage.py terms_cache --clear`` force a re-evaluation otherwise.
+
+Entries are stored with the fetch cache backends (publishers.fetchers.cache),
+so they are shared by every RQ worker and evicted least-recently-used past
+``MAX_BYTES``.  Hits, misses and stores are counted; ``stats()`` adds the hit
+ratio.  Configured by ``settings.TERMS_CACHE``; ``"BACKEND": None`` disables it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+import unicodedata
+import zlib
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from loguru import logger
+
+from publishers.fetchers.cache import DiskCacheBackend, RedisCacheBackend
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+STAT_KEYS = ("hits", "misses", "stores")
+
+_PUNCTUATION = str.maketrans({
+    "‘": "'", "’": "'", "‚": "'", "‛": "'",
+    "“": '"', "”": '"', "„": '"', "‟": '"',
+    "‐": "-", "‑": "-", "‒": "-", "–": "-", "—": "-",
+    "−": "-",
+})
+
+
+def normalize_text(text: str) -> str:
+    """*text* with presentation-only differences removed."""
+    text = unicodedata.normalize("NFKC", text).casefold().translate(_PUNCTUATION)
+    return " ".join(text.split())
+
+
+def text_fingerprint(text: str) -> str:
+    """SHA-256 of the normalized *text*."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def evaluator_version(prompt: str, model: str, schema: dict) -> str:
+    """Hash identifying what produced an evaluation: prompt, model and output schema."""
+    payload = json.dumps([prompt, model, schema], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class TermsCache:
+    """Evaluation results by (evaluator version, text fingerprint).
+
+    Backend errors are logged and treated as misses -- the cache must never
+    make an evaluation fail.
+    """
+
+    def __init__(self, backend: DiskCacheBackend | RedisCacheBackend, version: int | str = 1) -> None:
+        self.backend = backend
+        self.version = str(version)
+
+    def key(self, text: str, evaluator: str) -> str:
+        return hashlib.sha256(
+            f"{self.version}:{evaluator}:{text_fingerprint(text)}".encode("utf-8")
+        ).hexdigest()
+
+    def get(self, text: str, evaluator: str) -> dict | None:
+        """The cached result for *text*, counting the hit or miss."""
+        try:
+            data = self.backend.get(self.key(text, evaluator))
+            entry = json.loads(zlib.decompress(data)) if data is not None else None
+        except Exception as exc:
+            logger.warning(f"Terms cache lookup failed: {exc}")
+            return None
+        self._record("hits" if entry is not None else "misses")
+        return entry["result"] if entry is not None else None
+
+    def store(self, text: str, evaluator: str, result: dict, url: str = "") -> None:
+        """Cache *result* (a TermsEvaluationResult dump) for *text*."""
+        entry = {"result": result, "url": url, "stored_at": time.time()}
+        try:
+            self.backend.set(
+                self.key(text, evaluator), zlib.compress(json.dumps(entry).encode("utf-8"))
+            )
+        except Exception as exc:
+            logger.warning(f"Terms cache store failed for {url}: {exc}")
+            return
+        self._record("stores")
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def _record(self, outcome: str) -> None:
+        try:
+            self.backend.incr(outcome)
+        except Exception as exc:
+            logger.warning(f"Terms cache stats update failed: {exc}")
+
+    def stats(self) -> dict[str, int | float]:
+        """Counters plus ``hit_ratio`` (hits over all lookups)."""
+        stats: dict[str, int | float] = dict(self.backend.stats(STAT_KEYS))
+        total = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / total if total else 0.0
+        return stats
+
+
+_UNSET = object()
+_terms_cache: TermsCache | None | object = _UNSET
+_terms_cache_lock = threading.Lock()
+
+
+def build_terms_cache(config: dict) -> TermsCache | None:
+    """Build a TermsCache from a ``TERMS_CACHE``-style dict (None when disabled)."""
+    backend_name = config.get("BACKEND")
+    max_bytes = int(config.get("MAX_BYTES", DEFAULT_MAX_BYTES))
+    if not backend_name:
+        return None
+    if backend_name == "redis":
+        backend = RedisCacheBackend(max_bytes=max_bytes, prefix=config.get("PREFIX", "termscache"))
+    elif backend_name == "disk":
+        backend = DiskCacheBackend(config["DIRECTORY"], max_bytes=max_bytes)
+    else:
+        raise ValueError(f"Unknown TERMS_CACHE backend: {backend_name!r}")
+    return TermsCache(backend, version=config.get("VERSION", 1))
+
+
+def get_terms_cache() -> TermsCache | None:
+    """Return the process-wide TermsCache configured by settings.TERMS_CACHE."""
+    global _terms_cache
+    from django.conf import settings
+
+    with _terms_cache_lock:
+        if _terms_cache is _UNSET:
+            _terms_cache = build_terms_cache(getattr(settings, "TERMS_CACHE", {}))
+        return _terms_cache
+
+
+@receiver(setting_changed)
+def _reset_terms_cache(*, setting, **kwargs) -> None:
+    global _terms_cache
+    if setting == "TERMS_CACHE":
+        with _terms_cache_lock:
+            _terms_cache = _UNSET
@@ -0,0 +1,393 @@
+"""
+Terms Classifier Module
+
+A local first pass for ToS evaluation.  For each of the prompt's eight
+activities a softmax classifier over hashed word n-grams predicts the
+``PermissionStatus`` label from the clauses most relevant to that activity
+(ingestion.terms_clauses).  Probabilities are calibrated with a temperature
+fitted on held-out documents.  Predictions at or above
+``ACCEPT_CONFIDENCE`` are accepted; only the remaining activities are sent
+to the evaluation agent.
+
+Models are trained from stored evaluations (``manage.py
+train_terms_classifier``) with plain Python -- no numeric dependencies --
+and saved as one gzipped JSON artifact whose ``version`` changes with every
+training run.  Each worker loads the artifact at ``MODEL_PATH`` once; without
+one the classifier is simply not used.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from loguru import logger
+
+from .terms_clauses import ACTIVITY_QUERIES, ClauseIndex, split_clauses, tokenize
+
+DEFAULT_CONFIG = {
+    "ENABLED": True,
+    "MODEL_PATH": None,
+    "ACCEPT_CONFIDENCE": 0.9,
+    "TOP_K": 4,
+    "HASH_BITS": 18,
+    "EPOCHS": 12,
+    "LEARNING_RATE": 0.5,
+    "L2": 1e-5,
+}
+
+LABELS = ("explicitly_permitted", "explicitly_prohibited", "conditional_ambiguous")
+ACTIVITIES = tuple(ACTIVITY_QUERIES)
+# Notes prefix of permissions filled in by the classifier; such permissions
+# are never used as training labels.
+NOTE_PREFIX = "Predicted by the local terms classifier"
+
+# Free-text activity names from stored evaluations -> prompt activity.
+_ACTIVITY_PATTERNS = [
+    ("Text & Data Mining", re.compile(r"\bdata mining\b|\btdm\b|text (and|&) data")),
+    ("AI & Machine Learning", re.compile(r"\bai\b|machine learning|artificial intelligence|training")),
+    ("Scraping & Crawling", re.compile(r"scrap|crawl|spider|\bbots?\b|automated")),
+    ("Archiving & Caching", re.compile(r"archiv|cach")),
+    ("API & RSS Usage", re.compile(r"\bapi\b|\brss\b|feed")),
+    ("Redistribution & Reproduction", re.compile(r"redistribut|reproduc|republish|syndicat")),
+    ("User-Generated Content", re.compile(r"user[- ]generated|\bugc\b|user content")),
+    ("Manual Content Usage", re.compile(r"manual|personal|reading|printing")),
+]
+
+
+def terms_classifier_config() -> dict:
+    """DEFAULT_CONFIG overridden by settings.TERMS_CLASSIFIER."""
+    from django.conf import settings
+
+    return {**DEFAULT_CONFIG, **getattr(settings, "TERMS_CLASSIFIER", {})}
+
+
+def canonical_activity(name: str) -> str | None:
+    """The prompt activity a stored activity name refers to, if any."""
+    name = name.lower()
+    for activity in ACTIVITIES:
+        if name == activity.lower():
+            return activity
+    for activity, pattern in _ACTIVITY_PATTERNS:
+        if pattern.search(name):
+            return activity
+    return None
+
+
+def document_labels(permissions: list[dict]) -> dict[str, str]:
+    """Activity -> label from a stored ``permissions`` list (agent answers only)."""
+    labels = {}
+    for permission in permissions or []:
+        activity = canonical_activity(permission.get("activity", ""))
+        label = str(permission.get("permission", "")).split(".")[-1].lower()
+        if (
+            activity and label in LABELS and activity not in labels
+            and not str(permission.get("notes", "")).startswith(NOTE_PREFIX)
+        ):
+            labels[activity] = label
+    return labels
+
+
+# ---------------------------------------------------------------------------
+# Features
+# ---------------------------------------------------------------------------
+
+
+def _hash(feature: str, bits: int) -> int:
+    return zlib.crc32(feature.encode("utf-8")) & ((1 << bits) - 1)
+
+
+def hashed_features(text: str, bits: int) -> dict[int, float]:
+    """L2-normalized log term frequencies of stemmed unigrams and bigrams."""
+    words = tokenize(text) or ["__empty__"]
+    counts: dict[int, int] = {}
+    for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        bucket = _hash(feature, bits)
+        counts[bucket] = counts.get(bucket, 0) + 1
+    values = {bucket: 1 + math.log(count) for bucket, count in counts.items()}
+    norm = math.sqrt(sum(v * v for v in values.values()))
+    return {bucket: v / norm for bucket, v in values.items()}
+
+
+def activity_features(text: str, top_k: int, bits: int) -> dict[str, dict[int, float]]:
+    """Features of the clauses most relevant to each activity in cleaned ToS *text*."""
+    index = ClauseIndex(split_clauses(text))
+    features = {}
+    for activity, (query, phrases) in ACTIVITY_QUERIES.items():
+        clauses = index.top(query, phrases, top_k)
+        features[activity] = hashed_features(
+            " ".join(c.text for c in clauses) if clauses else "__no_clause__", bits
+        )
+    return features
+
+
+# ---------------------------------------------------------------------------
+# Model
+# ---------------------------------------------------------------------------
+
+
+def _softmax(scores: list[float], temperature: float = 1.0) -> list[float]:
+    top = max(scores)
+    exps = [math.exp((s - top) / temperature) for s in scores]
+    total = sum(exps)
+    return [e / total for e in exps]
+
+
+class ActivityModel:
+    """Multinomial logistic regression over hashed features for one activity."""
+
+    def __init__(
+        self,
+        weights: dict[int, list[float]] | None = None,
+        bias: list[float] | None = None,
+        temperature: float = 1.0,
+    ) -> None:
+        self.weights = weights or {}
+        self.bias = bias or [0.0] * len(LABELS)
+        self.temperature = temperature
+
+    def scores(self, features: dict[int, float]) -> list[float]:
+        scores = list(self.bias)
+        for bucket, value in features.items():
+            row = self.weights.get(bucket)
+            if row is not None:
+                for i, weight in enumerate(row):
+                    scores[i] += weight * value
+        return scores
+
+    def predict(self, features: dict[int, float]) -> tuple[str, float]:
+        probabilities = _softmax(self.scores(features), self.temperature)
+        best = max(range(len(LABELS)), key=probabilities.__getitem__)
+        return LABELS[best], probabilities[best]
+
+    def fit(self, examples: list[tuple[dict[int, float], str]], config: dict, seed: int = 0) -> None:
+        """SGD on the cross-entropy with L2 decay of the touched weights."""
+        rng = random.Random(seed)
+        order = list(examples)
+        rate, l2 = config["LEARNING_RATE"], config["L2"]
+        for epoch in range(config["EPOCHS"]):
+            rng.shuffle(order)
+            step = rate / (1 + epoch)
+            for features, label in order:
+                probabilities = _softmax(self.scores(features))
+                target = LABELS.index(label)
+                gradient = [p - (1.0 if i == target else 0.0) for i, p in enumerate(probabilities)]
+                for i, g in enumerate(gradient):
+                    self.bias[i] -= step * g
+                for bucket, value in features.items():
+                    row = self.weights.setdefault(bucket, [0.0] * len(LABELS))
+                    for i, g in enumerate(gradient):
+                        row[i] -= step * (g * value + l2 * row[i])
+
+    def calibrate(self, examples: list[tuple[dict[int, float], str]]) -> None:
+        """Pick the temperature minimizing held-out negative log-likelihood."""
+        if not examples:
+            return
+        scored = [(self.scores(features), LABELS.index(label)) for features, label in examples]
+
+        def nll(temperature: float) -> float:
+            return -sum(
+                math.log(max(_softmax(scores, temperature)[target], 1e-12))
+                for scores, target in scored
+            )
+
+        self.temperature = min((0.25 * step for step in range(2, 25)), key=nll)
+
+    def to_dict(self) -> dict:
+        return {
+            "weights": {str(bucket): [round(w, 6) for w in row] for bucket, row in self.weights.items()
+                        if any(abs(w) > 1e-6 for w in row)},
+            "bias": self.bias,
+            "temperature": self.temperature,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> ActivityModel:
+        return cls(
+            weights={int(bucket): row for bucket, row in data["weights"].items()},
+            bias=data["bias"],
+            temperature=data["temperature"],
+        )
+
+
+class TermsClassifier:
+    """The per-activity models of one trained artifact."""
+
+    def __init__(
+        self,
+        models: dict[str, ActivityModel],
+        config: dict,
+        version: str = "",
+        metrics: dict | None = None,
+    ) -> None:
+        self.models = models
+        self.config = config
+        self.version = version
+        self.metrics = metrics or {}
+
+    def predict(self, text: str) -> dict[str, tuple[str, float]]:
+        """Activity -> (label, calibrated confidence) for cleaned ToS *text*."""
+        features = activity_features(text, self.config["TOP_K"], self.config["HASH_BITS"])
+        return {
+            activity: model.predict(features[activity])
+            for activity, model in self.models.items()
+        }
+
+    def save(self, path: str | Path) -> None:
+        payload = {
+            "config": {key: self.config[key] for key in ("TOP_K", "HASH_BITS")},
+            "models": {activity: model.to_dict() for activity, model in self.models.items()},
+            "metrics": self.metrics,
+        }
+        body = json.dumps(payload, sort_keys=True)
+        self.version = (
+            datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S") + "-"
+            + hashlib.sha256(body.encode("utf-8")).hexdigest()[:8]
+        )
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, "wt", encoding="utf-8") as handle:
+            json.dump({"version": self.version, **payload}, handle)
+
+    @classmethod
+    def load(cls, path: str | Path) -> TermsClassifier:
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            data = json.load(handle)
+        return cls(
+            {activity: ActivityModel.from_dict(model) for activity, model in data["models"].items()},
+            {**DEFAULT_CONFIG, **data["config"]},
+            version=data["version"],
+            metrics=data.get("metrics"),
+        )
+
+
+# ---------------------------------------------------------------------------
+# Training and benchmark
+# ---------------------------------------------------------------------------
+
+
+def benchmark(
+    classifier: TermsClassifier, documents: list[tuple[str, dict[str, str]]], threshold: float
+) -> dict:
+    """Held-out accuracy, acceptance at *threshold* and prediction latency."""
+    total = correct = accepted = accepted_correct = 0
+    per_activity: dict[str, list[int]] = {activity: [0, 0] for activity in classifier.models}
+    started = perf_counter()
+    predictions = [classifier.predict(text) for text, _ in documents]
+    elapsed = perf_counter() - started
+    for prediction, (_, labels) in zip(predictions, documents):
+        for activity, label in labels.items():
+            if activity not in prediction:
+                continue
+            predicted, confidence = prediction[activity]
+            hit = predicted == label
+            total += 1
+            correct += hit
+            per_activity[activity][0] += 1
+            per_activity[activity][1] += hit
+            if confidence >= threshold:
+                accepted += 1
+                accepted_correct += hit
+    return {
+        "documents": len(documents),
+        "predictions": total,
+        "accuracy": round(correct / total, 3) if total else None,
+        "accepted": round(accepted / total, 3) if total else None,
+        "accepted_accuracy": round(accepted_correct / accepted, 3) if accepted else None,
+        "per_activity": {
+            activity: round(hits / count, 3) for activity, (count, hits) in per_activity.items() if count
+        },
+        "latency_ms": round(1000 * elapsed / len(documents), 2) if documents else None,
+    }
+
+
+def train_classifier(
+    documents: list[tuple[str, dict[str, str]]],
+    config: dict | None = None,
+    holdout: float = 0.2,
+    seed: int = 0,
+) -> TermsClassifier:
+    """Train on ``(cleaned text, activity labels)`` documents.
+
+    A *holdout* share of documents calibrates the temperatures and is
+    benchmarked; the reported metrics are stored with the model.
+    """
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    documents = [(text, labels) for text, labels in documents if labels]
+    rng = random.Random(seed)
+    shuffled = rng.sample(documents, len(documents))
+    cut = int(len(shuffled) * holdout) if len(shuffled) >= 10 else 0
+    held_out, training = shuffled[:cut], shuffled[cut:]
+
+    def examples(docs):
+        rows: dict[str, list] = {activity: [] for activity in ACTIVITIES}
+        for text, labels in docs:
+            features = activity_features(text, config["TOP_K"], config["HASH_BITS"])
+            for activity, label in labels.items():
+                rows[activity].append((features[activity], label))
+        return rows
+
+    train_rows, held_rows = examples(training), examples(held_out)
+    models = {}
+    for activity in ACTIVITIES:
+        if not train_rows[activity]:
+            continue
+        model = ActivityModel()
+        model.fit(train_rows[activity], config, seed=seed)
+        model.calibrate(held_rows[activity])
+        models[activity] = model
+
+    classifier = TermsClassifier(models, config)
+    classifier.metrics = {
+        "trained_on": len(training),
+        "holdout": benchmark(classifier, held_out, config["ACCEPT_CONFIDENCE"]) if held_out else None,
+    }
+    return classifier
+
+
+# ---------------------------------------------------------------------------
+# Worker-wide artifact
+# ---------------------------------------------------------------------------
+
+_UNSET = object()
+_classifier: TermsClassifier | None | object = _UNSET
+_classifier_lock = threading.Lock()
+
+
+def get_terms_classifier() -> TermsClassifier | None:
+    """The classifier at TERMS_CLASSIFIER["MODEL_PATH"], loaded once per process."""
+    global _classifier
+    with _classifier_lock:
+        if _classifier is _UNSET:
+            config = terms_classifier_config()
+            path = config["MODEL_PATH"]
+            _classifier = None
+            if config["ENABLED"] and path and Path(path).exists():
+                try:
+                    _classifier = TermsClassifier.load(path)
+                    _classifier.config.update(
+                        ACCEPT_CONFIDENCE=config["ACCEPT_CONFIDENCE"]
+                    )
+                    logger.info(f"Loaded terms classifier {_classifier.version} from {path}")
+                except Exception as exc:
+                    logger.warning(f"Terms classifier at {path} could not be loaded: {exc}")
+        return _classifier
+
+
+@receiver(setting_changed)
+def _reset_terms_classifier(*, setting, **kwargs) -> None:
+    global _classifier
+    if setting == "TERMS_CLASSIFIER":
+        with _classifier_lock:
+            _classifier = _UNSET
@@ -0,0 +1,323 @@
+"""
+Terms Clauses Module
+
+Offline clause retrieval for long Terms of Service.  The evaluation prompt
+asks about eight fixed activities, so a 30k-word ToS does not need to be
+sent whole: the cleaned text (ingestion.terms_text) is split into numbered
+clauses, each clause is scored against one query per activity with BM25
+plus a boost for the activity's key phrases, and the agent sees only:
+
+- the ``TOP_K`` best-scoring clauses for each activity, and
+- the ``GOVERNING_LAW_K`` best clauses for governing law, jurisdiction and
+  arbitration (the prompt's final risk assessment).
+
+Selected clauses keep their number and section heading, in document order.
+Documents shorter than ``MIN_TOKENS`` are sent whole.
+
+``retrieval_report`` measures a corpus: token reduction, and agreement with
+full-document evaluations as the share of their quoted evidence that the
+selected clauses still contain.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+from .terms_cache import normalize_text
+from .terms_text import count_tokens
+
+DEFAULT_CONFIG = {
+    "ENABLED": True,
+    "MIN_TOKENS": 1500,
+    "TOP_K": 4,
+    "GOVERNING_LAW_K": 2,
+    "MAX_CLAUSE_WORDS": 120,
+}
+
+# BM25 parameters (Robertson & Zaragoza defaults) and the score added per
+# key-phrase occurrence.
+BM25_K1 = 1.5
+BM25_B = 0.75
+PHRASE_WEIGHT = 2.0
+
+# Activity -> (query terms, key phrases).  Names follow the prompt's matrix.
+ACTIVITY_QUERIES = {
+    "Scraping & Crawling": (
+        "scrape scraping scraper crawl crawler spider robot bot automated automatic "
+        "harvest index extract",
+        ("automated means", "web scraping", "screen scraping", "data extraction"),
+    ),
+    "AI & Machine Learning": (
+        "artificial intelligence machine learning train training model ai llm "
+        "generative dataset neural",
+        ("machine learning", "artificial intelligence", "language model", "generative ai",
+         "derivative works"),
+    ),
+    "Manual Content Usage": (
+        "personal noncommercial non-commercial use view read print download copy "
+        "individual private",
+        ("personal use", "non-commercial", "personal, non-commercial"),
+    ),
+    "Archiving & Caching": (
+        "archive archiving cache caching store storage retain mirror wayback",
+        ("cache", "archive", "wayback machine"),
+    ),
+    "Text & Data Mining": (
+        "text data mining mine analysis analyze bulk pattern tdm",
+        ("text and data mining", "data mining", "tdm"),
+    ),
+    "API & RSS Usage": (
+        "api rss feed feeds endpoint interface developer syndication",
+        ("rss", "api", "application programming interface"),
+    ),
+    "Redistribution & Reproduction": (
+        "redistribute reproduce republish distribute sell resell license sublicense "
+        "mirror frame syndicate commercial modify derivative",
+        ("derivative works", "prior written consent", "without our permission"),
+    ),
+    "User-Generated Content": (
+        "user content submit submission post upload comment license grant royalty "
+        "worldwide perpetual",
+        ("user content", "you grant", "you retain"),
+    ),
+}
+GOVERNING_LAW_QUERY = (
+    "governing law laws jurisdiction arbitration dispute venue court courts class "
+    "action waiver",
+    ("governing law", "governed by", "class action", "arbitration", "jurisdiction"),
+)
+
+_WORD = re.compile(r"[a-z0-9]+")
+_SENTENCE_END = re.compile(r"(?<=[.;:!?])\s+")
+_SUFFIXES = ("ations", "ation", "ings", "ing", "ers", "er", "ed", "es", "e", "s")
+
+
+def terms_retrieval_config() -> dict:
+    """DEFAULT_CONFIG overridden by settings.TERMS_RETRIEVAL."""
+    from django.conf import settings
+
+    return {**DEFAULT_CONFIG, **getattr(settings, "TERMS_RETRIEVAL", {})}
+
+
+def _stem(word: str) -> str:
+    """Crude suffix stripping so "scraping", "scraper" and "scrape" match."""
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[: -len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> list[str]:
+    return [_stem(word) for word in _WORD.findall(normalize_text(text))]
+
+
+@dataclass
+class Clause:
+    """One numbered passage of a ToS, with the heading of its section."""
+
+    number: int
+    heading: str
+    text: str
+
+
+def _pack_sentences(line: str, max_words: int) -> list[str]:
+    """*line* as chunks of whole sentences of at most *max_words* (one sentence may exceed)."""
+    chunks: list[str] = []
+    current: list[str] = []
+    words = 0
+    for sentence in _SENTENCE_END.split(line):
+        count = len(sentence.split())
+        if current and words + count > max_words:
+            chunks.append(" ".join(current))
+            current, words = [], 0
+        current.append(sentence)
+        words += count
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def split_clauses(text: str, max_words: int = DEFAULT_CONFIG["MAX_CLAUSE_WORDS"]) -> list[Clause]:
+    """Clauses of cleaned ToS *text*: one per paragraph or list item, long ones split."""
+    clauses: list[Clause] = []
+    heading = ""
+    for line in text.split("\n"):
+        if not line:
+            continue
+        if line.startswith("#"):
+            heading = line
+            continue
+        for chunk in _pack_sentences(line, max_words):
+            clauses.append(Clause(len(clauses) + 1, heading, chunk))
+    return clauses
+
+
+class ClauseIndex:
+    """BM25 over clauses; a clause is indexed with its section heading."""
+
+    def __init__(self, clauses: list[Clause]) -> None:
+        self.clauses = clauses
+        self._texts = [
+            normalize_text(f"{clause.heading.lstrip('# ')} {clause.text}") for clause in clauses
+        ]
+        self._terms = [Counter(tokenize(text)) for text in self._texts]
+        self._lengths = [sum(terms.values()) for terms in self._terms]
+        self._avg_length = (sum(self._lengths) / len(clauses)) if clauses else 0.0
+        document_frequency: Counter[str] = Counter()
+        for terms in self._terms:
+            document_frequency.update(terms.keys())
+        n = len(clauses)
+        self._idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    def scores(self, query: str, phrases: tuple[str, ...] = ()) -> list[float]:
+        """BM25 score of every clause for *query*, plus PHRASE_WEIGHT per phrase hit."""
+        query_terms = set(tokenize(query))
+        patterns = [re.compile(rf"\b{re.escape(normalize_text(p))}\b") for p in phrases]
+        scores = []
+        for terms, length, text in zip(self._terms, self._lengths, self._texts):
+            score = 0.0
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (self._avg_length or 1))
+            for term in query_terms:
+                tf = terms.get(term, 0)
+                if tf:
+                    score += self._idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+            score += PHRASE_WEIGHT * sum(len(p.findall(text)) for p in patterns)
+            scores.append(score)
+        return scores
+
+    def top(self, query: str, phrases: tuple[str, ...], k: int) -> list[Clause]:
+        """The *k* best clauses with a positive score, best first."""
+        ranked = sorted(
+            ((score, clause.number) for score, clause in zip(self.scores(query, phrases), self.clauses)
+             if score > 0),
+            key=lambda item: (-item[0], item[1]),
+        )
+        return [self.clauses[number - 1] for _, number in ranked[:k]]
+
+
+@dataclass
+class ClauseSelection:
+    """The passages sent to the agent instead of the whole document."""
+
+    text: str
+    clauses: int
+    selected: int
+    by_activity: dict[str, list[int]]
+    document_tokens: int
+    selected_tokens: int
+
+    def stats(self) -> dict:
+        return {
+            "clauses": self.clauses,
+            "selected": self.selected,
+            "document_tokens": self.document_tokens,
+            "selected_tokens": self.selected_tokens,
+        }
+
+
+def render_clauses(clauses: list[Clause]) -> str:
+    """Clauses in document order as ``[n] text`` lines under their section headings."""
+    lines: list[str] = []
+    heading = None
+    for clause in sorted(clauses, key=lambda c: c.number):
+        if clause.heading and clause.heading != heading:
+            if lines:
+                lines.append("")
+            lines.append(clause.heading)
+        heading = clause.heading
+        lines.append(f"[{clause.number}] {clause.text}")
+    return "\n".join(lines)
+
+
+def select_clauses(text: str, config: dict | None = None) -> ClauseSelection:
+    """Top clauses of *text* per activity plus the governing-law clauses."""
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    clauses = split_clauses(text, config["MAX_CLAUSE_WORDS"])
+    index = ClauseIndex(clauses)
+    by_activity = {
+        activity: [c.number for c in index.top(query, phrases, config["TOP_K"])]
+        for activity, (query, phrases) in ACTIVITY_QUERIES.items()
+    }
+    by_activity["Governing Law"] = [
+        c.number for c in index.top(*GOVERNING_LAW_QUERY, config["GOVERNING_LAW_K"])
+    ]
+    numbers = {number for selected in by_activity.values() for number in selected}
+    rendered = render_clauses([clauses[number - 1] for number in numbers])
+    return ClauseSelection(
+        text=rendered,
+        clauses=len(clauses),
+        selected=len(numbers),
+        by_activity=by_activity,
+        document_tokens=count_tokens(text),
+        selected_tokens=count_tokens(rendered),
+    )
+
+
+def retrieve_passages(text: str, config: dict | None = None) -> ClauseSelection | None:
+    """A ClauseSelection for long *text*; None when it should be sent whole."""
+    config = config or terms_retrieval_config()
+    if not config["ENABLED"] or count_tokens(text) < config["MIN_TOKENS"]:
+        return None
+    selection = select_clauses(text, config)
+    return selection if selection.selected else None
+
+
+# ---------------------------------------------------------------------------
+# Corpus report
+# ---------------------------------------------------------------------------
+
+_QUOTE = re.compile(r"[\"“]([^\"”]{12,})[\"”]")
+
+
+def evidence_quotes(evaluation: dict) -> dict[str, list[str]]:
+    """Quoted document text in each permission's notes, by activity."""
+    return {
+        permission["activity"]: [m.group(1) for m in _QUOTE.finditer(permission.get("notes", ""))]
+        for permission in evaluation.get("permissions", [])
+    }
+
+
+def retrieval_report(corpus: list[tuple[str, str, dict | None]], config: dict | None = None) -> dict:
+    """Token reduction and evidence agreement for ``(name, text, full evaluation)`` items.
+
+    *full evaluation* is a TermsEvaluationResult dump produced from the whole
+    document (or None).  An activity agrees when every passage its notes quote
+    is contained in the selected clauses.
+    """
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    documents = []
+    for name, text, evaluation in corpus:
+        selection = select_clauses(text, config)
+        row = {"name": name, **selection.stats()}
+        row["reduction"] = round(1 - selection.selected_tokens / (selection.document_tokens or 1), 3)
+        if evaluation:
+            selected = normalize_text(selection.text)
+            quoted = {a: q for a, q in evidence_quotes(evaluation).items() if q}
+            agreeing = [
+                activity for activity, quotes in quoted.items()
+                if all(normalize_text(quote) in selected for quote in quotes)
+            ]
+            row["activities_quoted"] = len(quoted)
+            row["activities_agreeing"] = len(agreeing)
+            row["missing"] = sorted(set(quoted) - set(agreeing))
+        documents.append(row)
+
+    document_tokens = sum(row["document_tokens"] for row in documents)
+    selected_tokens = sum(row["selected_tokens"] for row in documents)
+    quoted = sum(row.get("activities_quoted", 0) for row in documents)
+    return {
+        "documents": documents,
+        "document_tokens": document_tokens,
+        "selected_tokens": selected_tokens,
+        "reduction": round(1 - selected_tokens / document_tokens, 3) if document_tokens else 0.0,
+        "agreement": (
+            round(sum(row.get("activities_agreeing", 0) for row in documents) / quoted, 3)
+            if quoted else None
+        ),
+    }
@@ -3,16 +3,30 @@ Terms Discovery Module
 
 This module provides functionality to discover and extract Terms of Service
 and Privacy Policy URLs from website HTML content using pydantic-ai.
+
+Most homepages link their ToS unambiguously, so the links are first scored
+by rules (link text, href, footer position; privacy/cookie links excluded)
+and a confident, clear winner is returned without the agent.  When no link
+looks like a ToS at all, common paths (``/terms``, ``/tos``, ``/legal`` ...)
+are probed concurrently.  Only ambiguous cases reach the agent.
 """
 
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from html.parser import HTMLParser
 from typing import Optional
+from urllib.parse import unquote, urldefrag, urljoin, urlsplit
 
+from asgiref.sync import sync_to_async
 from pydantic import BaseModel, Field, HttpUrl
 from pydantic_ai import Agent
 from loguru import logger
 from dotenv import load_dotenv
 
+from publishers.fetchers.curl_cffi_fetcher import CurlCffiFetcher
+from publishers.llm_governor import llm_governor
+
 load_dotenv()
 
 
@@ -57,18 +71,28 @@ Look for links where the text or href contains:
 """
 
 
+_VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "source", "track", "wbr",
+}
+
+
 class _LinkExtractor(HTMLParser):
-    """Extract <a> tags with their href and visible text."""
+    """Extract <a> tags with their href, visible text and whether they sit in the footer."""
 
     def __init__(self) -> None:
         super().__init__()
         self.links: list[dict] = []
         self._current_href: str | None = None
         self._current_text: list[str] = []
+        self._footer_tags: list[str] = []
 
     def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        attr_dict = {k.lower(): (v or "") for k, v in attrs}
+        # Elements open inside the footer; a footer ends when its own end tag arrives.
+        if tag not in _VOID_TAGS and (self._footer_tags or _is_footer(tag, attr_dict)):
+            self._footer_tags.append(tag)
         if tag == "a":
-            attr_dict = {k.lower(): (v or "") for k, v in attrs}
             href = attr_dict.get("href", "")
             if href:
                 self._current_href = href
@@ -81,20 +105,41 @@ class _LinkExtractor(HTMLParser):
     def handle_endtag(self, tag: str) -> None:
         if tag == "a" and self._current_href is not None:
             text = " ".join(t for t in self._current_text if t)
-            self.links.append({"href": self._current_href, "text": text})
+            self.links.append(
+                {"href": self._current_href, "text": text, "footer": bool(self._footer_tags)}
+            )
             self._current_href = None
             self._current_text = []
+        if tag in self._footer_tags:
+            while self._footer_tags.pop() != tag:
+                pass
 
 
-def _extract_links(html: str) -> str:
-    """Parse HTML and return a compact text listing of all <a> links."""
+def _is_footer(tag: str, attrs: dict[str, str]) -> bool:
+    if tag == "footer" or attrs.get("role", "").lower() == "contentinfo":
+        return True
+    tokens = f"{attrs.get('class', '')} {attrs.get('id', '')}".lower().split()
+    return any(token.startswith(("footer", "site-footer", "global-footer")) for token in tokens)
+
+
+def _parse_links(html: str) -> list[dict]:
+    """All <a> links of *html* as ``{"href", "text", "footer"}`` dicts."""
     parser = _LinkExtractor()
     try:
         parser.feed(html)
     except Exception:
-        return ""
+        return []
+    return parser.links
+
+
+def _extract_links(html: str) -> str:
+    """Parse HTML and return a compact text listing of all <a> links."""
+    return _format_links(_parse_links(html))
+
+
+def _format_links(links: list[dict]) -> str:
     lines = []
-    for link in parser.links:
+    for link in links:
         href = link["href"]
         text = link["text"]
         if text:
@@ -104,6 +149,145 @@ def _extract_links(html: str) -> str:
     return "\n".join(lines)
 
 
+DEFAULT_CONFIG = {
+    "RULES_ENABLED": True,
+    "ACCEPT_SCORE": 0.8,
+    "MARGIN": 0.15,
+    "PROBE_PATHS": ["/terms", "/terms-of-service", "/terms-of-use", "/tos", "/legal"],
+}
+
+# Link text -> score; the best matching rule counts.
+_TEXT_RULES = [
+    (re.compile(
+        r"^(terms|tos|terms (of (service|use)|(and|&) conditions)|conditions of use|"
+        r"user agreement|legal terms)$"
+    ), 0.7),
+    (re.compile(
+        r"\bterms (of (service|use)|(and|&) conditions)\b|\bconditions of use\b|"
+        r"\buser agreement\b"
+    ), 0.6),
+    (re.compile(r"^legal( notices?| information)?$"), 0.35),
+    (re.compile(r"\bterms\b"), 0.3),
+]
+# Link path -> score.
+_HREF_RULES = [
+    (re.compile(
+        r"/(terms([-_]?(of[-_]?(service|use)|(and|&)?[-_]?conditions))?|tos|"
+        r"user[-_]?agreement)(\.\w+)?/?$"
+    ), 0.2),
+    (re.compile(r"terms|\btos\b|conditions"), 0.1),
+    (re.compile(r"/legal(/|\.\w+)?$"), 0.1),
+]
+_FOOTER_SCORE = 0.1
+# Terms that are not the site's ToS: scored low enough never to be accepted.
+_OTHER_TERMS = re.compile(
+    r"\b(sale|purchase|subscriptions?|subscriber|contests?|sweepstakes|promotions?|"
+    r"rewards|api|developer|advertis\w*)\b"
+)
+_OTHER_TERMS_CAP = 0.3
+_EXCLUDED = re.compile(
+    r"privacy|cookie|gdpr|ccpa|do[-_ ]not[-_ ]sell|data[-_ ]processing|ad[-_ ]?choices|"
+    r"accessibility|sitemap"
+)
+_TERMS_TITLE = re.compile(
+    r"<(title|h1)\b[^>]*>[^<]*\b(terms|conditions of use|user agreement)\b",
+    re.IGNORECASE,
+)
+
+# Probes go out with curl-cffi only: a missing path must not fall back to Zyte.
+_probe_fetcher = CurlCffiFetcher(timeout=10.0)
+
+
+def terms_discovery_config() -> dict:
+    """DEFAULT_CONFIG overridden by settings.TERMS_DISCOVERY."""
+    from django.conf import settings
+
+    return {**DEFAULT_CONFIG, **getattr(settings, "TERMS_DISCOVERY", {})}
+
+
+def score_terms_link(link: dict) -> float:
+    """Rule score in [0, 1] for *link* being the site's Terms of Service link."""
+    text = " ".join(link["text"].lower().split())
+    path = unquote(urlsplit(link["href"]).path).lower()
+    text_score = max((score for rule, score in _TEXT_RULES if rule.search(text)), default=0.0)
+    if _EXCLUDED.search(text) or (_EXCLUDED.search(path) and text_score < 0.6):
+        return 0.0
+    href_score = max((score for rule, score in _HREF_RULES if rule.search(path)), default=0.0)
+    if not text_score and not href_score:
+        return 0.0
+    score = text_score + href_score + (_FOOTER_SCORE if link.get("footer") else 0.0)
+    if _OTHER_TERMS.search(text) or _OTHER_TERMS.search(path):
+        score = min(score, _OTHER_TERMS_CAP)
+    return round(min(score, 1.0), 3)
+
+
+def rank_terms_links(links: list[dict], base_url: str) -> list[tuple[float, str, dict]]:
+    """(score, absolute URL, link) for links that may be the ToS, best first, one per URL."""
+    best: dict[str, tuple[float, str, dict]] = {}
+    for link in links:
+        href = link["href"].strip()
+        if href.lower().startswith(("javascript:", "mailto:", "tel:", "#")):
+            continue
+        url = urldefrag(urljoin(base_url, href)).url
+        if urlsplit(url).scheme not in ("http", "https"):
+            continue
+        score = score_terms_link({**link, "href": url})
+        if score > 0 and score > best.get(url, (0.0,))[0]:
+            best[url] = (score, url, link)
+    return sorted(best.values(), key=lambda item: -item[0])
+
+
+def resolve_terms_link(
+    links: list[dict], base_url: str, config: dict | None = None
+) -> Optional[TermsDiscoveryResult]:
+    """The ToS link when one candidate is confident and clearly ahead, else None."""
+    config = config or terms_discovery_config()
+    ranked = rank_terms_links(links, base_url)
+    if not ranked:
+        return None
+    score, url, link = ranked[0]
+    runner_up = ranked[1][0] if len(ranked) > 1 else 0.0
+    if score < config["ACCEPT_SCORE"] or score - runner_up < config["MARGIN"]:
+        return None
+    return TermsDiscoveryResult(
+        terms_of_service_url=url,
+        confidence_score=score,
+        notes=f"Resolved by link rules: {link['text'] or link['href']!r}"
+        + (" in footer" if link.get("footer") else ""),
+    )
+
+
+def probe_terms_paths(base_url: str, config: dict | None = None) -> Optional[TermsDiscoveryResult]:
+    """Fetch the common ToS paths concurrently; the first (in PROBE_PATHS order)
+    whose title or heading names terms wins."""
+    config = config or terms_discovery_config()
+    paths = config["PROBE_PATHS"]
+    if not paths:
+        return None
+
+    def probe(path: str) -> Optional[str]:
+        url = urljoin(base_url, path)
+        try:
+            result = _probe_fetcher.fetch(url)
+        except Exception as exc:
+            logger.debug(f"ToS probe {url} failed: {exc}")
+            return None
+        if result.status_code == 200 and _TERMS_TITLE.search(result.html):
+            return result.url or url
+        return None
+
+    with ThreadPoolExecutor(max_workers=len(paths), thread_name_prefix="tos-probe") as pool:
+        found = list(pool.map(probe, paths))
+    for path, url in zip(paths, found):
+        if url:
+            return TermsDiscoveryResult(
+                terms_of_service_url=url,
+                confidence_score=0.7,
+                notes=f"No ToS link on the page; found by probing {path}",
+            )
+    return None
+
+
 terms_discovery_agent = Agent(
     "openai:gpt-5-mini",
     output_type=TermsDiscoveryResult,
@@ -111,7 +295,62 @@ terms_discovery_agent = Agent(
 )
 
 
-def discover_terms_and_privacy(url: str, publisher=None) -> TermsDiscoveryResult:
+def _prepare_discovery(
+    url: str, publisher=None, documents=None
+) -> tuple[Optional[TermsDiscoveryResult], str]:
+    """Fetch *url* and resolve its ToS link by rules: ``(result, "")`` or ``(None, agent prompt)``."""
+    from .services import fetch_html_via_proxy
+
+    # Fetch HTML content
+    html_content = fetch_html_via_proxy(url, publisher=publisher, documents=documents)
+    logger.debug(
+        f"Successfully fetched HTML content ({len(html_content)} characters)"
+    )
+
+    links = _parse_links(html_content)
+    config = terms_discovery_config()
+    if config["RULES_ENABLED"]:
+        resolved = resolve_terms_link(links, url, config)
+        if resolved is None and not rank_terms_links(links, url):
+            resolved = probe_terms_paths(url, config)
+        if resolved is not None:
+            logger.info(
+                f"Terms discovery for {url} resolved without the agent: "
+                f"{resolved.terms_of_service_url} ({resolved.confidence_score})"
+            )
+            return resolved, ""
+
+    # Extract just the links to avoid sending massive HTML to the LLM
+    links_text = _format_links(links)
+    logger.debug(
+        f"Extracted links ({len(links_text)} characters from {len(html_content)} chars HTML)"
+    )
+    return None, (
+        f"Find the Terms of Service URL from these links extracted from {url}.\n"
+        f"Base URL for relative links: {url}\n\nLinks (href | text):\n{links_text}"
+    )
+
+
+def _finish_discovery(url: str, output: TermsDiscoveryResult) -> TermsDiscoveryResult:
+    logger.info(f"Terms discovery completed for {url}")
+    logger.debug(
+        f"Results: ToS={output.terms_of_service_url}, Confidence={output.confidence_score}"
+    )
+    return output
+
+
+@contextmanager
+def _logged_discovery(url: str):
+    """Log the start of a discovery for *url* and any error it raises."""
+    logger.info(f"Starting terms discovery for URL: {url}")
+    try:
+        yield
+    except Exception as e:
+        logger.error(f"Error during terms discovery for {url}: {e}")
+        raise
+
+
+def discover_terms_and_privacy(url: str, publisher=None, documents=None) -> TermsDiscoveryResult:
     """
     Discover Terms of Service and Privacy Policy URLs from a website.
 
@@ -121,6 +360,7 @@ def discover_terms_and_privacy(url: str, publisher=None) -> TermsDiscoveryResult
 
     Args:
         url: The website URL to analyze
+        documents: Optional pipeline job DocumentStore for reusing fetched pages
 
     Returns:
         TermsDiscoveryResult containing the discovered URLs and metadata
@@ -130,39 +370,39 @@ def discover_terms_and_privacy(url: str, publisher=None) -> TermsDiscoveryResult
         requests.RequestException: If the URL cannot be fetched
         Exception: If the agent analysis fails
     """
-    from .services import fetch_html_via_proxy
+    with _logged_discovery(url):
+        resolved, prompt = _prepare_discovery(url, publisher=publisher, documents=documents)
+        if resolved is not None:
+            return resolved
 
-    logger.info(f"Starting terms discovery for URL: {url}")
-
-    try:
-        # Fetch HTML content
-        html_content = fetch_html_via_proxy(url, publisher=publisher)
-        logger.debug(
-            f"Successfully fetched HTML content ({len(html_content)} characters)"
+        # Analyze with pydantic-ai agent
+        result = llm_governor.run_sync(
+            terms_discovery_agent, prompt, system_prompt=TERMS_DISCOVERY_PROMPT
         )
+        return _finish_discovery(url, result.output)
 
-        # Extract just the links to avoid sending massive HTML to the LLM
-        links_text = _extract_links(html_content)
-        logger.debug(
-            f"Extracted links ({len(links_text)} characters from {len(html_content)} chars HTML)"
-        )
 
-        # Analyze with pydantic-ai agent
-        result = terms_discovery_agent.run_sync(
-            f"Find the Terms of Service URL from these links extracted from {url}.\n"
-            f"Base URL for relative links: {url}\n\nLinks (href | text):\n{links_text}"
-        )
+async def adiscover_terms_and_privacy(
+    url: str, publisher=None, documents=None
+) -> TermsDiscoveryResult:
+    """
+    Async twin of discover_terms_and_privacy.
 
-        logger.info(f"Terms discovery completed for {url}")
-        logger.debug(
-            f"Results: ToS={result.output.terms_of_service_url}, Confidence={result.output.confidence_score}"
+    The homepage fetch, rules and path probe run on the event loop's
+    executor; the agent call is awaited with ``Agent.run``.
+    """
+    with _logged_discovery(url):
+        resolved, prompt = await sync_to_async(_prepare_discovery, thread_sensitive=False)(
+            url, publisher=publisher, documents=documents
         )
+        if resolved is not None:
+            return resolved
 
-        return result.output
-
-    except Exception as e:
-        logger.error(f"Error during terms discovery for {url}: {e}")
-        raise
+        # Analyze with pydantic-ai agent
+        result = await llm_governor.run(
+            terms_discovery_agent, prompt, system_prompt=TERMS_DISCOVERY_PROMPT
+        )
+        return _finish_discovery(url, result.output)
 
 
 if __name__ == "__main__":
@@ -5,13 +5,23 @@ This module provides functionality to evaluate Terms of Service and Privacy Poli
 content for scraping and data extraction permissions using pydantic-ai.
 """
 
-from typing import Optional, List
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Optional, List, Tuple
+
+from asgiref.sync import sync_to_async
 from pydantic import BaseModel, Field
 from pydantic_ai import Agent
 from loguru import logger
 from dotenv import load_dotenv
 from enum import Enum
 
+from publishers.llm_governor import llm_governor
+
+from .terms_cache import TermsCache, evaluator_version, get_terms_cache
+from .terms_classifier import ACTIVITIES, NOTE_PREFIX, canonical_activity, get_terms_classifier
+from .terms_text import CleanDocument, clean_document
+
 load_dotenv()
 
 
@@ -106,22 +116,45 @@ For each of the 8 activities, provide:
 - **Aggregator Summary:** A 2-sentence "Bottom Line" for a developer or researcher."""
 
 
+TERMS_EVALUATION_MODEL = "openai:gpt-5-mini"
+
 terms_evaluation_agent = Agent(
-    "openai:gpt-5-mini",
+    TERMS_EVALUATION_MODEL,
     output_type=TermsEvaluationResult,
     system_prompt=TERMS_EVALUATION_PROMPT,
 )
 
 
-def evaluate_terms_and_conditions(url: str, publisher=None) -> TermsEvaluationResult:
+def _classify(classifier, text: str) -> dict[str, tuple[ActivityPermission, float]]:
+    """Activity -> (permission, confidence) for the classifier's confident predictions."""
+    if classifier is None:
+        return {}
+    threshold = classifier.config["ACCEPT_CONFIDENCE"]
+    return {
+        activity: (
+            ActivityPermission(
+                activity=activity,
+                permission=PermissionStatus(label),
+                notes=f"{NOTE_PREFIX} {classifier.version} (confidence {confidence:.2f}).",
+            ),
+            confidence,
+        )
+        for activity, (label, confidence) in classifier.predict(text).items()
+        if confidence >= threshold
+    }
+
+
+def evaluate_terms_and_conditions(url: str, publisher=None, documents=None) -> TermsEvaluationResult:
     """
     Evaluate Terms of Service and Privacy Policy content for activity permissions.
 
-    This function fetches the HTML content from the provided URL and uses
-    the pydantic-ai agent to analyze the terms for various activity permissions.
+    This function fetches the HTML content from the provided URL, reduces it
+    to clean text and uses the pydantic-ai agent to analyze the terms for
+    various activity permissions.
 
     Args:
         url: The website URL containing terms/privacy policy to analyze
+        documents: Optional pipeline job DocumentStore for reusing fetched pages
 
     Returns:
         TermsEvaluationResult containing the evaluated permissions and metadata
@@ -131,31 +164,179 @@ def evaluate_terms_and_conditions(url: str, publisher=None) -> TermsEvaluationRe
         requests.RequestException: If the URL cannot be fetched
         Exception: If the agent analysis fails
     """
-    from .services import fetch_html_via_proxy
+    result, _ = evaluate_terms_document(url, publisher=publisher, documents=documents)
+    return result
 
-    logger.info(f"Starting terms evaluation for URL: {url}")
 
-    try:
-        # Fetch HTML content
-        html_content = fetch_html_via_proxy(url, publisher=publisher)
-        logger.debug(
-            f"Successfully fetched HTML content ({len(html_content)} characters)"
+@dataclass
+class _Evaluation:
+    """State shared by the sync and async evaluation paths around the agent call."""
+
+    url: str
+    document: CleanDocument
+    cache: Optional[TermsCache] = None
+    evaluator: str = ""
+    classified: dict = field(default_factory=dict)
+    prompt: Optional[str] = None
+    output: Optional[TermsEvaluationResult] = None
+
+
+def _prepare_evaluation(url: str, publisher=None, documents=None) -> _Evaluation:
+    """Fetch and clean *url*, then answer from the cache or build the agent prompt.
+
+    The returned _Evaluation has ``output`` set on a cache hit and ``prompt``
+    set otherwise; the prompt leaves out the activities the classifier
+    answered confidently.
+    """
+    from .services import fetch_html_via_proxy
+
+    # Fetch HTML content
+    html_content = fetch_html_via_proxy(url, publisher=publisher, documents=documents)
+    document = clean_document(html_content, retrieve=True)
+    logger.debug(
+        f"Cleaned HTML content for {url}: ~{document.html_tokens} -> "
+        f"~{document.text_tokens} tokens"
+        + (" (truncated to budget)" if document.truncated else "")
+        + (
+            f", {document.retrieval['selected']}/{document.retrieval['clauses']} clauses"
+            if document.retrieval else ""
         )
+    )
 
-        # Analyze with pydantic-ai agent
-        result = terms_evaluation_agent.run_sync(
-            f"Analyze this HTML content from {url} to evaluate activity permissions. "
+    classifier = get_terms_classifier()
+    evaluation = _Evaluation(
+        url=url,
+        document=document,
+        cache=get_terms_cache(),
+        evaluator=evaluator_version(
+            TERMS_EVALUATION_PROMPT,
+            TERMS_EVALUATION_MODEL
+            + (f"+classifier:{classifier.version}" if classifier is not None else ""),
+            TermsEvaluationResult.model_json_schema(),
+        ),
+    )
+    cache = evaluation.cache
+    if cache is not None:
+        cached = cache.get(document.text, evaluation.evaluator)
+        if cached is not None:
+            logger.info(f"Terms evaluation for {url} served from cache")
+            document.cache_status = "hit"
+            evaluation.output = TermsEvaluationResult.model_validate(cached)
+            return evaluation
+        document.cache_status = "miss"
+
+    # Accept confident local predictions; the agent answers the rest and,
+    # always, the document-level fields (type, territorial exceptions,
+    # governing law and arbitration) the classifier cannot fill
+    classified = evaluation.classified = _classify(
+        classifier, document.full_text or document.text
+    )
+    document.classified = list(classified)
+
+    # Analyze with pydantic-ai agent
+    if document.retrieval:
+        prompt = (
+            f"Analyze these numbered clauses extracted from {url} to evaluate activity permissions. "
+            f"They are the clauses most relevant to each activity and to governing law, in document order; "
+            f"treat an activity none of them addresses as not covered by the document.\n\n"
+            f"Document Clauses:\n{document.text}"
+        )
+    else:
+        prompt = (
+            f"Analyze this text extracted from {url} to evaluate activity permissions. "
             f"Focus on the Terms of Service and Privacy Policy sections to determine what activities are permitted, prohibited, or conditional.\n\n"
-            f"HTML Content:\n{html_content}"
+            f"Document Text:\n{document.text}"
+        )
+    if classified and set(ACTIVITIES) <= set(classified):
+        logger.info(f"All activities for {url} answered by the local classifier")
+        prompt += (
+            "\n\nAll activities were already classified; return an empty permissions list "
+            "and fill in only the document type, territorial exceptions, arbitration "
+            "clauses and confidence score."
         )
+    elif classified:
+        prompt += (
+            f"\n\nThe following activities were already classified; do not evaluate them: "
+            f"{', '.join(classified)}."
+        )
+    evaluation.prompt = prompt
+    return evaluation
+
 
-        logger.info(f"Terms evaluation completed for {url}")
-        logger.debug(
-            f"Found {len(result.output.permissions)} activity permissions with confidence {result.output.confidence_score}"
+def _finish_evaluation(evaluation: _Evaluation, output: TermsEvaluationResult) -> TermsEvaluationResult:
+    """Merge the classifier's answers into the agent *output* and cache the result."""
+    if evaluation.classified:
+        output.permissions = [
+            p for p in output.permissions if canonical_activity(p.activity) not in evaluation.classified
+        ] + [permission for permission, _ in evaluation.classified.values()]
+
+    logger.info(f"Terms evaluation completed for {evaluation.url}")
+    logger.debug(
+        f"Found {len(output.permissions)} activity permissions with confidence {output.confidence_score}"
+    )
+
+    if evaluation.cache is not None:
+        evaluation.cache.store(
+            evaluation.document.text,
+            evaluation.evaluator,
+            output.model_dump(mode="json"),
+            url=evaluation.url,
         )
+    evaluation.output = output
+    return output
 
-        return result.output
 
+@contextmanager
+def _logged_evaluation(url: str):
+    """Log the start of an evaluation of *url* and any error it raises."""
+    logger.info(f"Starting terms evaluation for URL: {url}")
+    try:
+        yield
     except Exception as e:
         logger.error(f"Error during terms evaluation for {url}: {e}")
         raise
+
+
+def evaluate_terms_document(
+    url: str, publisher=None, documents=None
+) -> Tuple[TermsEvaluationResult, CleanDocument]:
+    """
+    Like evaluate_terms_and_conditions, also returning the cleaned document.
+
+    The CleanDocument carries the before/after token counts, whether the
+    text was cut to the token budget, whether the result came from the
+    terms cache (see ingestion.terms_cache) and which activities the local
+    classifier answered (see ingestion.terms_classifier).
+    """
+    with _logged_evaluation(url):
+        evaluation = _prepare_evaluation(url, publisher=publisher, documents=documents)
+        if evaluation.output is None:
+            result = llm_governor.run_sync(
+                terms_evaluation_agent, evaluation.prompt, system_prompt=TERMS_EVALUATION_PROMPT
+            )
+            _finish_evaluation(evaluation, result.output)
+        return evaluation.output, evaluation.document
+
+
+async def aevaluate_terms_document(
+    url: str, publisher=None, documents=None
+) -> Tuple[TermsEvaluationResult, CleanDocument]:
+    """
+    Async twin of evaluate_terms_document.
+
+    Fetching, cleaning and the cache lookup run on the event loop's executor;
+    the agent call is awaited with ``Agent.run`` so the loop can serve other
+    steps for the whole model latency.
+    """
+    with _logged_evaluation(url):
+        evaluation = await sync_to_async(_prepare_evaluation, thread_sensitive=False)(
+            url, publisher=publisher, documents=documents
+        )
+        if evaluation.output is None:
+            result = await llm_governor.run(
+                terms_evaluation_agent, evaluation.prompt, system_prompt=TERMS_EVALUATION_PROMPT
+            )
+            await sync_to_async(_finish_evaluation, thread_sensitive=False)(
+                evaluation, result.output
+            )
+        return evaluation.output, evaluation.document
@@ -0,0 +1,262 @@
+"""
+Terms Text Module
+
+Turns a Terms of Service page into the clean text the evaluation agent reads.
+Raw ToS pages carry scripts, inline CSS, navigation, cookie banners and
+footers that are often several times larger than the legal text itself;
+``clean_document`` strips them before the agent call:
+
+- script/style/SVG/form elements and navigation, header/footer, cookie and
+  newsletter boxes (by tag, ARIA role or class/id) are dropped; header and
+  footer elements inside the main content are kept, they often hold the title;
+- when the page has a ``<main>``/``<article>`` with enough text, only that
+  is used;
+- headings become ``#``-prefixed lines and list items ``-`` lines, so the
+  document's section structure survives; whitespace is collapsed.
+
+Token counts before and after cleaning are recorded per document.  They are
+estimates from a local tokenizer approximation (the OpenAI tokenizers are
+not a dependency and need network access to load), close enough for
+accounting and for enforcing the hard ``TOKEN_BUDGET``: text beyond the
+budget is cut at a line boundary and the document is marked truncated.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+
+from loguru import logger
+
+DEFAULT_CONFIG = {
+    "TOKEN_BUDGET": 16_000,
+    "MIN_MAIN_CHARS": 500,
+}
+
+# Words count one token per 6 characters, other symbols one each: roughly
+# what BPE tokenizers produce for English prose and markup.
+_TOKEN_PATTERN = re.compile(r"\w{1,6}|[^\w\s]")
+
+_DROP_TAGS = {
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "object",
+    "form", "button", "select", "input", "textarea", "nav", "aside", "dialog",
+}
+_CHROME_TAGS = {"header", "footer"}
+_MAIN_TAGS = {"main", "article"}
+_DROP_ROLES = {"navigation", "banner", "contentinfo", "search", "dialog", "alertdialog"}
+# Matched against each class/id token from its start, so "cookie-banner" and
+# "nav-menu" are dropped but "has-sidebar" on a page wrapper is not.
+_BOILERPLATE_CLASS = re.compile(
+    r"^(?:nav|navbar|navigation|menu|breadcrumbs?|sidebar|cookies?|consent|newsletter|"
+    r"subscribe|social|share|sharing|promo|advert|ads?|skip-link)(?:$|[_-])",
+    re.IGNORECASE,
+)
+_BLOCK_TAGS = {
+    "p", "div", "section", "br", "hr", "table", "tr", "ul", "ol", "dl", "dt", "dd",
+    "blockquote", "pre", "address", "figure", "figcaption", "details", "summary",
+    *_MAIN_TAGS, *_CHROME_TAGS,
+}
+_HEADINGS = {f"h{level}": level for level in range(1, 7)}
+_VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "source", "track", "wbr",
+}
+
+
+def terms_text_config() -> dict:
+    """DEFAULT_CONFIG overridden by settings.TERMS_TEXT."""
+    from django.conf import settings
+
+    return {**DEFAULT_CONFIG, **getattr(settings, "TERMS_TEXT", {})}
+
+
+def count_tokens(text: str) -> int:
+    """Estimated LLM token count of *text*."""
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+class _TextExtractor(HTMLParser):
+    """Collects visible text outside boilerplate, separately for main content."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        # Open elements as (tag, dropped, main); tolerant of unclosed tags.
+        self._stack: list[tuple[str, bool, bool]] = []
+        self._dropped = 0
+        self._main = 0
+        self.page: list[str] = []
+        self.main: list[str] = []
+
+    def _emit(self, piece: str) -> None:
+        self.page.append(piece)
+        if self._main:
+            self.main.append(piece)
+
+    def _drops(self, tag: str, attrs: dict[str, str]) -> bool:
+        if tag in _DROP_TAGS:
+            return True
+        if tag in _CHROME_TAGS and not self._main:
+            return True
+        if attrs.get("role", "").lower() in _DROP_ROLES:
+            return True
+        if "hidden" in attrs or attrs.get("aria-hidden") == "true":
+            return True
+        if tag in ("html", "body", *_MAIN_TAGS):
+            return False
+        tokens = f"{attrs.get('class', '')} {attrs.get('id', '')}".split()
+        return any(_BOILERPLATE_CLASS.match(token) for token in tokens)
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in _VOID_TAGS:
+            if tag in ("br", "hr") and not self._dropped:
+                self._emit("\n")
+            return
+        attr_dict = {k.lower(): (v or "") for k, v in attrs}
+        dropped = self._dropped > 0 or self._drops(tag, attr_dict)
+        main = tag in _MAIN_TAGS or attr_dict.get("role", "").lower() == "main"
+        self._stack.append((tag, dropped, main))
+        self._dropped += dropped
+        self._main += main
+        if dropped:
+            return
+        if tag in _HEADINGS:
+            self._emit("\n\n" + "#" * _HEADINGS[tag] + " ")
+        elif tag == "li":
+            self._emit("\n- ")
+        elif tag in _BLOCK_TAGS:
+            self._emit("\n")
+        elif tag in ("td", "th"):
+            self._emit(" ")
+
+    def handle_endtag(self, tag: str) -> None:
+        if not any(open_tag == tag for open_tag, _, _ in self._stack):
+            return
+        while self._stack:
+            open_tag, dropped, main = self._stack.pop()
+            self._dropped -= dropped
+            if open_tag in _HEADINGS or open_tag in _BLOCK_TAGS or open_tag == "li":
+                if not self._dropped:
+                    self._emit("\n")
+            self._main -= main
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data: str) -> None:
+        if not self._dropped:
+            # Source line breaks are layout, not structure (no <pre> in legal text).
+            self._emit(" ".join(data.split("\n")))
+
+
+def _collapse(pieces: list[str]) -> str:
+    """One block per line, single spaces, a blank line before each heading."""
+    lines = []
+    for line in "".join(pieces).split("\n"):
+        line = " ".join(line.split())
+        if not line or line == "-" or not line.strip("#"):
+            continue
+        if line.startswith("#") and lines:
+            lines.append("")
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def html_to_text(html: str, min_main_chars: int | None = None) -> str:
+    """Clean, structured text of an HTML page (see the module docstring)."""
+    if min_main_chars is None:
+        min_main_chars = terms_text_config()["MIN_MAIN_CHARS"]
+    extractor = _TextExtractor()
+    try:
+        extractor.feed(html)
+        extractor.close()
+    except AssertionError as exc:
+        # HTMLParser is lenient, but _markupbase still asserts on some malformed
+        # declarations; keep whatever was collected before it.
+        logger.warning(f"HTML parsing stopped early: {exc}")
+    main = _collapse(extractor.main)
+    if main and len(main) >= min_main_chars:
+        return main
+    return _collapse(extractor.page)
+
+
+def truncate_to_budget(text: str, budget: int) -> tuple[str, bool]:
+    """*text* cut at the last line that fits *budget* tokens; (text, truncated)."""
+    if count_tokens(text) <= budget:
+        return text, False
+    kept: list[str] = []
+    used = 0
+    for line in text.split("\n"):
+        tokens = count_tokens(line)
+        if used + tokens > budget:
+            if not kept:
+                # A single over-long line: keep its head word by word.
+                words = []
+                for word in line.split(" "):
+                    used += count_tokens(word)
+                    if used > budget:
+                        break
+                    words.append(word)
+                kept.append(" ".join(words))
+            break
+        kept.append(line)
+        used += tokens
+    return "\n".join(kept).rstrip(), True
+
+
+@dataclass
+class CleanDocument:
+    """Cleaned ToS text plus the token accounting for one document."""
+
+    text: str
+    html_tokens: int
+    text_tokens: int
+    truncated: bool
+    cache_status: str = ""  # terms cache: "", "hit" or "miss"
+    # ClauseSelection.stats() when only selected clauses are sent (ingestion.terms_clauses)
+    retrieval: dict = field(default_factory=dict)
+    # Activities answered by the local classifier (ingestion.terms_classifier)
+    classified: list = field(default_factory=list)
+    # The whole cleaned page before clause selection and the budget: what the
+    # classifier is trained on (train_terms_classifier uses html_to_text)
+    full_text: str = ""
+
+    def stats(self) -> dict:
+        stats = {
+            "html_tokens": self.html_tokens,
+            "text_tokens": self.text_tokens,
+            "truncated": self.truncated,
+        }
+        if self.retrieval:
+            stats["retrieval"] = self.retrieval
+        return stats
+
+
+def clean_document(
+    html: str, token_budget: int | None = None, retrieve: bool = False
+) -> CleanDocument:
+    """Clean *html* and hold it to *token_budget* (default: TERMS_TEXT["TOKEN_BUDGET"]).
+
+    With *retrieve*, a long document is reduced to its clauses relevant to
+    the evaluated activities (ingestion.terms_clauses) before the budget is
+    applied.
+    """
+    config = terms_text_config()
+    if token_budget is None:
+        token_budget = config["TOKEN_BUDGET"]
+    text = full_text = html_to_text(html, config["MIN_MAIN_CHARS"])
+    retrieval = {}
+    if retrieve:
+        from .terms_clauses import retrieve_passages
+
+        selection = retrieve_passages(text)
+        if selection is not None:
+            text, retrieval = selection.text, selection.stats()
+    text, truncated = truncate_to_budget(text, token_budget)
+    return CleanDocument(
+        text=text,
+        html_tokens=count_tokens(html),
+        text_tokens=count_tokens(text),
+        truncated=truncated,
+        retrieval=retrieval,
+        full_text=full_text,
+    )
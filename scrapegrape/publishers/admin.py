@@ -6,8 +6,9 @@ from django.urls import reverse, path
 from django_object_actions import DjangoObjectActions, action
 from django import forms
 import json
-from .models import ArticleMetadata, Publisher, ResolutionJob, WAFReport
+from .models import ArticleMetadata, FetchAttempt, Publisher, ResolutionJob, WAFReport
 from .tasks import analyze_url
+from .waf_check import scan_many
 from ingestion.services import (
     create_terms_discovery_from_url,
     create_terms_evaluation_from_url,
@@ -34,9 +35,13 @@ class URLAnalysisForm(forms.Form):
 
 def perform_waf_scan(modeladmin, request, queryset):
     """Django admin action to perform WAF scan on selected publishers."""
-    for publisher in queryset:
+    publishers = list(queryset)
+    scan_results = scan_many([publisher.url for publisher in publishers])
+    for publisher, scan_result in zip(publishers, scan_results):
         try:
-            waf_report = WAFReport.create_from_url_scan(publisher, publisher.url)
+            waf_report = WAFReport.create_from_scan_result(
+                publisher, publisher.url, scan_result
+            )
             if waf_report:
                 messages.success(
                     request,
@@ -465,6 +470,15 @@ class WAFReportAdmin(admin.ModelAdmin):
         return super().get_queryset(request).select_related("publisher")
 
 
+@admin.register(FetchAttempt)
+class FetchAttemptAdmin(admin.ModelAdmin):
+    list_display = ["domain", "strategy", "outcome", "status_code", "latency_ms", "bytes", "created_at"]
+    list_filter = ["strategy", "outcome", "created_at"]
+    search_fields = ["domain", "url", "block_reason"]
+    readonly_fields = [f.name for f in FetchAttempt._meta.fields]
+    date_hierarchy = "created_at"
+
+
 @admin.register(ResolutionJob)
 class ResolutionJobAdmin(admin.ModelAdmin):
     list_display = ["id", "canonical_url", "publisher", "status", "created_at"]
@@ -0,0 +1,443 @@
+"""Fleet-wide frequency, sitemap and AI-bot statistics as polars frames.
+
+``run_frequency_step`` computes cadence for one publisher from Python lists
+of datetimes; fleet questions (the distribution of posting cadence, which
+publishers changed cadence, how many block GPTBot) would mean loading every
+``ResolutionJob``'s JSON into Python.  This module bulk-loads the underlying
+data column-wise instead and answers them with vectorized expressions:
+
+* ``load_fleet`` reads, in a handful of streamed queries, the publication
+  dates behind each frequency source (the feed window, the sitemap store
+  and the latest sitemap-analysis lastmods), the frequency history of
+  completed jobs (scalar JSON keys extracted by the database), the AI-bot
+  blocks and per-publisher flags;
+* ``frequency_stats`` is ``_compute_frequency`` for every
+  (publisher, source) at once (interval medians, spans, confidence, label)
+  and ``select_frequency`` picks the source ``run_frequency_step`` would;
+* ``cadence_changes`` compares each publisher's last two frequency results;
+* ``fleet_summary`` folds everything into a JSON-able report, which
+  ``cached_fleet_summary`` keeps in the Django cache for ``CACHE_TTL``.
+
+``manage.py fleet_stats`` prints the report and can export the
+per-publisher table as Parquet.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import polars as pl
+from django.core.cache import cache
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from publishers.sitemaps import parse_w3c_datetime, sitemap_config
+
+DEFAULT_CONFIG = {
+    "CADENCE_CHANGE_FACTOR": 2.0,
+    "CACHE_TTL": 15 * 60,
+    "CHUNK_SIZE": 10_000,
+}
+
+SUMMARY_CACHE_KEY = "publishers:fleet-summary"
+
+DATES_SCHEMA = {
+    "publisher_id": pl.Int64,
+    "source": pl.Utf8,
+    "published": pl.Datetime("us", "UTC"),
+}
+ISO_FORMAT = "%Y-%m-%dT%H:%M:%S%.f%:z"
+HOUR_US = 3600 * 1_000_000
+
+
+def analytics_config() -> dict:
+    """DEFAULT_CONFIG overridden by settings.FLEET_ANALYTICS."""
+    from django.conf import settings
+
+    return {**DEFAULT_CONFIG, **getattr(settings, "FLEET_ANALYTICS", {})}
+
+
+@dataclass
+class FleetFrames:
+    publishers: pl.DataFrame
+    dates: pl.DataFrame
+    jobs: pl.DataFrame
+    bots: pl.DataFrame
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+
+def _load_publishers(chunk_size: int) -> pl.DataFrame:
+    from publishers.models import Publisher
+
+    rows = Publisher.objects.values_list(
+        "id", "domain", "has_news_sitemap", "sitemap_urls", "rss_urls"
+    ).iterator(chunk_size=chunk_size)
+    return pl.DataFrame(
+        [
+            (pk, domain, has_news, len(sitemaps or []), len(feeds or []))
+            for pk, domain, has_news, sitemaps, feeds in rows
+        ],
+        schema={
+            "publisher_id": pl.Int64,
+            "domain": pl.Utf8,
+            "has_news_sitemap": pl.Boolean,
+            "sitemap_count": pl.Int64,
+            "feed_count": pl.Int64,
+        },
+        orient="row",
+    )
+
+
+def _load_feed_dates(chunk_size: int) -> pl.DataFrame:
+    """The feed windows (``Publisher.feed_entry_dates``) as ``source="rss"`` rows."""
+    from publishers.models import Publisher
+
+    ids: list[int] = []
+    values: list[str] = []
+    rows = Publisher.objects.values_list("id", "feed_entry_dates").iterator(chunk_size=chunk_size)
+    for pk, window in rows:
+        if window:
+            ids.extend([pk] * len(window))
+            values.extend(window.values())
+    return pl.DataFrame(
+        {"publisher_id": ids, "published": values},
+        schema={"publisher_id": pl.Int64, "published": pl.Utf8},
+    ).select(
+        "publisher_id",
+        pl.lit("rss").alias("source"),
+        pl.col("published").str.strptime(pl.Datetime("us", "UTC"), ISO_FORMAT, strict=False),
+    ).drop_nulls("published")
+
+
+def _load_store_dates(sample: int, chunk_size: int) -> pl.DataFrame:
+    """The *sample* most recent sitemap-store dates per publisher, like ``entry_dates``."""
+    from publishers.models import SitemapEntry
+
+    rows = (
+        SitemapEntry.objects.annotate(published=Coalesce("news_publication_date", "lastmod"))
+        .filter(published__isnull=False, published__lte=timezone.now())
+        .values_list("publisher_id", "published")
+        .iterator(chunk_size=chunk_size)
+    )
+    frame = pl.DataFrame(
+        list(rows),
+        schema={"publisher_id": pl.Int64, "published": pl.Datetime("us", "UTC")},
+        orient="row",
+    )
+    return (
+        frame.sort(["publisher_id", "published"], descending=[False, True])
+        .filter(pl.int_range(pl.len()).over("publisher_id") < sample)
+        .select("publisher_id", pl.lit("sitemap_store").alias("source"), "published")
+    )
+
+
+def _load_analysis_dates(chunk_size: int) -> pl.DataFrame:
+    """Lastmods sampled by each publisher's latest completed sitemap analysis."""
+    from publishers.models import Publisher, ResolutionJob
+
+    latest = (
+        ResolutionJob.objects.filter(
+            publisher=OuterRef("pk"), status="completed", sitemap_analysis_result__isnull=False
+        )
+        .order_by("-created_at")
+        .values("pk")[:1]
+    )
+    rows = (
+        ResolutionJob.objects.filter(
+            pk__in=Publisher.objects.annotate(job=Subquery(latest)).values("job")
+        )
+        .values_list("publisher_id", "sitemap_analysis_result__lastmod_dates")
+        .iterator(chunk_size=chunk_size)
+    )
+    records = []
+    for pk, lastmods in rows:
+        for value in lastmods or []:
+            published = parse_w3c_datetime(value) if isinstance(value, str) else None
+            if published is not None:
+                records.append((pk, "sitemap", published))
+    return pl.DataFrame(records, schema=DATES_SCHEMA, orient="row")
+
+
+def _load_jobs(chunk_size: int) -> pl.DataFrame:
+    """(publisher, created_at, frequency_hours) of completed jobs, keys extracted in SQL."""
+    from publishers.models import ResolutionJob
+
+    rows = (
+        ResolutionJob.objects.filter(status="completed", frequency_result__isnull=False)
+        .values_list("publisher_id", "created_at", "frequency_result__frequency_hours")
+        .iterator(chunk_size=chunk_size)
+    )
+    return pl.DataFrame(
+        [
+            (pk, created_at, float(hours) if isinstance(hours, (int, float)) else None)
+            for pk, created_at, hours in rows
+        ],
+        schema={
+            "publisher_id": pl.Int64,
+            "created_at": pl.Datetime("us", "UTC"),
+            "frequency_hours": pl.Float64,
+        },
+        orient="row",
+    )
+
+
+def _load_bots(chunk_size: int) -> pl.DataFrame:
+    """One row per (publisher, AI bot) from ``Publisher.ai_bot_blocks``."""
+    from publishers.models import Publisher
+
+    records = []
+    rows = Publisher.objects.values_list("id", "ai_bot_blocks").iterator(chunk_size=chunk_size)
+    for pk, bots in rows:
+        for user_agent, info in (bots or {}).items():
+            if isinstance(info, dict):
+                records.append(
+                    (pk, user_agent, info.get("company") or "", bool(info.get("blocked")))
+                )
+    return pl.DataFrame(
+        records,
+        schema={
+            "publisher_id": pl.Int64,
+            "bot": pl.Utf8,
+            "company": pl.Utf8,
+            "blocked": pl.Boolean,
+        },
+        orient="row",
+    )
+
+
+def load_fleet(config: dict | None = None) -> FleetFrames:
+    """Bulk-load everything the fleet statistics need."""
+    config = config or analytics_config()
+    chunk_size = config["CHUNK_SIZE"]
+    dates = pl.concat(
+        [
+            _load_feed_dates(chunk_size),
+            _load_store_dates(sitemap_config()["FREQUENCY_SAMPLE"], chunk_size),
+            _load_analysis_dates(chunk_size),
+        ]
+    )
+    return FleetFrames(
+        publishers=_load_publishers(chunk_size),
+        dates=dates,
+        jobs=_load_jobs(chunk_size),
+        bots=_load_bots(chunk_size),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Vectorized statistics
+# ---------------------------------------------------------------------------
+
+
+def frequency_label(hours: pl.Expr) -> pl.Expr:
+    """``_format_frequency_label`` as an expression ("" where *hours* is null)."""
+    per_day = 24 / hours
+    per_month = (per_day * 30).round(0).cast(pl.Int64)
+    return (
+        pl.when(hours.is_null()).then(pl.lit(""))
+        .when(hours <= 0).then(pl.lit("~multiple/hour"))
+        .when(per_day >= 2).then(pl.format("~{} articles/day", per_day.round(0).cast(pl.Int64)))
+        .when(per_day >= 1).then(pl.lit("~1 article/day"))
+        .when(per_day >= 1 / 7)
+        .then(pl.format("~{} articles/week", (per_day * 7).round(0).cast(pl.Int64)))
+        .when(per_month >= 1).then(pl.format("~{} articles/month", per_month))
+        .otherwise(pl.lit("< 1 article/month"))
+    )
+
+
+def cadence_bucket(hours: pl.Expr) -> pl.Expr:
+    """Coarse cadence class for distributions."""
+    return (
+        pl.when(hours.is_null()).then(pl.lit("unknown"))
+        .when(hours <= 1).then(pl.lit("hourly"))
+        .when(hours <= 24).then(pl.lit("daily"))
+        .when(hours <= 24 * 7).then(pl.lit("weekly"))
+        .when(hours <= 24 * 31).then(pl.lit("monthly"))
+        .otherwise(pl.lit("rarer"))
+    )
+
+
+def frequency_stats(dates: pl.DataFrame) -> pl.DataFrame:
+    """``_compute_frequency`` for every (publisher_id, source) group of *dates* in one pass.
+
+    Columns: publisher_id, source, sample_size, frequency_hours,
+    date_span_days, confidence, frequency_label.  Hours and spans are
+    rounded to one decimal like the step's result.
+    """
+    keys = ["publisher_id", "source"]
+    interval = (
+        pl.col("published").diff().over(keys).dt.total_microseconds().abs() / HOUR_US
+    )
+    stats = (
+        dates.sort([*keys, "published"], descending=[False, False, True])
+        .with_columns(interval.alias("interval_hours"))
+        .group_by(keys)
+        .agg(
+            pl.len().alias("sample_size"),
+            pl.col("interval_hours").filter(pl.col("interval_hours") > 0).median()
+            .alias("median_hours"),
+            (
+                (pl.col("published").max() - pl.col("published").min()).dt.total_microseconds()
+                / (24 * HOUR_US)
+            ).alias("span_days"),
+        )
+    )
+    known = pl.col("median_hours").is_not_null()
+    span = pl.when(known).then(pl.col("span_days")).otherwise(0.0)
+    return stats.select(
+        *keys,
+        pl.col("sample_size").cast(pl.Int64),
+        pl.col("median_hours").round(1).alias("frequency_hours"),
+        span.round(1).alias("date_span_days"),
+        pl.when(known & (pl.col("sample_size") >= 10) & (span >= 7)).then(pl.lit("high"))
+        .when(known & (pl.col("sample_size") >= 5) & (span >= 3)).then(pl.lit("medium"))
+        .otherwise(pl.lit("low"))
+        .alias("confidence"),
+        frequency_label(pl.col("median_hours")).alias("frequency_label"),
+    ).sort(keys)
+
+
+def select_frequency(stats: pl.DataFrame) -> pl.DataFrame:
+    """Per publisher, the row of the source ``run_frequency_step`` would use.
+
+    The sitemap store when it has more dates than the feed window, else
+    the feed window, else the analysis lastmods; each needs two dates.
+    """
+    size = pl.col("sample_size")
+    rss_sizes = stats.filter(pl.col("source") == "rss").select(
+        "publisher_id", size.alias("rss_size")
+    )
+    priority = (
+        pl.when((pl.col("source") == "sitemap_store") & (size >= 2) & (size > pl.col("rss_size")))
+        .then(0)
+        .when((pl.col("source") == "rss") & (size >= 2)).then(1)
+        .when((pl.col("source") == "sitemap") & (size >= 2)).then(2)
+        .otherwise(None)
+    )
+    return (
+        stats.join(rss_sizes, on="publisher_id", how="left")
+        .with_columns(pl.col("rss_size").fill_null(0))
+        .with_columns(priority.alias("priority"))
+        .drop_nulls("priority")
+        .sort(["publisher_id", "priority"])
+        .unique("publisher_id", keep="first", maintain_order=True)
+        .drop("rss_size", "priority")
+    )
+
+
+def cadence_changes(jobs: pl.DataFrame, factor: float) -> pl.DataFrame:
+    """Publishers whose last two frequency results differ by at least *factor* either way."""
+    hours = pl.col("frequency_hours")
+    return (
+        jobs.filter(hours.is_not_null() & (hours > 0))
+        .sort(["publisher_id", "created_at"], descending=[False, True])
+        .group_by("publisher_id", maintain_order=True)
+        .agg(
+            hours.first().alias("current_hours"),
+            hours.slice(1, 1).first().alias("previous_hours"),
+        )
+        .drop_nulls("previous_hours")
+        .with_columns((pl.col("current_hours") / pl.col("previous_hours")).alias("ratio"))
+        .filter((pl.col("ratio") >= factor) | (pl.col("ratio") <= 1 / factor))
+    )
+
+
+def publisher_table(frames: FleetFrames) -> pl.DataFrame:
+    """One row per publisher: flags, selected frequency and AI-bot blocking counts."""
+    selected = select_frequency(frequency_stats(frames.dates)).rename(
+        {"source": "frequency_source"}
+    )
+    blocks = frames.bots.group_by("publisher_id").agg(
+        pl.col("blocked").sum().cast(pl.Int64).alias("ai_bots_blocked"),
+        pl.len().cast(pl.Int64).alias("ai_bots_checked"),
+    )
+    return (
+        frames.publishers.join(selected, on="publisher_id", how="left")
+        .join(blocks, on="publisher_id", how="left")
+        .with_columns(cadence_bucket(pl.col("frequency_hours")).alias("cadence"))
+        .sort("publisher_id")
+    )
+
+
+def _counts(frame: pl.DataFrame, column: str) -> dict:
+    return {
+        row[column]: row["count"]
+        for row in frame.group_by(column).agg(pl.len().alias("count")).sort(column).to_dicts()
+    }
+
+
+def fleet_summary(frames: FleetFrames | None = None, config: dict | None = None) -> dict:
+    """The fleet report: cadence distribution, cadence changes, sitemap and AI-bot shares."""
+    config = config or analytics_config()
+    frames = frames or load_fleet(config)
+    table = publisher_table(frames)
+    with_frequency = table.drop_nulls("frequency_source")
+
+    hours = with_frequency.get_column("frequency_hours").drop_nulls()
+    quantiles = {
+        f"p{int(q * 100)}": (hours.quantile(q, interpolation="linear") if len(hours) else None)
+        for q in (0.1, 0.25, 0.5, 0.75, 0.9)
+    }
+
+    changes = cadence_changes(frames.jobs, config["CADENCE_CHANGE_FACTOR"])
+    top_changes = (
+        changes.join(frames.publishers.select("publisher_id", "domain"), on="publisher_id")
+        .with_columns((pl.col("ratio").log().abs()).alias("magnitude"))
+        .sort("magnitude", descending=True)
+        .head(20)
+        .select("domain", "previous_hours", "current_hours", pl.col("ratio").round(2))
+        .to_dicts()
+    )
+
+    bots = frames.bots.group_by("bot", "company").agg(
+        pl.col("blocked").sum().cast(pl.Int64).alias("blocked"),
+        pl.len().alias("checked"),
+    ).sort("bot")
+
+    return {
+        "generated_at": timezone.now().isoformat(),
+        "publishers": table.height,
+        "frequency": {
+            "publishers": with_frequency.height,
+            "by_source": _counts(with_frequency, "frequency_source"),
+            "by_confidence": _counts(with_frequency, "confidence"),
+            "by_cadence": _counts(table, "cadence"),
+            "hours_quantiles": quantiles,
+        },
+        "cadence_changes": {
+            "factor": config["CADENCE_CHANGE_FACTOR"],
+            "count": changes.height,
+            "top": top_changes,
+        },
+        "sitemaps": {
+            "with_sitemaps": table.filter(pl.col("sitemap_count") > 0).height,
+            "news_sitemaps": table.filter(pl.col("has_news_sitemap")).height,
+        },
+        "ai_bots": {
+            "publishers": frames.bots.get_column("publisher_id").n_unique(),
+            "blocking_any": table.filter(pl.col("ai_bots_blocked") > 0).height,
+            "by_bot": {
+                row["bot"]: {
+                    "company": row["company"],
+                    "blocked": row["blocked"],
+                    "share": round(row["blocked"] / row["checked"], 3),
+                }
+                for row in bots.to_dicts()
+            },
+        },
+    }
+
+
+def cached_fleet_summary(refresh: bool = False) -> dict:
+    """``fleet_summary`` from the Django cache, recomputed at most once per CACHE_TTL."""
+    config = analytics_config()
+    summary = None if refresh else cache.get(SUMMARY_CACHE_KEY)
+    if summary is None:
+        summary = fleet_summary(config=config)
+        cache.set(SUMMARY_CACHE_KEY, summary, config["CACHE_TTL"])
+    return summary
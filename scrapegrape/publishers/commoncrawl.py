@@ -0,0 +1,518 @@
+"""Offline Common Crawl presence lookups from a collection's ``cluster.idx``.
+
+Common Crawl's URL index is a ZipNum index: CDX rows sorted by SURT key and
+gzipped in blocks of 3000 rows (``cdx-NNNNN.gz``), plus ``cluster.idx``, a
+plain-text file with one line per block giving the block's first key::
+
+    com,example)/about 20260115120000<TAB>cdx-00123.gz<TAB>offset<TAB>length<TAB>cluster
+
+The CDX server answers ``showNumPages`` by binary-searching that same file.
+``ClusterIndex`` memory-maps a downloaded copy (``manage.py download_cc_index``)
+and does the search locally, so ``run_cc_step`` needs no request to
+``index.commoncrawl.org`` for domains that span whole blocks.
+
+A domain with fewer rows than a block has no line of its own: its rows, if
+any, sit inside the block whose first key precedes it.  That one block is
+then read (from ``INDEX_DIR`` when the shard is there, otherwise with a
+single range request to ``data.commoncrawl.org``, which is static storage
+rather than the rate-limited CDX server) and its rows are counted exactly.
+With ``READ_BLOCKS`` off such domains are reported as unknown
+(``in_index`` None) and ``run_cc_step`` asks the CDX API instead.
+
+``ClusterIndex.lookup_many`` answers a batch in one forward pass over the
+index and reads each shared block once.
+
+Which collections exist comes from ``collection_registry``, which reads
+``collinfo.json`` at most once per ``COLLINFO_TTL`` (shared through the fetch
+response cache).  ``CCQuerier`` checks many domains against the
+``HISTORY_DEPTH`` most recent collections at once: the local index answers
+its own collection, the CDX API the rest, with at most ``CONCURRENCY``
+requests in flight.  Published collections never change, so CDX answers are
+kept in the response cache for ``RESULT_TTL`` under their query URL, i.e.
+per (collection, domain).  ``summarize`` folds the per-collection answers
+into ``run_cc_step``'s result and a compact ``{collection: page_count}``
+history, merged into ``Publisher.cc_history`` by ``merge_history``.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from loguru import logger
+
+DEFAULT_COLLECTION = "CC-MAIN-2026-04"
+DATA_URL = "https://data.commoncrawl.org/cc-index/collections/{collection}/indexes/{name}"
+COLLINFO_URL = "https://index.commoncrawl.org/collinfo.json"
+CDX_API = "https://index.commoncrawl.org/{collection}-index"
+ROWS_PER_BLOCK = 3000
+
+DEFAULT_CONFIG = {
+    "COLLECTION": DEFAULT_COLLECTION,
+    "COLLECTIONS": None,
+    "COLLINFO_TTL": 24 * 3600,
+    "HISTORY_DEPTH": 3,
+    "HISTORY_LENGTH": 24,
+    "RESULT_TTL": 30 * 24 * 3600,
+    "CONCURRENCY": 4,
+    "LOCAL_INDEX": False,
+    "INDEX_DIR": ".cc-index",
+    "READ_BLOCKS": True,
+    "BLOCK_CONCURRENCY": 8,
+}
+
+
+def cc_config() -> dict:
+    """DEFAULT_CONFIG overridden by settings.COMMON_CRAWL."""
+    from django.conf import settings
+
+    return {**DEFAULT_CONFIG, **getattr(settings, "COMMON_CRAWL", {})}
+
+
+def index_path(collection: str | None = None, config: dict | None = None) -> Path:
+    config = config or cc_config()
+    return Path(config["INDEX_DIR"]) / (collection or config["COLLECTION"]) / "cluster.idx"
+
+
+def domain_surt(domain: str) -> str:
+    """SURT host key of *domain*: ``www.example.com`` -> ``com,example,www``."""
+    host = domain.strip().lower().rstrip(".")
+    if "://" in host:
+        host = host.split("://", 1)[1]
+    host = host.split("/", 1)[0].split(":", 1)[0]
+    return ",".join(reversed(host.split(".")))
+
+
+@dataclass(frozen=True)
+class IndexBlock:
+    """One ``cluster.idx`` line: the block of CDX rows starting at *key*."""
+
+    key: str
+    timestamp: str
+    filename: str
+    offset: int
+    length: int
+
+    @classmethod
+    def parse(cls, line: bytes) -> IndexBlock:
+        head, filename, offset, length, *_ = line.decode().split("\t")
+        key, _, timestamp = head.partition(" ")
+        return cls(key, timestamp, filename, int(offset), int(length))
+
+
+def _crawl_month(timestamp: str) -> str | None:
+    return f"{timestamp[:4]}-{timestamp[4:6]}" if len(timestamp) >= 6 else None
+
+
+def presence_result(collection, in_index, page_count, latest_crawl, error=None) -> dict:
+    """One collection's answer for one domain, in ``run_cc_step``'s shape."""
+    return {
+        "available": error is None,
+        "in_index": in_index,
+        "page_count": page_count,
+        "latest_crawl": latest_crawl,
+        "collection": collection,
+        "error": error,
+    }
+
+
+class ClusterIndex:
+    """A memory-mapped, SURT-sorted ``cluster.idx`` searched by binary search."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        collection: str = DEFAULT_COLLECTION,
+        index_dir: str | Path | None = None,
+        read_blocks: bool = True,
+        block_concurrency: int = 8,
+    ) -> None:
+        self.path = Path(path)
+        self.collection = collection
+        self.shard_dir = Path(index_dir) if index_dir is not None else self.path.parent
+        self.read_blocks = read_blocks
+        self.block_concurrency = block_concurrency
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def __enter__(self) -> ClusterIndex:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -- searching ---------------------------------------------------------
+
+    def _line_end(self, start: int) -> int:
+        end = self._mm.find(b"\n", start)
+        return len(self._mm) if end == -1 else end
+
+    def _key_at(self, start: int) -> bytes:
+        line = self._mm[start : self._line_end(start)]
+        return line.split(b" ", 1)[0]
+
+    def _bisect(self, key: bytes, lo: int = 0) -> int:
+        """Byte offset of the first line at or after *lo* whose key is >= *key*."""
+        hi = len(self._mm)
+        while lo < hi:
+            start = self._mm.rfind(b"\n", lo, (lo + hi) // 2) + 1 or lo
+            if self._key_at(start) < key:
+                lo = self._line_end(start) + 1
+            else:
+                hi = start
+        return min(lo, len(self._mm))
+
+    def _blocks_between(self, start: int, end: int) -> list[IndexBlock]:
+        return [
+            IndexBlock.parse(line)
+            for line in self._mm[start:end].splitlines()
+            if line.strip()
+        ]
+
+    def _previous_block(self, start: int) -> IndexBlock | None:
+        if start == 0:
+            return None
+        end = start - 1 if self._mm[start - 1 : start] == b"\n" else start
+        previous = self._mm.rfind(b"\n", 0, end) + 1
+        return IndexBlock.parse(self._mm[previous:end])
+
+    def _locate(self, surt: str, lo: int = 0) -> tuple[list[IndexBlock], IndexBlock | None, int]:
+        """Blocks starting inside *surt*'s key range, the block before them, and the range start.
+
+        The range is ``surt)`` (the host itself) through ``surt,`` (its
+        subdomains); ``-`` is the next byte after ``,``.
+        """
+        start = self._bisect(f"{surt})".encode(), lo)
+        end = self._bisect(f"{surt}-".encode(), start)
+        return self._blocks_between(start, end), self._previous_block(start), start
+
+    # -- block rows ------------------------------------------------------
+
+    def _read_block(self, block: IndexBlock) -> bytes:
+        """The decompressed CDX rows of *block*, from a local shard if present."""
+        shard = self.shard_dir / block.filename
+        if shard.exists():
+            with open(shard, "rb") as f:
+                f.seek(block.offset)
+                data = f.read(block.length)
+        else:
+            from publishers.fetchers.clients import http_get
+
+            response = http_get(
+                DATA_URL.format(collection=self.collection, name=block.filename),
+                headers={"Range": f"bytes={block.offset}-{block.offset + block.length - 1}"},
+                timeout=30.0,
+            )
+            response.raise_for_status()
+            data = response.content
+        return zlib.decompress(data, zlib.MAX_WBITS | 16)
+
+    @staticmethod
+    def _count_rows(rows: bytes, surt: str) -> tuple[int, str]:
+        """Rows of *surt* (host and subdomains) in a block, and their latest timestamp."""
+        prefixes = (f"{surt})".encode(), f"{surt},".encode())
+        count, latest = 0, ""
+        for row in rows.splitlines():
+            if row.startswith(prefixes):
+                count += 1
+                latest = max(latest, row.split(b" ", 2)[1].decode())
+        return count, latest
+
+    # -- lookups ---------------------------------------------------------
+
+    def _result(self, in_index, page_count, latest_crawl, error=None) -> dict:
+        return presence_result(self.collection, in_index, page_count, latest_crawl, error)
+
+    def _answer(self, surt, blocks, previous, rows) -> dict:
+        if blocks:
+            latest = max(block.timestamp for block in blocks)
+            return self._result(True, len(blocks) * ROWS_PER_BLOCK, _crawl_month(latest))
+        if previous is None:
+            return self._result(False, 0, None)
+        if rows is None:
+            # Rows may sit inside the preceding block; without reading it we can't tell.
+            return self._result(None, None, None)
+        if isinstance(rows, Exception):
+            return self._result(None, None, None, error=str(rows))
+        count, latest = self._count_rows(rows, surt)
+        return self._result(count > 0, count, _crawl_month(latest))
+
+    def lookup(self, domain: str) -> dict:
+        """``run_cc_step``-shaped result for *domain* and its subdomains."""
+        return self.lookup_many([domain])[domain]
+
+    def lookup_many(self, domains) -> dict[str, dict]:
+        """Results for many domains from one forward pass over the index.
+
+        Domains are searched in SURT order, each search starting where the
+        previous one ended, and a block shared by several small domains is
+        read once.
+        """
+        located = {}
+        lo = 0
+        for surt, domain in sorted((domain_surt(d), d) for d in set(domains)):
+            blocks, previous, lo = self._locate(surt, lo)
+            located[domain] = (surt, blocks, previous)
+
+        wanted = {
+            previous
+            for _, blocks, previous in located.values()
+            if not blocks and previous is not None
+        }
+        rows: dict[IndexBlock, bytes | Exception] = {}
+        if self.read_blocks and wanted:
+            def read(block):
+                try:
+                    return block, self._read_block(block)
+                except Exception as exc:
+                    logger.warning(f"Could not read CC index block {block.filename}@{block.offset}: {exc}")
+                    return block, exc
+
+            with ThreadPoolExecutor(
+                max_workers=max(1, min(self.block_concurrency, len(wanted))),
+                thread_name_prefix="cc-index",
+            ) as executor:
+                rows = dict(executor.map(read, wanted))
+
+        return {
+            domain: self._answer(surt, blocks, previous, rows.get(previous))
+            for domain, (surt, blocks, previous) in located.items()
+        }
+
+
+_local_index: ClusterIndex | None = None
+_local_index_lock = threading.Lock()
+
+
+def local_index() -> ClusterIndex | None:
+    """The process-wide ClusterIndex when LOCAL_INDEX is on and the file exists."""
+    global _local_index
+
+    config = cc_config()
+    if not config["LOCAL_INDEX"]:
+        return None
+    path = index_path(config=config)
+    with _local_index_lock:
+        if _local_index is not None and _local_index.path == path:
+            return _local_index
+        if not path.exists():
+            logger.warning(f"Common Crawl cluster.idx not found at {path}; using the CDX API")
+            return None
+        _local_index = ClusterIndex(
+            path,
+            collection=config["COLLECTION"],
+            read_blocks=config["READ_BLOCKS"],
+            block_concurrency=config["BLOCK_CONCURRENCY"],
+        )
+        return _local_index
+
+
+# ---------------------------------------------------------------------------
+# Collections and multi-collection queries
+# ---------------------------------------------------------------------------
+
+
+def _response_cache():
+    from publishers.fetchers.cache import get_response_cache
+
+    return get_response_cache()
+
+
+def _cache_text(cache, url: str, text: str, ttl: int) -> None:
+    from publishers.fetchers.base import FetchResult
+
+    cache.store(
+        FetchResult(
+            html=text,
+            status_code=200,
+            strategy_used="httpx",
+            url=url,
+            headers={"content-type": "application/json"},
+        ),
+        ttl=ttl,
+    )
+
+
+class CollectionRegistry:
+    """Common Crawl collection ids, newest first, from ``collinfo.json``.
+
+    ``settings.COMMON_CRAWL["COLLECTIONS"]`` pins the list.  Otherwise the
+    file is fetched at most once per ``COLLINFO_TTL`` per process and shared
+    between workers through the response cache.  When it cannot be
+    fetched the last known list (or ``COLLECTION``) is used.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._collections: list[str] = []
+        self._expires_at = 0.0
+
+    def _fetch(self, ttl: int) -> list[str]:
+        from publishers.fetchers.clients import http_get
+
+        cache = _response_cache()
+        entry = cache.get(COLLINFO_URL) if cache is not None else None
+        if entry is not None and entry.is_fresh():
+            text = entry.html
+        else:
+            response = http_get(COLLINFO_URL, timeout=15.0)
+            response.raise_for_status()
+            text = response.text
+            if cache is not None:
+                _cache_text(cache, COLLINFO_URL, text, ttl)
+        return sorted((item["id"] for item in json.loads(text)), reverse=True)
+
+    def collections(self) -> list[str]:
+        config = cc_config()
+        if config["COLLECTIONS"]:
+            return list(config["COLLECTIONS"])
+        with self._lock:
+            if time.monotonic() >= self._expires_at:
+                self._refresh(config)
+            return list(self._collections or [config["COLLECTION"]])
+
+    def _refresh(self, config: dict) -> None:
+        """Reload the list; on failure keep the old one and retry in five minutes."""
+        try:
+            self._collections = self._fetch(config["COLLINFO_TTL"]) or self._collections
+            self._expires_at = time.monotonic() + config["COLLINFO_TTL"]
+        except Exception as exc:
+            logger.warning(f"Could not load Common Crawl collinfo.json: {exc}")
+            self._expires_at = time.monotonic() + 300
+
+    def recent(self, n: int | None = None) -> list[str]:
+        """The *n* (default ``HISTORY_DEPTH``) most recent collection ids."""
+        return self.collections()[: n or cc_config()["HISTORY_DEPTH"]]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._collections = []
+            self._expires_at = 0.0
+
+
+class CCQuerier:
+    """Batched presence queries for many domains across several collections.
+
+    *get* is the HTTP GET used for the CDX API (``http_get`` by default).
+    """
+
+    def __init__(self, get=None, concurrency: int | None = None) -> None:
+        config = cc_config()
+        if get is None:
+            from publishers.fetchers.clients import http_get as get
+        self._get = get
+        self._cache = _response_cache()
+        self.concurrency = concurrency or config["CONCURRENCY"]
+        self.result_ttl = config["RESULT_TTL"]
+
+    def _text(self, url: str) -> str:
+        if self._cache is not None:
+            entry = self._cache.get(url)
+            if entry is not None and entry.is_fresh():
+                return entry.html
+        response = self._get(url, timeout=15.0)
+        response.raise_for_status()
+        text = response.text
+        if self._cache is not None:
+            _cache_text(self._cache, url, text, self.result_ttl)
+        return text
+
+    def presence(self, collection: str, domain: str) -> dict:
+        """Block-count presence of *domain* (and subdomains) in *collection* via the CDX API."""
+        try:
+            data = json.loads(
+                self._text(
+                    f"{CDX_API.format(collection=collection)}?url=*.{domain}"
+                    f"&output=json&showNumPages=true"
+                )
+            )
+            if data.get("pages", 0) == 0:
+                return presence_result(collection, False, 0, None)
+            return presence_result(collection, True, data.get("blocks", 0) * ROWS_PER_BLOCK, None)
+        except Exception as exc:
+            logger.error(f"CC query error for {domain} in {collection}: {exc}")
+            return presence_result(collection, None, None, None, error=str(exc))
+
+    def latest_crawl(self, collection: str, domain: str) -> str | None:
+        """Month (YYYY-MM) of *domain*'s most recent capture in *collection*."""
+        try:
+            text = self._text(
+                f"{CDX_API.format(collection=collection)}?url=*.{domain}"
+                f"&output=json&fl=timestamp&limit=1&sort=desc"
+            )
+            return _crawl_month(json.loads(text.strip().split("\n")[0]).get("timestamp", ""))
+        except Exception as exc:
+            logger.warning(f"CC latest-crawl query failed for {domain} in {collection}: {exc}")
+            return None
+
+    def _map(self, fn, pairs: list[tuple[str, str]]) -> list:
+        if not pairs:
+            return []
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(self.concurrency, len(pairs))), thread_name_prefix="cc-query"
+        ) as executor:
+            return list(executor.map(lambda pair: fn(*pair), pairs))
+
+    def query(self, domains, collections: list[str]) -> dict[str, dict[str, dict]]:
+        """``{domain: {collection: presence_result}}`` for every pair.
+
+        The latest-capture month is looked up only for the newest
+        collection each domain appears in.
+        """
+        domains = list(dict.fromkeys(domains))
+        results: dict[str, dict[str, dict]] = {domain: {} for domain in domains}
+        index = local_index()
+        if index is not None and index.collection in collections:
+            for domain, result in index.lookup_many(domains).items():
+                if result["in_index"] is not None:
+                    results[domain][index.collection] = result
+
+        pending = [(c, d) for d in domains for c in collections if c not in results[d]]
+        for (collection, domain), result in zip(pending, self._map(self.presence, pending)):
+            results[domain][collection] = result
+
+        newest = []
+        for domain in domains:
+            found = next((c for c in collections if results[domain][c]["in_index"]), None)
+            if found is not None and results[domain][found]["latest_crawl"] is None:
+                newest.append((found, domain))
+        for (collection, domain), month in zip(newest, self._map(self.latest_crawl, newest)):
+            results[domain][collection]["latest_crawl"] = month
+
+        return {domain: {c: results[domain][c] for c in collections} for domain in domains}
+
+
+def summarize(results: dict[str, dict], collections: list[str]) -> dict:
+    """``run_cc_step`` result from one domain's ``CCQuerier.query`` answers.
+
+    Presence and page count are the newest collection's; ``latest_crawl``
+    is the newest month the domain was captured in any queried collection;
+    ``history`` maps each answered collection to its page count (0: absent).
+    """
+    summary = dict(results[collections[0]])
+    summary["latest_crawl"] = next(
+        (results[c]["latest_crawl"] for c in collections if results[c]["in_index"]), None
+    )
+    summary["history"] = {
+        c: results[c]["page_count"] for c in collections if results[c]["in_index"] is not None
+    }
+    return summary
+
+
+def merge_history(existing: dict | None, history: dict, limit: int | None = None) -> dict:
+    """*existing* updated with *history*, keeping the *limit* newest collections."""
+    limit = limit or cc_config()["HISTORY_LENGTH"]
+    merged = {**(existing or {}), **history}
+    return {c: merged[c] for c in sorted(merged, reverse=True)[:limit]}
+
+
+collection_registry = CollectionRegistry()
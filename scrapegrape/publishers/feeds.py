@@ -0,0 +1,174 @@
+"""Incremental RSS/Atom polling for publication-frequency estimates.
+
+``FeedPoller.poll`` fetches all of a publisher's feeds (``rss_urls``, at
+most ``MAX_FEEDS``) concurrently through the fetch manager.  Each feed's
+``FeedState`` keeps the response validators, so an unchanged feed costs one
+conditional GET answered with a 304 and is not parsed at all.  A changed
+feed is parsed and only entries whose key is not among the feed's
+``seen_ids`` are converted and recorded.
+
+New entries go into ``Publisher.feed_entry_dates``, a rolling window of the
+``WINDOW`` most recent publication times keyed by entry (link, else id), so
+an article listed in several feeds of the same publisher counts once.
+``feed_dates`` reads that window for ``run_frequency_step``, which polls
+only ``INLINE_FEEDS`` feeds itself and leaves a full poll to the
+``publishers.tasks.poll_feeds`` job.
+"""
+
+from __future__ import annotations
+
+import calendar
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from typing import TYPE_CHECKING
+
+import feedparser
+from django.utils import timezone
+from loguru import logger
+
+from publishers.fetchers.exceptions import AllStrategiesExhausted, FetchError, PolitenessTimeout
+
+if TYPE_CHECKING:
+    from publishers.fetchers.manager import FetchStrategyManager
+    from publishers.models import FeedState, Publisher
+
+DEFAULT_CONFIG = {
+    "ENABLED": True,
+    "MAX_FEEDS": 10,
+    "INLINE_FEEDS": 2,
+    "CONCURRENCY": 4,
+    "WINDOW": 500,
+    "SEEN_IDS": 500,
+}
+
+
+def feeds_config() -> dict:
+    """DEFAULT_CONFIG overridden by settings.FEEDS."""
+    from django.conf import settings
+
+    return {**DEFAULT_CONFIG, **getattr(settings, "FEEDS", {})}
+
+
+def entry_key(entry) -> str | None:
+    """Stable short key for a feed entry: hash of its link, id, title or date."""
+    for field in ("link", "id", "title", "published", "updated"):
+        value = entry.get(field)
+        if value:
+            return hashlib.sha256(f"{field}:{value}".encode("utf-8")).hexdigest()[:16]
+    return None
+
+
+def entry_published(entry) -> datetime | None:
+    """The entry's publication (else update) time as an aware UTC datetime."""
+    parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+    if not parsed:
+        return None
+    try:
+        # feedparser normalises dates to UTC struct_time.
+        return datetime.fromtimestamp(calendar.timegm(parsed), tz=dt_timezone.utc)
+    except (ValueError, OverflowError):
+        return None
+
+
+class FeedPoller:
+    """Polls a publisher's feeds concurrently and records new entries."""
+
+    def __init__(
+        self, manager: FetchStrategyManager, config: dict | None = None
+    ) -> None:
+        self._manager = manager
+        self._config = config if config is not None else feeds_config()
+
+    def poll(self, publisher: Publisher) -> dict:
+        """Poll every feed once; returns counts (``fetched``, ``not_modified``, ``errors``, ``new``).
+
+        Fetching and parsing run in worker threads; the database is only
+        touched from the calling thread.
+        """
+        from publishers.models import FeedState
+
+        stats = dict.fromkeys(("fetched", "not_modified", "errors", "new"), 0)
+        urls = list(dict.fromkeys(publisher.rss_urls or []))[: self._config["MAX_FEEDS"]]
+        if not urls:
+            return stats
+        states = {
+            state.url: state
+            for state in FeedState.objects.filter(publisher=publisher, url__in=urls)
+        }
+        states = [states.get(url) or FeedState(publisher=publisher, url=url) for url in urls]
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(self._config["CONCURRENCY"], len(states))),
+            thread_name_prefix="feed-poll",
+        ) as executor:
+            outcomes = list(
+                executor.map(lambda state: self._fetch(publisher, state), states)
+            )
+
+        window = dict(publisher.feed_entry_dates or {})
+        now = timezone.now()
+        for state, (outcome, headers, entries) in zip(states, outcomes):
+            stats[outcome] += 1
+            if outcome == "errors":
+                continue
+            state.fetched_at = now
+            if outcome == "fetched":
+                state.etag = headers.get("etag", "")[:255]
+                state.last_modified = headers.get("last-modified", "")[:64]
+                seen = set(state.seen_ids)
+                new_keys = [key for key, _ in entries if key not in seen]
+                state.seen_ids = (new_keys + list(state.seen_ids))[: self._config["SEEN_IDS"]]
+                for key, published in entries:
+                    if published is not None and key not in window:
+                        window[key] = published.isoformat()
+                        stats["new"] += 1
+            state.save()
+
+        if window != publisher.feed_entry_dates:
+            newest = sorted(window.items(), key=lambda item: item[1], reverse=True)
+            publisher.feed_entry_dates = dict(newest[: self._config["WINDOW"]])
+            publisher.save(update_fields=["feed_entry_dates"])
+        return stats
+
+    def _fetch(
+        self, publisher: Publisher, state: FeedState
+    ) -> tuple[str, dict[str, str], list[tuple[str, datetime | None]]]:
+        """Conditional GET of one feed; returns its outcome, headers and unseen entries."""
+        try:
+            with self._manager.stream(
+                state.url, publisher=publisher, headers=state.conditional_headers()
+            ) as body:
+                if body.status_code == 304:
+                    return "not_modified", body.headers, []
+                data = body.read()
+                headers = body.headers
+        except (AllStrategiesExhausted, FetchError, PolitenessTimeout) as exc:
+            logger.warning(f"Feed poll failed for {state.url}: {exc}")
+            return "errors", {}, []
+
+        feed = feedparser.parse(data)
+        if feed.bozo and not feed.entries:
+            logger.warning(f"Feed {state.url} could not be parsed: {feed.get('bozo_exception')}")
+            return "errors", {}, []
+        seen = set(state.seen_ids)
+        entries = []
+        for entry in feed.entries:
+            key = entry_key(entry)
+            if key is None or key in seen:
+                continue
+            seen.add(key)
+            entries.append((key, entry_published(entry)))
+        return "fetched", headers, entries
+
+
+def feed_dates(publisher: Publisher) -> list[datetime]:
+    """Publication times in the publisher's feed window, newest first."""
+    dates = []
+    for value in (publisher.feed_entry_dates or {}).values():
+        try:
+            dates.append(datetime.fromisoformat(value))
+        except (TypeError, ValueError):
+            continue
+    return sorted(dates, reverse=True)
@@ -1,12 +1,31 @@
-"""Fetch strategy module: curl-cffi default, Zyte API fallback, per-publisher memory."""
+"""Fetch strategy module: curl-cffi default, Zyte API fallback, per-publisher memory.
+
+AsyncFetchStrategyManager is the asyncio twin for batch fetching; the sync
+manager serves repeat fetches from the ETag/Last-Modified response cache.
+"""
 
 from .base import FetchResult
-from .exceptions import AllStrategiesExhausted, FetchError
-from .manager import FetchStrategyManager
+from .cache import ResponseCache, get_response_cache
+from .clients import http_clients
+from .documents import DocumentStore
+from .exceptions import AllStrategiesExhausted, FetchError, PolitenessTimeout
+from .hedging import hedge_stats
+from .manager import AsyncFetchStrategyManager, FetchStrategyManager
+from .politeness import PolitenessLimiter
+from .streaming import BodyStream
 
 __all__ = [
     "FetchStrategyManager",
+    "AsyncFetchStrategyManager",
     "FetchResult",
     "FetchError",
     "AllStrategiesExhausted",
+    "http_clients",
+    "ResponseCache",
+    "get_response_cache",
+    "PolitenessLimiter",
+    "PolitenessTimeout",
+    "hedge_stats",
+    "BodyStream",
+    "DocumentStore",
 ]
@@ -2,7 +2,8 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections.abc import Iterable
+from dataclasses import dataclass, field
 from typing import Protocol
 
 
@@ -14,6 +15,43 @@ class FetchResult:
     status_code: int
     strategy_used: str
     url: str
+    headers: dict[str, str] = field(default_factory=dict)  # lower-cased names
+    cookies: dict[str, str] = field(default_factory=dict)  # Set-Cookie name -> value
+    cache_status: str = ""  # "", "hit", "revalidated" or "miss"
+    truncated: bool = False  # body cut off at the content-type byte cap
+
+
+def normalize_headers(headers) -> dict[str, str]:
+    """Return a plain dict of response headers with lower-cased names."""
+    try:
+        return {str(k).lower(): str(v) for k, v in headers.items()}
+    except (AttributeError, TypeError):
+        return {}
+
+
+def parse_set_cookie(values: Iterable[str]) -> dict[str, str]:
+    """Cookie name -> value from Set-Cookie header values (attributes dropped)."""
+    cookies = {}
+    for value in values:
+        name, sep, cookie_value = value.split(";", 1)[0].partition("=")
+        if sep and name.strip():
+            cookies[name.strip()] = cookie_value.strip()
+    return cookies
+
+
+def response_cookies(headers) -> dict[str, str]:
+    """Cookies set by a response, from a multi-valued headers object.
+
+    curl-cffi and httpx expose repeated Set-Cookie headers through
+    ``get_list``; plain mappings only hold a single value.
+    """
+    if hasattr(headers, "get_list"):
+        return parse_set_cookie(headers.get_list("set-cookie"))
+    try:
+        value = headers.get("set-cookie") or headers.get("Set-Cookie")
+    except AttributeError:
+        return {}
+    return parse_set_cookie([value]) if value else {}
 
 
 class BaseFetcher(Protocol):
@@ -21,6 +59,9 @@ class BaseFetcher(Protocol):
 
     name: str
 
-    def fetch(self, url: str) -> FetchResult:
-        """Fetch a URL and return the result. Raises FetchError on failure."""
+    def fetch(self, url: str, headers: dict[str, str] | None = None) -> FetchResult:
+        """Fetch a URL and return the result. Raises FetchError on failure.
+
+        *headers* are extra request headers (e.g. conditional-GET validators).
+        """
         ...
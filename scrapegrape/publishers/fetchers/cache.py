@@ -0,0 +1,406 @@
+"""HTTP response cache with ETag/Last-Modified revalidation for FetchStrategyManager.
+
+A publisher's robots.txt, sitemap index, homepage and ToS page rarely change
+between pipeline runs, so successful (200) responses are stored keyed by
+canonical URL together with their headers.  While an entry is fresh (per
+content-type TTL) it is served without any request; once stale the next
+fetch sends ``If-None-Match`` / ``If-Modified-Since`` and a 304 refreshes
+the entry instead of re-downloading the body.
+
+Two backends are available, both evicting least-recently-used entries once
+the cache grows past ``MAX_BYTES``:
+
+- ``RedisCacheBackend``: shared by every RQ worker (default).
+- ``DiskCacheBackend``: one file per entry under a local directory.
+
+Configured by ``settings.FETCH_CACHE``; ``"BACKEND": None`` disables caching.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from loguru import logger
+from w3lib.url import canonicalize_url
+
+from .base import FetchResult
+
+DEFAULT_TTLS = {
+    "text/plain": 24 * 3600,  # robots.txt
+    "xml": 6 * 3600,  # sitemaps, RSS/Atom feeds
+    "text/html": 3600,
+    "default": 3600,
+}
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_ENTRY_BYTES = 5 * 1024 * 1024
+
+STAT_KEYS = ("hits", "misses", "revalidations", "bytes_saved", "zyte_requests_saved")
+
+
+@dataclass
+class CacheEntry:
+    """A cached response plus the validators needed to revalidate it."""
+
+    url: str
+    html: str
+    status_code: int
+    strategy_used: str
+    headers: dict[str, str] = field(default_factory=dict)
+    cookies: dict[str, str] = field(default_factory=dict)
+    stored_at: float = 0.0
+    expires_at: float = 0.0
+
+    @property
+    def etag(self) -> str | None:
+        return self.headers.get("etag")
+
+    @property
+    def last_modified(self) -> str | None:
+        return self.headers.get("last-modified")
+
+    def is_fresh(self, now: float | None = None) -> bool:
+        return (now if now is not None else time.time()) < self.expires_at
+
+    def conditional_headers(self) -> dict[str, str]:
+        """Request headers for a conditional GET (empty when there are no validators)."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_result(self, cache_status: str) -> FetchResult:
+        return FetchResult(
+            html=self.html,
+            status_code=self.status_code,
+            strategy_used=self.strategy_used,
+            url=self.url,
+            headers=dict(self.headers),
+            cookies=dict(self.cookies),
+            cache_status=cache_status,
+        )
+
+    def dumps(self) -> bytes:
+        return zlib.compress(json.dumps(asdict(self)).encode("utf-8"))
+
+    @classmethod
+    def loads(cls, data: bytes) -> CacheEntry:
+        return cls(**json.loads(zlib.decompress(data)))
+
+
+class DiskCacheBackend:
+    """Stores one compressed entry file per key; file mtime tracks recency."""
+
+    def __init__(self, directory: str | Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats: Counter[str] = Counter()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        os.utime(path)  # mark as recently used
+        return data
+
+    def set(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        self._evict()
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        for path in self._entries():
+            path.unlink(missing_ok=True)
+        with self._lock:
+            self._stats.clear()
+
+    def _entries(self) -> list[Path]:
+        if not self.directory.exists():
+            return []
+        return [p for p in self.directory.glob("*/*") if p.suffix != ".tmp"]
+
+    def _evict(self) -> None:
+        """Delete least-recently-used entries until the cache fits in max_bytes."""
+        with self._lock:
+            entries = []
+            for path in self._entries():
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries, key=lambda e: e[0]):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+
+    def incr(self, stat: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[stat] += amount
+
+    def stats(self, keys: tuple[str, ...] = STAT_KEYS) -> dict[str, int]:
+        with self._lock:
+            return {key: self._stats[key] for key in keys}
+
+
+class RedisCacheBackend:
+    """Shares entries across workers; a sorted set scored by last access drives LRU."""
+
+    def __init__(
+        self,
+        client=None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        prefix: str = "fetchcache",
+    ) -> None:
+        self._client = client
+        self.max_bytes = max_bytes
+        self.prefix = prefix
+
+    @property
+    def client(self):
+        if self._client is None:
+            from publishers.pipeline.events import get_redis_client
+
+            self._client = get_redis_client()
+        return self._client
+
+    def _key(self, *parts: str) -> str:
+        return ":".join((self.prefix, *parts))
+
+    def get(self, key: str) -> bytes | None:
+        data = self.client.get(self._key("entry", key))
+        if data is not None:
+            self.client.zadd(self._key("lru"), {key: time.time()})
+        return data
+
+    def set(self, key: str, data: bytes) -> None:
+        r = self.client
+        old_size = r.hget(self._key("sizes"), key)
+        pipe = r.pipeline()
+        pipe.set(self._key("entry", key), data)
+        pipe.zadd(self._key("lru"), {key: time.time()})
+        pipe.hset(self._key("sizes"), key, len(data))
+        pipe.incrby(self._key("bytes"), len(data) - int(old_size or 0))
+        pipe.execute()
+        self._evict()
+
+    def delete(self, key: str) -> None:
+        r = self.client
+        size = r.hget(self._key("sizes"), key)
+        pipe = r.pipeline()
+        pipe.delete(self._key("entry", key))
+        pipe.zrem(self._key("lru"), key)
+        pipe.hdel(self._key("sizes"), key)
+        if size is not None:
+            pipe.decrby(self._key("bytes"), int(size))
+        pipe.execute()
+
+    def clear(self) -> None:
+        r = self.client
+        keys = list(r.scan_iter(match=self._key("*")))
+        if keys:
+            r.delete(*keys)
+
+    def _evict(self) -> None:
+        r = self.client
+        while int(r.get(self._key("bytes")) or 0) > self.max_bytes:
+            oldest = r.zpopmin(self._key("lru"))
+            if not oldest:
+                break
+            key = oldest[0][0]
+            self.delete(key.decode() if isinstance(key, bytes) else key)
+
+    def incr(self, stat: str, amount: int = 1) -> None:
+        self.client.hincrby(self._key("stats"), stat, amount)
+
+    def stats(self, keys: tuple[str, ...] = STAT_KEYS) -> dict[str, int]:
+        raw = self.client.hgetall(self._key("stats"))
+        values = {
+            (k.decode() if isinstance(k, bytes) else k): int(v) for k, v in raw.items()
+        }
+        return {key: values.get(key, 0) for key in keys}
+
+
+class ResponseCache:
+    """Front-end used by FetchStrategyManager: TTLs, validators and statistics.
+
+    Backend errors are logged and treated as misses -- the cache must never
+    make a fetch fail.
+    """
+
+    def __init__(
+        self,
+        backend: DiskCacheBackend | RedisCacheBackend,
+        ttls: dict[str, int] | None = None,
+        max_entry_bytes: int = DEFAULT_MAX_ENTRY_BYTES,
+    ) -> None:
+        self.backend = backend
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_entry_bytes = max_entry_bytes
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(canonicalize_url(url).encode("utf-8")).hexdigest()
+
+    def ttl_for(self, content_type: str | None) -> int:
+        """TTL in seconds for *content_type*; the most specific configured match wins."""
+        mime = (content_type or "").split(";")[0].strip().lower()
+        if mime in self.ttls:
+            return self.ttls[mime]
+        for pattern, ttl in self.ttls.items():
+            if pattern != "default" and pattern in mime:
+                return ttl
+        return self.ttls["default"]
+
+    def get(self, url: str) -> CacheEntry | None:
+        try:
+            data = self.backend.get(self.key(url))
+            return CacheEntry.loads(data) if data is not None else None
+        except Exception as exc:
+            logger.warning(f"Fetch cache lookup failed for {url}: {exc}")
+            return None
+
+    def _save(self, entry: CacheEntry) -> None:
+        try:
+            self.backend.set(self.key(entry.url), entry.dumps())
+        except Exception as exc:
+            logger.warning(f"Fetch cache store failed for {entry.url}: {exc}")
+
+    def _stamp(self, entry: CacheEntry, ttl: int | None = None) -> CacheEntry:
+        entry.stored_at = time.time()
+        if ttl is None:
+            ttl = self.ttl_for(entry.headers.get("content-type"))
+        entry.expires_at = entry.stored_at + ttl
+        return entry
+
+    def store(self, result: FetchResult, ttl: int | None = None) -> CacheEntry | None:
+        """Cache a successful response; returns None when it is not cacheable.
+
+        A body cut off at the byte cap (``result.truncated``) is never cached,
+        since a later hit would serve it as the complete document.  *ttl*
+        overrides the content-type TTL, for callers that know how long a
+        response stays valid.
+        """
+        if result.status_code != 200 or result.truncated:
+            return None
+        if len(result.html) > self.max_entry_bytes:
+            return None
+        if "no-store" in result.headers.get("cache-control", "").lower():
+            return None
+        entry = self._stamp(
+            CacheEntry(
+                url=result.url,
+                html=result.html,
+                status_code=result.status_code,
+                strategy_used=result.strategy_used,
+                headers=dict(result.headers),
+                cookies=dict(result.cookies),
+            ),
+            ttl,
+        )
+        self._save(entry)
+        return entry
+
+    def revalidate(self, entry: CacheEntry, headers: dict[str, str]) -> CacheEntry:
+        """Refresh *entry* after a 304, merging any updated validators."""
+        entry.headers.update(
+            {k: v for k, v in headers.items() if k not in ("content-length", "content-type")}
+        )
+        self._save(self._stamp(entry))
+        return entry
+
+    def delete(self, url: str) -> None:
+        try:
+            self.backend.delete(self.key(url))
+        except Exception as exc:
+            logger.warning(f"Fetch cache delete failed for {url}: {exc}")
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def record(self, outcome: str, entry: CacheEntry | None = None) -> None:
+        """Count a "hits", "misses" or "revalidations" outcome and the bytes it saved."""
+        try:
+            self.backend.incr(outcome)
+            if entry is not None and outcome != "misses":
+                self.backend.incr("bytes_saved", len(entry.html.encode("utf-8")))
+                if entry.strategy_used == "zyte":
+                    self.backend.incr("zyte_requests_saved")
+        except Exception as exc:
+            logger.warning(f"Fetch cache stats update failed: {exc}")
+
+    def stats(self) -> dict[str, int | float]:
+        """Counters plus ``hit_ratio`` (hits and revalidations over all lookups)."""
+        stats: dict[str, int | float] = dict(self.backend.stats())
+        served = stats["hits"] + stats["revalidations"]
+        total = served + stats["misses"]
+        stats["hit_ratio"] = served / total if total else 0.0
+        return stats
+
+
+_UNSET = object()
+_response_cache: ResponseCache | None | object = _UNSET
+_response_cache_lock = threading.Lock()
+
+
+def build_response_cache(config: dict) -> ResponseCache | None:
+    """Build a ResponseCache from a ``FETCH_CACHE``-style dict (None when disabled)."""
+    backend_name = config.get("BACKEND")
+    max_bytes = int(config.get("MAX_BYTES", DEFAULT_MAX_BYTES))
+    if not backend_name:
+        return None
+    if backend_name == "redis":
+        backend = RedisCacheBackend(max_bytes=max_bytes, prefix=config.get("PREFIX", "fetchcache"))
+    elif backend_name == "disk":
+        backend = DiskCacheBackend(config["DIRECTORY"], max_bytes=max_bytes)
+    else:
+        raise ValueError(f"Unknown FETCH_CACHE backend: {backend_name!r}")
+    return ResponseCache(
+        backend,
+        ttls=config.get("TTLS"),
+        max_entry_bytes=int(config.get("MAX_ENTRY_BYTES", DEFAULT_MAX_ENTRY_BYTES)),
+    )
+
+
+def get_response_cache() -> ResponseCache | None:
+    """Return the process-wide ResponseCache configured by settings.FETCH_CACHE."""
+    global _response_cache
+    from django.conf import settings
+
+    with _response_cache_lock:
+        if _response_cache is _UNSET:
+            _response_cache = build_response_cache(getattr(settings, "FETCH_CACHE", {}))
+        return _response_cache
+
+
+@receiver(setting_changed)
+def _reset_response_cache(*, setting, **kwargs) -> None:
+    global _response_cache
+    if setting == "FETCH_CACHE":
+        with _response_cache_lock:
+            _response_cache = _UNSET
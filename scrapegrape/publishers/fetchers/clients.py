@@ -0,0 +1,192 @@
+"""Process-wide pooled HTTP clients shared by every fetcher and pipeline step.
+
+One job talks to the same publisher host 6-10 times (robots.txt, sitemap
+probes, homepage, ToS page, article), so every outbound request goes through
+a long-lived client that keeps connections alive between calls instead of
+paying a fresh TCP + TLS handshake each time:
+
+- ``curl_session()``: curl-cffi Session (thread-local curl handles) for
+  browser-impersonating fetches.
+- ``requests_session()``: requests Session for the Zyte API.
+- ``httpx_client()``: httpx Client for plain API calls (Common Crawl, RSS),
+  negotiating HTTP/2 when the optional ``h2`` package is installed.
+
+Async clients (``async_curl_session()``, ``async_httpx_client()``) hold
+connections bound to an event loop, so they are cached per running loop.
+
+Pool limits come from ``settings.HTTP_CLIENT_LIMITS``.  Pool hits and misses
+are counted per client kind: a request is a hit when the same client talked
+to the same host within the keep-alive window, i.e. when a pooled connection
+was available for reuse.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+from collections import Counter
+from importlib.util import find_spec
+from time import monotonic
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from curl_cffi import CurlOpt
+from curl_cffi import requests as curl_requests
+from requests.adapters import HTTPAdapter
+
+from .politeness import politeness
+
+DEFAULT_LIMITS = {
+    "max_connections": 100,
+    "max_connections_per_host": 10,
+    "max_hosts": 100,
+    "keepalive_expiry": 30.0,
+    "http2": True,
+}
+
+
+def _configured_limits() -> dict:
+    """Return DEFAULT_LIMITS overridden by settings.HTTP_CLIENT_LIMITS."""
+    from django.conf import settings
+
+    return {**DEFAULT_LIMITS, **getattr(settings, "HTTP_CLIENT_LIMITS", {})}
+
+
+class HttpClientRegistry:
+    """Lazily builds and hands out the shared pooled clients."""
+
+    def __init__(self, limits: dict | None = None) -> None:
+        self._limits = limits
+        self._lock = threading.Lock()
+        self._curl: curl_requests.Session | None = None
+        self._requests: requests.Session | None = None
+        self._httpx: httpx.Client | None = None
+        self._async_clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict
+        ] = weakref.WeakKeyDictionary()
+        self._counters: Counter[str] = Counter()
+        self._last_used: dict[tuple[str, str], float] = {}
+
+    @property
+    def limits(self) -> dict:
+        if self._limits is None:
+            self._limits = _configured_limits()
+        return self._limits
+
+    @property
+    def http2_enabled(self) -> bool:
+        """HTTP/2 for httpx needs the optional h2 package."""
+        return bool(self.limits["http2"]) and find_spec("h2") is not None
+
+    def curl_session(self) -> curl_requests.Session:
+        with self._lock:
+            if self._curl is None:
+                self._curl = curl_requests.Session(
+                    curl_options={CurlOpt.MAXCONNECTS: self.limits["max_connections"]},
+                )
+            return self._curl
+
+    def requests_session(self) -> requests.Session:
+        with self._lock:
+            if self._requests is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self.limits["max_hosts"],
+                    pool_maxsize=self.limits["max_connections_per_host"],
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._requests = session
+            return self._requests
+
+    def httpx_client(self) -> httpx.Client:
+        with self._lock:
+            if self._httpx is None:
+                self._httpx = httpx.Client(
+                    http2=self.http2_enabled,
+                    limits=httpx.Limits(
+                        max_connections=self.limits["max_connections"],
+                        max_keepalive_connections=self.limits["max_connections_per_host"],
+                        keepalive_expiry=self.limits["keepalive_expiry"],
+                    ),
+                )
+            return self._httpx
+
+    def _loop_clients(self) -> dict:
+        loop = asyncio.get_running_loop()
+        return self._async_clients.setdefault(loop, {})
+
+    def async_curl_session(self) -> curl_requests.AsyncSession:
+        with self._lock:
+            clients = self._loop_clients()
+            if "curl" not in clients:
+                clients["curl"] = curl_requests.AsyncSession(
+                    max_clients=self.limits["max_connections"],
+                    curl_options={CurlOpt.MAXCONNECTS: self.limits["max_connections"]},
+                )
+            return clients["curl"]
+
+    def async_httpx_client(self) -> httpx.AsyncClient:
+        with self._lock:
+            clients = self._loop_clients()
+            if "httpx" not in clients:
+                clients["httpx"] = httpx.AsyncClient(
+                    http2=self.http2_enabled,
+                    limits=httpx.Limits(
+                        max_connections=self.limits["max_connections"],
+                        max_keepalive_connections=self.limits["max_connections_per_host"],
+                        keepalive_expiry=self.limits["keepalive_expiry"],
+                    ),
+                )
+            return clients["httpx"]
+
+    async def aclose(self) -> None:
+        """Close the async clients bound to the running event loop."""
+        with self._lock:
+            clients = self._async_clients.pop(asyncio.get_running_loop(), {})
+        if "curl" in clients:
+            await clients["curl"].close()
+        if "httpx" in clients:
+            await clients["httpx"].aclose()
+
+    def record(self, kind: str, url: str) -> bool:
+        """Count a request made by client *kind*; return True on a pool hit."""
+        host = urlsplit(url).netloc.lower()
+        now = monotonic()
+        with self._lock:
+            last = self._last_used.get((kind, host))
+            hit = last is not None and now - last <= self.limits["keepalive_expiry"]
+            self._last_used[(kind, host)] = now
+            self._counters[f"{kind}.{'hits' if hit else 'misses'}"] += 1
+        return hit
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Return ``{kind: {"hits": n, "misses": n}}`` for every client used so far."""
+        with self._lock:
+            counters = dict(self._counters)
+        stats: dict[str, dict[str, int]] = {}
+        for key, value in counters.items():
+            kind, outcome = key.split(".", 1)
+            stats.setdefault(kind, {"hits": 0, "misses": 0})[outcome] = value
+        return stats
+
+    def close(self) -> None:
+        """Close every open client; the next call rebuilds them."""
+        with self._lock:
+            for client in (self._curl, self._requests, self._httpx):
+                if client is not None:
+                    client.close()
+            self._curl = self._requests = self._httpx = None
+            self._last_used.clear()
+
+
+http_clients = HttpClientRegistry()
+
+
+def http_get(url: str, **kwargs) -> httpx.Response:
+    """GET *url* through the shared pooled httpx client, within the host's politeness slot."""
+    with politeness.slot(url, strategy="httpx"):
+        http_clients.record("httpx", url)
+        return http_clients.httpx_client().get(url, **kwargs)
@@ -1,21 +1,22 @@
-"""CurlCffiFetcher: browser TLS impersonation via curl-cffi."""
+"""CurlCffiFetcher: browser TLS impersonation via curl-cffi (sync and async)."""
 
 from __future__ import annotations
 
-from curl_cffi import requests as curl_requests
+from contextlib import ExitStack
+
 from curl_cffi.requests.exceptions import RequestException
 
-from .base import FetchResult
+from publishers.signatures import signature_set
+
+from .base import FetchResult, normalize_headers, response_cookies
+from .clients import http_clients
 from .exceptions import FetchError
+from .politeness import politeness
+from .streaming import BodyStream, max_bytes_for
 
-WAF_BLOCK_SIGNATURES = [
-    "checking your browser",
-    "cloudflare",
-    "access denied",
-    "just a moment",
-    "cf-browser-verification",
-    "ray id",
-]
+# Challenge pages put their markers near the top; streamed bodies are only
+# checked this far before being handed to the consumer.
+WAF_PEEK_BYTES = 64 * 1024
 
 
 class CurlCffiFetcher:
@@ -27,40 +28,146 @@ class CurlCffiFetcher:
         self.timeout = timeout
         self.impersonate = impersonate
 
-    def fetch(self, url: str) -> FetchResult:
-        """Fetch *url* using curl-cffi. Raises FetchError on WAF block or connection failure."""
+    def fetch(self, url: str, headers: dict[str, str] | None = None) -> FetchResult:
+        """Fetch *url* using curl-cffi. Raises FetchError on WAF block or connection failure.
+
+        The body is streamed and cut off at the content-type byte cap
+        (``FetchResult.truncated``).
+        """
+        with self.stream(url, headers=headers) as body:
+            result = body.to_result()
+        if self._is_waf_block(result.html):
+            raise FetchError(
+                f"WAF block detected (status={result.status_code})",
+                strategy="curl_cffi",
+                blocked=True,
+                status_code=result.status_code,
+            )
+        return result
+
+    def stream(
+        self,
+        url: str,
+        headers: dict[str, str] | None = None,
+        max_bytes: int | None = None,
+    ) -> BodyStream:
+        """Open *url* for incremental reading.
+
+        Status and the first WAF_PEEK_BYTES of the body are checked before
+        returning, so blocks still raise FetchError.  The politeness slot and
+        connection are held until the stream is closed.
+        """
+        resources = ExitStack()
         try:
-            response = curl_requests.get(
+            resources.enter_context(politeness.slot(url, strategy=self.name))
+            http_clients.record(self.name, url)
+            response = http_clients.curl_session().get(
                 url,
+                headers=headers,
                 impersonate=self.impersonate,
                 timeout=self.timeout,
+                stream=True,
             )
         except RequestException as exc:
+            resources.close()
             raise FetchError(
                 f"curl-cffi connection failed: {exc}", strategy="curl_cffi"
             ) from exc
+        except BaseException:
+            resources.close()
+            raise
+        resources.callback(response.close)
 
-        if response.status_code == 403 or self._is_waf_block(response.text):
+        response_headers = normalize_headers(response.headers)
+        body = BodyStream(
+            response.iter_content(),
+            url=url,
+            status_code=response.status_code,
+            strategy_used=self.name,
+            headers=response_headers,
+            cookies=response_cookies(response.headers),
+            encoding=response.charset_encoding,
+            max_bytes=max_bytes or max_bytes_for(response_headers.get("content-type"), url),
+            on_close=resources.close,
+        )
+        try:
+            prefix = body.peek(WAF_PEEK_BYTES).decode(body.encoding, errors="replace")
+            self._check_response(response, prefix)
+        except BaseException:
+            body.close()
+            raise
+        return body
+
+    def _check_response(self, response, body: str) -> None:
+        """Raise FetchError for WAF blocks and HTTP errors."""
+        if response.status_code == 403 or self._is_waf_block(body):
             raise FetchError(
                 f"WAF block detected (status={response.status_code})",
                 strategy="curl_cffi",
+                blocked=True,
+                status_code=response.status_code,
             )
 
         try:
             response.raise_for_status()
         except Exception as exc:
             raise FetchError(
-                f"HTTP error {response.status_code}: {exc}", strategy="curl_cffi"
+                f"HTTP error {response.status_code}: {exc}",
+                strategy="curl_cffi",
+                status_code=response.status_code,
             ) from exc
 
-        return FetchResult(
-            html=response.text,
+    def _is_waf_block(self, body: str) -> bool:
+        """Check the head of the body for known WAF challenge signatures."""
+        return signature_set("waf_block").search(body) is not None
+
+
+class AsyncCurlCffiFetcher(CurlCffiFetcher):
+    """Async twin of CurlCffiFetcher built on curl-cffi's AsyncSession."""
+
+    async def fetch(self, url: str, headers: dict[str, str] | None = None) -> FetchResult:
+        """Fetch *url* without blocking the event loop. Same errors as CurlCffiFetcher.fetch."""
+        try:
+            async with politeness.aslot(url, strategy=self.name):
+                http_clients.record(self.name, url)
+                response = await http_clients.async_curl_session().get(
+                    url,
+                    headers=headers,
+                    impersonate=self.impersonate,
+                    timeout=self.timeout,
+                    stream=True,
+                )
+                try:
+                    response_headers = normalize_headers(response.headers)
+                    data, truncated = await self._read_capped(
+                        response, max_bytes_for(response_headers.get("content-type"), url)
+                    )
+                finally:
+                    await response.aclose()
+        except RequestException as exc:
+            raise FetchError(
+                f"curl-cffi connection failed: {exc}", strategy="curl_cffi"
+            ) from exc
+
+        result = BodyStream(
+            [data],
+            url=url,
             status_code=response.status_code,
             strategy_used=self.name,
-            url=url,
-        )
+            headers=response_headers,
+            cookies=response_cookies(response.headers),
+            encoding=response.charset_encoding,
+        ).to_result()
+        result.truncated = truncated
+        self._check_response(response, result.html)
+        return result
 
-    def _is_waf_block(self, body: str) -> bool:
-        """Check if the response body contains known WAF challenge signatures."""
-        body_lower = body.lower()
-        return any(sig in body_lower for sig in WAF_BLOCK_SIGNATURES)
+    @staticmethod
+    async def _read_capped(response, cap: int) -> tuple[bytes, bool]:
+        """Read at most *cap* body bytes, abandoning the rest; returns (body, truncated)."""
+        data = bytearray()
+        async for chunk in response.aiter_content():
+            data.extend(chunk)
+            if len(data) > cap:
+                return bytes(data[:cap]), True
+        return bytes(data), False
@@ -0,0 +1,82 @@
+"""Job-scoped document store: each URL is fetched at most once per pipeline run.
+
+Several steps of one ``run_pipeline`` job need the same page: ToS discovery
+and the RSS/RSL/publisher-details steps all read the homepage, and the
+submitted article is often the homepage itself.  ``run_pipeline`` creates one
+``DocumentStore`` and passes it through the steps; ``DocumentStore.fetch``
+deduplicates by canonical URL (``sanitize_url``) and hands every caller the
+same ``FetchResult``, headers included.  Concurrent steps asking for a URL
+that is already being fetched wait for that fetch instead of starting their
+own.  Failures are remembered too, so an unreachable page costs one round of
+strategies per job, not one per step.
+
+Given an event *loop* (``run_pipeline`` passes ``pipeline_loop()``), the
+store's fetches hedge their strategies on it when settings.FETCH_HEDGING is
+enabled; see ``FetchStrategyManager.fetch``.
+
+Results are shared between steps and must be treated as read-only.
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future
+from typing import TYPE_CHECKING
+
+from publishers.url_sanitizer import sanitize_url
+
+from .base import FetchResult
+from .manager import FetchStrategyManager
+
+if TYPE_CHECKING:
+    from publishers.pipeline.loop import EventLoopThread
+
+
+class DocumentStore:
+    """Per-job memo of fetched documents keyed by canonical URL."""
+
+    def __init__(
+        self,
+        manager: FetchStrategyManager | None = None,
+        loop: EventLoopThread | None = None,
+    ) -> None:
+        self._manager = manager if manager is not None else FetchStrategyManager()
+        self._loop = loop
+        self._lock = threading.Lock()
+        self._documents: dict[str, Future] = {}
+        self.fetches = 0
+        self.reused = 0
+
+    @staticmethod
+    def key(url: str) -> str:
+        return sanitize_url(url)
+
+    def fetch(self, url: str, publisher=None) -> FetchResult:
+        """Fetch *url* once for this job; raises the first fetch's error again on reuse."""
+        key = self.key(url)
+        with self._lock:
+            document = self._documents.get(key)
+            owner = document is None
+            if owner:
+                document = self._documents[key] = Future()
+                self.fetches += 1
+            else:
+                self.reused += 1
+        if owner:
+            try:
+                document.set_result(self._manager.fetch(url, publisher=publisher, loop=self._loop))
+            except BaseException as exc:
+                document.set_exception(exc)
+        return document.result()
+
+    def get(self, url: str) -> FetchResult | None:
+        """The stored result for *url* if it was fetched successfully, else None."""
+        with self._lock:
+            document = self._documents.get(self.key(url))
+        if document is None or not document.done() or document.exception() is not None:
+            return None
+        return document.result()
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return self.key(url) in self._documents
@@ -4,10 +4,37 @@ from __future__ import annotations
 
 
 class FetchError(Exception):
-    """A single fetch strategy failed."""
+    """A single fetch strategy failed.
 
-    def __init__(self, message: str, strategy: str):
+    ``blocked`` marks WAF/bot-protection blocks (as opposed to network or
+    HTTP errors); ``status_code`` is set when a response was received.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        strategy: str,
+        *,
+        blocked: bool = False,
+        status_code: int | None = None,
+    ):
+        self.strategy = strategy
+        self.blocked = blocked
+        self.status_code = status_code
+        super().__init__(message)
+
+
+class PolitenessTimeout(Exception):
+    """No politeness slot for the domain became free within MAX_WAIT_SECONDS.
+
+    Deliberately not a FetchError: the domain being busy says nothing about
+    the strategy, so the manager re-raises it without falling back to the
+    next strategy and without recording the attempt in telemetry.
+    """
+
+    def __init__(self, message: str, strategy: str, *, domain: str = ""):
         self.strategy = strategy
+        self.domain = domain
         super().__init__(message)
 
 
@@ -0,0 +1,113 @@
+"""Latency tracking and statistics for hedged fetches.
+
+With hedging enabled (``settings.FETCH_HEDGING["ENABLED"]``)
+``AsyncFetchStrategyManager`` does not wait out a slow preferred strategy: once it has run longer
+than the domain's recent p95 latency for that strategy, the next strategy is
+launched in parallel, the first valid result wins and the loser is
+cancelled.  A running sync request cannot be aborted, so the sync manager
+only hedges when given an event loop to run the async attempts on (the
+pipeline's ``DocumentStore`` passes ``pipeline_loop()``).
+
+``latency_tracker`` keeps a rolling window of successful fetch latencies per
+(domain, strategy) in this process; ``hedge_stats`` counts how often hedges
+fire, how often the backup wins and how many Zyte requests hedging added, so
+the percentile and delays can be tuned.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import Counter, deque
+
+DEFAULT_CONFIG = {
+    "ENABLED": False,
+    "PERCENTILE": 95,
+    "DEFAULT_DELAY": 5.0,
+    "MIN_DELAY": 0.5,
+    "MAX_DELAY": 20.0,
+    "MIN_SAMPLES": 5,
+    "WINDOW": 100,
+}
+
+
+def hedging_config() -> dict:
+    """DEFAULT_CONFIG overridden by settings.FETCH_HEDGING."""
+    from django.conf import settings
+
+    return {**DEFAULT_CONFIG, **getattr(settings, "FETCH_HEDGING", {})}
+
+
+class LatencyTracker:
+    """Rolling per-(domain, strategy) latency samples."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._samples: dict[tuple[str, str], deque[float]] = {}
+
+    def observe(self, domain: str, strategy: str, seconds: float, window: int = 100) -> None:
+        with self._lock:
+            samples = self._samples.get((domain, strategy))
+            if samples is None or samples.maxlen != window:
+                samples = deque(samples or (), maxlen=window)
+                self._samples[(domain, strategy)] = samples
+            samples.append(seconds)
+
+    def percentile(self, domain: str, strategy: str, pct: float) -> float | None:
+        """Nearest-rank percentile of the recorded samples, or None if there are none."""
+        with self._lock:
+            samples = sorted(self._samples.get((domain, strategy), ()))
+        if not samples:
+            return None
+        rank = max(math.ceil(pct / 100 * len(samples)), 1)
+        return samples[rank - 1]
+
+    def hedge_delay(self, domain: str, strategy: str, config: dict) -> float:
+        """Seconds to wait for *strategy* before hedging, clamped to the configured bounds."""
+        with self._lock:
+            count = len(self._samples.get((domain, strategy), ()))
+        if count < config["MIN_SAMPLES"]:
+            return config["DEFAULT_DELAY"]
+        p = self.percentile(domain, strategy, config["PERCENTILE"])
+        return min(max(p, config["MIN_DELAY"]), config["MAX_DELAY"])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+
+class HedgeStats:
+    """Process-wide hedging counters.
+
+    - ``fetches``: fetches that ran with hedging enabled
+    - ``hedged``: fetches where a backup strategy was launched early
+    - ``hedge_wins``: hedged fetches won by the backup strategy
+    - ``hedge_zyte_requests``: Zyte requests launched as hedges
+    - ``wasted_zyte_requests``: hedge Zyte requests whose result was discarded
+    """
+
+    KEYS = ("fetches", "hedged", "hedge_wins", "hedge_zyte_requests", "wasted_zyte_requests")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Counter[str] = Counter()
+
+    def incr(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[key] += amount
+
+    def snapshot(self) -> dict[str, int | float]:
+        """Counters plus ``hedge_rate`` (hedged/fetches) and ``win_rate`` (wins/hedged)."""
+        with self._lock:
+            stats: dict[str, int | float] = {k: self._counters[k] for k in self.KEYS}
+        stats["hedge_rate"] = stats["hedged"] / stats["fetches"] if stats["fetches"] else 0.0
+        stats["win_rate"] = stats["hedge_wins"] / stats["hedged"] if stats["hedged"] else 0.0
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+latency_tracker = LatencyTracker()
+hedge_stats = HedgeStats()
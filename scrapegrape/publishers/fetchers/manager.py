@@ -2,50 +2,347 @@
 
 from __future__ import annotations
 
+import asyncio
+from time import monotonic
 from typing import TYPE_CHECKING
 
+from asgiref.sync import sync_to_async
 from loguru import logger
 
 from .base import FetchResult
-from .curl_cffi_fetcher import CurlCffiFetcher
+from .cache import ResponseCache, get_response_cache
+from .clients import http_clients
+from .curl_cffi_fetcher import AsyncCurlCffiFetcher, CurlCffiFetcher
 from .exceptions import AllStrategiesExhausted, FetchError
-from .zyte_fetcher import ZyteFetcher
+from .hedging import hedge_stats, hedging_config, latency_tracker
+from .politeness import PolitenessLimiter
+from .streaming import BodyStream
+from .telemetry import attempt_recorder, strategy_scorer
+from .zyte_fetcher import AsyncZyteFetcher, ZyteFetcher
 
 if TYPE_CHECKING:
     from publishers.models import Publisher
+    from publishers.pipeline.loop import EventLoopThread
 
+def _domain(url: str) -> str:
+    return PolitenessLimiter.domain_for(url)
 
-class FetchStrategyManager:
-    """Tries fetch strategies in order, with automatic fallback and per-publisher memory."""
+
+class _StrategyManagerCore:
+    """Strategy ordering and telemetry shared by both managers."""
 
     STRATEGIES = ["curl_cffi", "zyte"]
 
-    def __init__(self) -> None:
+    @staticmethod
+    def _observe(
+        url: str,
+        domain: str,
+        strategy_name: str,
+        latency: float,
+        *,
+        status_code: int | None = None,
+        size: int = 0,
+        error: FetchError | None = None,
+    ) -> None:
+        """Feed one attempt to the telemetry buffer and the adaptive scorer."""
+        attempt_recorder.record(
+            url, domain, strategy_name, latency,
+            status_code=status_code, size=size, error=error,
+        )
+        strategy_scorer.observe(domain, strategy_name, error is None, latency)
+
+    def _observe_success(
+        self, url: str, domain: str, strategy_name: str, latency: float, result: FetchResult
+    ) -> None:
+        """Record a successful attempt, including its latency for hedging."""
+        self._observe(
+            url, domain, strategy_name, latency,
+            status_code=result.status_code, size=len(result.html),
+        )
+        latency_tracker.observe(
+            domain, strategy_name, latency, window=hedging_config()["WINDOW"]
+        )
+
+    def _preferred_strategies(self, publisher: Publisher | None) -> list[str]:
+        """Return strategy names with the publisher's preferred strategy first."""
+        if publisher and publisher.fetch_strategy:
+            preferred = publisher.fetch_strategy
+            return [preferred] + [s for s in self.STRATEGIES if s != preferred]
+        return list(self.STRATEGIES)
+
+
+class FetchStrategyManager(_StrategyManagerCore):
+    """Tries fetch strategies in order, with automatic fallback and per-publisher memory."""
+
+    def __init__(self, cache: ResponseCache | None = None) -> None:
         self._fetchers: dict[str, CurlCffiFetcher | ZyteFetcher] = {
             "curl_cffi": CurlCffiFetcher(),
             "zyte": ZyteFetcher(),
         }
+        self._cache = cache
+        self._hedger: AsyncFetchStrategyManager | None = None
+
+    @property
+    def cache(self) -> ResponseCache | None:
+        """The explicit cache, else the one configured by settings.FETCH_CACHE."""
+        return self._cache if self._cache is not None else get_response_cache()
+
+    def _ordered_strategies(
+        self, publisher: Publisher | None, url: str | None = None
+    ) -> list[str]:
+        """Return strategy names with the publisher's preferred strategy first.
 
-    def fetch(self, url: str, publisher: Publisher | None = None) -> FetchResult:
+        With a *url*, the order is then adapted to the domain's recorded
+        success rates and latencies (see ``telemetry``); ties keep the
+        preferred-first order.
+        """
+        strategies = self._preferred_strategies(publisher)
+        if url is None:
+            return strategies
+        return strategy_scorer.order(_domain(url), strategies)
+
+    def fetch(
+        self,
+        url: str,
+        publisher: Publisher | None = None,
+        loop: EventLoopThread | None = None,
+    ) -> FetchResult:
         """Fetch *url*, trying the remembered strategy first then falling back.
 
-        When a fallback strategy succeeds the working strategy is saved on the
-        publisher record so subsequent fetches start with it.
+        When a fallback strategy succeeds the working strategy is remembered
+        on the publisher record (written with the next telemetry flush) so
+        subsequent fetches start with it.  Every attempt is recorded as a
+        ``FetchAttempt`` and feeds the adaptive per-domain ordering (see
+        ``telemetry``).
+
+        Responses go through the response cache: a fresh entry is returned
+        without a request (``cache_status="hit"``), a stale one is revalidated
+        with a conditional GET and a 304 serves the cached body
+        (``"revalidated"``).
+
+        A running sync request cannot be aborted, so strategies are only
+        hedged when an event *loop* is given (the pipeline passes
+        ``pipeline_loop()``): the attempts then run as
+        AsyncFetchStrategyManager tasks on that loop, which cancels the
+        loser, while this thread waits for the winner.  Without a loop, or
+        with settings.FETCH_HEDGING disabled, strategies are tried in turn.
+
+        Raises AllStrategiesExhausted when every strategy failed, or
+        PolitenessTimeout when the domain had no free slot in time.
+        """
+        cache = self.cache
+        entry = cache.get(url) if cache else None
+        if entry and entry.is_fresh():
+            cache.record("hits", entry)
+            return entry.to_result("hit")
+        validators = entry.conditional_headers() if entry else {}
+
+        strategies = self._ordered_strategies(publisher, url)
+        try:
+            if loop is not None and hedging_config()["ENABLED"] and len(strategies) > 1:
+                strategy_name, result = loop.run(
+                    self._async_hedger()._fetch_hedged(url, strategies, validators)
+                )
+            else:
+                strategy_name, result = self._fetch_sequential(url, strategies, validators)
+        finally:
+            attempt_recorder.maybe_flush()
+
+        # Remember the working strategy on the publisher if it changed
+        # (persisted with the next telemetry flush).
+        if publisher and publisher.fetch_strategy != strategy_name:
+            attempt_recorder.remember_strategy(publisher, strategy_name)
+
+        if entry and result.status_code == 304:
+            entry = cache.revalidate(entry, result.headers)
+            cache.record("revalidations", entry)
+            return entry.to_result("revalidated")
+        if cache:
+            cache.store(result)
+            cache.record("misses")
+            result.cache_status = "miss"
+        return result
+
+    def stream(
+        self,
+        url: str,
+        publisher: Publisher | None = None,
+        max_bytes: int | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> BodyStream:
+        """Open *url* for incremental reading with the same fallback and memory as fetch.
+
+        The caller must close the returned BodyStream (or use it as a context
+        manager); stopping early aborts the transfer.  A fresh cache entry is
+        served from the cache, but streamed bodies are not stored since
+        consumers usually stop before the end.  Streams are never hedged.
+
+        Request *headers* are passed to the fetchers; a caller sending its own
+        validators bypasses the cache and gets a 304 back as the stream's
+        status (Zyte ignores validators and always answers with the body).
+        """
+        cache = self.cache if not headers else None
+        entry = cache.get(url) if cache else None
+        if entry and entry.is_fresh():
+            cache.record("hits", entry)
+            return BodyStream.from_text(
+                entry.html,
+                url=url,
+                status_code=entry.status_code,
+                strategy_used=entry.strategy_used,
+                headers=dict(entry.headers),
+                cookies=dict(entry.cookies),
+                max_bytes=max_bytes,
+                cache_status="hit",
+            )
+
+        errors: list[FetchError] = []
+        domain = _domain(url)
+        for strategy_name in self._ordered_strategies(publisher, url):
+            started = monotonic()
+            try:
+                fetcher = self._fetchers[strategy_name]
+                if headers:
+                    body = fetcher.stream(url, headers=headers, max_bytes=max_bytes)
+                else:
+                    body = fetcher.stream(url, max_bytes=max_bytes)
+            except FetchError as exc:
+                self._observe(url, domain, strategy_name, monotonic() - started, error=exc)
+                logger.warning(f"Strategy {strategy_name} failed for {url}: {exc}")
+                errors.append(exc)
+                continue
+
+            self._observe(
+                url, domain, strategy_name, monotonic() - started,
+                status_code=body.status_code,
+            )
+            if publisher and publisher.fetch_strategy != strategy_name:
+                attempt_recorder.remember_strategy(publisher, strategy_name)
+            attempt_recorder.maybe_flush()
+            return body
+
+        attempt_recorder.maybe_flush()
+        raise AllStrategiesExhausted(
+            f"All strategies exhausted for {url}",
+            errors=errors,
+        )
+
+    def _attempt(
+        self, strategy_name: str, url: str, validators: dict[str, str]
+    ) -> FetchResult:
+        """Run one strategy, recording telemetry and latency for hedging.
+
+        A PolitenessTimeout is not a FetchError: it propagates to the caller
+        unrecorded, without trying the next strategy (which would queue on
+        the same domain slot).
         """
-        strategies = self._ordered_strategies(publisher)
+        fetcher = self._fetchers[strategy_name]
+        domain = _domain(url)
+        started = monotonic()
+        try:
+            if validators:
+                result = fetcher.fetch(url, headers=validators)
+            else:
+                result = fetcher.fetch(url)
+        except FetchError as exc:
+            self._observe(url, domain, strategy_name, monotonic() - started, error=exc)
+            raise
+        self._observe_success(url, domain, strategy_name, monotonic() - started, result)
+        return result
+
+    def _async_hedger(self) -> AsyncFetchStrategyManager:
+        """The async manager whose fetchers run this manager's hedged attempts."""
+        if self._hedger is None:
+            self._hedger = AsyncFetchStrategyManager(hedging=True)
+        return self._hedger
+
+    def _fetch_sequential(
+        self, url: str, strategies: list[str], validators: dict[str, str]
+    ) -> tuple[str, FetchResult]:
         errors: list[FetchError] = []
 
         for strategy_name in strategies:
-            fetcher = self._fetchers[strategy_name]
             try:
-                result = fetcher.fetch(url)
+                return strategy_name, self._attempt(strategy_name, url, validators)
+            except FetchError as exc:
+                logger.warning(f"Strategy {strategy_name} failed for {url}: {exc}")
+                errors.append(exc)
+                continue
+
+        raise AllStrategiesExhausted(
+            f"All strategies exhausted for {url}",
+            errors=errors,
+        )
+
 
-                # Remember the working strategy on the publisher if it changed.
-                if publisher and publisher.fetch_strategy != strategy_name:
-                    publisher.fetch_strategy = strategy_name
-                    publisher.save(update_fields=["fetch_strategy"])
+class AsyncFetchStrategyManager(_StrategyManagerCore):
+    """Async twin of FetchStrategyManager with the same ordering, fallback and memory.
 
-                return result
+    Lets a single worker keep many requests in flight, e.g. probing several
+    sitemap paths or validating every RSS feed at once via ``fetch_many``.
+    Does not consult the response cache and has no stream API: the async
+    fetchers read capped bodies in ``fetch``.
+    """
+
+    def __init__(self, hedging: bool | None = None) -> None:
+        self._fetchers: dict[str, AsyncCurlCffiFetcher | AsyncZyteFetcher] = {
+            "curl_cffi": AsyncCurlCffiFetcher(),
+            "zyte": AsyncZyteFetcher(),
+        }
+        self._hedging = hedging
+
+    @property
+    def hedging(self) -> bool:
+        """The explicit hedging flag, else settings.FETCH_HEDGING["ENABLED"]."""
+        if self._hedging is not None:
+            return self._hedging
+        return bool(hedging_config()["ENABLED"])
+
+    async def _ordered_strategies(self, publisher: Publisher | None, url: str) -> list[str]:
+        """Async twin of FetchStrategyManager._ordered_strategies."""
+        return await strategy_scorer.aorder(_domain(url), self._preferred_strategies(publisher))
+
+    async def fetch(self, url: str, publisher: Publisher | None = None) -> FetchResult:
+        """Fetch *url*, trying the remembered strategy first then falling back."""
+        strategies = await self._ordered_strategies(publisher, url)
+        try:
+            if self.hedging and len(strategies) > 1:
+                strategy_name, result = await self._fetch_hedged(url, strategies, {})
+            else:
+                strategy_name, result = await self._fetch_sequential(url, strategies, {})
+        finally:
+            await sync_to_async(attempt_recorder.maybe_flush)()
+
+        if publisher and publisher.fetch_strategy != strategy_name:
+            attempt_recorder.remember_strategy(publisher, strategy_name)
+
+        return result
+
+    async def _attempt(
+        self, strategy_name: str, url: str, validators: dict[str, str]
+    ) -> FetchResult:
+        fetcher = self._fetchers[strategy_name]
+        domain = _domain(url)
+        started = monotonic()
+        try:
+            if validators:
+                result = await fetcher.fetch(url, headers=validators)
+            else:
+                result = await fetcher.fetch(url)
+        except FetchError as exc:
+            self._observe(url, domain, strategy_name, monotonic() - started, error=exc)
+            raise
+        self._observe_success(url, domain, strategy_name, monotonic() - started, result)
+        return result
+
+    async def _fetch_sequential(
+        self, url: str, strategies: list[str], validators: dict[str, str]
+    ) -> tuple[str, FetchResult]:
+        errors: list[FetchError] = []
+
+        for strategy_name in strategies:
+            try:
+                return strategy_name, await self._attempt(strategy_name, url, validators)
             except FetchError as exc:
                 logger.warning(f"Strategy {strategy_name} failed for {url}: {exc}")
                 errors.append(exc)
@@ -56,9 +353,96 @@ class FetchStrategyManager:
             errors=errors,
         )
 
-    def _ordered_strategies(self, publisher: Publisher | None) -> list[str]:
-        """Return strategy names with the publisher's preferred strategy first."""
-        if publisher and publisher.fetch_strategy:
-            preferred = publisher.fetch_strategy
-            return [preferred] + [s for s in self.STRATEGIES if s != preferred]
-        return list(self.STRATEGIES)
+    async def _fetch_hedged(
+        self, url: str, strategies: list[str], validators: dict[str, str]
+    ) -> tuple[str, FetchResult]:
+        """Race strategies: start the next one early if the current one is slow.
+
+        A strategy that fails hands over to the next one immediately, as in
+        the sequential path.  The first successful result wins and the
+        losing tasks are cancelled, which aborts their requests and releases
+        their politeness slots.
+        """
+        config = hedging_config()
+        domain = _domain(url)
+        remaining = list(strategies)
+        running: dict[asyncio.Task, tuple[str, bool]] = {}
+        errors: list[FetchError] = []
+        hedged = False
+        hedge_stats.incr("fetches")
+
+        def launch(is_hedge: bool) -> None:
+            name = remaining.pop(0)
+            if is_hedge and name == "zyte":
+                hedge_stats.incr("hedge_zyte_requests")
+            task = asyncio.create_task(self._attempt(name, url, validators))
+            running[task] = (name, is_hedge)
+
+        launch(is_hedge=False)
+        try:
+            while running:
+                timeout = None
+                if remaining and not hedged:
+                    leader = next(iter(running.values()))[0]
+                    timeout = latency_tracker.hedge_delay(domain, leader, config)
+                done, _ = await asyncio.wait(
+                    running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    hedged = True
+                    hedge_stats.incr("hedged")
+                    logger.info(f"Hedging {url}: {remaining[0]} after {timeout:.2f}s")
+                    launch(is_hedge=True)
+                    continue
+
+                for task in done:
+                    name, is_hedge = running.pop(task)
+                    try:
+                        result = task.result()
+                    except FetchError as exc:
+                        logger.warning(f"Strategy {name} failed for {url}: {exc}")
+                        errors.append(exc)
+                        continue
+                    if is_hedge:
+                        hedge_stats.incr("hedge_wins")
+                    for loser_name, loser_is_hedge in running.values():
+                        if loser_is_hedge and loser_name == "zyte":
+                            hedge_stats.incr("wasted_zyte_requests")
+                    return name, result
+
+                if not running and remaining:
+                    launch(is_hedge=False)
+        finally:
+            for task in running:
+                task.cancel()
+
+        raise AllStrategiesExhausted(
+            f"All strategies exhausted for {url}",
+            errors=errors,
+        )
+
+    async def fetch_many(
+        self,
+        urls: list[str],
+        publisher: Publisher | None = None,
+        concurrency: int | None = None,
+    ) -> list[FetchResult | AllStrategiesExhausted]:
+        """Fetch *urls* concurrently, returning results in input order.
+
+        Failed URLs yield their AllStrategiesExhausted exception instead of
+        raising, so one dead URL does not discard the rest of the batch.
+        At most *concurrency* requests (default: the per-host pool size)
+        are in flight at once.
+        """
+        limit = concurrency or http_clients.limits["max_connections_per_host"]
+        semaphore = asyncio.Semaphore(limit)
+
+        async def bounded_fetch(url: str) -> FetchResult | AllStrategiesExhausted:
+            async with semaphore:
+                try:
+                    return await self.fetch(url, publisher=publisher)
+                except AllStrategiesExhausted as exc:
+                    return exc
+
+        return list(await asyncio.gather(*(bounded_fetch(url) for url in urls)))
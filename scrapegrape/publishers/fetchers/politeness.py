@@ -0,0 +1,223 @@
+"""Redis-backed per-domain politeness limiter shared by every RQ worker.
+
+Bulk imports enqueue many jobs for the same publisher at once; without
+coordination each worker fetches independently and the publisher sees a burst
+that trips its WAF.  Every outbound request therefore takes a slot from this
+limiter first, keyed by the canonical publisher domain (``extract_domain``,
+i.e. ``Publisher.domain``):
+
+- a token bucket bounds the request rate per domain (``RATE`` requests per
+  second with bursts of ``BURST``), slowed to one request per ``crawl_delay``
+  seconds once ``run_robots_step`` has recorded one for the domain;
+- a lease-based semaphore bounds in-flight requests per domain
+  (``MAX_CONCURRENCY``); leases expire after ``LEASE_SECONDS`` so a crashed
+  worker cannot hold a slot forever.
+
+Both checks run in one Lua script using the Redis clock, so workers on
+different hosts share a single view.  Different domains never wait on each
+other.  If Redis is unavailable the limiter fails open: politeness is best
+effort and must not take the pipeline down with it.
+
+Configured by ``settings.POLITENESS``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+
+from loguru import logger
+
+from publishers.url_sanitizer import extract_domain
+
+from .exceptions import PolitenessTimeout
+
+DEFAULT_CONFIG = {
+    "ENABLED": True,
+    "RATE": 1.0,
+    "BURST": 3,
+    "MAX_CONCURRENCY": 2,
+    "LEASE_SECONDS": 60,
+    "MAX_WAIT_SECONDS": 60,
+    "CRAWL_DELAY_TTL": 24 * 3600,
+}
+
+# Longest single sleep between attempts, so freed concurrency slots are noticed.
+MAX_POLL_INTERVAL = 0.25
+
+# KEYS: bucket hash, slot zset, crawl-delay key
+# ARGV: rate, burst, max_concurrency, lease_seconds, slot_token
+# Returns "0" once a slot is taken, else the seconds to wait before retrying.
+_ACQUIRE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local delay = tonumber(redis.call('GET', KEYS[3]) or '0')
+if delay > 0 then
+  rate = math.min(rate, 1 / delay)
+  burst = 1
+end
+
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now)
+if redis.call('ZCARD', KEYS[2]) >= tonumber(ARGV[3]) then
+  local first = redis.call('ZRANGE', KEYS[2], 0, 0, 'WITHSCORES')
+  return tostring(math.max(tonumber(first[2]) - now, 0.01))
+end
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(now - ts, 0) * rate)
+local ttl = math.ceil(burst / rate) + 60
+if tokens < 1 then
+  redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+  redis.call('EXPIRE', KEYS[1], ttl)
+  return tostring((1 - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens - 1, 'ts', now)
+redis.call('EXPIRE', KEYS[1], ttl)
+local lease = tonumber(ARGV[4])
+redis.call('ZADD', KEYS[2], now + lease, ARGV[5])
+redis.call('EXPIRE', KEYS[2], math.ceil(lease) + 60)
+return '0'
+"""
+
+
+def _configured() -> dict:
+    from django.conf import settings
+
+    return {**DEFAULT_CONFIG, **getattr(settings, "POLITENESS", {})}
+
+
+class PolitenessLimiter:
+    """Distributed per-domain token bucket plus concurrency cap."""
+
+    def __init__(self, client=None, config: dict | None = None, prefix: str = "polite") -> None:
+        self._client = client
+        self._config = config
+        self.prefix = prefix
+        self._script = None
+
+    @property
+    def config(self) -> dict:
+        return self._config if self._config is not None else _configured()
+
+    @property
+    def client(self):
+        if self._client is None:
+            from publishers.pipeline.events import get_redis_client
+
+            self._client = get_redis_client()
+        return self._client
+
+    def _keys(self, domain: str) -> list[str]:
+        return [
+            f"{self.prefix}:{domain}:bucket",
+            f"{self.prefix}:{domain}:slots",
+            f"{self.prefix}:{domain}:crawl_delay",
+        ]
+
+    @staticmethod
+    def domain_for(url: str) -> str:
+        """Canonical domain for *url*, matching Publisher.domain."""
+        return extract_domain(url) if "://" in url else url.lower().removeprefix("www.")
+
+    def set_crawl_delay(self, domain: str, delay: float | None) -> None:
+        """Record robots.txt Crawl-delay for *domain* (None or 0 clears it)."""
+        if not self.config["ENABLED"]:
+            return
+        key = self._keys(domain)[2]
+        try:
+            if delay and delay > 0:
+                self.client.set(key, float(delay), ex=int(self.config["CRAWL_DELAY_TTL"]))
+            else:
+                self.client.delete(key)
+        except Exception as exc:
+            logger.warning(f"Could not record crawl delay for {domain}: {exc}")
+
+    def try_acquire(self, domain: str, token: str) -> float:
+        """One acquisition attempt: 0.0 when the slot was taken, else seconds to wait."""
+        if self._script is None:
+            self._script = self.client.register_script(_ACQUIRE_SCRIPT)
+        config = self.config
+        wait = self._script(
+            keys=self._keys(domain),
+            args=[
+                config["RATE"],
+                config["BURST"],
+                config["MAX_CONCURRENCY"],
+                config["LEASE_SECONDS"],
+                token,
+            ],
+        )
+        return float(wait.decode() if isinstance(wait, bytes) else wait)
+
+    def release(self, domain: str, token: str) -> None:
+        try:
+            self.client.zrem(self._keys(domain)[1], token)
+        except Exception as exc:
+            logger.warning(f"Could not release politeness slot for {domain}: {exc}")
+
+    def _next_wait(self, domain: str, token: str) -> float | None:
+        """Attempt once; None means acquired (or Redis is down and we fail open)."""
+        try:
+            wait = self.try_acquire(domain, token)
+        except Exception as exc:
+            logger.warning(f"Politeness limiter unavailable for {domain}: {exc}")
+            return None
+        return wait if wait > 0 else None
+
+    @contextmanager
+    def slot(self, url: str, strategy: str = "politeness"):
+        """Block until *url*'s domain has a free slot, hold it for the request."""
+        if not self.config["ENABLED"]:
+            yield
+            return
+        domain = self.domain_for(url)
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.config["MAX_WAIT_SECONDS"]
+        while (wait := self._next_wait(domain, token)) is not None:
+            if time.monotonic() + wait > deadline:
+                raise PolitenessTimeout(
+                    f"No politeness slot for {domain} within "
+                    f"{self.config['MAX_WAIT_SECONDS']}s",
+                    strategy=strategy,
+                    domain=domain,
+                )
+            time.sleep(min(wait, MAX_POLL_INTERVAL))
+        try:
+            yield
+        finally:
+            self.release(domain, token)
+
+    @asynccontextmanager
+    async def aslot(self, url: str, strategy: str = "politeness"):
+        """Async twin of ``slot``; waits with asyncio.sleep.
+
+        The Redis round-trips themselves are short blocking calls.
+        """
+        if not self.config["ENABLED"]:
+            yield
+            return
+        domain = self.domain_for(url)
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.config["MAX_WAIT_SECONDS"]
+        while (wait := self._next_wait(domain, token)) is not None:
+            if time.monotonic() + wait > deadline:
+                raise PolitenessTimeout(
+                    f"No politeness slot for {domain} within "
+                    f"{self.config['MAX_WAIT_SECONDS']}s",
+                    strategy=strategy,
+                    domain=domain,
+                )
+            await asyncio.sleep(min(wait, MAX_POLL_INTERVAL))
+        try:
+            yield
+        finally:
+            self.release(domain, token)
+
+
+politeness = PolitenessLimiter()
@@ -0,0 +1,178 @@
+"""Bounded, incrementally-read response bodies.
+
+Fetchers never hold more than a per-content-type byte cap of a response in
+memory (``settings.FETCH_MAX_BYTES``; robots.txt is capped at 500 KiB as
+RFC 9309 allows).  Bodies past the cap are cut off and flagged
+``truncated``.
+
+``BodyStream`` is the iterator API behind ``FetchStrategyManager.stream``:
+consumers read chunks (``iter_bytes``) or decoded text (``iter_text``) and
+simply stop -- or call ``close()`` -- once they have what they need, which
+aborts the underlying transfer and releases the connection.
+"""
+
+from __future__ import annotations
+
+import codecs
+from collections.abc import Callable, Iterable, Iterator
+from urllib.parse import urlsplit
+
+from .base import FetchResult
+
+DEFAULT_MAX_BYTES = {
+    "robots.txt": 500 * 1024,
+    "text/plain": 500 * 1024,
+    "xml": 50 * 1024 * 1024,  # sitemap protocol limit (uncompressed)
+    "text/html": 5 * 1024 * 1024,
+    "default": 10 * 1024 * 1024,
+}
+
+
+def max_bytes_for(content_type: str | None, url: str | None = None) -> int:
+    """Byte cap for a response, by URL (robots.txt) then content type."""
+    from django.conf import settings
+
+    caps = {**DEFAULT_MAX_BYTES, **getattr(settings, "FETCH_MAX_BYTES", {})}
+    if url and urlsplit(url).path.endswith("/robots.txt"):
+        return caps["robots.txt"]
+    mime = (content_type or "").split(";")[0].strip().lower()
+    if mime in caps:
+        return caps[mime]
+    for pattern, cap in caps.items():
+        if pattern not in ("default", "robots.txt") and pattern in mime:
+            return cap
+    return caps["default"]
+
+
+def _known_encoding(encoding: str | None) -> str:
+    try:
+        return codecs.lookup(encoding or "utf-8").name
+    except LookupError:
+        return "utf-8"
+
+
+class BodyStream:
+    """A response body read chunk by chunk, never past ``max_bytes``.
+
+    Use as a context manager (or call ``close()``) so the transfer is
+    aborted and the connection released even if the consumer stops early.
+    """
+
+    def __init__(
+        self,
+        chunks: Iterable[bytes],
+        *,
+        url: str,
+        status_code: int,
+        strategy_used: str,
+        headers: dict[str, str] | None = None,
+        encoding: str | None = None,
+        max_bytes: int | None = None,
+        on_close: Callable[[], None] | None = None,
+        cache_status: str = "",
+        cookies: dict[str, str] | None = None,
+    ) -> None:
+        self._chunks = iter(chunks)
+        self._buffer = bytearray()
+        self._on_close = on_close
+        self.url = url
+        self.status_code = status_code
+        self.strategy_used = strategy_used
+        self.headers = headers or {}
+        self.cookies = cookies or {}
+        self.encoding = _known_encoding(encoding)
+        self.max_bytes = max_bytes
+        self.cache_status = cache_status
+        self.bytes_read = 0
+        self.truncated = False
+        self.closed = False
+
+    @classmethod
+    def from_text(cls, text: str, **kwargs) -> BodyStream:
+        """Wrap an already-downloaded body (cache hits, Zyte responses)."""
+        body = text.encode(kwargs.get("encoding") or "utf-8")
+        return cls([body], **kwargs)
+
+    def _pull(self) -> bytes | None:
+        """Next chunk from the transfer, cut at max_bytes; None when exhausted."""
+        if self.closed:
+            return None
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            if self.max_bytes is not None:
+                remaining = self.max_bytes - self.bytes_read
+                if remaining <= 0:
+                    self.truncated = True
+                    return None
+                if len(chunk) > remaining:
+                    chunk = chunk[:remaining]
+                    self.truncated = True
+            self.bytes_read += len(chunk)
+            return chunk
+        return None
+
+    def peek(self, size: int) -> bytes:
+        """Return up to *size* leading bytes without consuming them."""
+        while len(self._buffer) < size:
+            chunk = self._pull()
+            if chunk is None:
+                break
+            self._buffer.extend(chunk)
+        return bytes(self._buffer[:size])
+
+    def iter_bytes(self) -> Iterator[bytes]:
+        """Yield body chunks; the stream is closed when iteration ends or stops."""
+        try:
+            if self._buffer:
+                buffered, self._buffer = bytes(self._buffer), bytearray()
+                yield buffered
+            while (chunk := self._pull()) is not None:
+                yield chunk
+        finally:
+            self.close()
+
+    __iter__ = iter_bytes
+
+    def iter_text(self) -> Iterator[str]:
+        """Yield decoded text incrementally (multi-byte characters never split)."""
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        for chunk in self.iter_bytes():
+            if text := decoder.decode(chunk):
+                yield text
+        if tail := decoder.decode(b"", final=True):
+            yield tail
+
+    def read(self) -> bytes:
+        """Read the rest of the body (up to the cap) and close the stream."""
+        return b"".join(self.iter_bytes())
+
+    def text(self) -> str:
+        return self.read().decode(self.encoding, errors="replace")
+
+    def to_result(self) -> FetchResult:
+        """Read the remaining body into a FetchResult."""
+        return FetchResult(
+            html=self.text(),
+            status_code=self.status_code,
+            strategy_used=self.strategy_used,
+            url=self.url,
+            headers=self.headers,
+            cookies=self.cookies,
+            cache_status=self.cache_status,
+            truncated=self.truncated,
+        )
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self._buffer = bytearray()
+        if self._on_close is not None:
+            self._on_close()
+
+    def __enter__(self) -> BodyStream:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
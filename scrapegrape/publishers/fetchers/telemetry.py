@@ -0,0 +1,282 @@
+"""Fetch attempt telemetry and adaptive per-domain strategy ordering.
+
+Every strategy attempt made by the fetch managers is buffered in
+``attempt_recorder`` and written to the append-only ``FetchAttempt`` table in
+batches (``BATCH_SIZE`` rows or every ``FLUSH_INTERVAL`` seconds, and at the
+end of each pipeline job).  Changes to ``Publisher.fetch_strategy`` are
+deferred to the same flush, so the fetch hot path never writes to the
+database row by row.
+
+``strategy_scorer`` turns those attempts into a per-domain strategy order.
+For each (domain, strategy) it keeps exponentially time-decayed sums of
+successes and latencies (half-life ``HALF_LIFE_HOURS``), seeded from the
+table's recent rows so every worker learns from the whole fleet.  Trying
+strategy A before B is cheaper in expectation when ``t_A / p_A < t_B / p_B``
+(``t`` = mean attempt latency plus a per-strategy cost, ``p`` = smoothed
+success rate), so strategies are sorted by that ratio.  A host where
+curl-cffi reliably times out after 30s therefore goes straight to Zyte.
+"""
+
+from __future__ import annotations
+
+import atexit
+import threading
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from loguru import logger
+
+DEFAULT_CONFIG = {
+    "ENABLED": True,
+    "BATCH_SIZE": 100,
+    "FLUSH_INTERVAL": 30.0,
+    "ADAPTIVE_ORDERING": True,
+    "HALF_LIFE_HOURS": 24.0,
+    "LOOKBACK_DAYS": 7,
+    "REFRESH_SECONDS": 600.0,
+    "PRIOR_LATENCY": 5.0,
+    "COST_SECONDS": {"zyte": 2.0},
+}
+
+
+def telemetry_config() -> dict:
+    """DEFAULT_CONFIG overridden by settings.FETCH_TELEMETRY."""
+    from django.conf import settings
+
+    return {**DEFAULT_CONFIG, **getattr(settings, "FETCH_TELEMETRY", {})}
+
+
+class AttemptRecorder:
+    """Buffers FetchAttempt rows and deferred fetch_strategy updates."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._attempts: list = []
+        self._strategies: dict[int, str] = {}
+        self._last_flush = time.monotonic()
+
+    def record(
+        self,
+        url: str,
+        domain: str,
+        strategy: str,
+        latency: float,
+        *,
+        status_code: int | None = None,
+        size: int = 0,
+        error=None,
+    ) -> None:
+        """Buffer one attempt; *error* is the FetchError for failed attempts."""
+        from publishers.models import FetchAttempt
+
+        if not telemetry_config()["ENABLED"]:
+            return
+        if error is None:
+            outcome, reason = "success", ""
+        else:
+            outcome = "blocked" if getattr(error, "blocked", False) else "error"
+            status_code, reason = getattr(error, "status_code", None), str(error)[:255]
+        attempt = FetchAttempt(
+            domain=domain,
+            url=url[:2048],
+            strategy=strategy,
+            outcome=outcome,
+            status_code=status_code,
+            latency_ms=int(latency * 1000),
+            bytes=size,
+            block_reason=reason,
+        )
+        with self._lock:
+            self._attempts.append(attempt)
+
+    def remember_strategy(self, publisher, strategy: str) -> None:
+        """Set publisher.fetch_strategy now, persist it on the next flush."""
+        publisher.fetch_strategy = strategy
+        if publisher.pk is not None:
+            with self._lock:
+                self._strategies[publisher.pk] = strategy
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._attempts) + len(self._strategies)
+
+    def pending_attempts(self, domain: str) -> list:
+        """The buffered, not yet flushed FetchAttempt rows for *domain*."""
+        with self._lock:
+            return [attempt for attempt in self._attempts if attempt.domain == domain]
+
+    def maybe_flush(self) -> None:
+        """Flush when the batch is full or the flush interval has passed."""
+        config = telemetry_config()
+        with self._lock:
+            if not self._attempts and not self._strategies:
+                return
+            due = (
+                len(self._attempts) >= config["BATCH_SIZE"]
+                or time.monotonic() - self._last_flush >= config["FLUSH_INTERVAL"]
+            )
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write buffered attempts and strategy changes; returns rows written.
+
+        Telemetry is non-critical: database errors are logged and the batch
+        is dropped.
+        """
+        from publishers.models import FetchAttempt, Publisher
+
+        with self._lock:
+            attempts, self._attempts = self._attempts, []
+            strategies, self._strategies = self._strategies, {}
+            self._last_flush = time.monotonic()
+        if not attempts and not strategies:
+            return 0
+        try:
+            FetchAttempt.objects.bulk_create(attempts)
+            by_strategy: dict[str, list[int]] = {}
+            for pk, strategy in strategies.items():
+                by_strategy.setdefault(strategy, []).append(pk)
+            for strategy, pks in by_strategy.items():
+                Publisher.objects.filter(pk__in=pks).update(fetch_strategy=strategy)
+        except Exception as exc:
+            logger.warning(f"Could not write {len(attempts)} fetch attempts: {exc}")
+            return 0
+        return len(attempts)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._attempts.clear()
+            self._strategies.clear()
+
+
+@dataclass
+class _DecayedStats:
+    successes: float = 0.0
+    attempts: float = 0.0
+    latency: float = 0.0
+    at: float = 0.0
+
+    def add(self, success: bool, latency: float, at: float, half_life: float) -> None:
+        if self.attempts:
+            factor = 0.5 ** (max(at - self.at, 0.0) / half_life)
+            self.successes *= factor
+            self.attempts *= factor
+            self.latency *= factor
+        self.successes += 1.0 if success else 0.0
+        self.attempts += 1.0
+        self.latency += latency
+        self.at = max(at, self.at)
+
+
+class StrategyScorer:
+    """Rolling per-domain success/latency scores with time decay."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: dict[tuple[str, str], _DecayedStats] = {}
+        self._loaded: dict[str, float] = {}
+
+    def observe(
+        self, domain: str, strategy: str, success: bool, latency: float, at: float | None = None
+    ) -> None:
+        half_life = telemetry_config()["HALF_LIFE_HOURS"] * 3600
+        with self._lock:
+            stats = self._stats.setdefault((domain, strategy), _DecayedStats())
+            stats.add(success, latency, at if at is not None else time.time(), half_life)
+
+    def _refresh(self, domain: str, config: dict) -> None:
+        """Rebuild the domain's stats from recent attempts (at most every REFRESH_SECONDS).
+
+        The stored FetchAttempt rows are merged with the attempts still
+        buffered in ``attempt_recorder``, so observations that have not been
+        flushed yet are not lost.  Runs a synchronous query: async callers use
+        ``aorder``.
+        """
+        from django.utils import timezone
+
+        from publishers.models import FetchAttempt
+
+        now = time.monotonic()
+        with self._lock:
+            loaded = self._loaded.get(domain)
+            if loaded is not None and now - loaded < config["REFRESH_SECONDS"]:
+                return
+            self._loaded[domain] = now
+        pending = attempt_recorder.pending_attempts(domain)
+        try:
+            rows = list(
+                FetchAttempt.objects.filter(
+                    domain=domain,
+                    created_at__gte=timezone.now() - timedelta(days=config["LOOKBACK_DAYS"]),
+                )
+                .order_by("created_at")
+                .values_list("strategy", "url", "outcome", "latency_ms", "created_at")
+            )
+        except Exception as exc:
+            logger.warning(f"Could not load fetch attempts for {domain}: {exc}")
+            return
+        # Attempts flushed while the query ran appear in both; created_at is
+        # set when the attempt is recorded, so it identifies them.
+        stored = {(strategy, url, created_at) for strategy, url, _, _, created_at in rows}
+        rows += [
+            (a.strategy, a.url, a.outcome, a.latency_ms, a.created_at)
+            for a in pending
+            if (a.strategy, a.url, a.created_at) not in stored
+        ]
+        if not rows:
+            return
+        rows.sort(key=lambda row: row[4])
+        half_life = config["HALF_LIFE_HOURS"] * 3600
+        fresh: dict[tuple[str, str], _DecayedStats] = {}
+        for strategy, _, outcome, latency_ms, created_at in rows:
+            fresh.setdefault((domain, strategy), _DecayedStats()).add(
+                outcome == "success", latency_ms / 1000, created_at.timestamp(), half_life
+            )
+        with self._lock:
+            for key in [k for k in self._stats if k[0] == domain]:
+                del self._stats[key]
+            self._stats.update(fresh)
+
+    def expected_cost(self, domain: str, strategy: str, config: dict) -> float:
+        """Smoothed (mean attempt latency + strategy cost) / success rate."""
+        with self._lock:
+            stats = self._stats.get((domain, strategy), _DecayedStats())
+        success_rate = (stats.successes + 1) / (stats.attempts + 2)
+        latency = (stats.latency + config["PRIOR_LATENCY"]) / (stats.attempts + 1)
+        return (latency + config["COST_SECONDS"].get(strategy, 0.0)) / success_rate
+
+    def order(self, domain: str, strategies: list[str]) -> list[str]:
+        """Sort *strategies* by expected cost; ties keep their given order."""
+        config = telemetry_config()
+        if not config["ADAPTIVE_ORDERING"]:
+            return list(strategies)
+        self._refresh(domain, config)
+        return self._sorted(domain, strategies, config)
+
+    async def aorder(self, domain: str, strategies: list[str]) -> list[str]:
+        """Async twin of ``order``; the stats are loaded through sync_to_async."""
+        config = telemetry_config()
+        if not config["ADAPTIVE_ORDERING"]:
+            return list(strategies)
+        await sync_to_async(self._refresh)(domain, config)
+        return self._sorted(domain, strategies, config)
+
+    def _sorted(self, domain: str, strategies: list[str], config: dict) -> list[str]:
+        with self._lock:
+            if not any((domain, s) in self._stats for s in strategies):
+                return list(strategies)
+        return sorted(strategies, key=lambda s: self.expected_cost(domain, s, config))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._loaded.clear()
+
+
+attempt_recorder = AttemptRecorder()
+strategy_scorer = StrategyScorer()
+
+atexit.register(attempt_recorder.flush)
@@ -1,14 +1,20 @@
-"""ZyteFetcher: fallback fetcher using the Zyte API proxy service."""
+"""ZyteFetcher: fallback fetcher using the Zyte API proxy service (sync and async)."""
 
 from __future__ import annotations
 
 import os
 from base64 import b64decode
 
+import httpx
 import requests
 
-from .base import FetchResult
+from .base import FetchResult, normalize_headers, parse_set_cookie
+from .clients import http_clients
 from .exceptions import FetchError
+from .politeness import politeness
+from .streaming import BodyStream, max_bytes_for
+
+ZYTE_API_URL = "https://api.zyte.com/v1/extract"
 
 
 class ZyteFetcher:
@@ -19,29 +25,103 @@ class ZyteFetcher:
     def __init__(self, timeout: float = 30.0):
         self.timeout = timeout
 
-    def fetch(self, url: str) -> FetchResult:
-        """Fetch *url* via Zyte API. Raises FetchError if API key is missing or request fails."""
-        api_key = os.getenv("ZYTE_API_KEY")
-        if not api_key:
-            raise FetchError("ZYTE_API_KEY not set", strategy="zyte")
+    def fetch(self, url: str, headers: dict[str, str] | None = None) -> FetchResult:
+        """Fetch *url* via Zyte API. Raises FetchError if API key is missing or request fails.
+
+        Request *headers* are accepted for interface parity but not forwarded:
+        conditional validators are only honoured by the direct fetchers.
+        """
+        api_key = self._api_key()
 
         try:
-            api_response = requests.post(
-                "https://api.zyte.com/v1/extract",
-                auth=(api_key, ""),
-                json={"url": url, "httpResponseBody": True},
-                timeout=self.timeout,
-            )
+            # Zyte still fetches from the publisher, so the domain's limit applies.
+            with politeness.slot(url, strategy=self.name):
+                http_clients.record(self.name, ZYTE_API_URL)
+                api_response = http_clients.requests_session().post(
+                    ZYTE_API_URL,
+                    auth=(api_key, ""),
+                    json={"url": url, "httpResponseBody": True, "httpResponseHeaders": True},
+                    timeout=self.timeout,
+                )
             api_response.raise_for_status()
         except requests.RequestException as exc:
             raise FetchError(
                 f"Zyte API request failed: {exc}", strategy="zyte"
             ) from exc
 
-        body = b64decode(api_response.json()["httpResponseBody"]).decode("utf-8")
+        return self._build_result(url, api_response)
+
+    def _api_key(self) -> str:
+        api_key = os.getenv("ZYTE_API_KEY")
+        if not api_key:
+            raise FetchError("ZYTE_API_KEY not set", strategy="zyte")
+        return api_key
+
+    def stream(
+        self,
+        url: str,
+        headers: dict[str, str] | None = None,
+        max_bytes: int | None = None,
+    ) -> BodyStream:
+        """Stream API for parity with CurlCffiFetcher.
+
+        The Zyte API returns the whole (capped) body in one response, so this
+        only saves the consumer's own processing, not the transfer.
+        """
+        result = self.fetch(url, headers=headers)
+        return BodyStream.from_text(
+            result.html,
+            url=url,
+            status_code=result.status_code,
+            strategy_used=self.name,
+            headers=result.headers,
+            cookies=result.cookies,
+            max_bytes=max_bytes,
+        )
+
+    def _build_result(self, url: str, api_response) -> FetchResult:
+        """Decode the base64 response body returned by the Zyte API, up to the byte cap."""
+        data = api_response.json()
+        response_headers = data.get("httpResponseHeaders") or []
+        headers = normalize_headers(
+            {h["name"]: h["value"] for h in response_headers}
+        )
+        cookies = parse_set_cookie(
+            h["value"] for h in response_headers if h["name"].lower() == "set-cookie"
+        )
+        raw = b64decode(data["httpResponseBody"])
+        cap = max_bytes_for(headers.get("content-type"), url)
         return FetchResult(
-            html=body,
+            html=raw[:cap].decode("utf-8", errors="replace"),
             status_code=200,
             strategy_used=self.name,
             url=url,
+            headers=headers,
+            cookies=cookies,
+            truncated=len(raw) > cap,
         )
+
+
+class AsyncZyteFetcher(ZyteFetcher):
+    """Async twin of ZyteFetcher using a pooled httpx AsyncClient."""
+
+    async def fetch(self, url: str, headers: dict[str, str] | None = None) -> FetchResult:
+        """Fetch *url* via Zyte API without blocking the event loop."""
+        api_key = self._api_key()
+
+        try:
+            async with politeness.aslot(url, strategy=self.name):
+                http_clients.record(self.name, ZYTE_API_URL)
+                api_response = await http_clients.async_httpx_client().post(
+                    ZYTE_API_URL,
+                    auth=(api_key, ""),
+                    json={"url": url, "httpResponseBody": True, "httpResponseHeaders": True},
+                    timeout=self.timeout,
+                )
+            api_response.raise_for_status()
+        except httpx.HTTPError as exc:
+            raise FetchError(
+                f"Zyte API request failed: {exc}", strategy="zyte"
+            ) from exc
+
+        return self._build_result(url, api_response)
@@ -0,0 +1,391 @@
+"""Redis-backed LLM rate governor shared by every RQ worker.
+
+Bulk ingestion runs many workers that all call the model provider at once;
+without coordination they overshoot the account's requests-per-minute (RPM)
+and tokens-per-minute (TPM) limits and the 429s come back as failed steps.
+Every agent call therefore goes through this governor first, per model
+(``"openai:gpt-5-mini"``):
+
+- two token buckets hold the model's RPM and TPM, scaled by ``HEADROOM``
+  so the cluster runs just under the provider's limits.  A call reserves
+  one request and its estimated tokens: the prompt and system prompt
+  (``ingestion.terms_text.count_tokens``) plus ``OUTPUT_TOKENS`` for the
+  completion, which providers count against TPM as well.  Once the call
+  returns, the reservation is settled against the reported usage so an
+  over-estimate is handed back to the bucket;
+- callers queue first-come first-served: each takes a ticket and only the
+  oldest live ticket may draw from the buckets, so a large evaluation prompt
+  is not starved by a stream of small ones.  Tickets expire ``TICKET_TTL``
+  seconds after their holder last polled, so a crashed worker does not
+  block the queue;
+- a 429 empties both buckets and holds them closed for the response's
+  ``Retry-After`` (``DEFAULT_RETRY_AFTER`` if it has none), pausing every
+  worker rather than just the one that saw it; the call is then queued
+  again, up to ``MAX_RETRIES`` times.
+
+The bucket and queue updates run in Lua scripts using the Redis clock, so
+workers on different hosts share a single view.  If Redis is unavailable the
+governor fails open, like the politeness limiter.  Callers that cannot get
+a slot within ``MAX_WAIT_SECONDS``, or are still rate limited after
+``MAX_RETRIES``, get ``LLMRateLimited`` so the pipeline can tell capacity
+from other failures.
+
+Configured by ``settings.LLM_RATE_LIMITS``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from email.utils import parsedate_to_datetime
+
+from loguru import logger
+from pydantic_ai.exceptions import ModelHTTPError
+
+from ingestion.terms_text import count_tokens
+
+DEFAULT_CONFIG = {
+    "ENABLED": True,
+    # Model -> {"RPM": ..., "TPM": ...}; models not listed use the defaults.
+    "MODELS": {},
+    "DEFAULT_RPM": 500,
+    "DEFAULT_TPM": 200_000,
+    "HEADROOM": 0.9,
+    "OUTPUT_TOKENS": 1024,
+    "MAX_WAIT_SECONDS": 300,
+    "MAX_RETRIES": 3,
+    "DEFAULT_RETRY_AFTER": 5.0,
+    "TICKET_TTL": 30,
+}
+
+# Longest single sleep between attempts, so the head of the queue is noticed.
+MAX_POLL_INTERVAL = 0.25
+
+# KEYS: bucket hash, queue zset (ticket order), alive zset (ticket expiry), ticket counter
+# ARGV: rpm, tpm, tokens, member, ticket_ttl, poll_interval
+# Returns "0" once the reservation is taken, else the seconds to wait before retrying.
+_ACQUIRE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rpm = tonumber(ARGV[1])
+local tpm = tonumber(ARGV[2])
+local need = math.min(tonumber(ARGV[3]), tpm)
+local member = ARGV[4]
+local ttl = tonumber(ARGV[5])
+
+local stale = redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', now)
+for _, m in ipairs(stale) do
+  redis.call('ZREM', KEYS[2], m)
+  redis.call('ZREM', KEYS[3], m)
+end
+if not redis.call('ZSCORE', KEYS[2], member) then
+  redis.call('ZADD', KEYS[2], redis.call('INCR', KEYS[4]), member)
+end
+redis.call('ZADD', KEYS[3], now + ttl, member)
+redis.call('EXPIRE', KEYS[2], ttl + 60)
+redis.call('EXPIRE', KEYS[3], ttl + 60)
+if redis.call('ZRANGE', KEYS[2], 0, 0)[1] ~= member then
+  return ARGV[6]
+end
+
+local state = redis.call('HMGET', KEYS[1], 'requests', 'tokens', 'ts')
+local requests = tonumber(state[1]) or rpm
+local tokens = tonumber(state[2]) or tpm
+local ts = tonumber(state[3]) or now
+if ts > now then
+  return tostring(ts - now)
+end
+local elapsed = now - ts
+requests = math.min(rpm, requests + elapsed * rpm / 60)
+tokens = math.min(tpm, tokens + elapsed * tpm / 60)
+redis.call('HSET', KEYS[1], 'requests', requests, 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], 120)
+if requests < 1 or tokens < need then
+  local wait = math.max((1 - requests) * 60 / rpm, (need - tokens) * 60 / tpm)
+  return tostring(math.max(wait, 0.01))
+end
+redis.call('HSET', KEYS[1], 'requests', requests - 1, 'tokens', tokens - need)
+redis.call('ZREM', KEYS[2], member)
+redis.call('ZREM', KEYS[3], member)
+return '0'
+"""
+
+# KEYS: bucket hash
+# ARGV: requests_delta, tokens_delta, rpm, tpm
+# Charges (positive) or refunds (negative) the difference between a call's
+# reservation and its reported usage.
+_SETTLE_SCRIPT = """
+local state = redis.call('HMGET', KEYS[1], 'requests', 'tokens')
+if not state[1] then
+  return 0
+end
+redis.call('HSET', KEYS[1],
+  'requests', math.min(tonumber(ARGV[3]), tonumber(state[1]) - tonumber(ARGV[1])),
+  'tokens', math.min(tonumber(ARGV[4]), tonumber(state[2]) - tonumber(ARGV[2])))
+return 1
+"""
+
+# KEYS: bucket hash
+# ARGV: retry_after
+# Empties the buckets and starts refilling them only after retry_after seconds.
+_BACKOFF_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local until_ts = now + tonumber(ARGV[1])
+local ts = tonumber(redis.call('HGET', KEYS[1], 'ts') or '0')
+redis.call('HSET', KEYS[1], 'requests', 0, 'tokens', 0, 'ts', math.max(ts, until_ts))
+redis.call('EXPIRE', KEYS[1], math.ceil(tonumber(ARGV[1])) + 120)
+return 1
+"""
+
+
+class LLMRateLimited(Exception):
+    """No LLM capacity for the call: the queue wait or the 429 retries ran out."""
+
+    def __init__(self, message: str, model: str, retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.model = model
+        self.retry_after = retry_after
+
+
+def _configured() -> dict:
+    from django.conf import settings
+
+    return {**DEFAULT_CONFIG, **getattr(settings, "LLM_RATE_LIMITS", {})}
+
+
+def model_name(agent) -> str:
+    """``provider:model`` name of *agent*'s model, e.g. ``openai:gpt-5-mini``."""
+    model = agent.model
+    if isinstance(model, str):
+        return model
+    return f"{model.system}:{model.model_name}"
+
+
+def retry_after_seconds(exc: ModelHTTPError) -> float | None:
+    """Seconds to wait from the error's ``Retry-After``/``Retry-After-Ms`` header."""
+    headers = exc.headers or {}
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_rate_limited(exc: Exception) -> bool:
+    return isinstance(exc, ModelHTTPError) and exc.status_code == 429
+
+
+class LLMRateGovernor:
+    """Distributed per-model RPM/TPM buckets with a FIFO queue of callers."""
+
+    def __init__(self, client=None, config: dict | None = None, prefix: str = "llm") -> None:
+        self._client = client
+        self._config = config
+        self.prefix = prefix
+        self._scripts: dict[str, object] = {}
+
+    @property
+    def config(self) -> dict:
+        return self._config if self._config is not None else _configured()
+
+    @property
+    def client(self):
+        if self._client is None:
+            from publishers.pipeline.events import get_redis_client
+
+            self._client = get_redis_client()
+        return self._client
+
+    def _script(self, name: str, source: str):
+        if name not in self._scripts:
+            self._scripts[name] = self.client.register_script(source)
+        return self._scripts[name]
+
+    def _keys(self, model: str) -> list[str]:
+        return [
+            f"{self.prefix}:{model}:bucket",
+            f"{self.prefix}:{model}:queue",
+            f"{self.prefix}:{model}:alive",
+            f"{self.prefix}:{model}:tickets",
+        ]
+
+    def limits(self, model: str) -> tuple[float, float]:
+        """``(rpm, tpm)`` the cluster may use for *model*, after HEADROOM."""
+        config = self.config
+        limits = config["MODELS"].get(model, {})
+        headroom = config["HEADROOM"]
+        return (
+            limits.get("RPM", config["DEFAULT_RPM"]) * headroom,
+            limits.get("TPM", config["DEFAULT_TPM"]) * headroom,
+        )
+
+    def estimate_tokens(
+        self, prompt: str, system_prompt: str = "", output_tokens: int | None = None
+    ) -> int:
+        """Tokens to reserve for one call: the prompts plus the expected completion."""
+        if output_tokens is None:
+            output_tokens = self.config["OUTPUT_TOKENS"]
+        return count_tokens(system_prompt) + count_tokens(prompt) + output_tokens
+
+    def try_acquire(self, model: str, token: str, tokens: int) -> float:
+        """One attempt: 0.0 when the reservation was taken, else seconds to wait."""
+        rpm, tpm = self.limits(model)
+        wait = self._script("acquire", _ACQUIRE_SCRIPT)(
+            keys=self._keys(model),
+            args=[rpm, tpm, tokens, token, self.config["TICKET_TTL"], MAX_POLL_INTERVAL],
+        )
+        return float(wait.decode() if isinstance(wait, bytes) else wait)
+
+    def leave(self, model: str, token: str) -> None:
+        """Give up a queue ticket without drawing from the buckets."""
+        keys = self._keys(model)
+        try:
+            self.client.zrem(keys[1], token)
+            self.client.zrem(keys[2], token)
+        except Exception as exc:
+            logger.warning(f"Could not leave the LLM queue for {model}: {exc}")
+
+    def settle(self, model: str, tokens: int, result) -> None:
+        """Correct a reservation of one request and *tokens* by *result*'s usage."""
+        usage = getattr(result, "usage", None)
+        try:
+            # A property on current pydantic-ai results, a method on older ones.
+            usage = usage() if callable(usage) else usage
+            used_requests, used_tokens = usage.requests, usage.total_tokens
+        except Exception:
+            return
+        if not (isinstance(used_requests, int) and isinstance(used_tokens, int)) or not used_tokens:
+            return
+        rpm, tpm = self.limits(model)
+        try:
+            self._script("settle", _SETTLE_SCRIPT)(
+                keys=self._keys(model)[:1],
+                args=[used_requests - 1, used_tokens - tokens, rpm, tpm],
+            )
+        except Exception as exc:
+            logger.warning(f"Could not settle LLM usage for {model}: {exc}")
+
+    def backoff(self, model: str, retry_after: float) -> bool:
+        """Close *model*'s buckets for *retry_after* seconds; False if Redis is down."""
+        try:
+            self._script("backoff", _BACKOFF_SCRIPT)(
+                keys=self._keys(model)[:1], args=[retry_after]
+            )
+            return True
+        except Exception as exc:
+            logger.warning(f"Could not record LLM backoff for {model}: {exc}")
+            return False
+
+    def _next_wait(self, model: str, token: str, tokens: int) -> float | None:
+        """Attempt once; None means acquired (or Redis is down and we fail open)."""
+        try:
+            wait = self.try_acquire(model, token, tokens)
+        except Exception as exc:
+            logger.warning(f"LLM rate governor unavailable for {model}: {exc}")
+            return None
+        return wait if wait > 0 else None
+
+    def _timeout(self, model: str, token: str) -> LLMRateLimited:
+        self.leave(model, token)
+        return LLMRateLimited(
+            f"No LLM capacity for {model} within {self.config['MAX_WAIT_SECONDS']}s",
+            model=model,
+        )
+
+    def acquire(self, model: str, tokens: int) -> None:
+        """Block until this caller's turn comes and *tokens* fit in *model*'s buckets."""
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.config["MAX_WAIT_SECONDS"]
+        while (wait := self._next_wait(model, token, tokens)) is not None:
+            if time.monotonic() + wait > deadline:
+                raise self._timeout(model, token)
+            time.sleep(min(wait, MAX_POLL_INTERVAL))
+
+    async def aacquire(self, model: str, tokens: int) -> None:
+        """Async twin of ``acquire``; waits with asyncio.sleep.
+
+        The Redis round-trips themselves are short blocking calls.
+        """
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.config["MAX_WAIT_SECONDS"]
+        while (wait := self._next_wait(model, token, tokens)) is not None:
+            if time.monotonic() + wait > deadline:
+                raise self._timeout(model, token)
+            await asyncio.sleep(min(wait, MAX_POLL_INTERVAL))
+
+    def _rate_limited(self, model: str, exc: ModelHTTPError, attempt: int) -> float:
+        """Record a 429 cluster-wide; the seconds to sleep locally, or raise when out of retries."""
+        retry_after = retry_after_seconds(exc)
+        if retry_after is None:
+            retry_after = self.config["DEFAULT_RETRY_AFTER"]
+        if attempt >= self.config["MAX_RETRIES"]:
+            raise LLMRateLimited(
+                f"{model} still rate limited after {attempt + 1} attempts",
+                model=model,
+                retry_after=retry_after,
+            ) from exc
+        logger.warning(f"{model} returned 429; backing off {retry_after:.1f}s")
+        # With Redis down the buckets cannot hold callers back: wait here.
+        return 0.0 if self.backoff(model, retry_after) else retry_after
+
+    def run_sync(
+        self, agent, prompt: str, *, system_prompt: str = "", output_tokens: int | None = None
+    ):
+        """``agent.run_sync(prompt)`` once the governor admits it, retrying 429s."""
+        if not self.config["ENABLED"]:
+            return agent.run_sync(prompt)
+        model = model_name(agent)
+        tokens = self.estimate_tokens(prompt, system_prompt, output_tokens)
+        attempt = 0
+        while True:
+            self.acquire(model, tokens)
+            try:
+                result = agent.run_sync(prompt)
+            except ModelHTTPError as exc:
+                if not _is_rate_limited(exc):
+                    raise
+                if wait := self._rate_limited(model, exc, attempt):
+                    time.sleep(wait)
+                attempt += 1
+                continue
+            self.settle(model, tokens, result)
+            return result
+
+    async def run(
+        self, agent, prompt: str, *, system_prompt: str = "", output_tokens: int | None = None
+    ):
+        """Async twin of ``run_sync``, awaiting ``agent.run(prompt)``."""
+        if not self.config["ENABLED"]:
+            return await agent.run(prompt)
+        model = model_name(agent)
+        tokens = self.estimate_tokens(prompt, system_prompt, output_tokens)
+        attempt = 0
+        while True:
+            await self.aacquire(model, tokens)
+            try:
+                result = await agent.run(prompt)
+            except ModelHTTPError as exc:
+                if not _is_rate_limited(exc):
+                    raise
+                if wait := self._rate_limited(model, exc, attempt):
+                    await asyncio.sleep(wait)
+                attempt += 1
+                continue
+            self.settle(model, tokens, result)
+            return result
+
+
+llm_governor = LLMRateGovernor()
@@ -0,0 +1,82 @@
+"""Microbenchmark the signature engine against whole-body scans on large HTML."""
+
+import random
+import re
+from timeit import timeit
+
+from django.core.management.base import BaseCommand
+
+from publishers.signatures import signature_set
+
+FILLER_WORDS = (
+    'the <div class="story-body"> <p>Lorem ipsum dolor sit amet, '
+    "consectetur adipiscing elit</p> <a href=\"/news/world\">World</a> "
+    "<script src=\"/static/app.js\"></script> Markets Politics Opinion"
+).split()
+
+
+def _fixture(size: int, seed: int = 0) -> str:
+    """Article-like HTML of roughly *size* characters without any signature."""
+    rng = random.Random(seed)
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(FILLER_WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return "<html><head><title>Article</title></head><body>" + " ".join(words) + "</body></html>"
+
+
+def _whole_body_scan(patterns):
+    def scan(html: str) -> list[str]:
+        html_lower = html.lower()
+        return [pattern for pattern in patterns if pattern in html_lower]
+
+    return scan
+
+
+def _combined_regex(patterns):
+    regex = re.compile("|".join(re.escape(p) for p in sorted(patterns, key=len, reverse=True)))
+
+    def scan(html: str) -> list[str]:
+        return sorted(set(regex.findall(html.lower())))
+
+    return scan
+
+
+class Command(BaseCommand):
+    help = "Compare signature scans (WAF block, paywall) on large HTML fixtures."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="100000,1000000,5000000",
+            help="Comma-separated fixture sizes in characters",
+        )
+        parser.add_argument("--number", type=int, default=20, help="Scans per measurement")
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options["sizes"].split(",")]
+        number = options["number"]
+
+        for name in ("waf_block", "paywall"):
+            engine = signature_set(name)
+            patterns = [pattern for _, pattern in engine._patterns]
+            candidates = {
+                "whole-body scans": _whole_body_scan(patterns),
+                "combined regex": _combined_regex(patterns),
+                f"engine (window={engine.window})": engine.matches,
+            }
+            self.stdout.write(f"\n{name}: {len(patterns)} patterns")
+            for size in sizes:
+                html = _fixture(size)
+                timings = {
+                    label: timeit(lambda scan=scan, html=html: scan(html), number=number) / number * 1000
+                    for label, scan in candidates.items()
+                }
+                baseline = timings["whole-body scans"]
+                for label, ms in timings.items():
+                    self.stdout.write(
+                        f"  {size:>10,} chars  {label:<28} {ms:8.2f} ms  "
+                        f"x{baseline / ms:5.1f}"
+                    )
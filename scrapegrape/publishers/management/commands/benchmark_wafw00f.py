@@ -0,0 +1,85 @@
+"""Compare per-scan latency of the wafw00f CLI subprocess with the in-process engine."""
+
+import json
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from statistics import median
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from publishers.waf_check import scan_many, scan_url_with_wafw00f
+
+
+class _LocalPage(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b"<html><body>benchmark</body></html>"
+        self.send_response(200)
+        self.send_header("Server", "cloudflare")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _scan_with_cli(url: str):
+    """The previous implementation: fork the wafw00f CLI and read its JSON file."""
+    from sh import wafw00f
+
+    with tempfile.NamedTemporaryFile(delete_on_close=False) as tf:
+        tf.close()
+        wafw00f("-f", "json", "-o", tf.name, url)
+        with open(tf.name) as f:
+            report = json.load(f)
+        os.remove(tf.name)
+    return report
+
+
+class Command(BaseCommand):
+    help = "Benchmark wafw00f scans: CLI subprocess vs in-process engine vs scan_many."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "urls",
+            nargs="*",
+            help="URLs to scan (default: a page served on localhost)",
+        )
+        parser.add_argument("--repeat", type=int, default=5, help="Scans per URL and mode")
+        parser.add_argument("--concurrency", type=int, default=8)
+
+    def handle(self, *args, **options):
+        server = None
+        urls = options["urls"]
+        if not urls:
+            server = ThreadingHTTPServer(("127.0.0.1", 0), _LocalPage)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            urls = [f"http://127.0.0.1:{server.server_address[1]}/"]
+
+        try:
+            batch = urls * options["repeat"]
+            for label, scan in (("subprocess", _scan_with_cli), ("in-process", scan_url_with_wafw00f)):
+                timings = []
+                for url in batch:
+                    started = perf_counter()
+                    scan(url)
+                    timings.append(perf_counter() - started)
+                self.stdout.write(
+                    f"{label:<12} median {median(timings) * 1000:8.1f} ms/scan  "
+                    f"total {sum(timings):6.2f} s for {len(batch)} scans"
+                )
+
+            started = perf_counter()
+            scan_many(batch, concurrency=options["concurrency"])
+            elapsed = perf_counter() - started
+            self.stdout.write(
+                f"{'scan_many':<12} {elapsed / len(batch) * 1000:8.1f} ms/scan  "
+                f"total {elapsed:6.2f} s (concurrency={options['concurrency']})"
+            )
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
@@ -0,0 +1,66 @@
+"""Answer Common Crawl presence for many domains from the local cluster.idx."""
+
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from publishers.commoncrawl import ClusterIndex, cc_config, index_path
+from publishers.models import Publisher
+
+
+class Command(BaseCommand):
+    help = "Batch Common Crawl lookups against a downloaded cluster.idx (JSON lines)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("domains", nargs="*", help="Domains to look up")
+        parser.add_argument(
+            "--file", help="Read domains from this file, one per line ('-' for stdin)"
+        )
+        parser.add_argument(
+            "--publishers",
+            action="store_true",
+            help="Look up every publisher and store the results on their cc_* fields",
+        )
+        parser.add_argument("--collection")
+
+    def handle(self, *args, **options):
+        config = cc_config()
+        collection = options["collection"] or config["COLLECTION"]
+        path = index_path(collection, config)
+        if not path.exists():
+            raise CommandError(f"{path} not found; run download_cc_index first")
+
+        domains = list(options["domains"])
+        if options["file"]:
+            stream = sys.stdin if options["file"] == "-" else open(options["file"])
+            with stream:
+                domains.extend(line.strip() for line in stream if line.strip())
+        publishers = list(Publisher.objects.all()) if options["publishers"] else []
+        domains.extend(publisher.domain for publisher in publishers)
+
+        with ClusterIndex(
+            path,
+            collection=collection,
+            read_blocks=config["READ_BLOCKS"],
+            block_concurrency=config["BLOCK_CONCURRENCY"],
+        ) as index:
+            results = index.lookup_many(domains)
+
+        for domain in dict.fromkeys(domains):
+            self.stdout.write(json.dumps({"domain": domain, **results[domain]}))
+
+        updated = []
+        for publisher in publishers:
+            result = results[publisher.domain]
+            if result["in_index"] is None:
+                continue
+            publisher.cc_in_index = result["in_index"]
+            publisher.cc_page_count = result["page_count"]
+            publisher.cc_last_crawl = result["latest_crawl"] or ""
+            updated.append(publisher)
+        if updated:
+            Publisher.objects.bulk_update(
+                updated, ["cc_in_index", "cc_page_count", "cc_last_crawl"]
+            )
+            self.stderr.write(f"Updated {len(updated)} publishers")
@@ -0,0 +1,48 @@
+"""Download (or refresh) a Common Crawl collection's cluster.idx for local lookups."""
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from publishers.commoncrawl import DATA_URL, cc_config, index_path
+from publishers.fetchers.clients import http_clients
+
+
+class Command(BaseCommand):
+    help = "Download a collection's cluster.idx into COMMON_CRAWL['INDEX_DIR']."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--collection",
+            help="Collection id, e.g. CC-MAIN-2026-04 (default: COMMON_CRAWL['COLLECTION'])",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Download even if a local copy of the same size exists",
+        )
+
+    def handle(self, *args, **options):
+        collection = options["collection"] or cc_config()["COLLECTION"]
+        path = index_path(collection)
+        url = DATA_URL.format(collection=collection, name="cluster.idx")
+        client = http_clients.httpx_client()
+
+        if path.exists() and not options["force"]:
+            head = client.head(url, timeout=30.0, follow_redirects=True)
+            if head.is_success and int(head.headers.get("content-length", -1)) == path.stat().st_size:
+                self.stdout.write(f"{path} is up to date")
+                return
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(".idx.part")
+        written = 0
+        with client.stream("GET", url, timeout=60.0, follow_redirects=True) as response:
+            if not response.is_success:
+                raise CommandError(f"GET {url} returned {response.status_code}")
+            with open(partial, "wb") as f:
+                for chunk in response.iter_bytes(1024 * 1024):
+                    f.write(chunk)
+                    written += len(chunk)
+        os.replace(partial, path)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written:,} bytes to {path}"))
@@ -0,0 +1,41 @@
+"""Refresh every publisher's Common Crawl presence history in one batched pass."""
+
+from django.core.management.base import BaseCommand
+
+from publishers.commoncrawl import CCQuerier, collection_registry, merge_history, summarize
+from publishers.models import Publisher
+
+
+class Command(BaseCommand):
+    help = "Query the most recent Common Crawl collections for all publishers at once."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--depth", type=int, help="Number of recent collections (default: HISTORY_DEPTH)"
+        )
+        parser.add_argument(
+            "--concurrency", type=int, help="CDX requests in flight (default: CONCURRENCY)"
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        collections = collection_registry.recent(options["depth"])
+        querier = CCQuerier(concurrency=options["concurrency"])
+        self.stdout.write(f"Collections: {', '.join(collections)}")
+
+        publishers = list(Publisher.objects.exclude(domain="").order_by("domain"))
+        fields = ["cc_in_index", "cc_page_count", "cc_last_crawl", "cc_history"]
+        updated = 0
+        for i in range(0, len(publishers), options["batch_size"]):
+            batch = publishers[i : i + options["batch_size"]]
+            results = querier.query([p.domain for p in batch], collections)
+            for publisher in batch:
+                summary = summarize(results[publisher.domain], collections)
+                publisher.cc_history = merge_history(publisher.cc_history, summary["history"])
+                if summary["available"]:
+                    publisher.cc_in_index = summary["in_index"]
+                    publisher.cc_page_count = summary["page_count"]
+                    publisher.cc_last_crawl = summary["latest_crawl"] or ""
+            Publisher.objects.bulk_update(batch, fields)
+            updated += len(batch)
+            self.stdout.write(f"{updated}/{len(publishers)} publishers")
@@ -0,0 +1,28 @@
+"""Show or clear the ToS evaluation result cache (ingestion.terms_cache)."""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ingestion.terms_cache import get_terms_cache
+
+
+class Command(BaseCommand):
+    help = "Print terms cache hit/miss statistics, or clear the cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete every cached evaluation (e.g. after editing the evaluation prompt)",
+        )
+
+    def handle(self, *args, **options):
+        cache = get_terms_cache()
+        if cache is None:
+            raise CommandError("The terms cache is disabled (TERMS_CACHE['BACKEND'] is None)")
+
+        if options["clear"]:
+            cache.clear()
+            self.stderr.write("Terms cache cleared")
+        self.stdout.write(json.dumps(cache.stats(), indent=2))
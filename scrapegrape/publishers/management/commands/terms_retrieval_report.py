@@ -0,0 +1,54 @@
+"""Report clause retrieval token reduction and agreement on a corpus of ToS documents."""
+
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ingestion.terms_clauses import retrieval_report, terms_retrieval_config
+from ingestion.terms_text import html_to_text
+
+
+class Command(BaseCommand):
+    help = (
+        "Run clause retrieval over a directory of ToS documents (.html or .txt). A sibling "
+        "<name>.json holding the full-document evaluation (a tos_result or "
+        "TermsEvaluationResult dump) is used to measure agreement."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", help="Directory of ToS documents")
+        parser.add_argument("--top-k", type=int, help="Override TERMS_RETRIEVAL['TOP_K']")
+
+    def handle(self, *args, **options):
+        directory = Path(options["directory"])
+        if not directory.is_dir():
+            raise CommandError(f"Not a directory: {directory}")
+
+        config = terms_retrieval_config()
+        if options["top_k"]:
+            config["TOP_K"] = options["top_k"]
+
+        corpus = []
+        for path in sorted(directory.iterdir()):
+            if path.suffix not in (".html", ".htm", ".txt"):
+                continue
+            text = path.read_text(errors="replace")
+            if path.suffix != ".txt":
+                text = html_to_text(text)
+            evaluation_path = path.with_suffix(".json")
+            evaluation = (
+                json.loads(evaluation_path.read_text()) if evaluation_path.exists() else None
+            )
+            corpus.append((path.name, text, evaluation))
+        if not corpus:
+            raise CommandError(f"No .html or .txt documents in {directory}")
+
+        report = retrieval_report(corpus, config)
+        self.stdout.write(json.dumps(report, indent=2))
+        agreement = report["agreement"]
+        self.stderr.write(
+            f"{len(corpus)} documents: {report['document_tokens']} -> "
+            f"{report['selected_tokens']} tokens ({report['reduction']:.0%} fewer)"
+            + (f", evidence agreement {agreement:.0%}" if agreement is not None else "")
+        )
@@ -0,0 +1,106 @@
+"""Train the local first-pass ToS classifier (ingestion.terms_classifier)."""
+
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ingestion.terms_classifier import (
+    TermsClassifier,
+    benchmark,
+    document_labels,
+    terms_classifier_config,
+    train_classifier,
+)
+from ingestion.terms_text import html_to_text
+from publishers.models import Publisher
+
+
+class Command(BaseCommand):
+    help = (
+        "Train the terms classifier from stored ToS evaluations and report held-out "
+        "accuracy and latency. Documents come from --corpus (.html/.txt files with a "
+        "sibling <name>.json evaluation) or, by default, from publishers with a ToS URL "
+        "and stored permissions (pages are fetched)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--corpus", help="Directory of ToS documents with evaluations")
+        parser.add_argument("--limit", type=int, help="Use at most this many publishers")
+        parser.add_argument("--output", help="Artifact path (default: TERMS_CLASSIFIER['MODEL_PATH'])")
+        parser.add_argument("--holdout", type=float, default=0.2, help="Held-out share (default 0.2)")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--benchmark",
+            action="store_true",
+            help="Only benchmark the existing artifact on the documents",
+        )
+
+    def handle(self, *args, **options):
+        config = terms_classifier_config()
+        output = options["output"] or config["MODEL_PATH"]
+        if not output:
+            raise CommandError("No artifact path: pass --output or set TERMS_CLASSIFIER['MODEL_PATH']")
+
+        documents = (
+            self._corpus(Path(options["corpus"])) if options["corpus"]
+            else self._publishers(options["limit"])
+        )
+        if not documents:
+            raise CommandError("No labelled ToS documents found")
+
+        if options["benchmark"]:
+            if not Path(output).exists():
+                raise CommandError(f"No artifact at {output}")
+            classifier = TermsClassifier.load(output)
+            report = {
+                "version": classifier.version,
+                **benchmark(classifier, documents, config["ACCEPT_CONFIDENCE"]),
+            }
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        classifier = train_classifier(
+            documents, config, holdout=options["holdout"], seed=options["seed"]
+        )
+        classifier.save(output)
+        self.stdout.write(json.dumps({"version": classifier.version, **classifier.metrics}, indent=2))
+        self.stderr.write(f"Wrote terms classifier {classifier.version} to {output}")
+
+    def _corpus(self, directory: Path) -> list[tuple[str, dict[str, str]]]:
+        if not directory.is_dir():
+            raise CommandError(f"Not a directory: {directory}")
+        documents = []
+        for path in sorted(directory.iterdir()):
+            evaluation_path = path.with_suffix(".json")
+            if path.suffix not in (".html", ".htm", ".txt") or not evaluation_path.exists():
+                continue
+            text = path.read_text(errors="replace")
+            if path.suffix != ".txt":
+                text = html_to_text(text)
+            permissions = json.loads(evaluation_path.read_text()).get("permissions", [])
+            documents.append((text, document_labels(permissions)))
+        return documents
+
+    def _publishers(self, limit: int | None) -> list[tuple[str, dict[str, str]]]:
+        from ingestion.services import fetch_html_via_proxy
+
+        publishers = (
+            Publisher.objects.exclude(tos_url="")
+            .exclude(tos_permissions__isnull=True)
+            .order_by("id")
+        )
+        if limit:
+            publishers = publishers[:limit]
+        documents = []
+        for publisher in publishers:
+            labels = document_labels(publisher.tos_permissions)
+            if not labels:
+                continue
+            try:
+                html = fetch_html_via_proxy(publisher.tos_url, publisher=publisher)
+            except Exception as exc:
+                self.stderr.write(f"Skipping {publisher.tos_url}: {exc}")
+                continue
+            documents.append((html_to_text(html), labels))
+        return documents
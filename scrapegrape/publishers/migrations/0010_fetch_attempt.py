@@ -0,0 +1,32 @@
+# Generated by Django 6.1.2 on 2026-10-17 00:23
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publishers', '0009_widen_resolution_job_url_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FetchAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('domain', models.CharField(max_length=255)),
+                ('url', models.URLField(max_length=2048)),
+                ('strategy', models.CharField(max_length=20)),
+                ('outcome', models.CharField(choices=[('success', 'Success'), ('blocked', 'Blocked'), ('error', 'Error')], max_length=10)),
+                ('status_code', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('latency_ms', models.PositiveIntegerField()),
+                ('bytes', models.PositiveIntegerField(default=0)),
+                ('block_reason', models.CharField(blank=True, default='', max_length=255)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['domain', 'created_at'], name='publishers__domain_a15001_idx')],
+            },
+        ),
+    ]
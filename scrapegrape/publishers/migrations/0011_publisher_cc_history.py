@@ -0,0 +1,18 @@
+# Generated by Django 6.1.2 on 2026-10-17 00:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publishers', '0010_fetch_attempt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publisher',
+            name='cc_history',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 6.1.2 on 2026-10-17 00:50
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publishers', '0011_publisher_cc_history'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SitemapEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url_hash', models.CharField(max_length=64)),
+                ('url', models.URLField(max_length=2048)),
+                ('lastmod', models.DateTimeField(blank=True, null=True)),
+                ('changefreq', models.CharField(blank=True, default='', max_length=16)),
+                ('news_publication_date', models.DateTimeField(blank=True, null=True)),
+                ('first_seen_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('publisher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sitemap_entries', to='publishers.publisher')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['publisher', 'lastmod'], name='publishers__publish_311836_idx'), models.Index(fields=['publisher', 'news_publication_date'], name='publishers__publish_aacae7_idx')],
+                'constraints': [models.UniqueConstraint(fields=('publisher', 'url_hash'), name='unique_sitemap_entry_per_publisher')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SitemapFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=2048)),
+                ('is_index', models.BooleanField(default=False)),
+                ('lastmod', models.CharField(blank=True, default='', max_length=64)),
+                ('etag', models.CharField(blank=True, default='', max_length=255)),
+                ('last_modified', models.CharField(blank=True, default='', max_length=64)),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('crawled_at', models.DateTimeField(blank=True, null=True)),
+                ('publisher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sitemap_files', to='publishers.publisher')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('publisher', 'url'), name='unique_sitemap_file_per_publisher')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.1.2 on 2026-10-17 00:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publishers', '0012_sitemap_store'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publisher',
+            name='feed_entry_dates',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.CreateModel(
+            name='FeedState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=2048)),
+                ('etag', models.CharField(blank=True, default='', max_length=255)),
+                ('last_modified', models.CharField(blank=True, default='', max_length=64)),
+                ('seen_ids', models.JSONField(blank=True, default=list)),
+                ('fetched_at', models.DateTimeField(blank=True, null=True)),
+                ('publisher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_states', to='publishers.publisher')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('publisher', 'url'), name='unique_feed_state_per_publisher')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.1.2 on 2026-10-17 02:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publishers', '0013_feed_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sitemapfile',
+            name='resume_offset',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,6 +1,7 @@
 import uuid
 
 from django.db import models
+from django.utils import timezone
 
 from .waf_check import scan_url_with_wafw00f
 
@@ -30,6 +31,8 @@ class Publisher(models.Model):
     cc_in_index = models.BooleanField(null=True)
     cc_page_count = models.IntegerField(null=True, blank=True)
     cc_last_crawl = models.CharField(max_length=20, blank=True, default="")
+    # Page count per Common Crawl collection id, newest first (0: absent)
+    cc_history = models.JSONField(default=dict, blank=True)
 
     # News sitemap (populated by Phase 15)
     has_news_sitemap = models.BooleanField(null=True)
@@ -41,6 +44,9 @@ class Publisher(models.Model):
     update_frequency = models.CharField(max_length=50, blank=True, default="")
     update_frequency_hours = models.FloatField(null=True, blank=True)
     update_frequency_confidence = models.CharField(max_length=10, blank=True, default="")
+    # Rolling window of feed entry publication times, {entry key: ISO timestamp}
+    # (maintained by publishers.feeds.FeedPoller)
+    feed_entry_dates = models.JSONField(default=dict, blank=True)
 
     # NEW: Remembered fetch strategy (populated by FetchStrategyManager)
     FETCH_STRATEGY_CHOICES = [
@@ -62,6 +68,140 @@ class Publisher(models.Model):
         return self.name
 
 
+class FetchAttempt(models.Model):
+    """One fetch strategy attempt. Append-only telemetry, written in batches.
+
+    Drives adaptive per-domain strategy ordering in FetchStrategyManager.
+    """
+
+    OUTCOME_CHOICES = [
+        ("success", "Success"),
+        ("blocked", "Blocked"),
+        ("error", "Error"),
+    ]
+
+    domain = models.CharField(max_length=255)
+    url = models.URLField(max_length=2048)
+    strategy = models.CharField(max_length=20)
+    outcome = models.CharField(max_length=10, choices=OUTCOME_CHOICES)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    latency_ms = models.PositiveIntegerField()
+    bytes = models.PositiveIntegerField(default=0)
+    block_reason = models.CharField(max_length=255, blank=True, default="")
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["domain", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.strategy} {self.outcome} {self.url} ({self.latency_ms}ms)"
+
+
+class FeedState(models.Model):
+    """Polling state of one RSS/Atom feed: validators and recently seen entry keys."""
+
+    publisher = models.ForeignKey(
+        Publisher, on_delete=models.CASCADE, related_name="feed_states"
+    )
+    url = models.URLField(max_length=2048)
+    etag = models.CharField(max_length=255, blank=True, default="")
+    last_modified = models.CharField(max_length=64, blank=True, default="")
+    # Keys of the entries seen in the feed, newest first (bounded)
+    seen_ids = models.JSONField(default=list, blank=True)
+    fetched_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["publisher", "url"], name="unique_feed_state_per_publisher"
+            ),
+        ]
+
+    def __str__(self):
+        return self.url
+
+    def conditional_headers(self) -> dict[str, str]:
+        """Request headers for a conditional GET (empty when there are no validators)."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class SitemapFile(models.Model):
+    """Crawl state of one sitemap document, for incremental re-crawls.
+
+    ``lastmod`` is the value the parent sitemap index declared for this file
+    when it was last crawled; ``etag``/``last_modified`` are the response
+    validators used for conditional GETs.  ``resume_offset`` is the number of
+    ``<url>`` entries already read from a file cut off at ``MAX_ENTRIES``.
+    """
+
+    publisher = models.ForeignKey(
+        Publisher, on_delete=models.CASCADE, related_name="sitemap_files"
+    )
+    url = models.URLField(max_length=2048)
+    is_index = models.BooleanField(default=False)
+    lastmod = models.CharField(max_length=64, blank=True, default="")
+    etag = models.CharField(max_length=255, blank=True, default="")
+    last_modified = models.CharField(max_length=64, blank=True, default="")
+    entry_count = models.PositiveIntegerField(default=0)
+    resume_offset = models.PositiveIntegerField(default=0)
+    crawled_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["publisher", "url"], name="unique_sitemap_file_per_publisher"
+            ),
+        ]
+
+    def __str__(self):
+        return self.url
+
+    def conditional_headers(self) -> dict[str, str]:
+        """Request headers for a conditional GET (empty when there are no validators)."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class SitemapEntry(models.Model):
+    """One ``<url>`` of a publisher's sitemaps, keyed by the SHA-256 of its location."""
+
+    publisher = models.ForeignKey(
+        Publisher, on_delete=models.CASCADE, related_name="sitemap_entries"
+    )
+    url_hash = models.CharField(max_length=64)
+    url = models.URLField(max_length=2048)
+    lastmod = models.DateTimeField(null=True, blank=True)
+    changefreq = models.CharField(max_length=16, blank=True, default="")
+    news_publication_date = models.DateTimeField(null=True, blank=True)
+    first_seen_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["publisher", "url_hash"], name="unique_sitemap_entry_per_publisher"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["publisher", "lastmod"]),
+            models.Index(fields=["publisher", "news_publication_date"]),
+        ]
+
+    def __str__(self):
+        return self.url
+
+
 class WAFReport(models.Model):
     publisher = models.ForeignKey(
         Publisher, on_delete=models.CASCADE, related_name="waf_reports"
@@ -79,8 +219,11 @@ class WAFReport(models.Model):
     @classmethod
     def create_from_url_scan(cls, publisher, url):
         """Create a WAFReport instance by scanning a URL with wafw00f."""
-        scan_result = scan_url_with_wafw00f(url)
+        return cls.create_from_scan_result(publisher, url, scan_url_with_wafw00f(url))
 
+    @classmethod
+    def create_from_scan_result(cls, publisher, url, scan_result):
+        """Create a WAFReport from a ``scan_url_with_wafw00f`` result (None if the scan failed)."""
         if not scan_result or not scan_result.get("report"):
             return None
 
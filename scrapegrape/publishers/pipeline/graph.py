@@ -0,0 +1,163 @@
+"""Declarative step graph and concurrent executor for the pipeline supervisor.
+
+Each Step declares the context keys it reads (``inputs``), the key its result
+is stored under (``output``), the ResolutionJob field it persists to and the
+flat Publisher fields it writes.  StepGraph submits every step whose inputs
+are available to a bounded thread pool.  Only the step bodies run on worker
+threads: the ``on_started``/``on_completed`` callbacks (persistence and event
+publishing) always run on the calling thread.
+
+Steps that declare an async variant (``arun``) run on an asyncio event loop
+instead when ``StepGraph.run`` is given one (see publishers.pipeline.loop),
+so a step awaiting an LLM does not occupy one of the ``max_workers`` threads.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any
+
+from django.db import connections
+
+
+class StepGraphError(Exception):
+    """The step graph is malformed (duplicate outputs, missing inputs or a cycle)."""
+
+
+@dataclass(frozen=True)
+class Step:
+    """A single node in the pipeline step graph.
+
+    Attributes:
+        name: Step name used for ``publish_step_event``.
+        run: Callable receiving a read-only snapshot of the context.
+        arun: Optional async variant of ``run``, used when the graph runs with an event loop.
+        inputs: Context keys that must be present before the step can run.
+        output: Context key the step's return value is stored under.
+        job_field: ResolutionJob field the result is saved to (None = not persisted).
+        merge: Merge the result into an existing dict in ``job_field`` instead of replacing it.
+        publisher_fields: Flat Publisher fields this step may write.
+        flatten: ``(publisher, result) -> {field: value}`` for ``publisher_fields``.
+        emit_started: Publish a "started" event when the step is submitted.
+        emit_completed: Publish a "completed" event when the step finishes.
+    """
+
+    name: str
+    run: Callable[[Mapping[str, Any]], Any]
+    output: str
+    inputs: tuple[str, ...] = ()
+    job_field: str | None = None
+    merge: bool = False
+    publisher_fields: tuple[str, ...] = ()
+    flatten: Callable[[Any, Any], dict] | None = None
+    emit_started: bool = True
+    emit_completed: bool = True
+    arun: Callable[[Mapping[str, Any]], Awaitable[Any]] | None = None
+
+
+def _run_step(step: Step, context: Mapping[str, Any]) -> tuple[Any, float]:
+    """Worker-thread entry point: run the step, then release its DB connections."""
+    started = monotonic()
+    try:
+        return step.run(context), monotonic() - started
+    finally:
+        connections.close_all()
+
+
+async def _arun_step(step: Step, context: Mapping[str, Any]) -> tuple[Any, float]:
+    """Event-loop entry point for steps with an async variant."""
+    started = monotonic()
+    return await step.arun(context), monotonic() - started
+
+
+class StepGraph:
+    """Runs a set of Steps concurrently, respecting their declared inputs."""
+
+    def __init__(self, steps: Iterable[Step]) -> None:
+        self.steps = list(steps)
+        outputs = [s.output for s in self.steps]
+        duplicates = {o for o in outputs if outputs.count(o) > 1}
+        if duplicates:
+            raise StepGraphError(f"Duplicate step outputs: {sorted(duplicates)}")
+
+    def check(self, seeds: Iterable[str]) -> None:
+        """Raise StepGraphError unless every step is reachable from *seeds*."""
+        available = set(seeds)
+        remaining = list(self.steps)
+        while remaining:
+            ready = [s for s in remaining if set(s.inputs) <= available]
+            if not ready:
+                missing = {
+                    s.name: sorted(set(s.inputs) - available) for s in remaining
+                }
+                raise StepGraphError(f"Unresolvable step inputs: {missing}")
+            for step in ready:
+                remaining.remove(step)
+                available.add(step.output)
+
+    def run(
+        self,
+        context: Mapping[str, Any],
+        *,
+        max_workers: int,
+        on_started: Callable[[Step], None] | None = None,
+        on_completed: Callable[[Step, Any], None] | None = None,
+        loop: asyncio.AbstractEventLoop | None = None,
+        timings: dict[str, float] | None = None,
+    ) -> dict[str, Any]:
+        """Execute the graph and return the context including every step output.
+
+        A step becomes ready once all of its inputs are in the context, i.e.
+        once the producing step has finished *and* ``on_completed`` has run
+        for it, so steps that read flat Publisher fields can depend on the
+        step that writes them.  Completed steps are handled in declaration
+        order when several finish together.  If a step raises, no further
+        steps are started, running steps are allowed to finish, and the
+        exception is re-raised.
+
+        With *loop*, steps that have ``arun`` are scheduled on that (already
+        running) event loop rather than the thread pool.  *timings*, if given,
+        is filled with each step's own run time in seconds; their sum is the
+        graph's wall time without any overlap.
+        """
+        context = dict(context)
+        self.check(context)
+        order = {step.name: i for i, step in enumerate(self.steps)}
+        pending = list(self.steps)
+        running: dict[Future, Step] = {}
+
+        executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="pipeline-step"
+        )
+        try:
+            while pending or running:
+                for step in [s for s in pending if all(k in context for k in s.inputs)]:
+                    pending.remove(step)
+                    if on_started:
+                        on_started(step)
+                    if loop is not None and step.arun is not None:
+                        future = asyncio.run_coroutine_threadsafe(
+                            _arun_step(step, dict(context)), loop
+                        )
+                    else:
+                        future = executor.submit(_run_step, step, dict(context))
+                    running[future] = step
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=lambda f: order[running[f].name]):
+                    step = running.pop(future)
+                    result, seconds = future.result()
+                    if timings is not None:
+                        timings[step.name] = seconds
+                    context[step.output] = result
+                    if on_completed:
+                        on_completed(step, result)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            wait(running)
+
+        return context
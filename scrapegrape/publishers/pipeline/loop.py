@@ -0,0 +1,84 @@
+"""Process-wide asyncio event loop for the pipeline's async steps.
+
+The async step variants (``arun_*`` in publishers.pipeline.steps) await the
+LLM agents on one event loop running in a daemon thread, so a job's model
+calls do not hold StepGraph worker threads while robots, sitemap and Common
+Crawl fetches are waiting for the network.  Blocking work inside those
+coroutines (``sync_to_async(..., thread_sensitive=False)``) runs on the
+loop's default executor, whose threads release their database connections
+after every call like the step graph's workers.
+
+RQ runs each job in a forked work horse and threads do not survive a fork,
+so ``pipeline_loop()`` starts a new loop when the process id changes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from collections.abc import Coroutine
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+from django.conf import settings
+from django.db import connections
+
+
+def _closing(fn, *args, **kwargs):
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        connections.close_all()
+
+
+class _ClosingExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor whose threads close their DB connections after each call."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(_closing, fn, *args, **kwargs)
+
+
+class EventLoopThread:
+    """An asyncio event loop running forever in a daemon thread."""
+
+    def __init__(self, name: str = "pipeline-loop", max_workers: int | None = None) -> None:
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_default_executor(
+            _ClosingExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-io")
+        )
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro: Coroutine) -> Future:
+        """Schedule *coro* on the loop; the returned Future can be waited on from any thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine, timeout: float | None = None) -> Any:
+        """Run *coro* on the loop and block the calling thread until it returns."""
+        return self.submit(coro).result(timeout)
+
+    def close(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.run_until_complete(self.loop.shutdown_default_executor())
+        self.loop.close()
+
+
+_loop: EventLoopThread | None = None
+_loop_pid: int | None = None
+_loop_lock = threading.Lock()
+
+
+def pipeline_loop() -> EventLoopThread:
+    """The process-wide pipeline event loop, started on first use in each process."""
+    global _loop, _loop_pid
+    with _loop_lock:
+        if _loop is None or _loop_pid != os.getpid():
+            _loop = EventLoopThread(max_workers=settings.PIPELINE_MAX_WORKERS)
+            _loop_pid = os.getpid()
+        return _loop
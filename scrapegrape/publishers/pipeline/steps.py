@@ -3,35 +3,46 @@
 Each step function takes a Publisher (and optional context) and returns a
 structured dict of results.  External services are called directly so that
 tests can monkeypatch the module-level references.
+
+The LLM-backed steps (ToS discovery, ToS evaluation, metadata profile) also
+have ``arun_*`` async twins that await ``Agent.run``, so the supervisor can
+run them on its event loop (publishers.pipeline.loop) while the network
+steps keep the worker threads busy.
 """
 
 from __future__ import annotations
 
 import json
 import re
-import xml.etree.ElementTree as ET
+from contextlib import closing
 from datetime import datetime as _datetime
 from datetime import timezone as dt_timezone
 from html.parser import HTMLParser
 from statistics import median
-from time import mktime
 from typing import TYPE_CHECKING
 from urllib.parse import urljoin, urlparse
 
-import feedparser
-import httpx
 from django.conf import settings
 from django.utils import timezone
 from loguru import logger
 from protego import Protego
 
-from publishers.fetchers.exceptions import AllStrategiesExhausted
+from publishers.commoncrawl import CCQuerier, collection_registry, presence_result, summarize
+from publishers.feeds import FeedPoller, feed_dates, feeds_config
+from publishers.fetchers.clients import http_get
+from publishers.fetchers.politeness import politeness
+from publishers.fetchers.exceptions import AllStrategiesExhausted, PolitenessTimeout
 from publishers.fetchers.manager import FetchStrategyManager
-from publishers.waf_check import scan_url_with_wafw00f
-from ingestion.terms_discovery import discover_terms_and_privacy
-from ingestion.terms_evaluation import evaluate_terms_and_conditions
+from publishers.llm_governor import LLMRateLimited, llm_governor
+from publishers.signatures import signature_set
+from publishers.sitemaps import SitemapCrawler, entry_dates, iter_sitemap, sitemap_config
+from publishers.tasks import crawl_sitemaps, poll_feeds
+from publishers.waf_check import fingerprint_passively, scan_url_with_wafw00f
+from ingestion.terms_discovery import adiscover_terms_and_privacy, discover_terms_and_privacy
+from ingestion.terms_evaluation import aevaluate_terms_document, evaluate_terms_document
 
 if TYPE_CHECKING:
+    from publishers.fetchers.documents import DocumentStore
     from publishers.models import Publisher
 
 ITSASCOUT_USER_AGENT = "itsascout"
@@ -64,10 +75,39 @@ def should_skip_publisher_steps(publisher: Publisher) -> bool:
 # ---------------------------------------------------------------------------
 
 
-def run_waf_step(publisher: Publisher) -> dict:
-    """Run wafw00f against the publisher URL and return structured result."""
+def _robots_url(publisher: Publisher) -> str:
+    return urljoin(f"https://{publisher.domain}/", "/robots.txt")
+
+
+def _stored_responses(documents: DocumentStore, publisher: Publisher, urls: list[str]):
+    """Yield each of *urls* from the job's store, None for one that could not be fetched."""
+    for url in urls:
+        try:
+            yield documents.fetch(url, publisher=publisher)
+        except (AllStrategiesExhausted, PolitenessTimeout):
+            yield None
+
+
+def run_waf_step(publisher: Publisher, documents: DocumentStore | None = None) -> dict:
+    """Identify the publisher's WAF/CDN and return structured result.
+
+    With the job's *documents* store the homepage and robots.txt responses
+    (shared with the other steps, so usually no extra request) are
+    fingerprinted passively first, robots.txt only when the homepage shows
+    nothing; the active wafw00f scan only runs when both are inconclusive.
+    """
     publisher_url = publisher.url or f"https://{publisher.domain}/"
     try:
+        if documents is not None:
+            report = fingerprint_passively(
+                _stored_responses(documents, publisher, [publisher_url, _robots_url(publisher)])
+            )
+            if report is not None:
+                return {
+                    "waf_detected": True,
+                    "waf_type": report["firewall"],
+                    "method": "passive",
+                }
         result = scan_url_with_wafw00f(publisher_url)
         if result is None:
             return {"waf_detected": False, "waf_type": "", "error": "WAF scan failed"}
@@ -76,6 +116,7 @@ def run_waf_step(publisher: Publisher) -> dict:
         return {
             "waf_detected": bool(report.get("detected", False)),
             "waf_type": report.get("firewall", "") if report.get("detected") else "",
+            "method": "active",
         }
     except Exception as exc:
         logger.error(f"WAF step error for {publisher_url}: {exc}")
@@ -87,24 +128,59 @@ def run_waf_step(publisher: Publisher) -> dict:
 # ---------------------------------------------------------------------------
 
 
-def run_tos_discovery_step(publisher: Publisher) -> dict:
+def _rate_limited(exc: LLMRateLimited) -> dict:
+    """Marks a result whose LLM call found no capacity, so the step is retried later."""
+    return {"rate_limited": True, "retry_after": exc.retry_after}
+
+
+def _llm_step_error(step: str, url: str, exc: Exception, **result) -> dict:
+    """The failed result of an LLM-backed step, shared by its sync and async twins."""
+    if isinstance(exc, LLMRateLimited):
+        logger.warning(f"{step} rate limited for {url}: {exc}")
+        return {**result, "error": str(exc), **_rate_limited(exc)}
+    logger.error(f"{step} error for {url}: {exc}")
+    return {**result, "error": str(exc)}
+
+
+def _discovery_result(discovery) -> dict:
+    tos_url = (
+        str(discovery.terms_of_service_url)
+        if discovery.terms_of_service_url
+        else None
+    )
+    return {
+        "tos_url": tos_url,
+        "confidence": discovery.confidence_score,
+        "notes": discovery.notes or "",
+    }
+
+
+def run_tos_discovery_step(
+    publisher: Publisher, documents: DocumentStore | None = None
+) -> dict:
     """Discover Terms of Service URL for the publisher."""
     publisher_url = publisher.url or f"https://{publisher.domain}/"
     try:
-        discovery = discover_terms_and_privacy(publisher_url, publisher=publisher)
-        tos_url = (
-            str(discovery.terms_of_service_url)
-            if discovery.terms_of_service_url
-            else None
+        discovery = discover_terms_and_privacy(
+            publisher_url, publisher=publisher, documents=documents
         )
-        return {
-            "tos_url": tos_url,
-            "confidence": discovery.confidence_score,
-            "notes": discovery.notes or "",
-        }
+        return _discovery_result(discovery)
     except Exception as exc:
-        logger.error(f"ToS discovery error for {publisher_url}: {exc}")
-        return {"tos_url": None, "error": str(exc)}
+        return _llm_step_error("ToS discovery", publisher_url, exc, tos_url=None)
+
+
+async def arun_tos_discovery_step(
+    publisher: Publisher, documents: DocumentStore | None = None
+) -> dict:
+    """Async twin of ``run_tos_discovery_step``."""
+    publisher_url = publisher.url or f"https://{publisher.domain}/"
+    try:
+        discovery = await adiscover_terms_and_privacy(
+            publisher_url, publisher=publisher, documents=documents
+        )
+        return _discovery_result(discovery)
+    except Exception as exc:
+        return _llm_step_error("ToS discovery", publisher_url, exc, tos_url=None)
 
 
 # ---------------------------------------------------------------------------
@@ -112,23 +188,49 @@ def run_tos_discovery_step(publisher: Publisher) -> dict:
 # ---------------------------------------------------------------------------
 
 
-def run_tos_evaluation_step(publisher: Publisher, tos_url: str | None) -> dict:
+def _evaluation_result(evaluation, document) -> dict:
+    return {
+        "permissions": [p.model_dump() for p in evaluation.permissions],
+        "document_type": evaluation.document_type,
+        "confidence_score": evaluation.confidence_score,
+        "territorial_exceptions": evaluation.territorial_exceptions,
+        "arbitration_clauses": evaluation.arbitration_clauses,
+        "tokens": document.stats(),
+        "cache_status": document.cache_status,
+        "classified": document.classified,
+    }
+
+
+def run_tos_evaluation_step(
+    publisher: Publisher, tos_url: str | None, documents: DocumentStore | None = None
+) -> dict:
     """Evaluate Terms of Service permissions for the publisher."""
     if tos_url is None:
         return {"skipped": True, "reason": "No ToS URL found"}
 
     try:
-        evaluation = evaluate_terms_and_conditions(tos_url, publisher=publisher)
-        return {
-            "permissions": [p.model_dump() for p in evaluation.permissions],
-            "document_type": evaluation.document_type,
-            "confidence_score": evaluation.confidence_score,
-            "territorial_exceptions": evaluation.territorial_exceptions,
-            "arbitration_clauses": evaluation.arbitration_clauses,
-        }
+        evaluation, document = evaluate_terms_document(
+            tos_url, publisher=publisher, documents=documents
+        )
+        return _evaluation_result(evaluation, document)
+    except Exception as exc:
+        return _llm_step_error("ToS evaluation", tos_url, exc)
+
+
+async def arun_tos_evaluation_step(
+    publisher: Publisher, tos_url: str | None, documents: DocumentStore | None = None
+) -> dict:
+    """Async twin of ``run_tos_evaluation_step``."""
+    if tos_url is None:
+        return {"skipped": True, "reason": "No ToS URL found"}
+
+    try:
+        evaluation, document = await aevaluate_terms_document(
+            tos_url, publisher=publisher, documents=documents
+        )
+        return _evaluation_result(evaluation, document)
     except Exception as exc:
-        logger.error(f"ToS evaluation error for {tos_url}: {exc}")
-        return {"error": str(exc)}
+        return _llm_step_error("ToS evaluation", tos_url, exc)
 
 
 # ---------------------------------------------------------------------------
@@ -146,11 +248,18 @@ def _extract_license_directives(robots_text: str) -> list[str]:
 # ---------------------------------------------------------------------------
 
 
-def run_robots_step(publisher: Publisher, submitted_url: str) -> dict:
-    """Fetch and parse robots.txt, check if submitted URL is allowed."""
-    robots_url = urljoin(f"https://{publisher.domain}/", "/robots.txt")
+def run_robots_step(
+    publisher: Publisher, submitted_url: str, documents: DocumentStore | None = None
+) -> dict:
+    """Fetch and parse robots.txt, check if submitted URL is allowed.
+
+    With the job's *documents* store the response is shared with the WAF
+    step's passive fingerprinting.
+    """
+    robots_url = _robots_url(publisher)
+    fetch = documents.fetch if documents is not None else _fetch_manager.fetch
     try:
-        result = _fetch_manager.fetch(robots_url, publisher=publisher)
+        result = fetch(robots_url, publisher=publisher)
         text = result.html
 
         # Content guard: HTML response means WAF challenge, not real robots.txt
@@ -166,6 +275,7 @@ def run_robots_step(publisher: Publisher, submitted_url: str) -> dict:
         url_allowed = rp.can_fetch(submitted_url, ITSASCOUT_USER_AGENT)
         sitemaps = list(rp.sitemaps)
         crawl_delay = rp.crawl_delay(ITSASCOUT_USER_AGENT)
+        politeness.set_crawl_delay(publisher.domain, crawl_delay)
         license_directives = _extract_license_directives(text)
 
         return {
@@ -177,7 +287,7 @@ def run_robots_step(publisher: Publisher, submitted_url: str) -> dict:
             "raw_length": len(text),
             "raw_text": text,
         }
-    except AllStrategiesExhausted as exc:
+    except (AllStrategiesExhausted, PolitenessTimeout) as exc:
         logger.error(f"robots.txt fetch error for {publisher.domain}: {exc}")
         return {"robots_found": False, "error": str(exc)}
 
@@ -271,7 +381,7 @@ def run_sitemap_step(publisher: Publisher, robots_result: dict) -> dict:
                     found_sitemaps.add(sitemap_url)
                     source = "probe"
                     break
-            except AllStrategiesExhausted:
+            except (AllStrategiesExhausted, PolitenessTimeout):
                 continue
 
     return {
@@ -416,71 +526,19 @@ def run_rsl_step(
 # Common Crawl presence detection step
 # ---------------------------------------------------------------------------
 
-CC_CDX_ENDPOINT = "https://index.commoncrawl.org/CC-MAIN-2026-04-index"
-CC_COLLECTION = "CC-MAIN-2026-04"
-
-
 def run_cc_step(publisher: Publisher) -> dict:
-    """Query Common Crawl CDX Index API for publisher domain presence."""
-    try:
-        # Request 1: Presence check with page count
-        presence_url = (
-            f"{CC_CDX_ENDPOINT}?url=*.{publisher.domain}"
-            f"&output=json&showNumPages=true"
-        )
-        resp = httpx.get(presence_url, timeout=15.0)
-        resp.raise_for_status()
-        data = resp.json()
-
-        pages = data.get("pages", 0)
-        blocks = data.get("blocks", 0)
-
-        if pages == 0:
-            return {
-                "available": True,
-                "in_index": False,
-                "page_count": 0,
-                "latest_crawl": None,
-                "collection": CC_COLLECTION,
-                "error": None,
-            }
-
-        # Estimate page count from blocks
-        estimated_count = blocks * 3000
-
-        # Request 2: Latest timestamp
-        latest_url = (
-            f"{CC_CDX_ENDPOINT}?url=*.{publisher.domain}"
-            f"&output=json&fl=timestamp&limit=1&sort=desc"
-        )
-        ts_resp = httpx.get(latest_url, timeout=15.0)
-        ts_resp.raise_for_status()
-
-        # Parse first line of newline-delimited JSON
-        first_line = ts_resp.text.strip().split("\n")[0]
-        ts_data = json.loads(first_line)
-        raw_ts = ts_data.get("timestamp", "")
-        latest_crawl = f"{raw_ts[:4]}-{raw_ts[4:6]}" if len(raw_ts) >= 6 else None
-
-        return {
-            "available": True,
-            "in_index": True,
-            "page_count": estimated_count,
-            "latest_crawl": latest_crawl,
-            "collection": CC_COLLECTION,
-            "error": None,
-        }
+    """Look up publisher domain presence in the most recent Common Crawl collections.
 
+    Answers come from the local cluster.idx where configured and from the
+    CDX Index API otherwise (see ``publishers.commoncrawl``).
+    """
+    collections = collection_registry.recent()
+    try:
+        results = CCQuerier(get=http_get).query([publisher.domain], collections)
+        return summarize(results[publisher.domain], collections)
     except Exception as exc:
         logger.error(f"CC step error for {publisher.domain}: {exc}")
-        return {
-            "available": False,
-            "in_index": None,
-            "page_count": None,
-            "latest_crawl": None,
-            "collection": CC_COLLECTION,
-            "error": str(exc),
-        }
+        return presence_result(collections[0], None, None, None, error=str(exc))
 
 
 # ---------------------------------------------------------------------------
@@ -488,38 +546,46 @@ def run_cc_step(publisher: Publisher) -> dict:
 # ---------------------------------------------------------------------------
 
 
-def _extract_sitemap_locs(xml_text: str, limit: int = 2) -> list[str]:
-    """Extract <loc> URLs from a sitemap index, limited to first N entries."""
-    try:
-        root = ET.fromstring(xml_text)
-    except ET.ParseError:
-        return []
-
-    ns = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
-    locs: list[str] = []
-    for sitemap in root.findall("sm:sitemap/sm:loc", ns):
-        if sitemap.text:
-            locs.append(sitemap.text.strip())
-            if len(locs) >= limit:
-                break
-    return locs
+def _scan_sitemap(
+    body,
+    loc_limit: int = 2,
+    lastmod_limit: int = 50,
+    entry_limit: int = 1000,
+    max_bytes: int | None = None,
+) -> dict:
+    """Sample a (optionally gzipped) sitemap with ``iter_sitemap``, stopping once enough is known.
 
+    Whether this is an index or a news sitemap is known from the root
+    element.  The transfer stops as soon as either *loc_limit* child sitemap
+    URLs (for an index) or *lastmod_limit* ``<url><lastmod>`` values have
+    been seen, or after *entry_limit* entries in any case, so the work is
+    bounded by the quotas rather than the file size.
 
-def _extract_lastmod_dates(xml_text: str, limit: int = 50) -> list[str]:
-    """Extract <lastmod> date strings from a sitemap XML."""
-    try:
-        root = ET.fromstring(xml_text)
-    except ET.ParseError:
-        return []
-
-    ns = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
-    dates: list[str] = []
-    for url_elem in root.findall("sm:url/sm:lastmod", ns):
-        if url_elem.text:
-            dates.append(url_elem.text.strip())
-            if len(dates) >= limit:
+    Returns ``{"is_index", "has_news", "locs", "lastmod_dates"}``.  Malformed
+    or truncated XML yields whatever was parsed before the error.
+    """
+    locs: list[str] = []
+    lastmod_dates: list[str] = []
+    entries = 0
+    with closing(iter_sitemap(body, max_bytes)) as records:
+        for record in records:
+            entries += 1
+            if record.kind == "sitemap":
+                locs.append(record.loc)
+                if len(locs) >= loc_limit:
+                    break
+            elif record.lastmod:
+                lastmod_dates.append(record.lastmod)
+                if len(lastmod_dates) >= lastmod_limit:
+                    break
+            if entries >= entry_limit:
                 break
-    return dates
+    return {
+        "is_index": records.is_index,
+        "has_news": records.has_news,
+        "locs": locs,
+        "lastmod_dates": lastmod_dates,
+    }
 
 
 # ---------------------------------------------------------------------------
@@ -528,7 +594,7 @@ def _extract_lastmod_dates(xml_text: str, limit: int = 50) -> list[str]:
 
 
 def run_sitemap_analysis_step(publisher: Publisher) -> dict:
-    """Fetch discovered sitemaps and detect xmlns:news XML namespace."""
+    """Stream discovered sitemaps, detect the news namespace and sample lastmods."""
     sitemap_urls = publisher.sitemap_urls or []
     if not sitemap_urls:
         return {
@@ -546,42 +612,34 @@ def run_sitemap_analysis_step(publisher: Publisher) -> dict:
 
     for url in sitemap_urls[:3]:  # Limit to first 3 sitemaps
         try:
-            result = _fetch_manager.fetch(url, publisher=publisher)
-            xml_text = result.html
+            scan = _scan_sitemap(_fetch_manager.stream(url, publisher=publisher))
             checked += 1
 
-            # Check for news namespace (string search is fastest)
-            if "xmlns:news" in xml_text or "schemas/sitemap-news" in xml_text:
+            if scan["has_news"]:
                 has_news = True
                 if not news_url:
                     news_url = url
 
             # Handle sitemap index: check child sitemaps
-            if "<sitemapindex" in xml_text:
-                child_urls = _extract_sitemap_locs(xml_text, limit=2)
+            if scan["is_index"]:
+                child_urls = scan["locs"]
                 # Prioritize URLs containing "news" in the name
                 child_urls.sort(key=lambda u: (0 if "news" in u.lower() else 1))
                 for child_url in child_urls:
                     try:
-                        child_result = _fetch_manager.fetch(
-                            child_url, publisher=publisher
+                        child = _scan_sitemap(
+                            _fetch_manager.stream(child_url, publisher=publisher)
                         )
-                        child_xml = child_result.html
                         checked += 1
-                        if (
-                            "xmlns:news" in child_xml
-                            or "schemas/sitemap-news" in child_xml
-                        ):
+                        if child["has_news"]:
                             has_news = True
                             if not news_url:
                                 news_url = child_url
-                        lastmod_dates.extend(
-                            _extract_lastmod_dates(child_xml, limit=50)
-                        )
+                        lastmod_dates.extend(child["lastmod_dates"])
                     except Exception:
                         continue
             else:
-                lastmod_dates.extend(_extract_lastmod_dates(xml_text, limit=50))
+                lastmod_dates.extend(scan["lastmod_dates"])
 
         except Exception as exc:
             logger.error(f"Sitemap analysis error for {url}: {exc}")
@@ -601,25 +659,32 @@ def run_sitemap_analysis_step(publisher: Publisher) -> dict:
 # ---------------------------------------------------------------------------
 
 
-def _extract_rss_dates(feed_url: str) -> list[_datetime]:
-    """Fetch RSS feed and extract publication dates as UTC datetimes."""
+def _enqueue(task, publisher: Publisher) -> None:
+    """Hand the rest of a capped poll or crawl to a background RQ job."""
     try:
-        resp = httpx.get(feed_url, timeout=10.0, follow_redirects=True)
-        resp.raise_for_status()
-        feed = feedparser.parse(resp.text)
-    except Exception:
-        return []
+        task.delay(publisher.pk)
+    except Exception as exc:
+        logger.warning(f"Could not enqueue {task.__name__} for {publisher.domain}: {exc}")
 
-    dates: list[_datetime] = []
-    for entry in feed.entries:
-        parsed = entry.get("published_parsed") or entry.get("updated_parsed")
-        if parsed:
-            try:
-                dt = _datetime.fromtimestamp(mktime(parsed), tz=dt_timezone.utc)
-                dates.append(dt)
-            except (ValueError, OverflowError):
-                continue
-    return sorted(dates, reverse=True)
+
+def _feed_dates(publisher: Publisher) -> list[_datetime]:
+    """Poll the first INLINE_FEEDS feeds, then read dates from the feed window.
+
+    A publisher with more feeds gets the full poll as a ``poll_feeds`` job,
+    so the pipeline never waits on all of them.
+    """
+    config = feeds_config()
+    if config["ENABLED"] and publisher.rss_urls:
+        try:
+            stats = FeedPoller(
+                _fetch_manager, {**config, "MAX_FEEDS": config["INLINE_FEEDS"]}
+            ).poll(publisher)
+            logger.info(f"Feed poll for {publisher.domain}: {stats}")
+        except Exception as exc:
+            logger.warning(f"Feed poll failed for {publisher.domain}: {exc}")
+        if len(set(publisher.rss_urls)) > config["INLINE_FEEDS"]:
+            _enqueue(poll_feeds, publisher)
+    return feed_dates(publisher)
 
 
 def _parse_lastmod_dates(date_strings: list[str]) -> list[_datetime]:
@@ -710,6 +775,25 @@ def _compute_frequency(dates: list[_datetime], source: str) -> dict:
     }
 
 
+def _sitemap_store_dates(publisher: Publisher) -> list[_datetime]:
+    """Crawl up to INLINE_SITEMAPS sitemap files, then read dates from the store.
+
+    Files deferred by that budget are crawled by a ``crawl_sitemaps`` job.
+    """
+    config = sitemap_config()
+    if config["ENABLED"] and publisher.sitemap_urls:
+        try:
+            stats = SitemapCrawler(
+                _fetch_manager, {**config, "MAX_SITEMAPS": config["INLINE_SITEMAPS"]}
+            ).crawl(publisher)
+            logger.info(f"Sitemap crawl for {publisher.domain}: {stats}")
+            if stats["deferred"]:
+                _enqueue(crawl_sitemaps, publisher)
+        except Exception as exc:
+            logger.warning(f"Sitemap crawl failed for {publisher.domain}: {exc}")
+    return entry_dates(publisher, config["FREQUENCY_SAMPLE"])
+
+
 # ---------------------------------------------------------------------------
 # Update frequency step
 # ---------------------------------------------------------------------------
@@ -718,14 +802,20 @@ def _compute_frequency(dates: list[_datetime], source: str) -> dict:
 def run_frequency_step(
     publisher: Publisher, sitemap_analysis_result: dict | None = None
 ) -> dict:
-    """Estimate publishing frequency from RSS dates, falling back to sitemap lastmod."""
-    rss_urls = publisher.rss_urls or []
+    """Estimate publishing frequency from the larger of the RSS and sitemap-store samples.
 
-    # Try RSS first
-    if rss_urls:
-        dates = _extract_rss_dates(rss_urls[0])
-        if len(dates) >= 2:
-            return _compute_frequency(dates, source="rss")
+    Both are brought up to date incrementally first (see ``publishers.feeds``
+    and ``publishers.sitemaps``), inline only for a small first pass with
+    the remainder left to background jobs; the analysis step's sampled
+    lastmods are the last resort.
+    """
+    rss_dates = _feed_dates(publisher)
+    stored_dates = _sitemap_store_dates(publisher)
+
+    if len(stored_dates) >= 2 and len(stored_dates) > len(rss_dates):
+        return _compute_frequency(stored_dates, source="sitemap_store")
+    if len(rss_dates) >= 2:
+        return _compute_frequency(rss_dates, source="rss")
 
     # Fallback to sitemap lastmod dates
     lastmod_dates = (sitemap_analysis_result or {}).get("lastmod_dates", [])
@@ -1286,39 +1376,9 @@ def _check_schema_accessible(extraction_result: dict) -> bool | None:
 
 def _detect_paywall_heuristics(html: str) -> tuple[str, list[str]]:
     """Detect paywall signals from HTML content. Returns (status, signals)."""
-    signals: list[str] = []
-    html_lower = html.lower()
-
-    # Signal: Login/subscribe wall patterns
-    login_patterns = [
-        "subscribe to continue reading",
-        "sign in to read",
-        "create an account to continue",
-        "already a subscriber?",
-        "subscription required",
-        "members only",
-    ]
-    for pattern in login_patterns:
-        if pattern in html_lower:
-            signals.append(f"login_wall:{pattern[:30]}")
-
-    # Signal: Paywall CSS classes
-    paywall_classes = [
-        "paywall", "subscriber-only", "premium-content",
-        "gated-content", "meter-", "regwall",
-    ]
-    for cls in paywall_classes:
-        if cls in html_lower:
-            signals.append(f"paywall_class:{cls}")
-
-    # Signal: Metered access patterns
-    meter_patterns = [
-        "articles remaining", "free articles",
-        "monthly limit", "article limit",
-    ]
-    for pattern in meter_patterns:
-        if pattern in html_lower:
-            signals.append(f"metered:{pattern[:20]}")
+    # Login/subscribe walls, paywall CSS classes and metered-access copy,
+    # scanned in one pass over the configured window (see publishers.signatures).
+    signals = [match.label for match in signature_set("paywall").matches(html)]
 
     # Decision logic: high confidence bar
     has_login = any(s.startswith("login_wall:") for s in signals)
@@ -1394,16 +1454,34 @@ metadata_profile_agent = Agent(
 )
 
 
+def _metadata_profile_prompt(extraction_result: dict, article_url: str) -> str:
+    return f"Analyze metadata for {article_url}:\n{json.dumps(extraction_result, default=str)}"
+
+
 def run_metadata_profile_step(extraction_result: dict, article_url: str) -> dict:
     """Generate LLM-based metadata profile summary."""
     try:
-        result = metadata_profile_agent.run_sync(
-            f"Analyze metadata for {article_url}:\n{json.dumps(extraction_result, default=str)}"
+        result = llm_governor.run_sync(
+            metadata_profile_agent,
+            _metadata_profile_prompt(extraction_result, article_url),
+            system_prompt=METADATA_PROFILE_PROMPT,
+        )
+        return result.output.model_dump()
+    except Exception as exc:
+        return _llm_step_error("Metadata profile step", article_url, exc, summary="")
+
+
+async def arun_metadata_profile_step(extraction_result: dict, article_url: str) -> dict:
+    """Async twin of ``run_metadata_profile_step``."""
+    try:
+        result = await llm_governor.run(
+            metadata_profile_agent,
+            _metadata_profile_prompt(extraction_result, article_url),
+            system_prompt=METADATA_PROFILE_PROMPT,
         )
         return result.output.model_dump()
     except Exception as exc:
-        logger.error(f"Metadata profile step error for {article_url}: {exc}")
-        return {"summary": "", "error": str(exc)}
+        return _llm_step_error("Metadata profile step", article_url, exc, summary="")
 
 
 # ---------------------------------------------------------------------------
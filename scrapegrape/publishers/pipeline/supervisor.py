@@ -1,16 +1,28 @@
-"""Pipeline supervisor: single RQ job that runs all steps sequentially."""
+"""Pipeline supervisor: single RQ job that runs the pipeline step graph."""
 
+from time import monotonic
+
+from django.conf import settings
 from django.utils import timezone
 from django_rq import job
 from loguru import logger
 from protego import Protego
 
-from publishers.fetchers.exceptions import AllStrategiesExhausted
+from publishers.commoncrawl import merge_history
+from publishers.fetchers.documents import DocumentStore
+from publishers.fetchers.exceptions import AllStrategiesExhausted, PolitenessTimeout
+from publishers.fetchers.hedging import hedging_config
 from publishers.fetchers.manager import FetchStrategyManager
+from publishers.fetchers.telemetry import attempt_recorder
 from publishers.models import ArticleMetadata, ResolutionJob
 from publishers.pipeline.events import publish_step_event
+from publishers.pipeline.graph import Step, StepGraph
+from publishers.pipeline.loop import pipeline_loop
 from publishers.pipeline.steps import (
     ITSASCOUT_USER_AGENT,
+    arun_metadata_profile_step,
+    arun_tos_discovery_step,
+    arun_tos_evaluation_step,
     run_ai_bot_blocking_step,
     run_article_extraction_step,
     run_cc_step,
@@ -34,22 +46,27 @@ from publishers.pipeline.steps import (
 _fetch_manager = FetchStrategyManager()
 
 
-def _fetch_homepage_html(publisher):
-    """Fetch publisher homepage HTML. Returns (html, headers) tuple."""
+def _homepage_url(publisher) -> str:
+    return publisher.url or f"https://{publisher.domain}/"
+
+
+def _fetch_homepage_html(publisher, documents: DocumentStore | None = None):
+    """Fetch publisher homepage HTML. Returns (html, headers) tuple.
+
+    Goes through the job's *documents* store when given, so the fetch made
+    for ToS discovery (or the article, when it is the homepage) is reused.
+    """
+    documents = documents if documents is not None else DocumentStore(_fetch_manager)
     try:
-        result = _fetch_manager.fetch(
-            f"https://{publisher.domain}/", publisher=publisher
-        )
-        return result.html, {}
-    except AllStrategiesExhausted as exc:
+        result = documents.fetch(_homepage_url(publisher), publisher=publisher)
+        return result.html, result.headers
+    except (AllStrategiesExhausted, PolitenessTimeout) as exc:
         logger.warning(f"Could not fetch homepage for {publisher.domain}: {exc}")
         return "", {}
 
 
 def _should_skip_article_steps(article_url: str) -> bool:
     """Return True if this article URL was analyzed within ARTICLE_FRESHNESS_TTL."""
-    from django.conf import settings
-
     recent = ArticleMetadata.objects.filter(
         article_url=article_url,
         created_at__gte=timezone.now() - settings.ARTICLE_FRESHNESS_TTL,
@@ -57,28 +74,262 @@ def _should_skip_article_steps(article_url: str) -> bool:
     return recent is not None
 
 
+# ---------------------------------------------------------------------------
+# Publisher step graph
+# ---------------------------------------------------------------------------
+# Step callables look up the run_*_step functions in this module's namespace
+# at call time so tests can monkeypatch them on the supervisor module.
+
+
+def _flatten_tos_discovery(publisher, result: dict) -> dict:
+    tos_url = result.get("tos_url")
+    return {"tos_url": tos_url} if tos_url else {}
+
+
+def _flatten_tos_evaluation(publisher, result: dict) -> dict:
+    permissions = result.get("permissions")
+    return {"tos_permissions": permissions} if permissions is not None else {}
+
+
+def _flatten_cc(publisher, result: dict) -> dict:
+    return {
+        "cc_in_index": result.get("in_index"),
+        "cc_page_count": result.get("page_count"),
+        "cc_last_crawl": result.get("latest_crawl") or "",
+        "cc_history": merge_history(publisher.cc_history, result.get("history") or {}),
+    }
+
+
+def _flatten_publisher_details(publisher, result: dict) -> dict:
+    fields = {"publisher_details": result.get("organization")}
+    # Update publisher name from structured data if still set to domain
+    org = result.get("organization")
+    if org and org.get("name") and publisher.name == publisher.domain:
+        fields["name"] = org["name"]
+    return fields
+
+
+PUBLISHER_STEP_GRAPH = StepGraph([
+    Step(
+        "waf",
+        run=lambda ctx: run_waf_step(ctx["publisher"], documents=ctx["documents"]),
+        inputs=("publisher", "documents"),
+        output="waf_result",
+        job_field="waf_result",
+        publisher_fields=("waf_detected", "waf_type"),
+        flatten=lambda pub, r: {
+            "waf_detected": r.get("waf_detected", False),
+            "waf_type": r.get("waf_type", ""),
+        },
+    ),
+    Step(
+        "tos_discovery",
+        run=lambda ctx: run_tos_discovery_step(ctx["publisher"], documents=ctx["documents"]),
+        arun=lambda ctx: arun_tos_discovery_step(ctx["publisher"], documents=ctx["documents"]),
+        inputs=("publisher", "documents"),
+        output="tos_result",
+        job_field="tos_result",
+        publisher_fields=("tos_url",),
+        flatten=_flatten_tos_discovery,
+    ),
+    Step(
+        "tos_evaluation",
+        run=lambda ctx: run_tos_evaluation_step(
+            ctx["publisher"], ctx["tos_result"].get("tos_url"), documents=ctx["documents"]
+        ),
+        arun=lambda ctx: arun_tos_evaluation_step(
+            ctx["publisher"], ctx["tos_result"].get("tos_url"), documents=ctx["documents"]
+        ),
+        inputs=("publisher", "tos_result", "documents"),
+        output="tos_evaluation_result",
+        job_field="tos_result",
+        merge=True,
+        publisher_fields=("tos_permissions",),
+        flatten=_flatten_tos_evaluation,
+    ),
+    Step(
+        "robots",
+        run=lambda ctx: run_robots_step(
+            ctx["publisher"], ctx["canonical_url"], documents=ctx["documents"]
+        ),
+        inputs=("publisher", "canonical_url", "documents"),
+        output="robots_result",
+        job_field="robots_result",
+        publisher_fields=("robots_txt_found",),
+        flatten=lambda pub, r: {"robots_txt_found": r.get("robots_found", False)},
+    ),
+    Step(
+        "ai_bot_blocking",
+        run=lambda ctx: run_ai_bot_blocking_step(ctx["publisher"], ctx["robots_result"]),
+        inputs=("publisher", "robots_result"),
+        output="ai_bot_result",
+        job_field="ai_bot_result",
+        publisher_fields=("ai_bot_blocks",),
+        flatten=lambda pub, r: {"ai_bot_blocks": r.get("bots")},
+    ),
+    Step(
+        "sitemap",
+        run=lambda ctx: run_sitemap_step(ctx["publisher"], ctx["robots_result"]),
+        inputs=("publisher", "robots_result"),
+        output="sitemap_result",
+        job_field="sitemap_result",
+        publisher_fields=("sitemap_urls",),
+        flatten=lambda pub, r: {"sitemap_urls": r.get("sitemap_urls", [])},
+    ),
+    # Homepage HTML and headers for the RSS, RSL and details steps, shared
+    # with ToS discovery through the job's document store.
+    Step(
+        "homepage",
+        run=lambda ctx: _fetch_homepage_html(ctx["publisher"], documents=ctx["documents"]),
+        inputs=("publisher", "documents"),
+        output="homepage",
+        emit_started=False,
+        emit_completed=False,
+    ),
+    Step(
+        "rss",
+        run=lambda ctx: run_rss_step(ctx["publisher"], ctx["homepage"][0]),
+        inputs=("publisher", "homepage"),
+        output="rss_result",
+        job_field="rss_result",
+        publisher_fields=("rss_urls",),
+        flatten=lambda pub, r: {"rss_urls": [f["url"] for f in r.get("feeds", [])]},
+    ),
+    Step(
+        "rsl",
+        run=lambda ctx: run_rsl_step(
+            ctx["publisher"], ctx["robots_result"], *ctx["homepage"]
+        ),
+        inputs=("publisher", "robots_result", "homepage"),
+        output="rsl_result",
+        job_field="rsl_result",
+        publisher_fields=("rsl_detected",),
+        flatten=lambda pub, r: {"rsl_detected": r.get("rsl_detected", False)},
+    ),
+    Step(
+        "cc",
+        run=lambda ctx: run_cc_step(ctx["publisher"]),
+        inputs=("publisher",),
+        output="cc_result",
+        job_field="cc_result",
+        publisher_fields=("cc_in_index", "cc_page_count", "cc_last_crawl", "cc_history"),
+        flatten=_flatten_cc,
+    ),
+    # Reads publisher.sitemap_urls, written when the sitemap step completes.
+    Step(
+        "sitemap_analysis",
+        run=lambda ctx: run_sitemap_analysis_step(ctx["publisher"]),
+        inputs=("publisher", "sitemap_result"),
+        output="sitemap_analysis_result",
+        job_field="sitemap_analysis_result",
+        publisher_fields=("has_news_sitemap",),
+        flatten=lambda pub, r: {"has_news_sitemap": r.get("has_news_sitemap")},
+    ),
+    # Reads publisher.rss_urls, written when the rss step completes.
+    Step(
+        "frequency",
+        run=lambda ctx: run_frequency_step(
+            ctx["publisher"], ctx["sitemap_analysis_result"]
+        ),
+        inputs=("publisher", "sitemap_analysis_result", "rss_result"),
+        output="frequency_result",
+        job_field="frequency_result",
+        publisher_fields=(
+            "update_frequency", "update_frequency_hours", "update_frequency_confidence",
+        ),
+        flatten=lambda pub, r: {
+            "update_frequency": r.get("frequency_label", ""),
+            "update_frequency_hours": r.get("frequency_hours"),
+            "update_frequency_confidence": r.get("confidence", ""),
+        },
+    ),
+    # "started" is published at pipeline begin (resolution data available immediately).
+    Step(
+        "publisher_details",
+        run=lambda ctx: run_publisher_details_step(ctx["publisher"], ctx["homepage"][0]),
+        inputs=("publisher", "homepage"),
+        output="metadata_result",
+        job_field="metadata_result",
+        publisher_fields=("publisher_details", "name"),
+        flatten=_flatten_publisher_details,
+        emit_started=False,
+    ),
+])
+
+
+def _is_rate_limited(result) -> bool:
+    return isinstance(result, dict) and bool(result.get("rate_limited"))
+
+
+async def _timed(coro, timings: dict[str, float], name: str):
+    """Await *coro*, recording its run time under *name* in *timings*."""
+    started = monotonic()
+    try:
+        return await coro
+    finally:
+        timings[name] = monotonic() - started
+
+
+def _persist_step_result(job_id, resolution_job, publisher, step: Step, result) -> None:
+    """Save a completed step's result on the job and publisher, then publish its event."""
+    if step.job_field:
+        existing = getattr(resolution_job, step.job_field)
+        if step.merge and existing:
+            existing.update(result)
+        else:
+            setattr(resolution_job, step.job_field, result)
+        resolution_job.save(update_fields=[step.job_field])
+
+    if step.emit_completed:
+        publish_step_event(job_id, step.name, "completed", result)
+
+    if step.flatten:
+        fields = step.flatten(publisher, result)
+        unexpected = set(fields) - set(step.publisher_fields)
+        if unexpected:
+            raise ValueError(
+                f"Step {step.name} wrote undeclared publisher fields: {sorted(unexpected)}"
+            )
+        if fields:
+            for name, value in fields.items():
+                setattr(publisher, name, value)
+            publisher.save(update_fields=list(fields))
+
+
 @job("default", timeout=600)
 def run_pipeline(job_id: str):
-    """Pipeline supervisor: runs all steps sequentially for a ResolutionJob.
+    """Pipeline supervisor: runs all steps for a ResolutionJob.
 
     1. Loads the job and sets status to 'running'.
     2. Publishes publisher_resolution completed event.
     3. Checks freshness TTL -- skips steps if publisher was recently checked.
-    4. Runs WAF, ToS discovery, ToS evaluation steps sequentially.
-    5. Saves each step result on the ResolutionJob and publishes events.
+    4. Runs PUBLISHER_STEP_GRAPH, with independent steps running concurrently
+       on up to PIPELINE_MAX_WORKERS threads.  With PIPELINE_ASYNC_AGENTS the
+       LLM steps await their agents on the shared pipeline event loop instead
+       of holding a thread, and overlap with the network-bound steps.
+    5. Saves each step result on the ResolutionJob and publishes events as
+       soon as the step completes.
     6. Updates publisher flat fields and freshness timestamp.
-    7. Sets status to 'completed' (or 'failed' on exception).
+    7. Runs article-level steps and the Google News aggregation.
+    8. Sets status to 'completed' (or 'failed' on exception) and reports the
+       job's wall time next to the time it would have taken without overlap.
     """
+    started_at = monotonic()
+    agent_loop = pipeline_loop() if settings.PIPELINE_ASYNC_AGENTS else None
+    # Own run time of each step that ran concurrently with others, and the
+    # wall time of those concurrent sections.
+    step_seconds: dict[str, float] = {}
+    overlapped_seconds = 0.0
     resolution_job = ResolutionJob.objects.select_related("publisher").get(id=job_id)
     resolution_job.status = "running"
     resolution_job.save(update_fields=["status"])
     publisher = resolution_job.publisher
+    # The loop is only started when hedging can use it.
+    documents = DocumentStore(
+        _fetch_manager, loop=pipeline_loop() if hedging_config()["ENABLED"] else None
+    )
 
     try:
-        # homepage_html is set by publisher steps; initialise for the
-        # article-steps branch that may run even when publisher steps are skipped.
-        homepage_html = ""
-
         # Step 0: Publisher details starts (resolution data available immediately)
         publish_step_event(
             job_id,
@@ -165,10 +416,10 @@ def run_pipeline(job_id: str):
                 resolution_job.cc_result = cc_result
                 resolution_job.save(update_fields=["cc_result"])
                 publish_step_event(job_id, "cc", "completed", cc_result)
-                publisher.cc_in_index = cc_result.get("in_index")
-                publisher.cc_page_count = cc_result.get("page_count")
-                publisher.cc_last_crawl = cc_result.get("latest_crawl") or ""
-                publisher.save(update_fields=["cc_in_index", "cc_page_count", "cc_last_crawl"])
+                cc_fields = _flatten_cc(publisher, cc_result)
+                for name, value in cc_fields.items():
+                    setattr(publisher, name, value)
+                publisher.save(update_fields=list(cc_fields))
             if resolution_job.sitemap_analysis_result:
                 publish_step_event(job_id, "sitemap_analysis", "skipped", {"reason": "fresh"})
             else:
@@ -195,166 +446,36 @@ def run_pipeline(job_id: str):
                 publisher.save(update_fields=["update_frequency", "update_frequency_hours", "update_frequency_confidence"])
             publish_step_event(job_id, "publisher_details", "skipped", {"reason": "fresh"})
         else:
-            # Step 1: WAF check
-            publish_step_event(job_id, "waf", "started")
-            waf_result = run_waf_step(publisher)
-            resolution_job.waf_result = waf_result
-            resolution_job.save(update_fields=["waf_result"])
-            publish_step_event(job_id, "waf", "completed", waf_result)
-
-            # Update publisher flat fields
-            publisher.waf_detected = waf_result.get("waf_detected", False)
-            publisher.waf_type = waf_result.get("waf_type", "")
-            publisher.save(update_fields=["waf_detected", "waf_type"])
-
-            # Step 2: ToS discovery
-            publish_step_event(job_id, "tos_discovery", "started")
-            tos_discovery_result = run_tos_discovery_step(publisher)
-            resolution_job.tos_result = tos_discovery_result
-            resolution_job.save(update_fields=["tos_result"])
-            publish_step_event(
-                job_id, "tos_discovery", "completed", tos_discovery_result
+            section_started = monotonic()
+            context = PUBLISHER_STEP_GRAPH.run(
+                {
+                    "publisher": publisher,
+                    "canonical_url": resolution_job.canonical_url,
+                    "documents": documents,
+                },
+                max_workers=settings.PIPELINE_MAX_WORKERS,
+                on_started=lambda step: publish_step_event(job_id, step.name, "started"),
+                on_completed=lambda step, result: _persist_step_result(
+                    job_id, resolution_job, publisher, step, result
+                ),
+                loop=agent_loop.loop if agent_loop is not None else None,
+                timings=step_seconds,
             )
-
-            # Update publisher flat field
-            tos_url = tos_discovery_result.get("tos_url")
-            if tos_url:
-                publisher.tos_url = tos_url
-                publisher.save(update_fields=["tos_url"])
-
-            # Step 3: ToS evaluation
-            publish_step_event(job_id, "tos_evaluation", "started")
-            tos_eval_result = run_tos_evaluation_step(publisher, tos_url)
-
-            # Merge evaluation data into existing tos_result
-            if resolution_job.tos_result:
-                resolution_job.tos_result.update(tos_eval_result)
+            overlapped_seconds += monotonic() - section_started
+
+            # Update freshness timestamp, unless an LLM step found no capacity:
+            # leaving the publisher stale makes the next job retry it.
+            rate_limited = [
+                step.name for step in PUBLISHER_STEP_GRAPH.steps
+                if _is_rate_limited(context.get(step.output))
+            ]
+            if rate_limited:
+                logger.warning(
+                    f"Not marking {publisher.domain} fresh: rate limited in {', '.join(rate_limited)}"
+                )
             else:
-                resolution_job.tos_result = tos_eval_result
-            resolution_job.save(update_fields=["tos_result"])
-            publish_step_event(
-                job_id, "tos_evaluation", "completed", tos_eval_result
-            )
-
-            # Update publisher flat fields
-            permissions = tos_eval_result.get("permissions")
-            if permissions is not None:
-                publisher.tos_permissions = permissions
-                publisher.save(update_fields=["tos_permissions"])
-
-            # Step 4: robots.txt + URL allowance
-            publish_step_event(job_id, "robots", "started")
-            robots_result = run_robots_step(publisher, resolution_job.canonical_url)
-            resolution_job.robots_result = robots_result
-            resolution_job.save(update_fields=["robots_result"])
-            publish_step_event(job_id, "robots", "completed", robots_result)
-
-            # Update publisher flat fields
-            publisher.robots_txt_found = robots_result.get("robots_found", False)
-            publisher.save(update_fields=["robots_txt_found"])
-
-            # Step 5: AI bot blocking detection
-            publish_step_event(job_id, "ai_bot_blocking", "started")
-            ai_bot_result = run_ai_bot_blocking_step(publisher, robots_result)
-            resolution_job.ai_bot_result = ai_bot_result
-            resolution_job.save(update_fields=["ai_bot_result"])
-            publish_step_event(job_id, "ai_bot_blocking", "completed", ai_bot_result)
-
-            publisher.ai_bot_blocks = ai_bot_result.get("bots")
-            publisher.save(update_fields=["ai_bot_blocks"])
-
-            # Step 6: Sitemap discovery
-            publish_step_event(job_id, "sitemap", "started")
-            sitemap_result = run_sitemap_step(publisher, robots_result)
-            resolution_job.sitemap_result = sitemap_result
-            resolution_job.save(update_fields=["sitemap_result"])
-            publish_step_event(job_id, "sitemap", "completed", sitemap_result)
-
-            publisher.sitemap_urls = sitemap_result.get("sitemap_urls", [])
-            publisher.save(update_fields=["sitemap_urls"])
-
-            # Fetch homepage HTML once for RSS and RSL steps
-            homepage_html, homepage_headers = _fetch_homepage_html(publisher)
-
-            # Step 6: RSS feed discovery
-            publish_step_event(job_id, "rss", "started")
-            rss_result = run_rss_step(publisher, homepage_html)
-            resolution_job.rss_result = rss_result
-            resolution_job.save(update_fields=["rss_result"])
-            publish_step_event(job_id, "rss", "completed", rss_result)
-
-            publisher.rss_urls = [f["url"] for f in rss_result.get("feeds", [])]
-            publisher.save(update_fields=["rss_urls"])
-
-            # Step 7: RSL detection
-            publish_step_event(job_id, "rsl", "started")
-            rsl_result = run_rsl_step(
-                publisher, robots_result, homepage_html, homepage_headers
-            )
-            resolution_job.rsl_result = rsl_result
-            resolution_job.save(update_fields=["rsl_result"])
-            publish_step_event(job_id, "rsl", "completed", rsl_result)
-
-            publisher.rsl_detected = rsl_result.get("rsl_detected", False)
-            publisher.save(update_fields=["rsl_detected"])
-
-            # Step: Common Crawl presence
-            publish_step_event(job_id, "cc", "started")
-            cc_result = run_cc_step(publisher)
-            resolution_job.cc_result = cc_result
-            resolution_job.save(update_fields=["cc_result"])
-            publish_step_event(job_id, "cc", "completed", cc_result)
-
-            # Update publisher flat fields
-            publisher.cc_in_index = cc_result.get("in_index")
-            publisher.cc_page_count = cc_result.get("page_count")
-            publisher.cc_last_crawl = cc_result.get("latest_crawl") or ""
-            publisher.save(update_fields=["cc_in_index", "cc_page_count", "cc_last_crawl"])
-
-            # Step: Sitemap analysis (news namespace detection)
-            publish_step_event(job_id, "sitemap_analysis", "started")
-            sitemap_analysis_result = run_sitemap_analysis_step(publisher)
-            resolution_job.sitemap_analysis_result = sitemap_analysis_result
-            resolution_job.save(update_fields=["sitemap_analysis_result"])
-            publish_step_event(job_id, "sitemap_analysis", "completed", sitemap_analysis_result)
-
-            # Update publisher flat fields
-            publisher.has_news_sitemap = sitemap_analysis_result.get("has_news_sitemap")
-            publisher.save(update_fields=["has_news_sitemap"])
-
-            # Step: Update frequency estimation
-            publish_step_event(job_id, "frequency", "started")
-            frequency_result = run_frequency_step(publisher, sitemap_analysis_result)
-            resolution_job.frequency_result = frequency_result
-            resolution_job.save(update_fields=["frequency_result"])
-            publish_step_event(job_id, "frequency", "completed", frequency_result)
-
-            # Update publisher flat fields
-            publisher.update_frequency = frequency_result.get("frequency_label", "")
-            publisher.update_frequency_hours = frequency_result.get("frequency_hours")
-            publisher.update_frequency_confidence = frequency_result.get("confidence", "")
-            publisher.save(update_fields=["update_frequency", "update_frequency_hours", "update_frequency_confidence"])
-
-            # Step 8: Publisher details (structured data — already "started" at pipeline begin)
-            details_result = run_publisher_details_step(publisher, homepage_html)
-            resolution_job.metadata_result = details_result
-            resolution_job.save(update_fields=["metadata_result"])
-            publish_step_event(job_id, "publisher_details", "completed", details_result)
-
-            publisher.publisher_details = details_result.get("organization")
-            update_fields = ["publisher_details"]
-
-            # Update publisher name from structured data if still set to domain
-            org = details_result.get("organization")
-            if org and org.get("name") and publisher.name == publisher.domain:
-                publisher.name = org["name"]
-                update_fields.append("name")
-
-            publisher.save(update_fields=update_fields)
-
-            # Update freshness timestamp
-            publisher.last_checked_at = timezone.now()
-            publisher.save(update_fields=["last_checked_at"])
+                publisher.last_checked_at = timezone.now()
+                publisher.save(update_fields=["last_checked_at"])
 
         # --- Article-level steps ---
         article_url = resolution_job.canonical_url
@@ -364,29 +485,38 @@ def run_pipeline(job_id: str):
             publish_step_event(job_id, "paywall_detection", "skipped", {"reason": "fresh"})
             publish_step_event(job_id, "metadata_profile", "skipped", {"reason": "fresh"})
         else:
-            # Fetch article HTML (reuse homepage_html if article URL matches homepage)
-            homepage_url = publisher.url or f"https://{publisher.domain}/"
-            if article_url.rstrip("/") == homepage_url.rstrip("/"):
-                article_html = homepage_html  # Already fetched above
-            else:
-                try:
-                    fetch_result = _fetch_manager.fetch(article_url, publisher=publisher)
-                    article_html = fetch_result.html
-                except AllStrategiesExhausted as exc:
-                    logger.warning(f"Could not fetch article {article_url}: {exc}")
-                    article_html = ""
+            # Fetch article HTML (reused from the document store when the
+            # article is the homepage fetched above)
+            try:
+                article_html = documents.fetch(article_url, publisher=publisher).html
+            except (AllStrategiesExhausted, PolitenessTimeout) as exc:
+                logger.warning(f"Could not fetch article {article_url}: {exc}")
+                article_html = ""
 
             # Step 10: Article extraction
             publish_step_event(job_id, "article_extraction", "started")
             extraction_result = run_article_extraction_step(article_html, article_url)
 
-            # Step 11: Paywall detection
+            # Steps 11 and 12: Paywall detection, with the metadata profile's
+            # LLM call in flight on the event loop meanwhile
             publish_step_event(job_id, "paywall_detection", "started")
-            paywall_result = run_paywall_detection_step(article_html, extraction_result)
-
-            # Step 12: Metadata profile
             publish_step_event(job_id, "metadata_profile", "started")
-            profile_result = run_metadata_profile_step(extraction_result, article_url)
+            section_started = monotonic()
+            if agent_loop is not None:
+                profile_future = agent_loop.submit(_timed(
+                    arun_metadata_profile_step(extraction_result, article_url),
+                    step_seconds, "metadata_profile",
+                ))
+            paywall_started = monotonic()
+            paywall_result = run_paywall_detection_step(article_html, extraction_result)
+            step_seconds["paywall_detection"] = monotonic() - paywall_started
+            if agent_loop is not None:
+                profile_result = profile_future.result()
+            else:
+                profile_started = monotonic()
+                profile_result = run_metadata_profile_step(extraction_result, article_url)
+                step_seconds["metadata_profile"] = monotonic() - profile_started
+            overlapped_seconds += monotonic() - section_started
 
             # Combine into article_result
             article_result = {
@@ -397,23 +527,25 @@ def run_pipeline(job_id: str):
             resolution_job.article_result = article_result
             resolution_job.save(update_fields=["article_result"])
 
-            # Create ArticleMetadata record
-            ArticleMetadata.objects.create(
-                resolution_job=resolution_job,
-                publisher=publisher,
-                article_url=article_url,
-                jsonld_fields=extraction_result.get("jsonld_fields"),
-                opengraph_fields=extraction_result.get("opengraph_fields"),
-                microdata_fields=extraction_result.get("microdata_fields"),
-                twitter_cards=extraction_result.get("twitter_cards"),
-                has_jsonld=bool(extraction_result.get("jsonld_fields")),
-                has_opengraph=bool(extraction_result.get("opengraph_fields")),
-                has_microdata=bool(extraction_result.get("microdata_fields")),
-                has_twitter_cards=bool(extraction_result.get("twitter_cards")),
-                paywall_status=paywall_result.get("paywall_status", "unknown"),
-                paywall_signals=paywall_result.get("signals", []),
-                metadata_profile=profile_result.get("summary", ""),
-            )
+            # Create ArticleMetadata record (it marks the article fresh, so
+            # not when the profile's LLM call was rate limited)
+            if not _is_rate_limited(profile_result):
+                ArticleMetadata.objects.create(
+                    resolution_job=resolution_job,
+                    publisher=publisher,
+                    article_url=article_url,
+                    jsonld_fields=extraction_result.get("jsonld_fields"),
+                    opengraph_fields=extraction_result.get("opengraph_fields"),
+                    microdata_fields=extraction_result.get("microdata_fields"),
+                    twitter_cards=extraction_result.get("twitter_cards"),
+                    has_jsonld=bool(extraction_result.get("jsonld_fields")),
+                    has_opengraph=bool(extraction_result.get("opengraph_fields")),
+                    has_microdata=bool(extraction_result.get("microdata_fields")),
+                    has_twitter_cards=bool(extraction_result.get("twitter_cards")),
+                    paywall_status=paywall_result.get("paywall_status", "unknown"),
+                    paywall_signals=paywall_result.get("signals", []),
+                    metadata_profile=profile_result.get("summary", ""),
+                )
 
             # Update publisher-level paywall signal (latest article's status)
             publisher.has_paywall = paywall_result.get("paywall_status") in ("paywalled", "metered")
@@ -461,7 +593,17 @@ def run_pipeline(job_id: str):
         # Mark job complete
         resolution_job.status = "completed"
         resolution_job.save(update_fields=["status"])
-        publish_step_event(job_id, "pipeline", "completed")
+        wall_seconds = monotonic() - started_at
+        serial_seconds = wall_seconds - overlapped_seconds + sum(step_seconds.values())
+        publish_step_event(job_id, "pipeline", "completed", {
+            "wall_seconds": round(wall_seconds, 3),
+            "serial_seconds": round(serial_seconds, 3),
+            "step_seconds": {name: round(sec, 3) for name, sec in step_seconds.items()},
+        })
+        logger.info(
+            f"Pipeline for job {job_id} completed in {wall_seconds:.1f}s "
+            f"({serial_seconds:.1f}s without overlap)"
+        )
 
     except Exception as exc:
         logger.error(f"Pipeline failed for job {job_id}: {exc}")
@@ -469,3 +611,8 @@ def run_pipeline(job_id: str):
         resolution_job.save(update_fields=["status"])
         publish_step_event(job_id, "pipeline", "failed", {"error": str(exc)})
         raise
+    finally:
+        attempt_recorder.flush()
+        logger.debug(
+            f"Job {job_id}: {documents.fetches} documents fetched, {documents.reused} reused"
+        )
@@ -0,0 +1,169 @@
+"""Named signature sets for scanning HTML bodies.
+
+WAF-block detection (``CurlCffiFetcher``) and paywall heuristics
+(``run_paywall_detection_step``) both look for a fixed list of lower-case
+markers in a page.  A ``SignatureSet`` compiles such a list once: patterns are
+lower-cased, de-duplicated and grouped, and every scan lower-cases only the
+configured window of the body (``settings.SIGNATURE_SCAN_WINDOWS``, in
+characters) instead of the whole page.  Challenge pages put their markers
+near the top, so ``waf_block`` only looks at the first 64 KiB; the cost of a
+scan is then bounded by the window, not by the size of the page.
+
+All patterns of a set are compiled into one regex alternation (longest
+first), so a scan is a single pass over the window rather than one search
+per pattern.  The scan restarts one character after each hit, so
+overlapping markers are all found; a pattern contained in a longer one that
+matched at the same position is implied by it.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+DEFAULT_WINDOWS = {
+    "waf_block": 64 * 1024,
+    "paywall": 1024 * 1024,
+}
+
+
+@dataclass(frozen=True)
+class SignatureMatch:
+    group: str
+    pattern: str
+
+    @property
+    def label(self) -> str:
+        return f"{self.group}:{self.pattern}"
+
+
+@dataclass
+class SignatureSet:
+    """A named, grouped list of lower-case markers scanned within a window.
+
+    *groups* maps a group name (e.g. ``"metered"``) to its patterns; matches
+    are reported in declaration order.  *window* is the number of leading
+    characters scanned, or None for the whole body.
+    """
+
+    name: str
+    groups: dict[str, tuple[str, ...]]
+    window: int | None = None
+    _patterns: tuple[tuple[str, str], ...] = field(init=False, repr=False)
+    _regex: re.Pattern | None = field(init=False, repr=False)
+    _implied: dict[str, tuple[int, ...]] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        seen: set[str] = set()
+        patterns = []
+        for group, group_patterns in self.groups.items():
+            for pattern in group_patterns:
+                pattern = pattern.lower()
+                if pattern and pattern not in seen:
+                    seen.add(pattern)
+                    patterns.append((group, pattern))
+        self._patterns = tuple(patterns)
+        # Indices of the patterns each pattern contains (itself included).
+        self._implied = {
+            pattern: tuple(i for i, (_, other) in enumerate(patterns) if other in pattern)
+            for _, pattern in patterns
+        }
+        by_length = sorted(seen, key=len, reverse=True)
+        self._regex = re.compile("|".join(map(re.escape, by_length))) if by_length else None
+
+    def with_window(self, window: int | None) -> SignatureSet:
+        return SignatureSet(self.name, self.groups, window)
+
+    def _prepare(self, text: str) -> str:
+        if self.window is not None:
+            text = text[: self.window]
+        return text.lower()
+
+    def _found(self, text: str, first: bool = False) -> list[int]:
+        """Sorted indices into ``_patterns`` of the patterns in *text*'s window.
+
+        With *first*, stop as soon as the first declared pattern is found.
+        """
+        if self._regex is None:
+            return []
+        haystack = self._prepare(text)
+        found: set[int] = set()
+        match = self._regex.search(haystack)
+        while match is not None:
+            found.update(self._implied[match.group()])
+            if (first and 0 in found) or len(found) == len(self._patterns):
+                break
+            match = self._regex.search(haystack, match.start() + 1)
+        return sorted(found)
+
+    def search(self, text: str) -> SignatureMatch | None:
+        """First match in declaration order, or None."""
+        found = self._found(text, first=True)
+        return SignatureMatch(*self._patterns[found[0]]) if found else None
+
+    def matches(self, text: str) -> list[SignatureMatch]:
+        """Every pattern found in the window, in declaration order."""
+        return [SignatureMatch(*self._patterns[i]) for i in self._found(text)]
+
+
+SIGNATURE_SETS = {
+    "waf_block": SignatureSet(
+        "waf_block",
+        {
+            "challenge": (
+                "checking your browser",
+                "cloudflare",
+                "access denied",
+                "just a moment",
+                "cf-browser-verification",
+                "ray id",
+            ),
+        },
+        window=DEFAULT_WINDOWS["waf_block"],
+    ),
+    "paywall": SignatureSet(
+        "paywall",
+        {
+            "login_wall": (
+                "subscribe to continue reading",
+                "sign in to read",
+                "create an account to continue",
+                "already a subscriber?",
+                "subscription required",
+                "members only",
+            ),
+            "paywall_class": (
+                "paywall",
+                "subscriber-only",
+                "premium-content",
+                "gated-content",
+                "meter-",
+                "regwall",
+            ),
+            "metered": (
+                "articles remaining",
+                "free articles",
+                "monthly limit",
+                "article limit",
+            ),
+        },
+        window=DEFAULT_WINDOWS["paywall"],
+    ),
+}
+
+
+def signature_set(name: str) -> SignatureSet:
+    """The named set with its scan window from settings.SIGNATURE_SCAN_WINDOWS."""
+    from django.conf import settings
+
+    windows = getattr(settings, "SIGNATURE_SCAN_WINDOWS", {})
+    base = SIGNATURE_SETS[name]
+    if name not in windows or windows[name] == base.window:
+        return base
+    return _with_window(name, windows[name])
+
+
+@lru_cache(maxsize=None)
+def _with_window(name: str, window: int | None) -> SignatureSet:
+    return SIGNATURE_SETS[name].with_window(window)
@@ -0,0 +1,431 @@
+"""Incremental sitemap crawling into the ``SitemapEntry`` store.
+
+``run_sitemap_analysis_step`` only samples a sitemap (a couple of child
+sitemaps, 50 lastmods), which leaves ``run_frequency_step`` with thin data.
+Re-reading whole sitemap trees every freshness cycle would be far too
+expensive, so ``SitemapCrawler`` keeps per-file crawl state (``SitemapFile``)
+and only does new work:
+
+* a child sitemap whose ``<lastmod>`` in its index equals the value recorded
+  at its last crawl is not requested at all;
+* every other file is fetched with a conditional GET using the stored
+  ``ETag``/``Last-Modified``; a 304 ends the work for that file, and for an
+  index its whole subtree;
+* ``<url>`` entries are upserted in batches keyed by the SHA-256 of their
+  location, writing only rows that are new or whose lastmod, changefreq or
+  ``news:publication_date`` changed.
+
+At most ``MAX_SITEMAPS`` files are fetched per publisher per crawl, newest
+children first (children without a declared lastmod in least recently
+crawled order), so the per-cycle cost stays roughly constant and a large
+tree is filled in over successive cycles.  ``run_frequency_step`` crawls
+with an ``INLINE_SITEMAPS`` budget and enqueues the
+``publishers.tasks.crawl_sitemaps`` job for whatever it deferred;
+``entry_dates`` then gives it up to ``FREQUENCY_SAMPLE`` dated entries.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import xml.etree.ElementTree as ET
+import zlib
+from collections import deque
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from typing import TYPE_CHECKING
+from urllib.parse import urljoin
+
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from loguru import logger
+
+from publishers.fetchers.exceptions import AllStrategiesExhausted, FetchError, PolitenessTimeout
+from publishers.fetchers.streaming import max_bytes_for
+
+if TYPE_CHECKING:
+    from publishers.fetchers.manager import FetchStrategyManager
+    from publishers.fetchers.streaming import BodyStream
+    from publishers.models import Publisher, SitemapFile
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+GZIP_MAGIC = b"\x1f\x8b"
+SITEMAP_INFLATE_CHUNK = 64 * 1024
+
+DEFAULT_CONFIG = {
+    "ENABLED": True,
+    "MAX_SITEMAPS": 10,
+    "INLINE_SITEMAPS": 2,
+    "MAX_ENTRIES": 50_000,
+    "BATCH_SIZE": 1000,
+    "FREQUENCY_SAMPLE": 2000,
+}
+
+# SitemapEntry fields taken from a <url> entry; a change in any of them is a delta.
+ENTRY_FIELDS = ("lastmod", "changefreq", "news_publication_date")
+
+
+def sitemap_config() -> dict:
+    """DEFAULT_CONFIG overridden by settings.SITEMAP_CRAWLER."""
+    from django.conf import settings
+
+    return {**DEFAULT_CONFIG, **getattr(settings, "SITEMAP_CRAWLER", {})}
+
+
+def is_news_namespace(uri: str) -> bool:
+    """Whether *uri* is the Google News sitemap namespace (any version)."""
+    return "schemas/sitemap-news" in uri
+
+
+def sitemap_chunks(body, max_bytes: int):
+    """Yield a sitemap body's XML bytes, inflating gzip (``.xml.gz``) on the fly.
+
+    Servers often send ``.xml.gz`` files as ``application/gzip`` without a
+    ``Content-Encoding``, so gzip is recognised by its magic bytes.  Output
+    is produced in pieces of at most ``SITEMAP_INFLATE_CHUNK`` bytes and ends
+    after *max_bytes* of XML, so a small compressed file cannot inflate into
+    unbounded memory.  A corrupt gzip stream ends the body.
+    """
+    if body.peek(len(GZIP_MAGIC)) != GZIP_MAGIC:
+        yield from body.iter_bytes()
+        return
+    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    produced = 0
+    for chunk in body.iter_bytes():
+        while chunk and produced < max_bytes:
+            try:
+                data = inflater.decompress(chunk, SITEMAP_INFLATE_CHUNK)
+            except zlib.error:
+                return
+            chunk = inflater.unconsumed_tail
+            produced += len(data)
+            yield data
+        if produced >= max_bytes or inflater.eof:
+            return
+
+
+@dataclass(frozen=True)
+class SitemapRecord:
+    """One ``<sitemap>`` (``kind="sitemap"``) or ``<url>`` (``kind="url"``) entry, as raw text."""
+
+    kind: str
+    loc: str
+    lastmod: str | None = None
+    changefreq: str | None = None
+    publication_date: str | None = None
+
+
+class SitemapReader:
+    """Iterator over a sitemap's ``SitemapRecord``s; see ``iter_sitemap``.
+
+    ``is_index`` and ``has_news`` describe the root element (``<sitemapindex>``,
+    a declared Google News namespace) and are set before the first record.
+    """
+
+    def __init__(self, body: BodyStream, max_bytes: int | None = None) -> None:
+        self.is_index = False
+        self.has_news = False
+        self._records = self._read(body, max_bytes_for("xml") if max_bytes is None else max_bytes)
+
+    def __iter__(self) -> SitemapReader:
+        return self
+
+    def __next__(self) -> SitemapRecord:
+        return next(self._records)
+
+    def close(self) -> None:
+        self._records.close()
+
+    def _read(self, body: BodyStream, max_bytes: int):
+        parser = ET.XMLPullParser(events=("start-ns", "start", "end"))
+        url_tag, sitemap_tag = f"{{{SITEMAP_NS}}}url", f"{{{SITEMAP_NS}}}sitemap"
+        field_tags = {
+            f"{{{SITEMAP_NS}}}loc": "loc",
+            f"{{{SITEMAP_NS}}}lastmod": "lastmod",
+            f"{{{SITEMAP_NS}}}changefreq": "changefreq",
+        }
+        root = None
+        fields: dict[str, str] = {}
+
+        with body:
+            for chunk in sitemap_chunks(body, max_bytes):
+                parser.feed(chunk)
+                try:
+                    for event, item in parser.read_events():
+                        if event == "start-ns":
+                            prefix, uri = item
+                            if prefix == "news" or is_news_namespace(uri):
+                                self.has_news = True
+                            continue
+                        if event == "start":
+                            if root is None:
+                                root = item
+                                self.is_index = item.tag.endswith("sitemapindex")
+                            continue
+                        tag = item.tag
+                        if tag in (url_tag, sitemap_tag):
+                            if fields.get("loc"):
+                                yield SitemapRecord(
+                                    kind="sitemap" if tag == sitemap_tag else "url", **fields
+                                )
+                            fields = {}
+                            root.clear()
+                        elif not item.text or not item.text.strip():
+                            continue
+                        elif tag in field_tags:
+                            fields[field_tags[tag]] = item.text.strip()
+                        elif tag.endswith("}publication_date") and is_news_namespace(tag):
+                            fields["publication_date"] = item.text.strip()
+                except ET.ParseError:
+                    return
+
+
+def iter_sitemap(body: BodyStream, max_bytes: int | None = None) -> SitemapReader:
+    """Stream the entries of a (optionally gzipped) sitemap or sitemap index.
+
+    Yields a ``SitemapRecord`` per entry with a ``<loc>`` as soon as the
+    entry's closing tag has arrived; finished entries are dropped from the
+    tree, so memory stays flat however large the file is.  Closing the
+    iterator closes *body* and aborts the transfer.  Malformed or truncated
+    XML ends the iteration after the last complete entry.  The returned
+    ``SitemapReader`` also reports whether the file is an index and whether
+    it declares the news namespace.
+    """
+    return SitemapReader(body, max_bytes)
+
+
+def parse_w3c_datetime(value: str | None) -> datetime | None:
+    """Parse a sitemap (W3C/ISO 8601) date into an aware datetime; None if invalid."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt_timezone.utc)
+    return parsed
+
+
+def url_hash(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+class SitemapCrawler:
+    """Walks a publisher's sitemap trees and ingests changed ``<url>`` entries."""
+
+    def __init__(
+        self, manager: FetchStrategyManager, config: dict | None = None
+    ) -> None:
+        self._manager = manager
+        self._config = config if config is not None else sitemap_config()
+
+    def crawl(self, publisher: Publisher) -> dict:
+        """Crawl from ``publisher.sitemap_urls``; returns counts of the work done.
+
+        ``fetched``/``not_modified`` count requests answered with a body or a
+        304, ``skipped`` children left alone because their declared lastmod
+        is unchanged, ``deferred`` files left for the next cycle by the
+        ``MAX_SITEMAPS`` budget, ``created``/``updated`` entry rows written.
+
+        A file is only marked unchanged (validators and declared lastmod kept)
+        once it and everything below it were read in full.  The indexes
+        above a deferred, failed or capped file forget theirs, so the next
+        crawl lists their children again instead of stopping at a 304.
+        """
+        from publishers.models import SitemapFile
+
+        stats = dict.fromkeys(
+            ("fetched", "not_modified", "skipped", "deferred", "errors", "created", "updated"),
+            0,
+        )
+        files = {state.url: state for state in SitemapFile.objects.filter(publisher=publisher)}
+        queue: deque[tuple[str, str | None]] = deque(
+            (url, None) for url in publisher.sitemap_urls or []
+        )
+        seen: set[str] = set()
+        parents: dict[str, str] = {}
+        incomplete: set[str] = set()
+        budget = self._config["MAX_SITEMAPS"]
+
+        def unfinished(url: str | None) -> None:
+            while url is not None and url not in incomplete:
+                incomplete.add(url)
+                url = parents.get(url)
+
+        while queue:
+            url, declared = queue.popleft()
+            if url in seen:
+                continue
+            seen.add(url)
+            state = files.get(url)
+            if declared and state and state.crawled_at and state.lastmod == declared:
+                stats["skipped"] += 1
+                continue
+            if budget <= 0:
+                stats["deferred"] += 1
+                unfinished(parents.get(url))
+                continue
+            budget -= 1
+            if state is None:
+                state = files[url] = SitemapFile(publisher=publisher, url=url)
+            children, complete = self._crawl_file(publisher, state, declared, stats)
+            if not complete:
+                unfinished(parents.get(url))
+            for child, _ in children:
+                parents.setdefault(child, url)
+            queue.extend(self._order(children, files))
+
+        for url in incomplete:
+            state = files[url]
+            if state.pk and (state.etag or state.last_modified or state.lastmod):
+                state.etag = state.last_modified = state.lastmod = ""
+                state.save(update_fields=["etag", "last_modified", "lastmod"])
+        return stats
+
+    @staticmethod
+    def _order(
+        children: list[tuple[str, str | None]], files: dict[str, SitemapFile]
+    ) -> list[tuple[str, str | None]]:
+        """Newest declared lastmod first, then undated children least recently crawled first."""
+
+        def key(child: tuple[str, str | None]) -> tuple[str, float]:
+            state = files.get(child[0])
+            crawled = state.crawled_at.timestamp() if state and state.crawled_at else 0.0
+            return child[1] or "", -crawled
+
+        return sorted(children, key=key, reverse=True)
+
+    def _crawl_file(
+        self, publisher: Publisher, state: SitemapFile, declared: str | None, stats: dict
+    ) -> tuple[list[tuple[str, str | None]], bool]:
+        """Fetch one sitemap file and ingest its entries.
+
+        Returns an index's children and whether the file was read in full.
+        A file cut off at ``MAX_ENTRIES`` keeps no validators and records
+        where to resume, so the next crawl reads on from there.
+        """
+        try:
+            body = self._manager.stream(
+                state.url, publisher=publisher, headers=state.conditional_headers()
+            )
+        except (AllStrategiesExhausted, FetchError, PolitenessTimeout) as exc:
+            logger.warning(f"Sitemap crawl failed for {state.url}: {exc}")
+            stats["errors"] += 1
+            return [], False
+
+        if body.status_code == 304:
+            body.close()
+            stats["not_modified"] += 1
+            state.lastmod = declared or state.lastmod
+            state.crawled_at = timezone.now()
+            state.save()
+            return [], True
+
+        stats["fetched"] += 1
+        children: list[tuple[str, str | None]] = []
+        batch: list[SitemapRecord] = []
+        position = entries = 0
+        capped = False
+        try:
+            with closing(iter_sitemap(body)) as records:
+                for record in records:
+                    if record.kind == "sitemap":
+                        children.append((urljoin(state.url, record.loc), record.lastmod))
+                        continue
+                    position += 1
+                    if position <= state.resume_offset:
+                        continue
+                    batch.append(record)
+                    entries += 1
+                    if len(batch) >= self._config["BATCH_SIZE"]:
+                        self._ingest(publisher, batch, stats)
+                        batch = []
+                    if entries >= self._config["MAX_ENTRIES"]:
+                        capped = True
+                        break
+            self._ingest(publisher, batch, stats)
+        except Exception as exc:
+            # Keep the old validators so the file is fetched in full next time.
+            logger.warning(f"Sitemap crawl of {state.url} aborted: {exc}")
+            stats["errors"] += 1
+            return [], False
+
+        state.is_index = bool(children)
+        if capped:
+            state.lastmod = state.etag = state.last_modified = ""
+            state.resume_offset = position
+        else:
+            state.lastmod = declared or ""
+            state.etag = body.headers.get("etag", "")[:255]
+            state.last_modified = body.headers.get("last-modified", "")[:64]
+            state.resume_offset = 0
+        state.entry_count = len(children) if children else position
+        state.crawled_at = timezone.now()
+        state.save()
+        return children, not capped
+
+    @staticmethod
+    def _ingest(publisher: Publisher, records: list[SitemapRecord], stats: dict) -> None:
+        """Create new entries and update changed ones; unchanged rows are not written."""
+        from publishers.models import SitemapEntry
+
+        if not records:
+            return
+        rows = {url_hash(record.loc): record for record in records}
+        existing = {
+            entry.url_hash: entry
+            for entry in SitemapEntry.objects.filter(publisher=publisher, url_hash__in=rows)
+        }
+        now = timezone.now()
+        created: list[SitemapEntry] = []
+        updated: list[SitemapEntry] = []
+        for key, record in rows.items():
+            values = {
+                "lastmod": parse_w3c_datetime(record.lastmod),
+                "changefreq": (record.changefreq or "").lower()[:16],
+                "news_publication_date": parse_w3c_datetime(record.publication_date),
+            }
+            entry = existing.get(key)
+            if entry is None:
+                created.append(
+                    SitemapEntry(
+                        publisher=publisher,
+                        url_hash=key,
+                        url=record.loc[:2048],
+                        first_seen_at=now,
+                        updated_at=now,
+                        **values,
+                    )
+                )
+            elif any(getattr(entry, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(entry, field, value)
+                entry.updated_at = now
+                updated.append(entry)
+
+        SitemapEntry.objects.bulk_create(created, ignore_conflicts=True)
+        SitemapEntry.objects.bulk_update(updated, [*ENTRY_FIELDS, "updated_at"])
+        stats["created"] += len(created)
+        stats["updated"] += len(updated)
+
+
+def entry_dates(publisher: Publisher, limit: int | None = None) -> list[datetime]:
+    """The most recent publication dates (news date, else lastmod) in the store, newest first.
+
+    Dates in the future are ignored.
+    """
+    from publishers.models import SitemapEntry
+
+    if limit is None:
+        limit = sitemap_config()["FREQUENCY_SAMPLE"]
+    dates = (
+        SitemapEntry.objects.filter(publisher=publisher)
+        .annotate(published=Coalesce("news_publication_date", "lastmod"))
+        .filter(published__isnull=False, published__lte=timezone.now())
+        .order_by("-published")
+        .values_list("published", flat=True)
+    )
+    return list(dates[:limit])
@@ -5,7 +5,10 @@ from django.utils import timezone
 from django_rq import job
 from loguru import logger
 
+from .feeds import FeedPoller
+from .fetchers.manager import FetchStrategyManager
 from .models import Publisher, WAFReport
+from .sitemaps import SitemapCrawler
 from ingestion.models import TermsDiscoveryResult, TermsEvaluationResult
 from ingestion.terms_discovery import discover_terms_and_privacy
 from ingestion.terms_evaluation import evaluate_terms_and_conditions
@@ -198,3 +201,21 @@ def analyze_url(url: str) -> Dict[str, Any]:
             "url": url,
             "timestamp": timezone.now().isoformat(),
         }
+
+
+@job("default", timeout=600)
+def poll_feeds(publisher_id: int) -> Dict[str, Any]:
+    """Poll all of a publisher's feeds; the frequency step only polls the first few."""
+    publisher = Publisher.objects.get(pk=publisher_id)
+    stats = FeedPoller(FetchStrategyManager()).poll(publisher)
+    logger.info(f"Feed poll for {publisher.domain}: {stats}")
+    return stats
+
+
+@job("default", timeout=1800)
+def crawl_sitemaps(publisher_id: int) -> Dict[str, Any]:
+    """Crawl a publisher's sitemaps with the full MAX_SITEMAPS budget."""
+    publisher = Publisher.objects.get(pk=publisher_id)
+    stats = SitemapCrawler(FetchStrategyManager()).crawl(publisher)
+    logger.info(f"Sitemap crawl for {publisher.domain}: {stats}")
+    return stats
@@ -0,0 +1,252 @@
+"""Tests for the vectorized fleet statistics (publishers.analytics)."""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import polars as pl
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone as dj_timezone
+
+from publishers import analytics
+from publishers.analytics import (
+    DATES_SCHEMA,
+    cadence_changes,
+    fleet_summary,
+    frequency_stats,
+    load_fleet,
+    select_frequency,
+)
+from publishers.factories import PublisherFactory, ResolutionJobFactory
+from publishers.models import Publisher, ResolutionJob, SitemapEntry
+from publishers.pipeline.steps import _compute_frequency, run_frequency_step
+
+BASE = datetime(2026, 2, 17, 12, tzinfo=timezone.utc)
+
+
+def _dates(groups):
+    """Long dates frame from {(publisher_id, source): [datetime, ...]}."""
+    rows = [
+        (publisher_id, source, published)
+        for (publisher_id, source), dates in groups.items()
+        for published in dates
+    ]
+    return pl.DataFrame(rows, schema=DATES_SCHEMA, orient="row")
+
+
+# ---------------------------------------------------------------------------
+# Vectorized statistics
+# ---------------------------------------------------------------------------
+
+
+class TestFrequencyStats:
+    def test_matches_compute_frequency(self):
+        rng = random.Random(7)
+        groups = {}
+        for publisher_id in range(1, 40):
+            for source in ("rss", "sitemap"):
+                count = rng.choice([0, 1, 2, 3, 6, 12, 50])
+                spread = rng.choice([0.5, 5, 30, 400, 2000])
+                groups[(publisher_id, source)] = [
+                    BASE - timedelta(hours=rng.uniform(0, spread)) for _ in range(count)
+                ]
+        groups[(99, "rss")] = [BASE, BASE, BASE]  # no positive interval
+
+        stats = frequency_stats(_dates({k: v for k, v in groups.items() if v}))
+
+        rows = {(row["publisher_id"], row["source"]): row for row in stats.to_dicts()}
+        for key, dates in groups.items():
+            if not dates:
+                assert key not in rows
+                continue
+            expected = _compute_frequency(sorted(dates, reverse=True), source=key[1])
+            row = rows[key]
+            for field in (
+                "sample_size", "frequency_hours", "date_span_days", "confidence", "frequency_label"
+            ):
+                assert row[field] == expected[field], (key, field)
+
+    def test_select_frequency_prefers_larger_store(self):
+        hours = [BASE - timedelta(hours=i) for i in range(10)]
+        stats = frequency_stats(_dates({
+            (1, "sitemap_store"): hours, (1, "rss"): hours[:5], (1, "sitemap"): hours,
+            (2, "sitemap_store"): hours[:3], (2, "rss"): hours[:5],
+            (3, "sitemap_store"): hours[:1], (3, "sitemap"): hours[:4],
+            (4, "rss"): hours[:1],
+        }))
+
+        selected = select_frequency(stats)
+
+        assert dict(zip(selected["publisher_id"], selected["source"])) == {
+            1: "sitemap_store", 2: "rss", 3: "sitemap"
+        }
+
+    def test_cadence_changes(self):
+        jobs = pl.DataFrame(
+            [
+                (1, BASE - timedelta(days=2), 24.0), (1, BASE, 6.0),
+                (2, BASE - timedelta(days=2), 24.0), (2, BASE, 30.0),
+                (3, BASE - timedelta(days=9), 10.0), (3, BASE - timedelta(days=2), 2.0),
+                (3, BASE, None),
+                (4, BASE, 1.0),
+            ],
+            schema={
+                "publisher_id": pl.Int64,
+                "created_at": pl.Datetime("us", "UTC"),
+                "frequency_hours": pl.Float64,
+            },
+            orient="row",
+        )
+
+        changes = cadence_changes(jobs, factor=2.0).sort("publisher_id")
+
+        assert changes["publisher_id"].to_list() == [1, 3]
+        assert changes["ratio"].to_list() == [0.25, 0.2]
+
+
+# ---------------------------------------------------------------------------
+# Loading, summary, command and view
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def fleet():
+    now = dj_timezone.now().replace(microsecond=0)
+    daily = PublisherFactory(
+        domain="daily.example",
+        sitemap_urls=["https://daily.example/sitemap.xml"],
+        has_news_sitemap=True,
+        feed_entry_dates={
+            f"k{i}": (now - timedelta(days=i)).isoformat() for i in range(12)
+        },
+        ai_bot_blocks={
+            "GPTBot": {"company": "OpenAI", "blocked": True},
+            "CCBot": {"company": "Common Crawl", "blocked": False},
+        },
+    )
+    hourly = PublisherFactory(
+        domain="hourly.example",
+        ai_bot_blocks={
+            "GPTBot": {"company": "OpenAI", "blocked": False},
+            "CCBot": {"company": "Common Crawl", "blocked": False},
+        },
+    )
+    SitemapEntry.objects.bulk_create([
+        SitemapEntry(
+            publisher=hourly, url_hash=str(i), url=f"https://hourly.example/{i}",
+            lastmod=now - timedelta(hours=i),
+        )
+        for i in range(30)
+    ])
+    quiet = PublisherFactory(domain="quiet.example")
+    ResolutionJobFactory(
+        publisher=quiet,
+        status="completed",
+        sitemap_analysis_result={"lastmod_dates": ["2026-01-01", "2026-01-15T00:00:00Z"]},
+        frequency_result={"frequency_hours": 48.0},
+    )
+    ResolutionJobFactory(
+        publisher=quiet,
+        status="completed",
+        sitemap_analysis_result={"lastmod_dates": ["2026-02-01", "2026-02-08"]},
+        frequency_result={"frequency_hours": 168.0},
+    )
+    return daily, hourly, quiet
+
+
+@pytest.mark.django_db
+class TestFleetSummary:
+    def test_load_fleet(self, fleet):
+        frames = load_fleet()
+
+        assert frames.publishers.height == 3
+        counts = dict(frames.dates.group_by("source").len().iter_rows())
+        assert counts == {"rss": 12, "sitemap_store": 30, "sitemap": 2}
+        assert frames.jobs.height == 2
+        assert frames.bots.height == 4
+
+    def test_summary(self, fleet):
+        summary = fleet_summary()
+
+        assert summary["publishers"] == 3
+        assert summary["frequency"]["by_source"] == {
+            "rss": 1, "sitemap": 1, "sitemap_store": 1
+        }
+        assert summary["frequency"]["by_cadence"] == {"daily": 1, "hourly": 1, "weekly": 1}
+        assert summary["cadence_changes"]["count"] == 1
+        assert summary["cadence_changes"]["top"][0]["domain"] == "quiet.example"
+        assert summary["sitemaps"] == {"with_sitemaps": 1, "news_sitemaps": 1}
+        assert summary["ai_bots"]["blocking_any"] == 1
+        assert summary["ai_bots"]["by_bot"]["GPTBot"] == {
+            "company": "OpenAI", "blocked": 1, "share": 0.5
+        }
+
+    def test_selection_matches_frequency_step(self, fleet, settings):
+        settings.SITEMAP_CRAWLER = {"ENABLED": False}
+        settings.FEEDS = {"ENABLED": False}
+        # A weekly store reaching back well past three months.
+        archive = PublisherFactory(domain="archive.example")
+        now = dj_timezone.now().replace(microsecond=0)
+        SitemapEntry.objects.bulk_create([
+            SitemapEntry(
+                publisher=archive, url_hash=str(i), url=f"https://archive.example/{i}",
+                lastmod=now - timedelta(weeks=i),
+            )
+            for i in range(30)
+        ])
+
+        selected = {
+            row["publisher_id"]: row
+            for row in select_frequency(frequency_stats(load_fleet().dates)).to_dicts()
+        }
+
+        for publisher in Publisher.objects.all():
+            job = (
+                ResolutionJob.objects.filter(publisher=publisher, status="completed")
+                .order_by("-created_at")
+                .first()
+            )
+            expected = run_frequency_step(publisher, job.sitemap_analysis_result if job else None)
+            row = selected[publisher.pk]
+            for field in (
+                "source", "sample_size", "frequency_hours", "date_span_days", "confidence"
+            ):
+                assert row[field] == expected[field], (publisher.domain, field)
+        assert selected[archive.pk]["sample_size"] == 30
+
+    def test_view_requires_staff(self, fleet, client, django_user_model):
+        assert client.get("/api/analytics/fleet").status_code == 302
+
+        client.force_login(django_user_model.objects.create_user("reader", password="x"))
+        assert client.get("/api/analytics/fleet").status_code == 302
+
+    def test_view_is_cached(self, fleet, admin_client, monkeypatch):
+        cache.delete(analytics.SUMMARY_CACHE_KEY)
+        calls = []
+        real = analytics.fleet_summary
+
+        def counting(*args, **kwargs):
+            calls.append(1)
+            return real(*args, **kwargs)
+
+        monkeypatch.setattr(analytics, "fleet_summary", counting)
+
+        first = admin_client.get("/api/analytics/fleet")
+        second = admin_client.get("/api/analytics/fleet")
+
+        assert first.status_code == 200
+        assert first.json()["publishers"] == 3
+        assert second.json() == first.json()
+        assert len(calls) == 1
+        cache.delete(analytics.SUMMARY_CACHE_KEY)
+
+    def test_command_writes_parquet(self, fleet, tmp_path, capsys):
+        path = tmp_path / "fleet.parquet"
+
+        call_command("fleet_stats", parquet=str(path))
+
+        table = pl.read_parquet(path)
+        assert table.height == 3
+        assert set(table.columns) >= {"domain", "frequency_source", "frequency_hours", "cadence"}
+        assert '"publishers": 3' in capsys.readouterr().out
@@ -0,0 +1,318 @@
+"""Tests for offline Common Crawl lookups from a local cluster.idx."""
+
+import gzip
+import json
+import random
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from publishers import commoncrawl
+from publishers.commoncrawl import ROWS_PER_BLOCK, ClusterIndex, domain_surt
+
+
+def _write_index(directory, rows, block_size=6):
+    """Write a ZipNum index (cluster.idx + cdx-00000.gz) for sorted CDX *rows*."""
+    directory.mkdir(parents=True, exist_ok=True)
+    rows = sorted(rows)
+    shard = bytearray()
+    lines = []
+    for i in range(0, len(rows), block_size):
+        block = rows[i : i + block_size]
+        data = gzip.compress("".join(f"{row} {{}}\n" for row in block).encode())
+        lines.append(f"{block[0]}\tcdx-00000.gz\t{len(shard)}\t{len(data)}\t{len(lines) + 1}")
+        shard += data
+    (directory / "cdx-00000.gz").write_bytes(bytes(shard))
+    path = directory / "cluster.idx"
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+ROWS = [
+    "at,orf)/ 20260110000000",
+    "com,big)/ 20260101000000",
+    *(f"com,big)/a/{i:03d} 2026011{i % 10}000000" for i in range(12)),
+    "com,big,www)/ 20260120000000",
+    "com,example)/ 20260105000000",
+    "com,example)/about 20260118000000",
+    "com,example,news)/ 20260112000000",
+    "com,example-shop)/ 20260103000000",
+    "com,notexample)/ 20260102000000",
+    "org,wikipedia)/ 20260111000000",
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    with ClusterIndex(_write_index(tmp_path / "CC-TEST", ROWS), collection="CC-TEST") as index:
+        yield index
+
+
+class TestDomainSurt:
+    def test_reverses_host(self):
+        assert domain_surt("www.Example.com") == "com,example,www"
+        assert domain_surt("https://example.com/path") == "com,example"
+
+
+class TestClusterIndex:
+    def test_domain_spanning_blocks_needs_no_block_read(self, index, monkeypatch):
+        monkeypatch.setattr(index, "_read_block", lambda block: pytest.fail("block read"))
+
+        result = index.lookup("big.com")
+
+        assert result["in_index"] is True
+        assert result["page_count"] == 2 * ROWS_PER_BLOCK
+        assert result["latest_crawl"] == "2026-01"
+        assert result["collection"] == "CC-TEST"
+
+    def test_small_domain_counted_from_preceding_block(self, index):
+        result = index.lookup("example.com")
+
+        # Host and subdomain rows, not example-shop.com or notexample.com.
+        assert result["in_index"] is True
+        assert result["page_count"] == 3
+        assert result["latest_crawl"] == "2026-01"
+
+    def test_absent_domain(self, index):
+        assert index.lookup("missing.com")["in_index"] is False
+        assert index.lookup("aaa.aa") == {
+            "available": True,
+            "in_index": False,
+            "page_count": 0,
+            "latest_crawl": None,
+            "collection": "CC-TEST",
+            "error": None,
+        }
+
+    def test_unknown_without_block_reads(self, tmp_path):
+        path = _write_index(tmp_path / "CC-TEST", ROWS)
+        with ClusterIndex(path, read_blocks=False) as index:
+            assert index.lookup("example.com")["in_index"] is None
+
+    def test_lookup_many_matches_single_lookups_and_shares_blocks(self, index, monkeypatch):
+        domains = ["example.com", "example-shop.com", "big.com", "notexample.com", "missing.com",
+                   "wikipedia.org", "orf.at"]
+        expected = {domain: index.lookup(domain) for domain in domains}
+        reads = []
+        read_block = index._read_block
+        monkeypatch.setattr(index, "_read_block", lambda block: reads.append(block) or read_block(block))
+
+        assert index.lookup_many(domains) == expected
+        assert len(reads) == len(set(reads))
+
+    def test_bisect_agrees_with_linear_scan(self, tmp_path):
+        rng = random.Random(7)
+        hosts = sorted({f"com,{rng.choice('abcdefgh')}{rng.randrange(1000)})/" for _ in range(400)})
+        path = _write_index(tmp_path / "CC-TEST", [f"{h} 20260101000000" for h in hosts], 1)
+        keys = [line.split(" ")[0] for line in path.read_text().splitlines()]
+        with ClusterIndex(path) as index:
+            for probe in ("com,a", "com,d5", "com,h999)", "zzz", ""):
+                offset = index._bisect(probe.encode())
+                first = next((i for i, key in enumerate(keys) if key >= probe), len(keys))
+                assert index._key_at(offset).decode() == (keys[first] if first < len(keys) else "")
+
+
+@pytest.mark.django_db
+class TestRunCcStepLocalIndex:
+    def test_uses_local_index_without_cdx_requests(self, tmp_path, settings, monkeypatch):
+        from publishers.factories import PublisherFactory
+        from publishers.pipeline.steps import run_cc_step
+
+        _write_index(tmp_path / "CC-TEST", ROWS)
+        settings.COMMON_CRAWL = {
+            "COLLECTION": "CC-TEST",
+            "COLLECTIONS": ["CC-TEST"],
+            "LOCAL_INDEX": True,
+            "INDEX_DIR": str(tmp_path),
+        }
+        monkeypatch.setattr(commoncrawl, "_local_index", None)
+        monkeypatch.setattr(
+            "publishers.pipeline.steps.http_get",
+            lambda *args, **kwargs: pytest.fail("CDX API called"),
+        )
+
+        result = run_cc_step(PublisherFactory(domain="example.com"))
+
+        assert result["in_index"] is True
+        assert result["page_count"] == 3
+        assert result["collection"] == "CC-TEST"
+
+    def test_falls_back_to_api_without_index_file(self, tmp_path, settings, monkeypatch):
+        from publishers.pipeline.steps import run_cc_step
+        from publishers.factories import PublisherFactory
+
+        settings.COMMON_CRAWL = {
+            "COLLECTIONS": ["CC-MAIN-2026-04"],
+            "LOCAL_INDEX": True,
+            "INDEX_DIR": str(tmp_path),
+        }
+        monkeypatch.setattr(commoncrawl, "_local_index", None)
+        calls = []
+
+        def fake_get(url, **kwargs):
+            calls.append(url)
+            raise RuntimeError("offline")
+
+        monkeypatch.setattr("publishers.pipeline.steps.http_get", fake_get)
+
+        result = run_cc_step(PublisherFactory(domain="example.com"))
+
+        assert calls and "index.commoncrawl.org" in calls[0]
+        assert result["available"] is False
+
+
+# ---------------------------------------------------------------------------
+# Collection registry and multi-collection queries
+# ---------------------------------------------------------------------------
+class _FakeCdx:
+    """A CDX API stand-in: *pages* maps (collection, domain) to block counts."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def __call__(self, url, timeout=None):
+        with self._lock:
+            self.calls.append(url)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.01)
+        collection = url.split("/")[3].split("?")[0].removesuffix("-index")
+        domain = url.split("url=*.")[1].split("&")[0]
+        blocks = self.pages.get((collection, domain), 0)
+        if "showNumPages" in url:
+            text = json.dumps({"pages": -(-blocks // 5), "pageSize": 5, "blocks": blocks})
+        else:
+            text = json.dumps({"timestamp": collection[8:12] + "0115000000"})
+        with self._lock:
+            self.in_flight -= 1
+        return MagicMock(text=text, status_code=200)
+
+
+COLLECTIONS = ["CC-MAIN-2026-04", "CC-MAIN-2025-51", "CC-MAIN-2025-47"]
+
+
+class TestCollectionRegistry:
+    def test_collinfo_fetched_once_and_sorted(self, settings, monkeypatch):
+        settings.COMMON_CRAWL = {"COLLECTIONS": None}
+        calls = []
+
+        def fake_get(url, timeout=None):
+            calls.append(url)
+            return MagicMock(text=json.dumps([{"id": c} for c in reversed(COLLECTIONS)]))
+
+        monkeypatch.setattr("publishers.fetchers.clients.http_get", fake_get)
+        registry = commoncrawl.CollectionRegistry()
+
+        assert registry.recent(2) == COLLECTIONS[:2]
+        assert registry.collections() == COLLECTIONS
+        assert calls == [commoncrawl.COLLINFO_URL]
+
+    def test_collinfo_shared_through_response_cache(self, tmp_path, settings, monkeypatch):
+        settings.COMMON_CRAWL = {"COLLECTIONS": None}
+        settings.FETCH_CACHE = {"BACKEND": "disk", "DIRECTORY": str(tmp_path)}
+        calls = []
+
+        def fake_get(url, timeout=None):
+            calls.append(url)
+            return MagicMock(text=json.dumps([{"id": c} for c in COLLECTIONS]))
+
+        monkeypatch.setattr("publishers.fetchers.clients.http_get", fake_get)
+
+        commoncrawl.CollectionRegistry().collections()
+        assert commoncrawl.CollectionRegistry().collections() == COLLECTIONS
+        assert len(calls) == 1
+
+    def test_falls_back_to_configured_collection(self, settings, monkeypatch):
+        settings.COMMON_CRAWL = {"COLLECTIONS": None, "COLLECTION": "CC-MAIN-2026-04"}
+        monkeypatch.setattr(
+            "publishers.fetchers.clients.http_get",
+            MagicMock(side_effect=RuntimeError("offline")),
+        )
+        assert commoncrawl.CollectionRegistry().collections() == ["CC-MAIN-2026-04"]
+
+
+class TestCCQuerier:
+    def test_batch_over_collections_with_bounded_concurrency(self):
+        cdx = _FakeCdx({
+            ("CC-MAIN-2026-04", "big.com"): 15,
+            ("CC-MAIN-2025-51", "big.com"): 12,
+            ("CC-MAIN-2025-51", "gone.com"): 2,
+        })
+        domains = ["big.com", "gone.com", "never.com"] * 2
+
+        results = commoncrawl.CCQuerier(get=cdx, concurrency=2).query(domains, COLLECTIONS)
+
+        assert cdx.max_in_flight <= 2
+        presence = [url for url in cdx.calls if "showNumPages" in url]
+        assert len(presence) == 3 * len(COLLECTIONS)
+        # Latest month only for the newest collection each domain appears in.
+        latest = sorted(url.split("/")[3] for url in cdx.calls if "sort=desc" in url)
+        assert latest == ["CC-MAIN-2025-51-index?url=*.gone.com&output=json&fl=timestamp&limit=1&sort=desc",
+                          "CC-MAIN-2026-04-index?url=*.big.com&output=json&fl=timestamp&limit=1&sort=desc"]
+        assert results["big.com"]["CC-MAIN-2026-04"]["page_count"] == 45000
+        assert results["gone.com"]["CC-MAIN-2026-04"]["in_index"] is False
+        assert results["gone.com"]["CC-MAIN-2025-51"]["latest_crawl"] == "2025-01"
+
+    def test_results_cached_per_collection_and_domain(self, tmp_path, settings):
+        settings.FETCH_CACHE = {"BACKEND": "disk", "DIRECTORY": str(tmp_path)}
+        cdx = _FakeCdx({("CC-MAIN-2026-04", "big.com"): 15})
+
+        commoncrawl.CCQuerier(get=cdx).query(["big.com"], COLLECTIONS[:1])
+        commoncrawl.CCQuerier(get=cdx).query(["big.com", "new.com"], COLLECTIONS[:2])
+
+        domains_per_collection = sorted(
+            (url.split("/")[3].split("-index")[0], url.split("url=*.")[1].split("&")[0])
+            for url in cdx.calls if "showNumPages" in url
+        )
+        assert domains_per_collection == [
+            ("CC-MAIN-2025-51", "big.com"),
+            ("CC-MAIN-2025-51", "new.com"),
+            ("CC-MAIN-2026-04", "big.com"),
+            ("CC-MAIN-2026-04", "new.com"),
+        ]
+
+    def test_summarize_and_merge_history(self):
+        cdx = _FakeCdx({("CC-MAIN-2025-51", "gone.com"): 2})
+        results = commoncrawl.CCQuerier(get=cdx).query(["gone.com"], COLLECTIONS)
+
+        summary = commoncrawl.summarize(results["gone.com"], COLLECTIONS)
+
+        assert summary["in_index"] is False
+        assert summary["collection"] == "CC-MAIN-2026-04"
+        assert summary["latest_crawl"] == "2025-01"
+        assert summary["history"] == {
+            "CC-MAIN-2026-04": 0, "CC-MAIN-2025-51": 6000, "CC-MAIN-2025-47": 0,
+        }
+        merged = commoncrawl.merge_history({"CC-MAIN-2025-43": 3000}, summary["history"], limit=3)
+        assert list(merged) == COLLECTIONS
+
+
+@pytest.mark.django_db
+class TestRunCcStepHistory:
+    def test_history_merged_into_publisher(self, settings, monkeypatch):
+        from publishers.factories import PublisherFactory
+        from publishers.pipeline.steps import run_cc_step
+        from publishers.pipeline.supervisor import _flatten_cc
+
+        settings.COMMON_CRAWL = {"COLLECTIONS": COLLECTIONS}
+        cdx = _FakeCdx({("CC-MAIN-2026-04", "big.com"): 1, ("CC-MAIN-2025-47", "big.com"): 3})
+        monkeypatch.setattr("publishers.pipeline.steps.http_get", cdx)
+        publisher = PublisherFactory(domain="big.com", cc_history={"CC-MAIN-2025-43": 0})
+
+        result = run_cc_step(publisher)
+        fields = _flatten_cc(publisher, result)
+
+        assert result["page_count"] == 3000
+        assert result["latest_crawl"] == "2026-01"
+        assert fields["cc_history"] == {
+            "CC-MAIN-2026-04": 3000,
+            "CC-MAIN-2025-51": 0,
+            "CC-MAIN-2025-47": 9000,
+            "CC-MAIN-2025-43": 0,
+        }
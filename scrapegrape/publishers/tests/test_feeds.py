@@ -0,0 +1,176 @@
+"""Tests for incremental multi-feed polling (FeedState and the feed window)."""
+
+import threading
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from publishers import feeds
+from publishers.factories import PublisherFactory
+from publishers.feeds import FeedPoller, entry_key, entry_published, feed_dates, feeds_config
+from publishers.fetchers.exceptions import AllStrategiesExhausted
+from publishers.fetchers.streaming import BodyStream
+from publishers.models import FeedState
+
+NEWS_FEED = "https://example.com/feed.xml"
+SPORT_FEED = "https://example.com/sport/feed.xml"
+BASE = datetime(2026, 2, 17, 12, tzinfo=timezone.utc)
+
+
+def _rss(items):
+    """RSS 2.0 for (path, hours before BASE) pairs."""
+    entries = "".join(
+        f"<item><link>https://example.com/{path}</link>"
+        f"<pubDate>{(BASE - timedelta(hours=hours)).strftime('%a, %d %b %Y %H:%M:%S GMT')}"
+        "</pubDate></item>"
+        for path, hours in items
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel>{entries}</channel></rss>'
+
+
+class _FakeManager:
+    """Serves feeds by URL and answers If-None-Match with a 304 like a server would."""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.requests: list[tuple[str, dict]] = []
+        self.threads: set[str] = set()
+        self._lock = threading.Lock()
+
+    def stream(self, url, publisher=None, max_bytes=None, headers=None):
+        with self._lock:
+            self.requests.append((url, dict(headers or {})))
+            self.threads.add(threading.current_thread().name)
+        if url not in self.documents:
+            raise AllStrategiesExhausted(f"All strategies exhausted for {url}")
+        body, etag = self.documents[url]
+        if (headers or {}).get("If-None-Match") == etag:
+            return BodyStream.from_text(
+                "", url=url, status_code=304, strategy_used="curl_cffi", headers={"etag": etag}
+            )
+        return BodyStream.from_text(
+            body, url=url, status_code=200, strategy_used="curl_cffi", headers={"etag": etag}
+        )
+
+
+def _poll(publisher, manager, **config):
+    return FeedPoller(manager, {**feeds_config(), **config}).poll(publisher)
+
+
+class TestEntryHelpers:
+    def test_entry_key_prefers_link(self):
+        assert entry_key({"link": "https://example.com/a", "id": "1"}) == entry_key(
+            {"link": "https://example.com/a", "id": "2"}
+        )
+        assert entry_key({"id": "1"}) != entry_key({"title": "1"})
+        assert entry_key({}) is None
+
+    def test_entry_published_is_utc(self):
+        parsed = feeds.feedparser.parse(_rss([("a", 0)])).entries[0]
+        assert entry_published(parsed) == BASE
+
+
+@pytest.mark.django_db
+class TestFeedPoller:
+    def test_first_poll_reads_all_feeds(self):
+        manager = _FakeManager({
+            NEWS_FEED: (_rss([("a", 0), ("b", 6), ("c", 12)]), '"n1"'),
+            SPORT_FEED: (_rss([("s1", 3), ("b", 6)]), '"s1"'),
+        })
+        publisher = PublisherFactory(rss_urls=[NEWS_FEED, SPORT_FEED])
+
+        stats = _poll(publisher, manager)
+
+        assert stats == {"fetched": 2, "not_modified": 0, "errors": 0, "new": 4}
+        assert all(thread.startswith("feed-poll") for thread in manager.threads)
+        publisher.refresh_from_db()
+        assert feed_dates(publisher) == [
+            BASE, BASE - timedelta(hours=3), BASE - timedelta(hours=6), BASE - timedelta(hours=12)
+        ]
+        state = FeedState.objects.get(publisher=publisher, url=NEWS_FEED)
+        assert state.etag == '"n1"'
+        assert len(state.seen_ids) == 3
+
+    def test_unchanged_feed_is_one_conditional_get(self, monkeypatch):
+        manager = _FakeManager({NEWS_FEED: (_rss([("a", 0), ("b", 6)]), '"n1"')})
+        publisher = PublisherFactory(rss_urls=[NEWS_FEED])
+        _poll(publisher, manager)
+        manager.requests.clear()
+
+        def no_parse(*args, **kwargs):
+            raise AssertionError("a 304 must not be parsed")
+
+        monkeypatch.setattr(feeds.feedparser, "parse", no_parse)
+        stats = _poll(publisher, manager)
+
+        assert manager.requests == [(NEWS_FEED, {"If-None-Match": '"n1"'})]
+        assert stats["not_modified"] == 1
+        assert len(feed_dates(publisher)) == 2
+
+    def test_changed_feed_records_only_new_entries(self):
+        documents = {NEWS_FEED: (_rss([("a", 0), ("b", 6)]), '"n1"')}
+        manager = _FakeManager(documents)
+        publisher = PublisherFactory(rss_urls=[NEWS_FEED])
+        _poll(publisher, manager)
+
+        documents[NEWS_FEED] = (_rss([("new", -2), ("a", 0), ("b", 6)]), '"n2"')
+        stats = _poll(publisher, manager)
+
+        assert stats["new"] == 1
+        state = FeedState.objects.get(publisher=publisher, url=NEWS_FEED)
+        assert state.etag == '"n2"'
+        assert state.seen_ids[0] == entry_key({"link": "https://example.com/new"})
+        assert feed_dates(publisher)[0] == BASE + timedelta(hours=2)
+
+    def test_window_keeps_most_recent(self):
+        manager = _FakeManager({NEWS_FEED: (_rss([(f"p{i}", i) for i in range(10)]), '"n1"')})
+        publisher = PublisherFactory(rss_urls=[NEWS_FEED])
+
+        _poll(publisher, manager, WINDOW=4)
+
+        publisher.refresh_from_db()
+        assert feed_dates(publisher) == [BASE - timedelta(hours=i) for i in range(4)]
+
+    def test_failed_feed_keeps_state(self):
+        manager = _FakeManager({NEWS_FEED: (_rss([("a", 0), ("b", 6)]), '"n1"')})
+        publisher = PublisherFactory(rss_urls=[NEWS_FEED, SPORT_FEED])
+
+        stats = _poll(publisher, manager)
+
+        assert (stats["fetched"], stats["errors"]) == (1, 1)
+        assert not FeedState.objects.filter(url=SPORT_FEED).exists()
+        assert len(feed_dates(publisher)) == 2
+
+
+@pytest.mark.django_db
+class TestFrequencyStepFirstPass:
+    def test_polls_inline_feeds_and_enqueues_the_rest(self, monkeypatch, settings):
+        from publishers.pipeline import steps
+
+        third = "https://example.com/world/feed.xml"
+        settings.FEEDS = {"ENABLED": True, "INLINE_FEEDS": 2}
+        manager = _FakeManager(
+            {url: (_rss([("a", 0)]), None) for url in (NEWS_FEED, SPORT_FEED, third)}
+        )
+        monkeypatch.setattr(steps._fetch_manager, "stream", manager.stream)
+        poll_feeds = MagicMock()
+        monkeypatch.setattr(steps, "poll_feeds", poll_feeds)
+        publisher = PublisherFactory(rss_urls=[NEWS_FEED, SPORT_FEED, third])
+
+        steps.run_frequency_step(publisher)
+
+        assert {url for url, _ in manager.requests} == {NEWS_FEED, SPORT_FEED}
+        poll_feeds.delay.assert_called_once_with(publisher.pk)
+
+    def test_no_job_when_all_feeds_polled_inline(self, monkeypatch):
+        from publishers.pipeline import steps
+
+        manager = _FakeManager({NEWS_FEED: (_rss([("a", 0)]), None)})
+        monkeypatch.setattr(steps._fetch_manager, "stream", manager.stream)
+        poll_feeds = MagicMock()
+        monkeypatch.setattr(steps, "poll_feeds", poll_feeds)
+
+        steps.run_frequency_step(PublisherFactory(rss_urls=[NEWS_FEED]))
+
+        poll_feeds.delay.assert_not_called()
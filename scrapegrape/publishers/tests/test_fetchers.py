@@ -1,18 +1,60 @@
 """Tests for the fetch strategy module: CurlCffiFetcher, ZyteFetcher, FetchStrategyManager."""
 
+import asyncio
 import base64
+import threading
 from unittest.mock import MagicMock
 
 import pytest
 import requests
+from asgiref.sync import sync_to_async
 
 from publishers.factories import PublisherFactory
 from publishers.fetchers.base import FetchResult
-from publishers.fetchers.curl_cffi_fetcher import CurlCffiFetcher
-from publishers.fetchers.exceptions import AllStrategiesExhausted, FetchError
-from publishers.fetchers.manager import FetchStrategyManager
+from publishers.fetchers.cache import DiskCacheBackend, RedisCacheBackend, ResponseCache
+from publishers.fetchers.clients import HttpClientRegistry
+from publishers.fetchers.curl_cffi_fetcher import AsyncCurlCffiFetcher, CurlCffiFetcher
+from publishers.fetchers.documents import DocumentStore
+from publishers.fetchers.exceptions import (
+    AllStrategiesExhausted,
+    FetchError,
+    PolitenessTimeout,
+)
+from publishers.fetchers.hedging import LatencyTracker, hedge_stats, latency_tracker
+from publishers.fetchers.manager import AsyncFetchStrategyManager, FetchStrategyManager
+from publishers.fetchers.politeness import PolitenessLimiter
+from publishers.fetchers.streaming import BodyStream, max_bytes_for
+from publishers.fetchers.telemetry import StrategyScorer, attempt_recorder
 from publishers.fetchers.zyte_fetcher import ZyteFetcher
-from publishers.models import Publisher
+from publishers.models import FetchAttempt, Publisher
+
+
+def _curl_response(status_code, text, headers=None, chunk_size=None):
+    """A curl-cffi streamed response mock yielding *text* in chunks."""
+    body = text.encode()
+    size = chunk_size or max(len(body), 1)
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.charset_encoding = None
+    response.iter_content = lambda *args, **kwargs: iter(
+        [body[i : i + size] for i in range(0, len(body), size)]
+    )
+    return response
+
+
+def _async_curl_response(status_code, text, headers=None):
+    response = _curl_response(status_code, text, headers)
+
+    async def aiter_content(*args, **kwargs):
+        yield text.encode()
+
+    async def aclose():
+        pass
+
+    response.aiter_content = aiter_content
+    response.aclose = aclose
+    return response
 
 
 # ---------------------------------------------------------------------------
@@ -20,13 +62,11 @@ from publishers.models import Publisher
 # ---------------------------------------------------------------------------
 class TestCurlCffiFetcher:
     def test_successful_fetch(self, monkeypatch):
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.text = "<html><body>Hello</body></html>"
+        mock_response = _curl_response(200, "<html><body>Hello</body></html>")
 
         monkeypatch.setattr(
-            "publishers.fetchers.curl_cffi_fetcher.curl_requests.get",
-            lambda *args, **kwargs: mock_response,
+            "publishers.fetchers.curl_cffi_fetcher.http_clients.curl_session",
+            lambda: MagicMock(get=lambda *args, **kwargs: mock_response),
         )
 
         fetcher = CurlCffiFetcher()
@@ -38,13 +78,11 @@ class TestCurlCffiFetcher:
         assert result.url == "https://example.com"
 
     def test_403_raises_fetch_error(self, monkeypatch):
-        mock_response = MagicMock()
-        mock_response.status_code = 403
-        mock_response.text = "Access Denied"
+        mock_response = _curl_response(403, "Access Denied")
 
         monkeypatch.setattr(
-            "publishers.fetchers.curl_cffi_fetcher.curl_requests.get",
-            lambda *args, **kwargs: mock_response,
+            "publishers.fetchers.curl_cffi_fetcher.http_clients.curl_session",
+            lambda: MagicMock(get=lambda *args, **kwargs: mock_response),
         )
 
         fetcher = CurlCffiFetcher()
@@ -52,13 +90,13 @@ class TestCurlCffiFetcher:
             fetcher.fetch("https://example.com")
 
     def test_waf_signature_on_200_raises_fetch_error(self, monkeypatch):
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.text = "<html>Please wait... checking your browser</html>"
+        mock_response = _curl_response(
+            200, "<html>Please wait... checking your browser</html>"
+        )
 
         monkeypatch.setattr(
-            "publishers.fetchers.curl_cffi_fetcher.curl_requests.get",
-            lambda *args, **kwargs: mock_response,
+            "publishers.fetchers.curl_cffi_fetcher.http_clients.curl_session",
+            lambda: MagicMock(get=lambda *args, **kwargs: mock_response),
         )
 
         fetcher = CurlCffiFetcher()
@@ -69,8 +107,8 @@ class TestCurlCffiFetcher:
         from curl_cffi.requests.exceptions import RequestException
 
         monkeypatch.setattr(
-            "publishers.fetchers.curl_cffi_fetcher.curl_requests.get",
-            MagicMock(side_effect=RequestException("Connection refused")),
+            "publishers.fetchers.curl_cffi_fetcher.http_clients.curl_session",
+            lambda: MagicMock(get=MagicMock(side_effect=RequestException("Connection refused"))),
         )
 
         fetcher = CurlCffiFetcher()
@@ -78,6 +116,25 @@ class TestCurlCffiFetcher:
             fetcher.fetch("https://example.com")
         assert exc_info.value.strategy == "curl_cffi"
 
+    def test_keeps_headers_and_cookies(self, monkeypatch):
+        from curl_cffi.requests import Headers
+
+        headers = Headers([
+            ("Server", "cloudflare"),
+            ("Set-Cookie", "__cf_bm=abc; path=/; HttpOnly"),
+            ("Set-Cookie", "session=1; Secure"),
+        ])
+        mock_response = _curl_response(200, "<html>ok</html>", headers=headers)
+        monkeypatch.setattr(
+            "publishers.fetchers.curl_cffi_fetcher.http_clients.curl_session",
+            lambda: MagicMock(get=lambda *args, **kwargs: mock_response),
+        )
+
+        result = CurlCffiFetcher().fetch("https://example.com")
+
+        assert result.headers["server"] == "cloudflare"
+        assert result.cookies == {"__cf_bm": "abc", "session": "1"}
+
 
 # ---------------------------------------------------------------------------
 # ZyteFetcher
@@ -95,8 +152,8 @@ class TestZyteFetcher:
         mock_response.raise_for_status = MagicMock()
 
         monkeypatch.setattr(
-            "publishers.fetchers.zyte_fetcher.requests.post",
-            lambda *args, **kwargs: mock_response,
+            "publishers.fetchers.zyte_fetcher.http_clients.requests_session",
+            lambda: MagicMock(post=lambda *args, **kwargs: mock_response),
         )
 
         fetcher = ZyteFetcher()
@@ -106,6 +163,30 @@ class TestZyteFetcher:
         assert result.strategy_used == "zyte"
         assert result.status_code == 200
 
+    def test_keeps_every_set_cookie(self, monkeypatch):
+        monkeypatch.setenv("ZYTE_API_KEY", "fake-key")
+
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            "httpResponseBody": base64.b64encode(b"<html>Zyte</html>").decode(),
+            "httpResponseHeaders": [
+                {"name": "X-Akamai-Transformed", "value": "9 - 0 pmb=mRUM,1"},
+                {"name": "Set-Cookie", "value": "_abck=1~0; Path=/"},
+                {"name": "set-cookie", "value": "bm_sz=xyz; Max-Age=14400"},
+            ],
+        }
+        mock_response.raise_for_status = MagicMock()
+        monkeypatch.setattr(
+            "publishers.fetchers.zyte_fetcher.http_clients.requests_session",
+            lambda: MagicMock(post=lambda *args, **kwargs: mock_response),
+        )
+
+        result = ZyteFetcher().fetch("https://example.com")
+
+        assert result.headers["x-akamai-transformed"] == "9 - 0 pmb=mRUM,1"
+        assert result.cookies == {"_abck": "1~0", "bm_sz": "xyz"}
+
     def test_missing_api_key_raises_fetch_error(self, monkeypatch):
         monkeypatch.delenv("ZYTE_API_KEY", raising=False)
 
@@ -117,8 +198,8 @@ class TestZyteFetcher:
         monkeypatch.setenv("ZYTE_API_KEY", "fake-key")
 
         monkeypatch.setattr(
-            "publishers.fetchers.zyte_fetcher.requests.post",
-            MagicMock(side_effect=requests.RequestException("API error")),
+            "publishers.fetchers.zyte_fetcher.http_clients.requests_session",
+            lambda: MagicMock(post=MagicMock(side_effect=requests.RequestException("API error"))),
         )
 
         fetcher = ZyteFetcher()
@@ -204,12 +285,17 @@ class TestFetchStrategyManager:
         )
 
         result = manager.fetch("https://example.com", publisher=publisher)
+        attempt_recorder.flush()
         publisher.refresh_from_db()
 
         assert result.strategy_used == "zyte"
         assert publisher.fetch_strategy == "zyte"
 
-    def test_no_db_write_when_strategy_unchanged(self, monkeypatch, django_assert_num_queries):
+    def test_no_db_write_when_strategy_unchanged(
+        self, monkeypatch, settings, django_assert_num_queries
+    ):
+        # Adaptive ordering would load the domain's attempts.
+        settings.FETCH_TELEMETRY = {"ADAPTIVE_ORDERING": False}
         publisher = PublisherFactory(fetch_strategy="curl_cffi")
 
         curl_result = FetchResult(
@@ -282,6 +368,806 @@ class TestFetchStrategyManager:
         assert result.html == "<html>ok</html>"
 
 
+# ---------------------------------------------------------------------------
+# Async fetchers and AsyncFetchStrategyManager
+# ---------------------------------------------------------------------------
+class TestAsyncCurlCffiFetcher:
+    @pytest.mark.asyncio
+    async def test_successful_fetch(self, monkeypatch):
+        mock_response = _async_curl_response(200, "<html>async</html>")
+
+        async def fake_get(*args, **kwargs):
+            return mock_response
+
+        monkeypatch.setattr(
+            "publishers.fetchers.curl_cffi_fetcher.http_clients.async_curl_session",
+            lambda: MagicMock(get=fake_get),
+        )
+
+        result = await AsyncCurlCffiFetcher().fetch("https://example.com")
+        assert result.html == "<html>async</html>"
+        assert result.strategy_used == "curl_cffi"
+
+    @pytest.mark.asyncio
+    async def test_waf_block_raises_fetch_error(self, monkeypatch):
+        mock_response = _async_curl_response(403, "Access Denied")
+
+        async def fake_get(*args, **kwargs):
+            return mock_response
+
+        monkeypatch.setattr(
+            "publishers.fetchers.curl_cffi_fetcher.http_clients.async_curl_session",
+            lambda: MagicMock(get=fake_get),
+        )
+
+        with pytest.raises(FetchError, match="WAF block"):
+            await AsyncCurlCffiFetcher().fetch("https://example.com")
+
+
+def _async_fetch(strategy, calls, fail=False):
+    async def fetch(url):
+        calls.append((strategy, url))
+        if fail:
+            raise FetchError(f"{strategy} failed", strategy=strategy)
+        return FetchResult(html=url, status_code=200, strategy_used=strategy, url=url)
+
+    return fetch
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncFetchStrategyManager:
+    def test_shares_core_but_not_sync_api(self):
+        manager = AsyncFetchStrategyManager(hedging=False)
+
+        assert not isinstance(manager, FetchStrategyManager)
+        assert not hasattr(manager, "stream") and not hasattr(manager, "cache")
+        assert manager._preferred_strategies(None) == FetchStrategyManager.STRATEGIES
+
+    @pytest.mark.asyncio
+    async def test_falls_back_and_remembers_strategy(self, monkeypatch):
+        publisher = await Publisher.objects.acreate(
+            name="async.com", url="https://async.com", domain="async.com"
+        )
+        calls = []
+        manager = AsyncFetchStrategyManager()
+        monkeypatch.setattr(
+            manager._fetchers["curl_cffi"], "fetch", _async_fetch("curl_cffi", calls, fail=True)
+        )
+        monkeypatch.setattr(manager._fetchers["zyte"], "fetch", _async_fetch("zyte", calls))
+
+        result = await manager.fetch("https://async.com/", publisher=publisher)
+
+        assert result.strategy_used == "zyte"
+        assert [c[0] for c in calls] == ["curl_cffi", "zyte"]
+        await sync_to_async(attempt_recorder.flush)()
+        await publisher.arefresh_from_db()
+        assert publisher.fetch_strategy == "zyte"
+
+    @pytest.mark.asyncio
+    async def test_uses_remembered_strategy_first(self, monkeypatch):
+        publisher = Publisher(name="z.com", url="https://z.com", domain="z.com", fetch_strategy="zyte")
+        calls = []
+        manager = AsyncFetchStrategyManager()
+        monkeypatch.setattr(manager._fetchers["curl_cffi"], "fetch", _async_fetch("curl_cffi", calls))
+        monkeypatch.setattr(manager._fetchers["zyte"], "fetch", _async_fetch("zyte", calls))
+
+        await manager.fetch("https://z.com/", publisher=publisher)
+        assert calls == [("zyte", "https://z.com/")]
+
+    @pytest.mark.asyncio
+    async def test_fetch_many_preserves_order_and_returns_failures(self, monkeypatch):
+        calls = []
+        manager = AsyncFetchStrategyManager()
+
+        async def curl_fetch(url):
+            if url.endswith("/dead"):
+                raise FetchError("dead", strategy="curl_cffi")
+            return await _async_fetch("curl_cffi", calls)(url)
+
+        monkeypatch.setattr(manager._fetchers["curl_cffi"], "fetch", curl_fetch)
+        monkeypatch.setattr(
+            manager._fetchers["zyte"], "fetch", _async_fetch("zyte", calls, fail=True)
+        )
+
+        urls = ["https://a.com/1", "https://a.com/dead", "https://a.com/2"]
+        results = await manager.fetch_many(urls)
+
+        assert results[0].html == "https://a.com/1"
+        assert isinstance(results[1], AllStrategiesExhausted)
+        assert results[2].html == "https://a.com/2"
+
+    @pytest.mark.asyncio
+    async def test_fetch_many_bounds_concurrency(self, monkeypatch):
+        import asyncio
+
+        in_flight = 0
+        peak = 0
+
+        async def slow_fetch(url):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return FetchResult(html="", status_code=200, strategy_used="curl_cffi", url=url)
+
+        manager = AsyncFetchStrategyManager()
+        monkeypatch.setattr(manager._fetchers["curl_cffi"], "fetch", slow_fetch)
+
+        await manager.fetch_many([f"https://a.com/{i}" for i in range(10)], concurrency=3)
+        assert peak == 3
+
+
+# ---------------------------------------------------------------------------
+# Streaming and byte caps
+# ---------------------------------------------------------------------------
+class TestBodyStream:
+    def _stream(self, chunks, **kwargs):
+        closed = []
+        body = BodyStream(
+            chunks,
+            url="https://example.com/",
+            status_code=200,
+            strategy_used="curl_cffi",
+            on_close=lambda: closed.append(True),
+            **kwargs,
+        )
+        return body, closed
+
+    def test_reads_all_chunks(self):
+        body, closed = self._stream([b"ab", b"cd"])
+        assert body.read() == b"abcd"
+        assert body.truncated is False
+        assert closed == [True]
+
+    def test_truncates_at_max_bytes(self):
+        body, _ = self._stream([b"abc", b"def", b"ghi"], max_bytes=5)
+        result = body.to_result()
+        assert result.html == "abcde"
+        assert result.truncated is True
+
+    def test_exact_cap_not_truncated(self):
+        body, _ = self._stream([b"abc", b"de"], max_bytes=5)
+        assert body.read() == b"abcde"
+        assert body.truncated is False
+
+    def test_early_stop_closes_without_reading_rest(self):
+        pulled = []
+
+        def chunks():
+            for i in range(100):
+                pulled.append(i)
+                yield b"x" * 10
+
+        body, closed = self._stream(chunks())
+        with body:
+            for chunk in body.iter_bytes():
+                break
+        assert closed == [True]
+        assert len(pulled) == 1
+
+    def test_peek_does_not_consume(self):
+        body, _ = self._stream([b"hello ", b"world"])
+        assert body.peek(3) == b"hel"
+        assert body.read() == b"hello world"
+
+    def test_iter_text_keeps_multibyte_characters(self):
+        data = "café".encode()
+        body, _ = self._stream([data[:4], data[4:]])
+        assert "".join(body.iter_text()) == "café"
+
+    def test_robots_cap_by_url(self):
+        assert max_bytes_for("text/html", "https://example.com/robots.txt") == 500 * 1024
+        assert max_bytes_for("application/xml; charset=utf-8") == 50 * 1024 * 1024
+
+    def test_curl_fetch_applies_content_type_cap(self, monkeypatch, settings):
+        settings.FETCH_MAX_BYTES = {"text/plain": 10}
+        response = _curl_response(
+            200, "User-agent: *\nDisallow: /", headers={"Content-Type": "text/plain"}, chunk_size=4
+        )
+        monkeypatch.setattr(
+            "publishers.fetchers.curl_cffi_fetcher.http_clients.curl_session",
+            lambda: MagicMock(get=lambda *args, **kwargs: response),
+        )
+
+        result = CurlCffiFetcher().fetch("https://example.com/file.txt")
+
+        assert result.html == "User-agent"
+        assert result.truncated is True
+        response.close.assert_called_once()
+
+    def test_curl_stream_checks_waf_before_returning(self, monkeypatch):
+        response = _curl_response(200, "<html>Just a moment...</html>")
+        monkeypatch.setattr(
+            "publishers.fetchers.curl_cffi_fetcher.http_clients.curl_session",
+            lambda: MagicMock(get=lambda *args, **kwargs: response),
+        )
+
+        with pytest.raises(FetchError, match="WAF block"):
+            CurlCffiFetcher().stream("https://example.com/")
+        response.close.assert_called_once()
+
+    @pytest.mark.django_db
+    def test_manager_stream_falls_back(self, monkeypatch):
+        def failing_stream(url, max_bytes=None):
+            raise FetchError("blocked", strategy="curl_cffi")
+
+        manager = FetchStrategyManager()
+        monkeypatch.setattr(manager._fetchers["curl_cffi"], "stream", failing_stream)
+        monkeypatch.setattr(
+            manager._fetchers["zyte"],
+            "stream",
+            lambda url, max_bytes=None: BodyStream.from_text(
+                "<urlset/>", url=url, status_code=200, strategy_used="zyte"
+            ),
+        )
+        publisher = PublisherFactory(fetch_strategy="")
+
+        with manager.stream("https://example.com/sitemap.xml", publisher=publisher) as body:
+            assert body.strategy_used == "zyte"
+            assert body.read() == b"<urlset/>"
+        attempt_recorder.flush()
+        publisher.refresh_from_db()
+        assert publisher.fetch_strategy == "zyte"
+
+    def test_manager_stream_passes_validators(self, monkeypatch):
+        sent = {}
+
+        def conditional_stream(url, headers=None, max_bytes=None):
+            sent.update(headers)
+            return BodyStream.from_text("", url=url, status_code=304, strategy_used="curl_cffi")
+
+        manager = FetchStrategyManager()
+        monkeypatch.setattr(manager._fetchers["curl_cffi"], "stream", conditional_stream)
+
+        with manager.stream(
+            "https://example.com/sitemap.xml", headers={"If-None-Match": '"v1"'}
+        ) as body:
+            assert body.status_code == 304
+        assert sent == {"If-None-Match": '"v1"'}
+
+
+# ---------------------------------------------------------------------------
+# ResponseCache
+# ---------------------------------------------------------------------------
+def _cached_manager(tmp_path, max_bytes=10_000_000):
+    cache = ResponseCache(DiskCacheBackend(tmp_path, max_bytes=max_bytes))
+    return FetchStrategyManager(cache=cache), cache
+
+
+class TestResponseCache:
+    def test_fresh_entry_served_without_request(self, tmp_path, monkeypatch):
+        manager, cache = _cached_manager(tmp_path)
+        calls = []
+
+        def curl(url):
+            calls.append(url)
+            return FetchResult(
+                html="<html>hi</html>",
+                status_code=200,
+                strategy_used="curl_cffi",
+                url=url,
+                headers={"content-type": "text/html"},
+            )
+
+        monkeypatch.setattr(manager._fetchers["curl_cffi"], "fetch", curl)
+
+        first = manager.fetch("https://example.com/")
+        second = manager.fetch("https://example.com/")
+
+        assert first.cache_status == "miss"
+        assert second.cache_status == "hit"
+        assert second.html == "<html>hi</html>"
+        assert calls == ["https://example.com/"]
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_stale_entry_revalidated_with_304(self, tmp_path, monkeypatch):
+        manager, cache = _cached_manager(tmp_path)
+        cache.store(
+            FetchResult(
+                html="User-agent: *",
+                status_code=200,
+                strategy_used="curl_cffi",
+                url="https://example.com/robots.txt",
+                headers={"etag": '"v1"', "content-type": "text/plain"},
+            )
+        )
+        entry = cache.get("https://example.com/robots.txt")
+        entry.expires_at = 0
+        cache.backend.set(cache.key(entry.url), entry.dumps())
+
+        sent = {}
+
+        def curl(url, headers=None):
+            sent.update(headers or {})
+            return FetchResult(
+                html="", status_code=304, strategy_used="curl_cffi", url=url
+            )
+
+        monkeypatch.setattr(manager._fetchers["curl_cffi"], "fetch", curl)
+        result = manager.fetch("https://example.com/robots.txt")
+
+        assert sent == {"If-None-Match": '"v1"'}
+        assert result.cache_status == "revalidated"
+        assert result.status_code == 200
+        assert result.html == "User-agent: *"
+        assert cache.get("https://example.com/robots.txt").is_fresh()
+        assert cache.stats()["revalidations"] == 1
+        assert cache.stats()["bytes_saved"] == len("User-agent: *")
+
+    def test_zyte_savings_counted_on_hit(self, tmp_path):
+        _, cache = _cached_manager(tmp_path)
+        result = FetchResult(
+            html="abc", status_code=200, strategy_used="zyte", url="https://a.com/"
+        )
+        manager = FetchStrategyManager(cache=cache)
+        cache.store(result)
+
+        assert manager.fetch("https://a.com/").strategy_used == "zyte"
+        assert cache.stats()["zyte_requests_saved"] == 1
+
+    def test_non_200_not_cached(self, tmp_path):
+        _, cache = _cached_manager(tmp_path)
+        cache.store(
+            FetchResult(html="", status_code=404, strategy_used="curl_cffi", url="https://a.com/")
+        )
+        assert cache.get("https://a.com/") is None
+
+    def test_truncated_body_not_cached(self, tmp_path, monkeypatch):
+        manager, cache = _cached_manager(tmp_path)
+        result = FetchResult(
+            html="<html>cut", status_code=200, strategy_used="curl_cffi",
+            url="https://a.com/", truncated=True,
+        )
+        monkeypatch.setattr(manager._fetchers["curl_cffi"], "fetch", lambda url: result)
+
+        assert manager.fetch("https://a.com/").truncated
+        assert cache.store(result) is None
+        assert cache.get("https://a.com/") is None
+
+    def test_key_uses_canonical_url(self):
+        assert ResponseCache.key("https://a.com/?b=2&a=1") == ResponseCache.key(
+            "https://a.com/?a=1&b=2"
+        )
+
+    def test_ttl_by_content_type(self, tmp_path):
+        _, cache = _cached_manager(tmp_path)
+        assert cache.ttl_for("text/plain; charset=utf-8") == 24 * 3600
+        assert cache.ttl_for("application/rss+xml") == 6 * 3600
+        assert cache.ttl_for("text/html") == 3600
+        assert cache.ttl_for(None) == 3600
+
+    def test_lru_eviction_over_max_bytes(self, tmp_path):
+        import os
+
+        _, cache = _cached_manager(tmp_path)
+        for i, url in enumerate(["https://a.com/1", "https://a.com/2"]):
+            cache.store(
+                FetchResult(html="x" * 100, status_code=200, strategy_used="curl_cffi", url=url)
+            )
+            os.utime(cache.backend._path(cache.key(url)), (i, i))
+        size = cache.backend._path(cache.key("https://a.com/2")).stat().st_size
+        # Room for two entries (plus slack for varying timestamps), not three.
+        cache.backend.max_bytes = size * 2 + size // 2
+
+        cache.store(
+            FetchResult(html="y" * 100, status_code=200, strategy_used="curl_cffi", url="https://a.com/3")
+        )
+
+        assert cache.get("https://a.com/1") is None
+        assert cache.get("https://a.com/2") is not None
+        assert cache.get("https://a.com/3") is not None
+
+    def test_redis_backend_by_default(self, redis_client):
+        cache = FetchStrategyManager().cache
+
+        assert isinstance(cache.backend, RedisCacheBackend)
+        assert cache.backend.client is redis_client
+
+    def test_disabled_without_backend(self, settings):
+        settings.FETCH_CACHE = {"BACKEND": None}
+        assert FetchStrategyManager().cache is None
+
+
+# ---------------------------------------------------------------------------
+# Hedged fetches
+# ---------------------------------------------------------------------------
+def _result(strategy, url="https://example.com/"):
+    return FetchResult(html=strategy, status_code=200, strategy_used=strategy, url=url)
+
+
+class TestHedgedFetch:
+    @pytest.fixture(autouse=True)
+    def _fast_hedging(self, settings):
+        settings.FETCH_HEDGING = {"DEFAULT_DELAY": 0.05, "MIN_SAMPLES": 5}
+        hedge_stats.clear()
+        latency_tracker.clear()
+        yield
+        hedge_stats.clear()
+        latency_tracker.clear()
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_is_hedged_and_backup_wins(self, monkeypatch):
+        async def slow_curl(url):
+            await asyncio.sleep(5)
+            return _result("curl_cffi")
+
+        async def zyte(url):
+            return _result("zyte")
+
+        manager = AsyncFetchStrategyManager(hedging=True)
+        monkeypatch.setattr(manager._fetchers["curl_cffi"], "fetch", slow_curl)
+        monkeypatch.setattr(manager._fetchers["zyte"], "fetch", zyte)
+
+        result = await manager.fetch("https://example.com/")
+
+        assert result.strategy_used == "zyte"
+        stats = hedge_stats.snapshot()
+        assert stats["hedged"] == 1
+        assert stats["hedge_wins"] == 1
+        assert stats["hedge_zyte_requests"] == 1
+        assert stats["win_rate"] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_primary_wins_after_hedge_counts_wasted_zyte(self, monkeypatch):
+        async def curl(url):
+            await asyncio.sleep(0.2)
+            return _result("curl_cffi")
+
+        async def slow_zyte(url):
+            await asyncio.sleep(5)
+            return _result("zyte")
+
+        manager = AsyncFetchStrategyManager(hedging=True)
+        monkeypatch.setattr(manager._fetchers["curl_cffi"], "fetch", curl)
+        monkeypatch.setattr(manager._fetchers["zyte"], "fetch", slow_zyte)
+
+        result = await manager.fetch("https://example.com/")
+
+        assert result.strategy_used == "curl_cffi"
+        stats = hedge_stats.snapshot()
+        assert stats["hedged"] == 1
+        assert stats["hedge_wins"] == 0
+        assert stats["wasted_zyte_requests"] == 1
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_not_hedged(self, monkeypatch):
+        calls = []
+        manager = AsyncFetchStrategyManager(hedging=True)
+        monkeypatch.setattr(manager._fetchers["curl_cffi"], "fetch", _async_fetch("curl_cffi", []))
+        monkeypatch.setattr(manager._fetchers["zyte"], "fetch", _async_fetch("zyte", calls))
+
+        assert (await manager.fetch("https://example.com/")).strategy_used == "curl_cffi"
+        assert calls == []
+        assert hedge_stats.snapshot()["hedged"] == 0
+        assert hedge_stats.snapshot()["fetches"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_primary_falls_back_without_hedge(self, monkeypatch):
+        manager = AsyncFetchStrategyManager(hedging=True)
+        monkeypatch.setattr(
+            manager._fetchers["curl_cffi"], "fetch", _async_fetch("curl_cffi", [], fail=True)
+        )
+        monkeypatch.setattr(manager._fetchers["zyte"], "fetch", _async_fetch("zyte", []))
+
+        assert (await manager.fetch("https://example.com/")).strategy_used == "zyte"
+        assert hedge_stats.snapshot()["hedged"] == 0
+
+    @pytest.mark.asyncio
+    async def test_all_fail_raises(self, monkeypatch):
+        manager = AsyncFetchStrategyManager(hedging=True)
+        monkeypatch.setattr(
+            manager._fetchers["curl_cffi"], "fetch", _async_fetch("curl_cffi", [], fail=True)
+        )
+        monkeypatch.setattr(manager._fetchers["zyte"], "fetch", _async_fetch("zyte", [], fail=True))
+
+        with pytest.raises(AllStrategiesExhausted) as exc_info:
+            await manager.fetch("https://example.com/")
+        assert len(exc_info.value.errors) == 2
+
+    def test_hedging_off_by_default(self):
+        assert AsyncFetchStrategyManager().hedging is False
+
+    def test_sync_manager_without_loop_does_not_hedge(self, monkeypatch, settings):
+        settings.FETCH_HEDGING = {"ENABLED": True, "DEFAULT_DELAY": 0.01}
+        calls = []
+
+        def slow_curl(url):
+            calls.append("curl_cffi")
+            threading.Event().wait(0.1)
+            return _result("curl_cffi")
+
+        manager = FetchStrategyManager()
+        monkeypatch.setattr(manager._fetchers["curl_cffi"], "fetch", slow_curl)
+        monkeypatch.setattr(manager._fetchers["zyte"], "fetch", lambda url: calls.append("zyte"))
+
+        assert manager.fetch("https://example.com/").strategy_used == "curl_cffi"
+        assert calls == ["curl_cffi"]
+        assert hedge_stats.snapshot()["fetches"] == 0
+
+    def test_sync_manager_hedges_on_loop_and_cancels_loser(self, monkeypatch, settings):
+        from publishers.pipeline.loop import EventLoopThread
+
+        settings.FETCH_HEDGING = {"ENABLED": True, "DEFAULT_DELAY": 0.05, "MIN_SAMPLES": 5}
+        cancelled = []
+
+        async def slow_curl(url):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append("curl_cffi")
+                raise
+            return _result("curl_cffi")
+
+        async def zyte(url):
+            return _result("zyte")
+
+        manager = FetchStrategyManager()
+        hedger = manager._async_hedger()
+        monkeypatch.setattr(hedger._fetchers["curl_cffi"], "fetch", slow_curl)
+        monkeypatch.setattr(hedger._fetchers["zyte"], "fetch", zyte)
+        loop = EventLoopThread(name="test-hedge-loop")
+        try:
+            store = DocumentStore(manager, loop=loop)
+            result = store.fetch("https://example.com/")
+            loop.run(asyncio.sleep(0))
+        finally:
+            loop.close()
+
+        assert result.strategy_used == "zyte"
+        assert cancelled == ["curl_cffi"]
+        assert hedge_stats.snapshot()["hedge_wins"] == 1
+
+    @pytest.mark.asyncio
+    async def test_async_hedge_cancels_loser(self, monkeypatch):
+        cancelled = []
+
+        async def slow_curl(url):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append("curl_cffi")
+                raise
+            return _result("curl_cffi")
+
+        async def zyte(url):
+            return _result("zyte")
+
+        manager = AsyncFetchStrategyManager(hedging=True)
+        monkeypatch.setattr(manager._fetchers["curl_cffi"], "fetch", slow_curl)
+        monkeypatch.setattr(manager._fetchers["zyte"], "fetch", zyte)
+
+        result = await manager.fetch("https://example.com/")
+        await asyncio.sleep(0)
+
+        assert result.strategy_used == "zyte"
+        assert cancelled == ["curl_cffi"]
+        assert hedge_stats.snapshot()["hedge_wins"] == 1
+
+
+class TestLatencyTracker:
+    CONFIG = {
+        "PERCENTILE": 95,
+        "DEFAULT_DELAY": 5.0,
+        "MIN_DELAY": 0.5,
+        "MAX_DELAY": 20.0,
+        "MIN_SAMPLES": 5,
+    }
+
+    def test_default_delay_until_enough_samples(self):
+        tracker = LatencyTracker()
+        tracker.observe("a.com", "curl_cffi", 1.0)
+        assert tracker.hedge_delay("a.com", "curl_cffi", self.CONFIG) == 5.0
+
+    def test_p95_of_samples(self):
+        tracker = LatencyTracker()
+        for i in range(1, 21):
+            tracker.observe("a.com", "curl_cffi", float(i))
+        assert tracker.percentile("a.com", "curl_cffi", 95) == 19.0
+        assert tracker.hedge_delay("a.com", "curl_cffi", self.CONFIG) == 19.0
+
+    def test_delay_clamped(self):
+        tracker = LatencyTracker()
+        for _ in range(10):
+            tracker.observe("a.com", "curl_cffi", 0.01)
+            tracker.observe("b.com", "curl_cffi", 60.0)
+        assert tracker.hedge_delay("a.com", "curl_cffi", self.CONFIG) == 0.5
+        assert tracker.hedge_delay("b.com", "curl_cffi", self.CONFIG) == 20.0
+
+    def test_window_limits_samples(self):
+        tracker = LatencyTracker()
+        for i in range(10):
+            tracker.observe("a.com", "zyte", float(i), window=3)
+        assert tracker.percentile("a.com", "zyte", 0) == 7.0
+
+
+# ---------------------------------------------------------------------------
+# PolitenessLimiter
+# ---------------------------------------------------------------------------
+def _limiter(waits, **config):
+    """A limiter whose acquire script returns the given waits in turn."""
+    client = MagicMock()
+    script = MagicMock(side_effect=[str(w).encode() for w in waits])
+    client.register_script.return_value = script
+    limiter = PolitenessLimiter(
+        client=client,
+        config={
+            "ENABLED": True,
+            "RATE": 1.0,
+            "BURST": 3,
+            "MAX_CONCURRENCY": 2,
+            "LEASE_SECONDS": 60,
+            "MAX_WAIT_SECONDS": 5,
+            "CRAWL_DELAY_TTL": 3600,
+            **config,
+        },
+    )
+    return limiter, client, script
+
+
+class TestPolitenessLimiter:
+    def test_slot_acquired_and_released(self):
+        limiter, client, script = _limiter([0])
+
+        with limiter.slot("https://www.example.com/robots.txt"):
+            pass
+
+        keys = script.call_args.kwargs["keys"]
+        assert keys[0] == "polite:example.com:bucket"
+        token = script.call_args.kwargs["args"][-1]
+        client.zrem.assert_called_once_with("polite:example.com:slots", token)
+
+    def test_waits_until_slot_free(self, monkeypatch):
+        limiter, _, script = _limiter([0.1, 0.1, 0])
+        sleeps = []
+        monkeypatch.setattr("publishers.fetchers.politeness.time.sleep", sleeps.append)
+
+        with limiter.slot("https://example.com/"):
+            pass
+
+        assert sleeps == [0.1, 0.1]
+        assert script.call_count == 3
+
+    def test_times_out_beyond_max_wait(self):
+        limiter, client, _ = _limiter([30])
+
+        with pytest.raises(PolitenessTimeout) as exc_info:
+            with limiter.slot("https://example.com/", strategy="curl_cffi"):
+                pass
+
+        assert exc_info.value.strategy == "curl_cffi"
+        assert exc_info.value.domain == "example.com"
+        client.zrem.assert_not_called()
+
+    def test_fails_open_when_redis_unavailable(self):
+        limiter, _, script = _limiter([])
+        script.side_effect = ConnectionError("redis down")
+        entered = []
+
+        with limiter.slot("https://example.com/"):
+            entered.append(True)
+
+        assert entered == [True]
+
+    def test_disabled_skips_redis(self):
+        limiter, client, _ = _limiter([], ENABLED=False)
+
+        with limiter.slot("https://example.com/"):
+            pass
+
+        client.register_script.assert_not_called()
+
+    def test_set_crawl_delay(self):
+        limiter, client, _ = _limiter([])
+
+        limiter.set_crawl_delay("example.com", 5.0)
+        limiter.set_crawl_delay("example.com", None)
+
+        client.set.assert_called_once_with("polite:example.com:crawl_delay", 5.0, ex=3600)
+        client.delete.assert_called_once_with("polite:example.com:crawl_delay")
+
+    @pytest.mark.asyncio
+    async def test_async_slot(self, monkeypatch):
+        limiter, client, _ = _limiter([0.2, 0])
+        sleeps = []
+
+        async def fake_sleep(seconds):
+            sleeps.append(seconds)
+
+        monkeypatch.setattr("publishers.fetchers.politeness.asyncio.sleep", fake_sleep)
+
+        async with limiter.aslot("https://example.com/"):
+            pass
+
+        assert sleeps == [0.2]
+        client.zrem.assert_called_once()
+
+    def test_fetcher_timeout_is_not_fetch_error(self, monkeypatch):
+        limiter, _, _ = _limiter([30])
+        monkeypatch.setattr("publishers.fetchers.curl_cffi_fetcher.politeness", limiter)
+
+        with pytest.raises(PolitenessTimeout) as exc_info:
+            CurlCffiFetcher().fetch("https://example.com/")
+
+        assert not isinstance(exc_info.value, FetchError)
+
+    @pytest.mark.django_db
+    def test_manager_does_not_fall_back_on_timeout(self, monkeypatch):
+        calls = []
+
+        def busy_curl(url):
+            calls.append("curl_cffi")
+            raise PolitenessTimeout("No politeness slot", strategy="curl_cffi")
+
+        def zyte(url):
+            calls.append("zyte")
+            return FetchResult(html="ok", status_code=200, strategy_used="zyte", url=url)
+
+        manager = FetchStrategyManager()
+        monkeypatch.setattr(manager._fetchers["curl_cffi"], "fetch", busy_curl)
+        monkeypatch.setattr(manager._fetchers["zyte"], "fetch", zyte)
+
+        with pytest.raises(PolitenessTimeout):
+            manager.fetch("https://example.com/")
+
+        assert calls == ["curl_cffi"]
+        assert attempt_recorder.pending() == 0
+
+
+# ---------------------------------------------------------------------------
+# HttpClientRegistry
+# ---------------------------------------------------------------------------
+class TestHttpClientRegistry:
+    def test_clients_are_shared(self):
+        registry = HttpClientRegistry()
+        try:
+            assert registry.httpx_client() is registry.httpx_client()
+            assert registry.requests_session() is registry.requests_session()
+            assert registry.curl_session() is registry.curl_session()
+        finally:
+            registry.close()
+
+    def test_limits_read_from_settings(self, settings):
+        settings.HTTP_CLIENT_LIMITS = {"max_connections_per_host": 3}
+        registry = HttpClientRegistry()
+        try:
+            assert registry.limits["max_connections_per_host"] == 3
+            assert registry.limits["max_connections"] == 100
+            adapter = registry.requests_session().get_adapter("https://api.zyte.com/")
+            assert adapter._pool_maxsize == 3
+        finally:
+            registry.close()
+
+    def test_record_counts_hits_and_misses_per_host(self):
+        registry = HttpClientRegistry(limits={"keepalive_expiry": 30.0})
+
+        assert registry.record("curl_cffi", "https://example.com/robots.txt") is False
+        assert registry.record("curl_cffi", "https://example.com/") is True
+        assert registry.record("curl_cffi", "https://other.com/") is False
+        assert registry.record("zyte", "https://example.com/") is False
+
+        assert registry.stats() == {
+            "curl_cffi": {"hits": 1, "misses": 2},
+            "zyte": {"hits": 0, "misses": 1},
+        }
+
+    def test_record_expired_keepalive_is_miss(self, monkeypatch):
+        registry = HttpClientRegistry(limits={"keepalive_expiry": 30.0})
+        clock = iter([0.0, 31.0])
+        monkeypatch.setattr(
+            "publishers.fetchers.clients.monotonic", lambda: next(clock)
+        )
+
+        registry.record("httpx", "https://example.com/a")
+        assert registry.record("httpx", "https://example.com/b") is False
+
+    def test_http2_requires_h2_package(self, monkeypatch):
+        registry = HttpClientRegistry(limits={"http2": True})
+        monkeypatch.setattr("publishers.fetchers.clients.find_spec", lambda name: None)
+        assert registry.http2_enabled is False
+
+
 # ---------------------------------------------------------------------------
 # Publisher fetch_strategy field
 # ---------------------------------------------------------------------------
@@ -298,3 +1184,247 @@ class TestPublisherFetchStrategy:
         assert "" in choice_values
         assert "curl_cffi" in choice_values
         assert "zyte" in choice_values
+
+
+# ---------------------------------------------------------------------------
+# Job-scoped document store
+# ---------------------------------------------------------------------------
+class TestDocumentStore:
+    def _store(self, fetch):
+        manager = MagicMock()
+        manager.fetch.side_effect = fetch
+        return DocumentStore(manager), manager
+
+    def test_same_canonical_url_fetched_once(self):
+        store, manager = self._store(
+            lambda url, publisher=None, loop=None: FetchResult(
+                html="<html/>", status_code=200, strategy_used="curl_cffi", url=url,
+                headers={"server": "nginx"},
+            )
+        )
+
+        first = store.fetch("https://www.example.com")
+        second = store.fetch("https://example.com/#top")
+
+        assert second is first
+        assert second.headers == {"server": "nginx"}
+        assert manager.fetch.call_count == 1
+        assert (store.fetches, store.reused) == (1, 1)
+        assert "https://example.com/" in store
+        assert store.get("https://example.com/") is first
+
+    def test_failure_is_remembered(self):
+        store, manager = self._store(MagicMock(side_effect=AllStrategiesExhausted("down")))
+
+        for _ in range(2):
+            with pytest.raises(AllStrategiesExhausted):
+                store.fetch("https://example.com/")
+        assert manager.fetch.call_count == 1
+        assert store.get("https://example.com/") is None
+
+    def test_concurrent_callers_share_one_fetch(self):
+        release = threading.Event()
+        calls = []
+
+        def slow_fetch(url, publisher=None, loop=None):
+            calls.append(url)
+            release.wait(5)
+            return FetchResult(html="ok", status_code=200, strategy_used="zyte", url=url)
+
+        store, _ = self._store(slow_fetch)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(store.fetch("https://example.com/a")))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert calls == ["https://example.com/a"]
+        assert len(results) == 4 and all(r is results[0] for r in results)
+
+
+# ---------------------------------------------------------------------------
+# Fetch attempt telemetry and adaptive strategy ordering
+# ---------------------------------------------------------------------------
+def _blocking_manager(monkeypatch, calls=None):
+    """Manager whose curl_cffi strategy is WAF-blocked and zyte succeeds."""
+    calls = calls if calls is not None else []
+
+    def blocked_curl(url):
+        calls.append("curl_cffi")
+        raise FetchError("WAF block detected (status=403)", "curl_cffi", blocked=True, status_code=403)
+
+    def zyte(url):
+        calls.append("zyte")
+        return FetchResult(html="<html>ok</html>", status_code=200, strategy_used="zyte", url=url)
+
+    manager = FetchStrategyManager()
+    monkeypatch.setattr(manager._fetchers["curl_cffi"], "fetch", blocked_curl)
+    monkeypatch.setattr(manager._fetchers["zyte"], "fetch", zyte)
+    return manager
+
+
+@pytest.mark.django_db
+class TestFetchTelemetry:
+    def test_attempts_written_on_flush(self, monkeypatch):
+        manager = _blocking_manager(monkeypatch)
+
+        manager.fetch("https://www.example.com/a")
+        assert FetchAttempt.objects.count() == 0
+        assert attempt_recorder.flush() == 2
+
+        blocked = FetchAttempt.objects.get(strategy="curl_cffi")
+        assert blocked.domain == "example.com"
+        assert blocked.outcome == "blocked"
+        assert blocked.status_code == 403
+        assert "WAF block" in blocked.block_reason
+        success = FetchAttempt.objects.get(strategy="zyte")
+        assert success.outcome == "success"
+        assert success.status_code == 200
+        assert success.bytes == len("<html>ok</html>")
+
+    def test_flushes_when_batch_is_full(self, monkeypatch, settings):
+        settings.FETCH_TELEMETRY = {"ADAPTIVE_ORDERING": False, "BATCH_SIZE": 2}
+        manager = _blocking_manager(monkeypatch)
+
+        manager.fetch("https://example.com/a")
+
+        assert FetchAttempt.objects.count() == 2
+        assert attempt_recorder.pending() == 0
+
+    def test_disabled_records_nothing(self, monkeypatch, settings):
+        settings.FETCH_TELEMETRY = {"ENABLED": False, "ADAPTIVE_ORDERING": False}
+        manager = _blocking_manager(monkeypatch)
+
+        manager.fetch("https://example.com/a")
+
+        assert attempt_recorder.flush() == 0
+
+    def test_strategy_change_deferred_to_flush(
+        self, monkeypatch, settings, django_assert_num_queries
+    ):
+        settings.FETCH_TELEMETRY = {"ADAPTIVE_ORDERING": False}
+        manager = _blocking_manager(monkeypatch)
+        publisher = PublisherFactory(fetch_strategy="")
+
+        with django_assert_num_queries(0):
+            manager.fetch("https://example.com/a", publisher=publisher)
+        assert publisher.fetch_strategy == "zyte"
+        assert Publisher.objects.get(pk=publisher.pk).fetch_strategy == ""
+
+        attempt_recorder.flush()
+        assert Publisher.objects.get(pk=publisher.pk).fetch_strategy == "zyte"
+
+    def test_adaptive_ordering_skips_failing_strategy(self, monkeypatch, settings):
+        settings.FETCH_TELEMETRY = {"ADAPTIVE_ORDERING": True}
+        calls = []
+        manager = _blocking_manager(monkeypatch, calls)
+
+        manager.fetch("https://example.com/a")
+        manager.fetch("https://example.com/b")
+        manager.fetch("https://other.com/")
+
+        assert calls == ["curl_cffi", "zyte", "zyte", "curl_cffi", "zyte"]
+
+
+@pytest.mark.django_db
+class TestStrategyScorer:
+    CONFIG = {"ADAPTIVE_ORDERING": True}
+
+    def test_no_data_keeps_given_order(self, settings):
+        settings.FETCH_TELEMETRY = self.CONFIG
+        scorer = StrategyScorer()
+        assert scorer.order("example.com", ["curl_cffi", "zyte"]) == ["curl_cffi", "zyte"]
+
+    def test_slow_failing_strategy_ordered_last(self, settings):
+        settings.FETCH_TELEMETRY = self.CONFIG
+        scorer = StrategyScorer()
+        for _ in range(5):
+            scorer.observe("slow.com", "curl_cffi", False, 30.0)
+            scorer.observe("slow.com", "zyte", True, 3.0)
+
+        assert scorer.order("slow.com", ["curl_cffi", "zyte"]) == ["zyte", "curl_cffi"]
+        assert scorer.order("fast.com", ["curl_cffi", "zyte"]) == ["curl_cffi", "zyte"]
+
+    def test_old_failures_decay(self, settings):
+        settings.FETCH_TELEMETRY = {**self.CONFIG, "HALF_LIFE_HOURS": 1.0}
+        scorer = StrategyScorer()
+        now = 1_000_000.0
+        for _ in range(10):
+            scorer.observe("example.com", "curl_cffi", False, 30.0, at=now - 20 * 3600)
+        scorer.observe("example.com", "zyte", True, 3.0, at=now - 20 * 3600)
+        assert scorer.order("example.com", ["curl_cffi", "zyte"]) == ["zyte", "curl_cffi"]
+
+        for _ in range(3):
+            scorer.observe("example.com", "curl_cffi", True, 1.0, at=now)
+        assert scorer.order("example.com", ["curl_cffi", "zyte"]) == ["curl_cffi", "zyte"]
+
+    def test_seeded_from_recorded_attempts(self, settings):
+        settings.FETCH_TELEMETRY = self.CONFIG
+        FetchAttempt.objects.bulk_create(
+            FetchAttempt(
+                domain="example.com",
+                url="https://example.com/",
+                strategy=strategy,
+                outcome=outcome,
+                latency_ms=latency_ms,
+            )
+            for strategy, outcome, latency_ms in [
+                ("curl_cffi", "error", 30000),
+                ("curl_cffi", "error", 30000),
+                ("zyte", "success", 2500),
+            ]
+        )
+
+        scorer = StrategyScorer()
+        assert scorer.order("example.com", ["curl_cffi", "zyte"]) == ["zyte", "curl_cffi"]
+
+    def test_refresh_keeps_unflushed_attempts(self, settings):
+        settings.FETCH_TELEMETRY = self.CONFIG
+        FetchAttempt.objects.create(
+            domain="example.com", url="https://example.com/", strategy="zyte",
+            outcome="success", latency_ms=2500,
+        )
+        for _ in range(3):
+            attempt_recorder.record("https://example.com/", "example.com", "curl_cffi", 0.5)
+
+        scorer = StrategyScorer()
+        assert scorer.order("example.com", ["zyte", "curl_cffi"]) == ["curl_cffi", "zyte"]
+        assert scorer._stats[("example.com", "curl_cffi")].attempts == pytest.approx(3)
+
+        # Once flushed, the same attempts are not counted twice.
+        attempt_recorder.flush()
+        scorer.clear()
+        scorer.order("example.com", ["zyte", "curl_cffi"])
+        assert scorer._stats[("example.com", "curl_cffi")].attempts == pytest.approx(3)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncStrategyOrder:
+    @pytest.mark.asyncio
+    async def test_async_order_loads_recorded_attempts(self, settings, monkeypatch):
+        settings.FETCH_TELEMETRY = {"ADAPTIVE_ORDERING": True}
+        await FetchAttempt.objects.abulk_create(
+            FetchAttempt(
+                domain="example.com", url="https://example.com/", strategy=strategy,
+                outcome=outcome, latency_ms=latency_ms,
+            )
+            for strategy, outcome, latency_ms in [
+                ("curl_cffi", "error", 30000),
+                ("curl_cffi", "error", 30000),
+                ("zyte", "success", 2500),
+            ]
+        )
+        calls = []
+        manager = AsyncFetchStrategyManager(hedging=False)
+        monkeypatch.setattr(manager._fetchers["curl_cffi"], "fetch", _async_fetch("curl_cffi", calls))
+        monkeypatch.setattr(manager._fetchers["zyte"], "fetch", _async_fetch("zyte", calls))
+
+        result = await manager.fetch("https://example.com/")
+
+        assert result.strategy_used == "zyte"
+        assert calls[0][0] == "zyte"
@@ -0,0 +1,271 @@
+"""Tests for the cluster-wide LLM rate governor (publishers.llm_governor)."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest.mock import MagicMock
+
+import pytest
+from pydantic_ai import Agent
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.messages import ModelResponse, TextPart
+from pydantic_ai.models.function import FunctionModel
+
+from ingestion.terms_text import count_tokens
+from publishers import llm_governor as governor_module
+from publishers.llm_governor import (
+    _ACQUIRE_SCRIPT,
+    _BACKOFF_SCRIPT,
+    _SETTLE_SCRIPT,
+    LLMRateGovernor,
+    LLMRateLimited,
+    model_name,
+    retry_after_seconds,
+)
+
+CONFIG = {
+    "ENABLED": True,
+    "MODELS": {"function:function:reply:": {"RPM": 100, "TPM": 10_000}},
+    "DEFAULT_RPM": 50,
+    "DEFAULT_TPM": 5_000,
+    "HEADROOM": 0.9,
+    "OUTPUT_TOKENS": 100,
+    "MAX_WAIT_SECONDS": 5,
+    "MAX_RETRIES": 2,
+    "DEFAULT_RETRY_AFTER": 3.0,
+    "TICKET_TTL": 30,
+}
+
+
+def _governor(waits=(), **config):
+    """A governor whose acquire script returns the given waits in turn (then 0)."""
+    client = MagicMock()
+    scripts = {
+        _ACQUIRE_SCRIPT: MagicMock(side_effect=[str(w).encode() for w in waits] + [b"0"] * 10),
+        _SETTLE_SCRIPT: MagicMock(return_value=1),
+        _BACKOFF_SCRIPT: MagicMock(return_value=1),
+    }
+    client.register_script.side_effect = scripts.__getitem__
+    governor = LLMRateGovernor(client=client, config={**CONFIG, **config})
+    return governor, client, scripts
+
+
+def _rate_limit(headers=None):
+    return ModelHTTPError(429, "reply", body={"error": "rate_limit_exceeded"}, headers=headers)
+
+
+def _agent(failures=()):
+    """An agent whose model raises each of *failures* in turn, then answers."""
+    failures = list(failures)
+    calls = []
+
+    def reply(messages, info):
+        calls.append(messages)
+        if failures:
+            raise failures.pop(0)
+        return ModelResponse(parts=[TextPart("ok")])
+
+    agent = Agent(FunctionModel(reply), system_prompt="Answer briefly.")
+    return agent, calls
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(governor_module.time, "sleep", recorded.append)
+    return recorded
+
+
+# ---------------------------------------------------------------------------
+# Limits, estimates and headers
+# ---------------------------------------------------------------------------
+
+
+class TestEstimates:
+    def test_limits_with_headroom(self):
+        governor, _, _ = _governor()
+
+        assert governor.limits("function:function:reply:") == (90.0, 9000.0)
+        assert governor.limits("openai:unknown") == (45.0, 4500.0)
+
+    def test_estimate_counts_prompts_and_output(self):
+        governor, _, _ = _governor()
+        prompt = "Find the Terms of Service URL from these links."
+
+        assert governor.estimate_tokens(prompt, "Answer briefly.") == (
+            count_tokens(prompt) + count_tokens("Answer briefly.") + 100
+        )
+        assert governor.estimate_tokens(prompt, output_tokens=0) == count_tokens(prompt)
+
+    def test_model_name(self):
+        agent, _ = _agent()
+        assert model_name(agent) == "function:function:reply:"
+        assert model_name(MagicMock(model="openai:gpt-5-mini")) == "openai:gpt-5-mini"
+
+    def test_retry_after_headers(self):
+        later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+
+        assert retry_after_seconds(_rate_limit({"retry-after": "7"})) == 7.0
+        assert retry_after_seconds(_rate_limit({"retry-after-ms": "1500"})) == 1.5
+        assert 25 < retry_after_seconds(_rate_limit({"retry-after": later})) <= 30
+        assert retry_after_seconds(_rate_limit({"retry-after": "soon"})) is None
+        assert retry_after_seconds(_rate_limit()) is None
+
+
+# ---------------------------------------------------------------------------
+# Queueing for a reservation
+# ---------------------------------------------------------------------------
+
+
+class TestAcquire:
+    def test_waits_for_turn_and_tokens(self, sleeps):
+        governor, _, scripts = _governor([0.25, 0.25, 1.5])
+
+        governor.acquire("openai:gpt-5-mini", 1200)
+
+        assert sleeps == [0.25, 0.25, 0.25]
+        acquire = scripts[_ACQUIRE_SCRIPT]
+        assert acquire.call_count == 4
+        assert acquire.call_args.kwargs["keys"] == [
+            "llm:openai:gpt-5-mini:bucket",
+            "llm:openai:gpt-5-mini:queue",
+            "llm:openai:gpt-5-mini:alive",
+            "llm:openai:gpt-5-mini:tickets",
+        ]
+        rpm, tpm, tokens, member, ttl, poll = acquire.call_args.kwargs["args"]
+        assert (rpm, tpm, tokens, ttl, poll) == (45.0, 4500.0, 1200, 30, 0.25)
+        # The same ticket is kept while waiting, so the caller keeps its place.
+        assert {call.kwargs["args"][3] for call in acquire.call_args_list} == {member}
+
+    def test_times_out_and_leaves_queue(self, sleeps):
+        governor, client, scripts = _governor([60])
+
+        with pytest.raises(LLMRateLimited) as exc_info:
+            governor.acquire("openai:gpt-5-mini", 100)
+
+        assert exc_info.value.model == "openai:gpt-5-mini"
+        member = scripts[_ACQUIRE_SCRIPT].call_args.kwargs["args"][3]
+        client.zrem.assert_any_call("llm:openai:gpt-5-mini:queue", member)
+        client.zrem.assert_any_call("llm:openai:gpt-5-mini:alive", member)
+
+    def test_fails_open_when_redis_unavailable(self, sleeps):
+        governor, client, _ = _governor()
+        client.register_script.side_effect = ConnectionError("redis down")
+        agent, calls = _agent()
+
+        assert governor.run_sync(agent, "hello").output == "ok"
+        assert sleeps == []
+
+    def test_disabled_skips_redis(self):
+        governor, client, _ = _governor(ENABLED=False)
+        agent, _ = _agent()
+
+        assert governor.run_sync(agent, "hello").output == "ok"
+        client.register_script.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# Agent calls
+# ---------------------------------------------------------------------------
+
+
+class TestRun:
+    def test_reservation_settled_against_usage(self):
+        governor, _, scripts = _governor()
+        agent, _ = _agent()
+
+        result = governor.run_sync(agent, "hello", system_prompt="Answer briefly.")
+
+        reserved = scripts[_ACQUIRE_SCRIPT].call_args.kwargs["args"][2]
+        settle = scripts[_SETTLE_SCRIPT].call_args.kwargs
+        assert settle["keys"] == ["llm:function:function:reply::bucket"]
+        assert settle["args"] == [0, result.usage.total_tokens - reserved, 90.0, 9000.0]
+
+    def test_429_backs_off_cluster_wide_and_retries(self, sleeps):
+        governor, _, scripts = _governor()
+        agent, calls = _agent([_rate_limit({"retry-after": "12"})])
+
+        assert governor.run_sync(agent, "hello").output == "ok"
+
+        assert len(calls) == 2
+        assert scripts[_BACKOFF_SCRIPT].call_args.kwargs["args"] == [12.0]
+        assert scripts[_ACQUIRE_SCRIPT].call_count == 2
+        assert sleeps == []
+
+    def test_429_without_redis_waits_locally(self, sleeps):
+        governor, _, scripts = _governor()
+        scripts[_BACKOFF_SCRIPT].side_effect = ConnectionError("redis down")
+        agent, _ = _agent([_rate_limit()])
+
+        governor.run_sync(agent, "hello")
+
+        assert sleeps == [3.0]
+
+    def test_retries_exhausted(self, sleeps):
+        governor, _, _ = _governor()
+        agent, calls = _agent([_rate_limit({"retry-after": "2"})] * 3)
+
+        with pytest.raises(LLMRateLimited) as exc_info:
+            governor.run_sync(agent, "hello")
+
+        assert len(calls) == 3
+        assert exc_info.value.retry_after == 2.0
+        assert isinstance(exc_info.value.__cause__, ModelHTTPError)
+
+    def test_other_errors_are_not_retried(self):
+        governor, _, scripts = _governor()
+        agent, calls = _agent([ModelHTTPError(500, "reply")])
+
+        with pytest.raises(ModelHTTPError):
+            governor.run_sync(agent, "hello")
+
+        assert len(calls) == 1
+        scripts[_BACKOFF_SCRIPT].assert_not_called()
+
+    def test_async_run(self, monkeypatch):
+        governor, _, scripts = _governor([0.1])
+        agent, calls = _agent([_rate_limit({"retry-after-ms": "500"})])
+        sleeps = []
+
+        async def fake_sleep(seconds):
+            sleeps.append(seconds)
+
+        monkeypatch.setattr(governor_module.asyncio, "sleep", fake_sleep)
+
+        result = asyncio.run(governor.run(agent, "hello"))
+
+        assert result.output == "ok"
+        assert len(calls) == 2
+        assert sleeps == [0.1]
+        assert scripts[_BACKOFF_SCRIPT].call_args.kwargs["args"] == [0.5]
+
+
+# ---------------------------------------------------------------------------
+# Pipeline steps
+# ---------------------------------------------------------------------------
+
+
+class TestRateLimitedSteps:
+    def test_tos_evaluation_step_marks_rate_limit(self, monkeypatch):
+        from publishers.pipeline import steps
+
+        def evaluate(url, publisher=None, documents=None):
+            raise LLMRateLimited("no capacity", model="openai:gpt-5-mini", retry_after=20.0)
+
+        monkeypatch.setattr(steps, "evaluate_terms_document", evaluate)
+
+        result = steps.run_tos_evaluation_step(MagicMock(), "https://example.com/terms")
+
+        assert result == {"error": "no capacity", "rate_limited": True, "retry_after": 20.0}
+
+    def test_metadata_profile_goes_through_governor(self, monkeypatch):
+        from publishers.pipeline import steps
+
+        run_sync = MagicMock(side_effect=LLMRateLimited("no capacity", model="openai:gpt-4.1-nano"))
+        monkeypatch.setattr(steps.llm_governor, "run_sync", run_sync)
+
+        result = steps.run_metadata_profile_step({"formats_found": []}, "https://example.com/a")
+
+        assert run_sync.call_args.args[0] is steps.metadata_profile_agent
+        assert run_sync.call_args.kwargs["system_prompt"] == steps.METADATA_PROFILE_PROMPT
+        assert result["rate_limited"] is True and result["summary"] == ""
@@ -1,5 +1,6 @@
 """Tests for the pipeline supervisor, step functions, and event publishing."""
 
+import asyncio
 import json
 from datetime import timedelta
 from unittest.mock import MagicMock
@@ -23,8 +24,9 @@ class TestPublishStepEvent:
     def test_publish_step_event_sends_to_redis_channel(self, monkeypatch):
         """publish_step_event publishes JSON payload to job:{id}:events channel."""
         mock_redis_instance = MagicMock()
-        mock_redis_cls = MagicMock(return_value=mock_redis_instance)
-        monkeypatch.setattr("publishers.pipeline.events.redis.Redis", mock_redis_cls)
+        monkeypatch.setattr(
+            "publishers.pipeline.events.get_redis_client", lambda: mock_redis_instance
+        )
 
         from publishers.pipeline.events import publish_step_event
 
@@ -140,6 +142,81 @@ class TestRunWafStep:
         assert result["waf_detected"] is False
         assert "error" in result
 
+    def _documents(self, **fetched):
+        from publishers.fetchers.base import FetchResult
+        from publishers.fetchers.documents import DocumentStore
+
+        manager = MagicMock()
+        manager.fetch.side_effect = lambda url, publisher=None, loop=None: FetchResult(
+            html="<html></html>", status_code=200, strategy_used="curl_cffi", url=url, **fetched
+        )
+        return DocumentStore(manager)
+
+    def test_passive_match_skips_active_scan(self, monkeypatch):
+        """A WAF visible on the fetched homepage is reported without scanning."""
+        from publishers.pipeline.steps import run_waf_step
+
+        scans = []
+        monkeypatch.setattr(
+            "publishers.pipeline.steps.scan_url_with_wafw00f",
+            lambda url: scans.append(url),
+        )
+        documents = self._documents(cookies={"__cf_bm": "token"})
+        publisher = PublisherFactory()
+
+        result = run_waf_step(publisher, documents=documents)
+
+        assert result == {"waf_detected": True, "waf_type": "Cloudflare", "method": "passive"}
+        assert scans == []
+        assert documents.fetches == 1
+
+    def test_inconclusive_passive_falls_back_to_active_scan(self, monkeypatch):
+        from publishers.pipeline.steps import run_waf_step
+
+        monkeypatch.setattr(
+            "publishers.pipeline.steps.scan_url_with_wafw00f",
+            lambda url: {"report": [{"detected": True, "firewall": "ModSecurity"}]},
+        )
+        publisher = PublisherFactory()
+
+        result = run_waf_step(publisher, documents=self._documents(headers={"server": "nginx"}))
+
+        assert result == {"waf_detected": True, "waf_type": "ModSecurity", "method": "active"}
+
+    def test_passive_match_on_robots_txt(self, monkeypatch):
+        """A WAF seen only on the robots.txt response still skips the active scan."""
+        from publishers.fetchers.base import FetchResult
+        from publishers.fetchers.documents import DocumentStore
+        from publishers.pipeline.steps import run_waf_step
+
+        monkeypatch.setattr(
+            "publishers.pipeline.steps.scan_url_with_wafw00f",
+            lambda url: pytest.fail("active scan should not run"),
+        )
+        manager = MagicMock()
+        manager.fetch.side_effect = lambda url, publisher=None, loop=None: FetchResult(
+            html="", status_code=200, strategy_used="curl_cffi", url=url,
+            cookies={"__cf_bm": "token"} if url.endswith("/robots.txt") else {},
+        )
+        documents = DocumentStore(manager)
+
+        result = run_waf_step(PublisherFactory(), documents=documents)
+
+        assert result["method"] == "passive" and result["waf_type"] == "Cloudflare"
+        assert documents.fetches == 2
+
+    def test_passive_fingerprint_error_is_reported(self, monkeypatch):
+        from publishers.pipeline import steps
+
+        def broken(results):
+            raise ValueError("bad signature")
+
+        monkeypatch.setattr(steps, "fingerprint_passively", broken)
+
+        result = steps.run_waf_step(PublisherFactory(), documents=self._documents())
+
+        assert result == {"waf_detected": False, "waf_type": "", "error": "bad signature"}
+
 
 # ---------------------------------------------------------------------------
 # TestRunTosDiscoveryStep
@@ -159,7 +236,7 @@ class TestRunTosDiscoveryStep:
 
         monkeypatch.setattr(
             "publishers.pipeline.steps.discover_terms_and_privacy",
-            lambda url, publisher=None: mock_result,
+            lambda url, publisher=None, documents=None: mock_result,
         )
         publisher = PublisherFactory()
         result = run_tos_discovery_step(publisher)
@@ -177,7 +254,7 @@ class TestRunTosDiscoveryStep:
 
         monkeypatch.setattr(
             "publishers.pipeline.steps.discover_terms_and_privacy",
-            lambda url, publisher=None: mock_result,
+            lambda url, publisher=None, documents=None: mock_result,
         )
         publisher = PublisherFactory()
         result = run_tos_discovery_step(publisher)
@@ -193,6 +270,7 @@ class TestRunTosDiscoveryStep:
 class TestRunTosEvaluationStep:
     def test_tos_evaluation_returns_permissions(self, monkeypatch):
         """ToS evaluation returns permissions list and document type."""
+        from ingestion.terms_text import CleanDocument
         from publishers.pipeline.steps import run_tos_evaluation_step
 
         mock_permission = MagicMock()
@@ -214,14 +292,22 @@ class TestRunTosEvaluationStep:
         mock_result.territorial_exceptions = None
         mock_result.arbitration_clauses = None
 
+        document = CleanDocument(
+            text="Terms", html_tokens=5000, text_tokens=900, truncated=False
+        )
         monkeypatch.setattr(
-            "publishers.pipeline.steps.evaluate_terms_and_conditions",
-            lambda url, publisher=None: mock_result,
+            "publishers.pipeline.steps.evaluate_terms_document",
+            lambda url, publisher=None, documents=None: (mock_result, document),
         )
         publisher = PublisherFactory()
         result = run_tos_evaluation_step(publisher, tos_url="https://example.com/tos")
         assert len(result["permissions"]) == 1
         assert result["document_type"] == "Terms of Service"
+        assert result["tokens"] == {
+            "html_tokens": 5000, "text_tokens": 900, "truncated": False
+        }
+        assert result["cache_status"] == ""
+        assert result["classified"] == []
 
     def test_tos_evaluation_no_tos_url(self):
         """ToS evaluation skips when tos_url is None."""
@@ -320,8 +406,12 @@ class TestRunAiBotBlockingStep:
 
 @pytest.mark.django_db
 class TestRunCCStep:
+    @pytest.fixture(autouse=True)
+    def _pinned_collection(self, settings):
+        settings.COMMON_CRAWL = {"COLLECTIONS": ["CC-MAIN-2026-04"]}
+
     def _make_mock_httpx_get(self, responses):
-        """Create a mock httpx.get that returns different responses based on URL params."""
+        """Create a mock http_get that returns different responses based on URL params."""
         call_count = [0]
 
         def mock_get(url, timeout=None):
@@ -350,7 +440,7 @@ class TestRunCCStep:
             {"text": '{"pages": 5, "pageSize": 5, "blocks": 15}'},
             {"text": '{"timestamp": "20260115120000"}'},
         ])
-        monkeypatch.setattr("publishers.pipeline.steps.httpx.get", mock_get)
+        monkeypatch.setattr("publishers.pipeline.steps.http_get", mock_get)
 
         result = run_cc_step(publisher)
         assert result["in_index"] is True
@@ -368,7 +458,7 @@ class TestRunCCStep:
         mock_get = self._make_mock_httpx_get([
             {"text": '{"pages": 0, "pageSize": 0, "blocks": 0}'},
         ])
-        monkeypatch.setattr("publishers.pipeline.steps.httpx.get", mock_get)
+        monkeypatch.setattr("publishers.pipeline.steps.http_get", mock_get)
 
         result = run_cc_step(publisher)
         assert result["in_index"] is False
@@ -384,7 +474,7 @@ class TestRunCCStep:
         mock_get = self._make_mock_httpx_get([
             {"raise": httpx.TimeoutException("timeout")},
         ])
-        monkeypatch.setattr("publishers.pipeline.steps.httpx.get", mock_get)
+        monkeypatch.setattr("publishers.pipeline.steps.http_get", mock_get)
 
         result = run_cc_step(publisher)
         assert result["available"] is False
@@ -399,7 +489,7 @@ class TestRunCCStep:
         mock_get = self._make_mock_httpx_get([
             {"text": "this is not json"},
         ])
-        monkeypatch.setattr("publishers.pipeline.steps.httpx.get", mock_get)
+        monkeypatch.setattr("publishers.pipeline.steps.http_get", mock_get)
 
         result = run_cc_step(publisher)
         assert result["available"] is False
@@ -413,6 +503,13 @@ class TestRunCCStep:
 
 @pytest.mark.django_db
 class TestRunPipeline:
+    @pytest.fixture(autouse=True)
+    def _sync_agents(self, settings):
+        # These tests stub the sync LLM steps on the supervisor, and must not
+        # load the live Common Crawl collection list.
+        settings.PIPELINE_ASYNC_AGENTS = False
+        settings.COMMON_CRAWL = {"COLLECTIONS": ["CC-MAIN-2026-04"]}
+
     def test_pipeline_runs_all_steps(self, monkeypatch):
         """Pipeline runs all steps and sets job status to completed."""
         from publishers.pipeline.supervisor import run_pipeline
@@ -428,22 +525,22 @@ class TestRunPipeline:
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_waf_step",
-            lambda pub: {"waf_detected": False, "waf_type": ""},
+            lambda pub, documents=None: {"waf_detected": False, "waf_type": ""},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_tos_discovery_step",
-            lambda pub: {"tos_url": "https://example.com/tos", "confidence": 0.9},
+            lambda pub, documents=None: {"tos_url": "https://example.com/tos", "confidence": 0.9},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_tos_evaluation_step",
-            lambda pub, tos_url: {
+            lambda pub, tos_url, documents=None: {
                 "permissions": [],
                 "document_type": "Terms of Service",
             },
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_robots_step",
-            lambda pub, url: {"robots_found": True, "url_allowed": True},
+            lambda pub, url, documents=None: {"robots_found": True, "url_allowed": True},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_ai_bot_blocking_step",
@@ -464,7 +561,7 @@ class TestRunPipeline:
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor._fetch_homepage_html",
-            lambda pub: ("<html></html>", {}),
+            lambda pub, documents=None: ("<html></html>", {}),
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_rss_step",
@@ -608,12 +705,12 @@ class TestRunPipeline:
         waf_called = []
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_waf_step",
-            lambda pub: waf_called.append(True) or {"waf_detected": False},
+            lambda pub, documents=None: waf_called.append(True) or {"waf_detected": False},
         )
         robots_called = []
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_robots_step",
-            lambda pub, url: robots_called.append(True)
+            lambda pub, url, documents=None: robots_called.append(True)
             or {"robots_found": False},
         )
 
@@ -664,7 +761,7 @@ class TestRunPipeline:
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_waf_step",
-            lambda pub: (_ for _ in ()).throw(Exception("network error")),
+            lambda pub, documents=None: (_ for _ in ()).throw(Exception("network error")),
         )
 
         with pytest.raises(Exception, match="network error"):
@@ -686,15 +783,15 @@ class TestRunPipeline:
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_waf_step",
-            lambda pub: {"waf_detected": True, "waf_type": "Cloudflare"},
+            lambda pub, documents=None: {"waf_detected": True, "waf_type": "Cloudflare"},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_tos_discovery_step",
-            lambda pub: {"tos_url": "https://example.com/tos", "confidence": 0.9},
+            lambda pub, documents=None: {"tos_url": "https://example.com/tos", "confidence": 0.9},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_tos_evaluation_step",
-            lambda pub, tos_url: {
+            lambda pub, tos_url, documents=None: {
                 "permissions": [{"activity": "scraping", "permission": "allowed"}],
                 "document_type": "Terms of Service",
                 "confidence_score": 0.85,
@@ -702,7 +799,7 @@ class TestRunPipeline:
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_robots_step",
-            lambda pub, url: {
+            lambda pub, url, documents=None: {
                 "robots_found": True,
                 "url_allowed": True,
                 "sitemaps_from_robots": [],
@@ -727,7 +824,7 @@ class TestRunPipeline:
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor._fetch_homepage_html",
-            lambda pub: ("<html></html>", {}),
+            lambda pub, documents=None: ("<html></html>", {}),
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_rss_step",
@@ -820,19 +917,19 @@ class TestRunPipeline:
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_waf_step",
-            lambda pub: {"waf_detected": False, "waf_type": ""},
+            lambda pub, documents=None: {"waf_detected": False, "waf_type": ""},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_tos_discovery_step",
-            lambda pub: {"tos_url": None},
+            lambda pub, documents=None: {"tos_url": None},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_tos_evaluation_step",
-            lambda pub, tos_url: {"skipped": True},
+            lambda pub, tos_url, documents=None: {"skipped": True},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_robots_step",
-            lambda pub, url: {
+            lambda pub, url, documents=None: {
                 "robots_found": True,
                 "url_allowed": True,
             },
@@ -856,7 +953,7 @@ class TestRunPipeline:
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor._fetch_homepage_html",
-            lambda pub: ("<html></html>", {}),
+            lambda pub, documents=None: ("<html></html>", {}),
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_rss_step",
@@ -916,19 +1013,19 @@ class TestRunPipeline:
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_waf_step",
-            lambda pub: {"waf_detected": False, "waf_type": ""},
+            lambda pub, documents=None: {"waf_detected": False, "waf_type": ""},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_tos_discovery_step",
-            lambda pub: {"tos_url": None},
+            lambda pub, documents=None: {"tos_url": None},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_tos_evaluation_step",
-            lambda pub, tos_url: {"skipped": True},
+            lambda pub, tos_url, documents=None: {"skipped": True},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_robots_step",
-            lambda pub, url: {"robots_found": True, "url_allowed": True},
+            lambda pub, url, documents=None: {"robots_found": True, "url_allowed": True},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_ai_bot_blocking_step",
@@ -949,7 +1046,7 @@ class TestRunPipeline:
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor._fetch_homepage_html",
-            lambda pub: ("<html></html>", {}),
+            lambda pub, documents=None: ("<html></html>", {}),
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_rss_step",
@@ -1017,19 +1114,19 @@ class TestRunPipeline:
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_waf_step",
-            lambda pub: {"waf_detected": False, "waf_type": ""},
+            lambda pub, documents=None: {"waf_detected": False, "waf_type": ""},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_tos_discovery_step",
-            lambda pub: {"tos_url": None},
+            lambda pub, documents=None: {"tos_url": None},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_tos_evaluation_step",
-            lambda pub, tos_url: {"skipped": True},
+            lambda pub, tos_url, documents=None: {"skipped": True},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_robots_step",
-            lambda pub, url: {"robots_found": False},
+            lambda pub, url, documents=None: {"robots_found": False},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_ai_bot_blocking_step",
@@ -1050,7 +1147,7 @@ class TestRunPipeline:
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor._fetch_homepage_html",
-            lambda pub: ("<html></html>", {}),
+            lambda pub, documents=None: ("<html></html>", {}),
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_rss_step",
@@ -1111,19 +1208,19 @@ class TestRunPipeline:
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_waf_step",
-            lambda pub: {"waf_detected": False, "waf_type": ""},
+            lambda pub, documents=None: {"waf_detected": False, "waf_type": ""},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_tos_discovery_step",
-            lambda pub: {"tos_url": None},
+            lambda pub, documents=None: {"tos_url": None},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_tos_evaluation_step",
-            lambda pub, tos_url: {"skipped": True},
+            lambda pub, tos_url, documents=None: {"skipped": True},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_robots_step",
-            lambda pub, url: {"robots_found": False},
+            lambda pub, url, documents=None: {"robots_found": False},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_ai_bot_blocking_step",
@@ -1144,7 +1241,7 @@ class TestRunPipeline:
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor._fetch_homepage_html",
-            lambda pub: ("<html></html>", {}),
+            lambda pub, documents=None: ("<html></html>", {}),
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_rss_step",
@@ -1205,19 +1302,19 @@ class TestRunPipeline:
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_waf_step",
-            lambda pub: {"waf_detected": False, "waf_type": ""},
+            lambda pub, documents=None: {"waf_detected": False, "waf_type": ""},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_tos_discovery_step",
-            lambda pub: {"tos_url": None},
+            lambda pub, documents=None: {"tos_url": None},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_tos_evaluation_step",
-            lambda pub, tos_url: {"skipped": True},
+            lambda pub, tos_url, documents=None: {"skipped": True},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_robots_step",
-            lambda pub, url: {"robots_found": False},
+            lambda pub, url, documents=None: {"robots_found": False},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_ai_bot_blocking_step",
@@ -1229,7 +1326,7 @@ class TestRunPipeline:
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor._fetch_homepage_html",
-            lambda pub: ("<html></html>", {}),
+            lambda pub, documents=None: ("<html></html>", {}),
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_rss_step",
@@ -1323,19 +1420,19 @@ class TestRunPipeline:
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_waf_step",
-            lambda pub: {"waf_detected": False, "waf_type": ""},
+            lambda pub, documents=None: {"waf_detected": False, "waf_type": ""},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_tos_discovery_step",
-            lambda pub: {"tos_url": None},
+            lambda pub, documents=None: {"tos_url": None},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_tos_evaluation_step",
-            lambda pub, tos_url: {"skipped": True},
+            lambda pub, tos_url, documents=None: {"skipped": True},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_robots_step",
-            lambda pub, url: {"robots_found": False},
+            lambda pub, url, documents=None: {"robots_found": False},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_ai_bot_blocking_step",
@@ -1347,7 +1444,7 @@ class TestRunPipeline:
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor._fetch_homepage_html",
-            lambda pub: ("", {}),
+            lambda pub, documents=None: ("", {}),
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_rss_step",
@@ -1412,19 +1509,19 @@ class TestRunPipeline:
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_waf_step",
-            lambda pub: {"waf_detected": False, "waf_type": ""},
+            lambda pub, documents=None: {"waf_detected": False, "waf_type": ""},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_tos_discovery_step",
-            lambda pub: {"tos_url": None},
+            lambda pub, documents=None: {"tos_url": None},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_tos_evaluation_step",
-            lambda pub, tos_url: {"skipped": True},
+            lambda pub, tos_url, documents=None: {"skipped": True},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_robots_step",
-            lambda pub, url: {"robots_found": False},
+            lambda pub, url, documents=None: {"robots_found": False},
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_ai_bot_blocking_step",
@@ -1436,7 +1533,7 @@ class TestRunPipeline:
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor._fetch_homepage_html",
-            lambda pub: ("<html>homepage</html>", {}),
+            lambda pub, documents=None: ("<html>homepage</html>", {}),
         )
         monkeypatch.setattr(
             "publishers.pipeline.supervisor.run_rss_step",
@@ -1457,7 +1554,7 @@ class TestRunPipeline:
 
         # Track fetch calls on the supervisor's _fetch_manager
         original_fetch_manager = MagicMock()
-        original_fetch_manager.fetch.side_effect = lambda url, publisher=None: (
+        original_fetch_manager.fetch.side_effect = lambda url, publisher=None, loop=None: (
             fetch_calls.append(url) or FetchResult(html="<html>fetched</html>", status_code=200, strategy_used="curl_cffi", url=url)
         )
         monkeypatch.setattr(
@@ -1485,6 +1582,113 @@ class TestRunPipeline:
         article_fetches = [u for u in fetch_calls if "example.com/" in u and u != "https://example.com/"]
         assert len(article_fetches) == 0
 
+    def test_pipeline_fetches_each_document_once(self, monkeypatch):
+        """ToS discovery, the homepage steps and the article share one homepage fetch."""
+        from publishers.pipeline.supervisor import run_pipeline
+
+        publisher = PublisherFactory(
+            domain="example.com", name="example.com", url="https://www.example.com"
+        )
+        job = ResolutionJobFactory(
+            publisher=publisher,
+            status="pending",
+            canonical_url="https://example.com/",
+        )
+
+        fetch_calls = []
+        seen = {}
+
+        def fetch(url, publisher=None, loop=None):
+            fetch_calls.append(url)
+            return FetchResult(
+                html="<html>homepage</html>",
+                status_code=200,
+                strategy_used="curl_cffi",
+                url=url,
+                headers={"link": '<https://example.com/rsl.xml>; rel="license"'},
+            )
+
+        def tos_discovery(pub, documents=None):
+            seen["tos_html"] = documents.fetch(pub.url, publisher=pub).html
+            return {"tos_url": None}
+
+        def rsl(pub, robots, html, headers=None):
+            seen["rsl_headers"] = headers
+            return {"rsl_detected": False, "indicators": [], "count": 0}
+
+        def extraction(html, url):
+            seen["article_html"] = html
+            return {
+                "jsonld_fields": None, "opengraph_fields": None, "microdata_fields": None,
+                "twitter_cards": None, "formats_found": [],
+            }
+
+        manager = MagicMock()
+        manager.fetch.side_effect = fetch
+        monkeypatch.setattr("publishers.pipeline.supervisor._fetch_manager", manager)
+        monkeypatch.setattr(
+            "publishers.pipeline.supervisor.publish_step_event",
+            lambda job_id, step, status, data=None: None,
+        )
+        monkeypatch.setattr(
+            "publishers.pipeline.supervisor.run_waf_step",
+            lambda pub, documents=None: {"waf_detected": False, "waf_type": ""},
+        )
+        monkeypatch.setattr("publishers.pipeline.supervisor.run_tos_discovery_step", tos_discovery)
+        monkeypatch.setattr(
+            "publishers.pipeline.supervisor.run_tos_evaluation_step",
+            lambda pub, tos_url, documents=None: {"skipped": True},
+        )
+        monkeypatch.setattr(
+            "publishers.pipeline.supervisor.run_robots_step",
+            lambda pub, url, documents=None: {"robots_found": False},
+        )
+        monkeypatch.setattr(
+            "publishers.pipeline.supervisor.run_ai_bot_blocking_step",
+            lambda pub, robots_result: {"robots_found": False, "bots": {}, "blocked_count": 0, "total_count": 0},
+        )
+        monkeypatch.setattr(
+            "publishers.pipeline.supervisor.run_sitemap_step",
+            lambda pub, robots_result: {"sitemap_urls": [], "source": "none", "count": 0},
+        )
+        monkeypatch.setattr(
+            "publishers.pipeline.supervisor.run_rss_step",
+            lambda pub, html: {"feeds": [], "count": 0},
+        )
+        monkeypatch.setattr("publishers.pipeline.supervisor.run_rsl_step", rsl)
+        monkeypatch.setattr(
+            "publishers.pipeline.supervisor.run_cc_step",
+            lambda pub: {"available": True, "in_index": False, "page_count": 0, "latest_crawl": None, "collection": "CC-MAIN-2026-04", "error": None},
+        )
+        monkeypatch.setattr(
+            "publishers.pipeline.supervisor.run_sitemap_analysis_step",
+            lambda pub: {"has_news_sitemap": False},
+        )
+        monkeypatch.setattr(
+            "publishers.pipeline.supervisor.run_frequency_step",
+            lambda pub, sa: {"frequency_label": "", "frequency_hours": None, "confidence": ""},
+        )
+        monkeypatch.setattr(
+            "publishers.pipeline.supervisor.run_publisher_details_step",
+            lambda pub, html: {"found": False, "source": None, "score": 0, "organization": None, "candidate_count": 0},
+        )
+        monkeypatch.setattr("publishers.pipeline.supervisor.run_article_extraction_step", extraction)
+        monkeypatch.setattr(
+            "publishers.pipeline.supervisor.run_paywall_detection_step",
+            lambda html, extraction: {"paywall_status": "free", "signals": [], "schema_accessible": None},
+        )
+        monkeypatch.setattr(
+            "publishers.pipeline.supervisor.run_metadata_profile_step",
+            lambda extraction, url: {"summary": ""},
+        )
+
+        run_pipeline(str(job.id))
+
+        assert len(fetch_calls) == 1
+        assert seen["tos_html"] == "<html>homepage</html>"
+        assert seen["article_html"] == "<html>homepage</html>"
+        assert seen["rsl_headers"]["link"].startswith("<https://example.com/rsl.xml>")
+
 
 # ---------------------------------------------------------------------------
 # TestExtractLicenseDirectives
@@ -1650,6 +1854,22 @@ class TestRunRobotsStep:
         result = run_robots_step(publisher, "https://example.com/article")
         assert result["crawl_delay"] == 5.0
 
+    def test_robots_records_crawl_delay_with_limiter(self, monkeypatch):
+        """robots step hands Crawl-delay to the politeness limiter."""
+        from publishers.pipeline import steps
+
+        self._patch_fetch(
+            monkeypatch, "User-agent: itsascout\nCrawl-delay: 5\nAllow: /"
+        )
+        recorded = []
+        monkeypatch.setattr(
+            steps.politeness, "set_crawl_delay", lambda d, delay: recorded.append((d, delay))
+        )
+
+        publisher = PublisherFactory(domain="example.com")
+        steps.run_robots_step(publisher, "https://example.com/article")
+        assert recorded == [("example.com", 5.0)]
+
 
 # ---------------------------------------------------------------------------
 # TestRunSitemapStep
@@ -2478,6 +2698,21 @@ class TestRunMetadataProfileStep:
 # ---------------------------------------------------------------------------
 
 
+def _sitemap_stream(xml: str | bytes, url: str, chunk: int = 0, max_bytes: int | None = None):
+    """BodyStream over *xml* (text or raw bytes), optionally split into *chunk*-byte pieces."""
+    from publishers.fetchers.streaming import BodyStream
+
+    data = xml.encode() if isinstance(xml, str) else xml
+    size = chunk or len(data)
+    return BodyStream(
+        [data[i : i + size] for i in range(0, len(data), size)],
+        url=url,
+        status_code=200,
+        strategy_used="direct",
+        max_bytes=max_bytes,
+    )
+
+
 @pytest.mark.django_db
 class TestSitemapAnalysisStep:
     def test_no_sitemaps_returns_empty(self):
@@ -2501,14 +2736,10 @@ class TestSitemapAnalysisStep:
             "<url><loc>https://example.com/article1</loc></url>"
             "</urlset>"
         )
-        mock_result = FetchResult(
-            html=news_xml,
-            status_code=200,
-            strategy_used="direct",
-            url="https://example.com/sitemap.xml",
-        )
         monkeypatch.setattr(
-            steps._fetch_manager, "fetch", lambda url, publisher=None: mock_result
+            steps._fetch_manager,
+            "stream",
+            lambda url, publisher=None: _sitemap_stream(news_xml, url),
         )
 
         publisher = PublisherFactory(
@@ -2539,22 +2770,13 @@ class TestSitemapAnalysisStep:
 
         call_count = {"n": 0}
 
-        def mock_fetch(url, publisher=None):
+        def mock_stream(url, publisher=None):
             call_count["n"] += 1
             if "sitemap-news" in url:
-                return FetchResult(
-                    html=child_news_xml, status_code=200, strategy_used="direct", url=url
-                )
-            if "sitemapindex" not in url and call_count["n"] == 1:
-                # First call returns the index
-                return FetchResult(
-                    html=index_xml, status_code=200, strategy_used="direct", url=url
-                )
-            return FetchResult(
-                html=index_xml, status_code=200, strategy_used="direct", url=url
-            )
+                return _sitemap_stream(child_news_xml, url)
+            return _sitemap_stream(index_xml, url)
 
-        monkeypatch.setattr(steps._fetch_manager, "fetch", mock_fetch)
+        monkeypatch.setattr(steps._fetch_manager, "stream", mock_stream)
 
         publisher = PublisherFactory(
             sitemap_urls=["https://example.com/sitemap_index.xml"]
@@ -2575,11 +2797,10 @@ class TestSitemapAnalysisStep:
             "<url><loc>https://example.com/c</loc><lastmod>2026-02-13</lastmod></url>"
             "</urlset>"
         )
-        mock_result = FetchResult(
-            html=sitemap_xml, status_code=200, strategy_used="direct", url="https://example.com/sitemap.xml"
-        )
         monkeypatch.setattr(
-            steps._fetch_manager, "fetch", lambda url, publisher=None: mock_result
+            steps._fetch_manager,
+            "stream",
+            lambda url, publisher=None: _sitemap_stream(sitemap_xml, url),
         )
 
         publisher = PublisherFactory(
@@ -2602,15 +2823,13 @@ class TestSitemapAnalysisStep:
 
         call_count = {"n": 0}
 
-        def mock_fetch(url, publisher=None):
+        def mock_stream(url, publisher=None):
             call_count["n"] += 1
             if call_count["n"] == 1:
                 raise Exception("Network error")
-            return FetchResult(
-                html=sitemap_xml, status_code=200, strategy_used="direct", url=url
-            )
+            return _sitemap_stream(sitemap_xml, url)
 
-        monkeypatch.setattr(steps._fetch_manager, "fetch", mock_fetch)
+        monkeypatch.setattr(steps._fetch_manager, "stream", mock_stream)
 
         publisher = PublisherFactory(
             sitemap_urls=[
@@ -2621,6 +2840,111 @@ class TestSitemapAnalysisStep:
         result = steps.run_sitemap_analysis_step(publisher)
         assert result["sitemaps_checked"] == 1
 
+    def test_stops_reading_after_lastmod_limit(self, monkeypatch):
+        """Streaming stops once 50 lastmods are collected instead of reading the whole file."""
+        from publishers.pipeline import steps
+
+        urls = "".join(
+            f"<url><loc>https://example.com/{i}</loc><lastmod>2026-01-01</lastmod></url>"
+            for i in range(5000)
+        )
+        sitemap_xml = (
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            f"{urls}</urlset>"
+        )
+        body = _sitemap_stream(sitemap_xml, "https://example.com/sitemap.xml", chunk=1024)
+        monkeypatch.setattr(
+            steps._fetch_manager, "stream", lambda url, publisher=None: body
+        )
+
+        publisher = PublisherFactory(sitemap_urls=["https://example.com/sitemap.xml"])
+        result = steps.run_sitemap_analysis_step(publisher)
+
+        assert len(result["lastmod_dates"]) == 50
+        assert body.closed is True
+        assert body.bytes_read < len(sitemap_xml) // 10
+
+    def test_truncated_sitemap_keeps_parsed_dates(self, monkeypatch):
+        """A sitemap cut off at the byte cap still yields the dates before the cut."""
+        from publishers.pipeline import steps
+
+        sitemap_xml = (
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            "<url><loc>https://example.com/a</loc><lastmod>2026-02-15</lastmod></url>"
+            "<url><loc>https://example.com/b</loc><lastmod>2026-02-14</lastmod></url>"
+            "</urlset>"
+        )
+        cut = sitemap_xml.index("<url><loc>https://example.com/b")
+        monkeypatch.setattr(
+            steps._fetch_manager,
+            "stream",
+            lambda url, publisher=None: _sitemap_stream(sitemap_xml, url, max_bytes=cut + 5),
+        )
+
+        publisher = PublisherFactory(sitemap_urls=["https://example.com/sitemap.xml"])
+        result = steps.run_sitemap_analysis_step(publisher)
+        assert result["lastmod_dates"] == ["2026-02-15"]
+
+    def test_gzipped_sitemap_streamed_and_stopped_early(self, monkeypatch):
+        """A .xml.gz body is inflated incrementally and the download still stops early."""
+        import gzip
+        import random
+
+        from publishers.pipeline import steps
+
+        rng = random.Random(0)
+        urls = "".join(
+            f"<url><loc>https://example.com/{rng.getrandbits(64):x}</loc>"
+            f"<lastmod>2026-01-{i % 28 + 1:02d}</lastmod></url>"
+            for i in range(20000)
+        )
+        compressed = gzip.compress(
+            (
+                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+                ' xmlns:news="http://www.google.com/schemas/sitemap-news/0.9">'
+                f"{urls}</urlset>"
+            ).encode()
+        )
+        body = _sitemap_stream(compressed, "https://example.com/sitemap.xml.gz", chunk=1024)
+        monkeypatch.setattr(steps._fetch_manager, "stream", lambda url, publisher=None: body)
+
+        publisher = PublisherFactory(sitemap_urls=["https://example.com/sitemap.xml.gz"])
+        result = steps.run_sitemap_analysis_step(publisher)
+
+        assert result["has_news_sitemap"] is True
+        assert len(result["lastmod_dates"]) == 50
+        assert body.closed is True
+        assert body.bytes_read < len(compressed) // 10
+
+    def test_scan_stops_after_entry_limit_without_lastmods(self):
+        """Sitemaps without lastmods are not read to the end just to fill the quota."""
+        from publishers.pipeline.steps import _scan_sitemap
+
+        urls = "".join(f"<url><loc>https://example.com/{i}</loc></url>" for i in range(50000))
+        sitemap_xml = f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'
+        body = _sitemap_stream(sitemap_xml, "https://example.com/sitemap.xml", chunk=4096)
+
+        scan = _scan_sitemap(body, entry_limit=100)
+
+        assert scan["lastmod_dates"] == []
+        assert body.bytes_read < len(sitemap_xml) // 50
+
+    def test_inflated_size_is_capped(self):
+        """A small gzip body that inflates to a huge document is cut at max_bytes."""
+        import gzip
+
+        from publishers.pipeline.steps import _scan_sitemap
+
+        bomb = gzip.compress(
+            b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">' + b" " * 50_000_000
+        )
+        body = _sitemap_stream(bomb, "https://example.com/sitemap.xml.gz")
+
+        scan = _scan_sitemap(body, max_bytes=1024 * 1024)
+
+        assert scan["is_index"] is False
+        assert body.closed is True
+
 
 # ---------------------------------------------------------------------------
 # TestFrequencyStep
@@ -2654,12 +2978,11 @@ class TestFrequencyStep:
 
         rss_xml = _build_rss_xml(15, "2026-02-17", interval_hours=24.0)
 
-        mock_resp = MagicMock()
-        mock_resp.text = rss_xml
-        mock_resp.status_code = 200
-        mock_resp.raise_for_status = MagicMock()
-
-        monkeypatch.setattr(steps.httpx, "get", lambda *a, **kw: mock_resp)
+        monkeypatch.setattr(
+            steps._fetch_manager,
+            "stream",
+            lambda url, publisher=None, headers=None: _sitemap_stream(rss_xml, url),
+        )
 
         publisher = PublisherFactory(
             rss_urls=["https://example.com/feed.xml"]
@@ -2700,12 +3023,11 @@ class TestFrequencyStep:
 
         rss_xml = _build_rss_xml(3, "2026-02-17", interval_hours=12.0)
 
-        mock_resp = MagicMock()
-        mock_resp.text = rss_xml
-        mock_resp.status_code = 200
-        mock_resp.raise_for_status = MagicMock()
-
-        monkeypatch.setattr(steps.httpx, "get", lambda *a, **kw: mock_resp)
+        monkeypatch.setattr(
+            steps._fetch_manager,
+            "stream",
+            lambda url, publisher=None, headers=None: _sitemap_stream(rss_xml, url),
+        )
 
         publisher = PublisherFactory(
             rss_urls=["https://example.com/feed.xml"]
@@ -2720,12 +3042,11 @@ class TestFrequencyStep:
         # 6 entries, ~19.2 hours apart -> span ~4 days
         rss_xml = _build_rss_xml(6, "2026-02-17", interval_hours=19.2)
 
-        mock_resp = MagicMock()
-        mock_resp.text = rss_xml
-        mock_resp.status_code = 200
-        mock_resp.raise_for_status = MagicMock()
-
-        monkeypatch.setattr(steps.httpx, "get", lambda *a, **kw: mock_resp)
+        monkeypatch.setattr(
+            steps._fetch_manager,
+            "stream",
+            lambda url, publisher=None, headers=None: _sitemap_stream(rss_xml, url),
+        )
 
         publisher = PublisherFactory(
             rss_urls=["https://example.com/feed.xml"]
@@ -2863,3 +3184,478 @@ class TestGoogleNewsStep:
         )
         assert result["signals"]["has_news_article_schema"] is True
         assert result["readiness"] == "minimal"
+
+
+# ---------------------------------------------------------------------------
+# TestStepGraph
+# ---------------------------------------------------------------------------
+
+
+class TestStepGraph:
+    def test_independent_steps_run_concurrently(self):
+        import threading
+
+        from publishers.pipeline.graph import Step, StepGraph
+
+        # Both steps must be in flight at once to get past the barrier.
+        barrier = threading.Barrier(2, timeout=5)
+
+        def wait_then(value):
+            def run(ctx):
+                barrier.wait()
+                return value
+            return run
+
+        graph = StepGraph([
+            Step("a", run=wait_then(1), output="a"),
+            Step("b", run=wait_then(2), output="b"),
+        ])
+        context = graph.run({}, max_workers=2)
+        assert context["a"] == 1
+        assert context["b"] == 2
+
+    def test_dependent_step_sees_upstream_output(self):
+        from publishers.pipeline.graph import Step, StepGraph
+
+        completed = []
+        graph = StepGraph([
+            Step("double", run=lambda ctx: ctx["base"] * 2, inputs=("base",), output="double"),
+            Step("base", run=lambda ctx: ctx["seed"] + 1, inputs=("seed",), output="base"),
+        ])
+        context = graph.run(
+            {"seed": 1},
+            max_workers=4,
+            on_completed=lambda step, result: completed.append(step.name),
+        )
+        assert context["double"] == 4
+        assert completed == ["base", "double"]
+
+    def test_started_and_completed_callbacks_run_on_caller_thread(self):
+        import threading
+
+        from publishers.pipeline.graph import Step, StepGraph
+
+        caller = threading.get_ident()
+        callback_threads = set()
+        graph = StepGraph([Step("a", run=lambda ctx: threading.get_ident(), output="a")])
+        context = graph.run(
+            {},
+            max_workers=1,
+            on_started=lambda step: callback_threads.add(threading.get_ident()),
+            on_completed=lambda step, result: callback_threads.add(threading.get_ident()),
+        )
+        assert callback_threads == {caller}
+        assert context["a"] != caller
+
+    def test_step_exception_stops_downstream_steps(self):
+        from publishers.pipeline.graph import Step, StepGraph
+
+        downstream = []
+        graph = StepGraph([
+            Step("boom", run=lambda ctx: 1 / 0, output="boom"),
+            Step("after", run=lambda ctx: downstream.append(True), inputs=("boom",), output="after"),
+        ])
+        with pytest.raises(ZeroDivisionError):
+            graph.run({}, max_workers=2)
+        assert downstream == []
+
+    def test_unresolvable_inputs_raise(self):
+        from publishers.pipeline.graph import Step, StepGraph, StepGraphError
+
+        graph = StepGraph([
+            Step("a", run=lambda ctx: 1, inputs=("b",), output="a"),
+            Step("b", run=lambda ctx: 2, inputs=("a",), output="b"),
+        ])
+        with pytest.raises(StepGraphError, match="Unresolvable"):
+            graph.run({}, max_workers=2)
+
+    def test_duplicate_outputs_rejected(self):
+        from publishers.pipeline.graph import Step, StepGraph, StepGraphError
+
+        with pytest.raises(StepGraphError, match="Duplicate"):
+            StepGraph([
+                Step("a", run=lambda ctx: 1, output="x"),
+                Step("b", run=lambda ctx: 2, output="x"),
+            ])
+
+    def test_publisher_step_graph_resolves_from_job_seeds(self):
+        from publishers.pipeline.supervisor import PUBLISHER_STEP_GRAPH
+
+        PUBLISHER_STEP_GRAPH.check({"publisher", "canonical_url", "documents"})
+
+
+# ---------------------------------------------------------------------------
+# Async agent steps and the pipeline event loop
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def event_loop_thread():
+    from publishers.pipeline.loop import EventLoopThread
+
+    loop = EventLoopThread(name="test-loop")
+    yield loop
+    loop.close()
+
+
+class TestStepGraphWithLoop:
+    def test_async_steps_overlap_without_a_worker_thread(self, event_loop_thread):
+        import threading
+        import time
+        from time import monotonic
+
+        from publishers.pipeline.graph import Step, StepGraph
+
+        async def llm(ctx):
+            await asyncio.sleep(0.3)
+            return threading.current_thread().name
+
+        def network(ctx):
+            time.sleep(0.3)
+            return threading.current_thread().name
+
+        graph = StepGraph([
+            Step("llm", run=lambda ctx: "sync", arun=llm, output="llm"),
+            Step("network", run=network, output="network"),
+        ])
+        timings = {}
+        started = monotonic()
+        context = graph.run({}, max_workers=1, loop=event_loop_thread.loop, timings=timings)
+
+        assert monotonic() - started < 0.55
+        assert context["llm"] == "test-loop"
+        assert context["network"].startswith("pipeline-step")
+        assert timings["llm"] >= 0.29 and timings["network"] >= 0.29
+
+    def test_without_loop_runs_sync_variant(self):
+        from publishers.pipeline.graph import Step, StepGraph
+
+        async def arun(ctx):
+            return "async"
+
+        graph = StepGraph([Step("a", run=lambda ctx: "sync", arun=arun, output="a")])
+        assert graph.run({}, max_workers=1)["a"] == "sync"
+
+    def test_async_step_exception_is_raised(self, event_loop_thread):
+        from publishers.pipeline.graph import Step, StepGraph
+
+        async def boom(ctx):
+            raise RuntimeError("model unavailable")
+
+        graph = StepGraph([Step("a", run=lambda ctx: 1, arun=boom, output="a")])
+        with pytest.raises(RuntimeError, match="model unavailable"):
+            graph.run({}, max_workers=1, loop=event_loop_thread.loop)
+
+    def test_pipeline_loop_is_shared_per_process(self, monkeypatch):
+        from publishers.pipeline import loop as loop_module
+
+        async def answer():
+            return 42
+
+        first = loop_module.pipeline_loop()
+        assert loop_module.pipeline_loop() is first
+        assert first.run(answer()) == 42
+
+        # A forked RQ work horse has no loop thread: start a new loop.
+        monkeypatch.setattr(loop_module, "_loop_pid", -1)
+        assert loop_module.pipeline_loop() is not first
+
+
+class TestAsyncSteps:
+    def test_tos_discovery(self, monkeypatch):
+        from publishers.pipeline import steps
+
+        discovery = MagicMock(
+            terms_of_service_url="https://example.com/terms", confidence_score=0.9, notes=""
+        )
+
+        async def adiscover(url, publisher=None, documents=None):
+            return discovery
+
+        monkeypatch.setattr(steps, "adiscover_terms_and_privacy", adiscover)
+        publisher = MagicMock(url="https://example.com/", domain="example.com")
+
+        result = asyncio.run(steps.arun_tos_discovery_step(publisher))
+
+        assert result == {"tos_url": "https://example.com/terms", "confidence": 0.9, "notes": ""}
+
+    def test_tos_evaluation_error(self, monkeypatch):
+        from publishers.pipeline import steps
+
+        async def aevaluate(url, publisher=None, documents=None):
+            raise RuntimeError("timeout")
+
+        monkeypatch.setattr(steps, "aevaluate_terms_document", aevaluate)
+
+        result = asyncio.run(
+            steps.arun_tos_evaluation_step(MagicMock(), "https://example.com/terms")
+        )
+
+        assert result == {"error": "timeout"}
+        assert asyncio.run(steps.arun_tos_evaluation_step(MagicMock(), None))["skipped"] is True
+
+    def test_metadata_profile_awaits_agent(self, monkeypatch):
+        from unittest.mock import AsyncMock
+
+        from publishers.pipeline import steps
+
+        output = steps.MetadataProfileResult(summary="JSON-LD and OpenGraph present.")
+        run = AsyncMock(return_value=MagicMock(output=output))
+        run_sync = MagicMock()
+        monkeypatch.setattr(steps.metadata_profile_agent, "run", run)
+        monkeypatch.setattr(steps.metadata_profile_agent, "run_sync", run_sync)
+
+        result = asyncio.run(
+            steps.arun_metadata_profile_step({"formats_found": []}, "https://example.com/a")
+        )
+
+        assert result == {"summary": "JSON-LD and OpenGraph present."}
+        assert "https://example.com/a" in run.await_args.args[0]
+        run_sync.assert_not_called()
+
+
+def _sleep_then(seconds, result):
+    def run(*args, **kwargs):
+        import time
+
+        time.sleep(seconds)
+        return result
+    return run
+
+
+def _asleep_then(seconds, result):
+    async def arun(*args, **kwargs):
+        await asyncio.sleep(seconds)
+        return result
+    return arun
+
+
+def _awaitable(step):
+    async def arun(*args, **kwargs):
+        return step(*args, **kwargs)
+    return arun
+
+
+def _fail(*args, **kwargs):
+    raise AssertionError("unexpected step variant called")
+
+
+def _stub_pipeline(monkeypatch, **overrides):
+    """Stub every step on the supervisor; returns {(step, status): data} of published events."""
+    from publishers.pipeline import supervisor
+
+    events = {}
+    stubs = {
+        "publish_step_event": lambda job_id, step, status, data=None: events.update(
+            {(step, status): data}
+        ),
+        "run_waf_step": lambda pub, documents=None: {"waf_detected": False, "waf_type": ""},
+        "run_tos_discovery_step": lambda pub, documents=None: {"tos_url": "https://example.com/tos"},
+        "run_tos_evaluation_step": lambda pub, tos_url, documents=None: {"permissions": []},
+        "run_robots_step": lambda pub, url, documents=None: {"robots_found": True, "url_allowed": True},
+        "run_ai_bot_blocking_step": lambda pub, robots: {"bots": {}},
+        "run_sitemap_step": lambda pub, robots: {"sitemap_urls": []},
+        "_fetch_homepage_html": lambda pub, documents=None: ("<html></html>", {}),
+        "run_rss_step": lambda pub, html: {"feeds": []},
+        "run_rsl_step": lambda pub, robots, html, headers=None: {"rsl_detected": False},
+        "run_cc_step": lambda pub: {"in_index": False},
+        "run_sitemap_analysis_step": lambda pub: {"has_news_sitemap": False},
+        "run_frequency_step": lambda pub, analysis: {"frequency_label": ""},
+        "run_publisher_details_step": lambda pub, html: {"organization": None},
+        "run_article_extraction_step": lambda html, url: {"formats_found": []},
+        "run_paywall_detection_step": lambda html, extraction: {"paywall_status": "free"},
+        "run_metadata_profile_step": lambda extraction, url: {"summary": "Profile"},
+        "run_google_news_step": lambda **kwargs: {"readiness": ""},
+        **overrides,
+    }
+    # The event-loop path awaits the async twins of the LLM steps.
+    for name in ("run_tos_discovery_step", "run_tos_evaluation_step", "run_metadata_profile_step"):
+        stubs.setdefault(f"a{name}", _awaitable(stubs[name]))
+    for name, stub in stubs.items():
+        monkeypatch.setattr(supervisor, name, stub)
+    monkeypatch.setattr(
+        supervisor.DocumentStore, "fetch",
+        lambda self, url, publisher=None: MagicMock(html="<html></html>"),
+    )
+    return events
+
+
+@pytest.mark.django_db
+class TestRunPipelineWithLoop:
+    def test_llm_steps_overlap_and_wall_time_is_reported(self, monkeypatch, settings):
+        from publishers.pipeline import supervisor
+
+        settings.PIPELINE_ASYNC_AGENTS = True
+        job = ResolutionJobFactory(status="pending")
+        events = _stub_pipeline(
+            monkeypatch,
+            run_tos_discovery_step=_fail,
+            arun_tos_discovery_step=_asleep_then(0.3, {"tos_url": "https://example.com/tos"}),
+            run_tos_evaluation_step=_fail,
+            arun_tos_evaluation_step=_asleep_then(0.3, {"permissions": []}),
+            run_robots_step=_sleep_then(0.3, {"robots_found": True, "url_allowed": True}),
+            run_cc_step=_sleep_then(0.3, {"in_index": False}),
+            run_paywall_detection_step=_sleep_then(0.2, {"paywall_status": "free"}),
+            run_metadata_profile_step=_fail,
+            arun_metadata_profile_step=_asleep_then(0.2, {"summary": "Profile"}),
+        )
+
+        supervisor.run_pipeline(str(job.id))
+
+        job.refresh_from_db()
+        assert job.status == "completed"
+        assert job.article_result["profile"] == {"summary": "Profile"}
+        report = events[("pipeline", "completed")]
+        assert report["step_seconds"]["metadata_profile"] >= 0.19
+        assert report["serial_seconds"] >= 1.6
+        assert report["wall_seconds"] < report["serial_seconds"] - 0.5
+
+
+@pytest.mark.django_db
+class TestRunPipelineRateLimited:
+    def test_rate_limited_steps_are_not_marked_fresh(self, monkeypatch):
+        from publishers.pipeline import supervisor
+
+        job = ResolutionJobFactory(status="pending")
+        _stub_pipeline(
+            monkeypatch,
+            run_tos_evaluation_step=lambda pub, tos_url, documents=None: {
+                "error": "no capacity", "rate_limited": True, "retry_after": 20.0,
+            },
+            run_metadata_profile_step=lambda extraction, url: {
+                "summary": "", "error": "no capacity", "rate_limited": True, "retry_after": None,
+            },
+        )
+
+        supervisor.run_pipeline(str(job.id))
+
+        job.refresh_from_db()
+        job.publisher.refresh_from_db()
+        assert job.status == "completed"
+        assert job.tos_result["rate_limited"] is True
+        assert job.publisher.last_checked_at is None
+        assert not ArticleMetadata.objects.filter(article_url=job.canonical_url).exists()
+
+    def test_fresh_when_nothing_was_rate_limited(self, monkeypatch):
+        from publishers.pipeline import supervisor
+
+        job = ResolutionJobFactory(status="pending")
+        _stub_pipeline(monkeypatch)
+
+        supervisor.run_pipeline(str(job.id))
+
+        job.publisher.refresh_from_db()
+        assert job.publisher.last_checked_at is not None
+        assert ArticleMetadata.objects.filter(article_url=job.canonical_url).exists()
+
+
+# ---------------------------------------------------------------------------
+# run_pipeline with the shipped settings
+# ---------------------------------------------------------------------------
+
+
+def _page(status_code, text, headers=None):
+    """A streamed curl-cffi response mock."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {"content-type": "text/html; charset=utf-8"}
+    response.charset_encoding = None
+    response.iter_content = lambda *args, **kwargs: iter([text.encode()])
+    return response
+
+
+def _structured_model(**output):
+    """A model that answers every run with *output* as the agent's structured result."""
+    from pydantic_ai.messages import ModelResponse, ToolCallPart
+    from pydantic_ai.models.function import FunctionModel
+
+    def reply(messages, info):
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, output)])
+
+    return FunctionModel(reply)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestRunPipelineProductionDefaults:
+    """The whole job with the cache, limiter, governor and event loop all enabled.
+
+    Only the edges are faked: the shared Redis client (``redis_client``), the
+    curl-cffi session, the WAF scan, Common Crawl and the LLM models.
+    """
+
+    def test_pipeline_with_shipped_settings(self, monkeypatch, settings, redis_client):
+        from ingestion import terms_discovery, terms_evaluation
+        from publishers.fetchers import clients, politeness
+        from publishers.llm_governor import _ACQUIRE_SCRIPT
+        from publishers.models import FetchAttempt
+        from publishers.pipeline import steps, supervisor
+
+        assert settings.PIPELINE_ASYNC_AGENTS
+        for name in ("FETCH_CACHE", "TERMS_CACHE"):
+            assert getattr(settings, name)["BACKEND"] == "redis"
+        for name in ("POLITENESS", "LLM_RATE_LIMITS", "SITEMAP_CRAWLER"):
+            assert getattr(settings, name)["ENABLED"]
+
+        scripts = {}
+        redis_client.register_script.side_effect = lambda source: scripts.setdefault(
+            source, MagicMock(return_value=b"0")
+        )
+
+        job = ResolutionJobFactory(status="pending")
+        site = job.publisher.url.rstrip("/")
+        pages = {
+            f"{site}/": _page(
+                200,
+                f'<html><head><title>News</title></head><body><main>'
+                f'<a href="{site}/terms">Terms of Service</a></main></body></html>',
+                {"content-type": "text/html", "server": "cloudflare", "cf-ray": "8a1b2c"},
+            ),
+            f"{site}/robots.txt": _page(
+                200, "User-agent: *\nAllow: /\n", {"content-type": "text/plain"}
+            ),
+            f"{site}/terms": _page(
+                200, "<html><body><main><h1>Terms of Service</h1>"
+                "<p>You may not scrape, crawl or use automated means to access the site.</p>"
+                "<p>These terms are governed by the laws of New York.</p></main></body></html>",
+            ),
+            job.canonical_url: _page(
+                200, '<html><head><meta property="og:title" content="A story"></head>'
+                "<body><article><p>Story</p></article></body></html>",
+            ),
+        }
+        pages[site] = pages[f"{site}/"]
+        session = MagicMock()
+        session.get.side_effect = lambda url, **kwargs: pages.get(url) or _page(404, "")
+        monkeypatch.setattr(clients.http_clients, "curl_session", lambda: session)
+        monkeypatch.setattr(steps, "scan_url_with_wafw00f", lambda url: None)
+        monkeypatch.setattr(
+            steps, "http_get", MagicMock(side_effect=httpx.ConnectError("no network"))
+        )
+        settings.COMMON_CRAWL = {"COLLECTIONS": ["CC-MAIN-2026-04"]}
+
+        for agent, output in [
+            (terms_discovery.terms_discovery_agent,
+             {"terms_of_service_url": f"{site}/terms", "confidence_score": 0.9}),
+            (terms_evaluation.terms_evaluation_agent,
+             {"permissions": [], "document_type": "Terms of Service", "confidence_score": 0.8}),
+            (steps.metadata_profile_agent, {"summary": "OpenGraph only."}),
+        ]:
+            monkeypatch.setattr(agent, "model", _structured_model(**output))
+            # The event-loop path awaits Agent.run; the sync call must not be used.
+            monkeypatch.setattr(agent, "run_sync", _fail)
+
+        supervisor.run_pipeline(str(job.id))
+
+        job.refresh_from_db()
+        assert job.status == "completed"
+        assert job.waf_result["method"] == "passive"
+        assert job.tos_result["tos_url"] == f"{site}/terms"
+        assert job.tos_result["document_type"] == "Terms of Service"
+        assert job.article_result["profile"]["summary"] == "OpenGraph only."
+        # Every request took a politeness slot and every agent call a
+        # governor reservation, both through the shared Redis client.
+        assert scripts[politeness._ACQUIRE_SCRIPT].call_count >= len(pages) - 1
+        assert scripts[_ACQUIRE_SCRIPT].call_count >= 2
+        # Responses and the terms evaluation were written to the Redis caches.
+        assert redis_client.pipeline.return_value.set.call_count >= 2
+        assert FetchAttempt.objects.filter(domain=job.publisher.domain).exists()
@@ -0,0 +1,57 @@
+from publishers.fetchers.curl_cffi_fetcher import CurlCffiFetcher
+from publishers.signatures import SignatureSet, signature_set
+
+
+class TestSignatureSet:
+    def test_matches_in_declaration_order_case_insensitively(self):
+        signatures = SignatureSet("demo", {"a": ("Foo", "bar"), "b": ("baz",)})
+        matches = signatures.matches("BAZ then bar then foo")
+        assert [m.label for m in matches] == ["a:foo", "a:bar", "b:baz"]
+
+    def test_duplicate_patterns_reported_once(self):
+        signatures = SignatureSet("demo", {"a": ("foo",), "b": ("FOO",)})
+        assert [m.label for m in signatures.matches("foo")] == ["a:foo"]
+
+    def test_overlapping_and_nested_patterns(self):
+        signatures = SignatureSet(
+            "demo", {"a": ("meter-", "paywall"), "b": ("paywall-meter", "all-me")}
+        )
+        matches = signatures.matches("<div class='paywall-meter-x'>")
+        assert [m.label for m in matches] == ["a:meter-", "a:paywall", "b:paywall-meter", "b:all-me"]
+        assert signatures.search("paywall-meter").label == "a:paywall"
+
+    def test_empty_set(self):
+        assert SignatureSet("demo", {}).matches("anything") == []
+
+    def test_window_limits_scan(self):
+        signatures = SignatureSet("demo", {"a": ("marker",)}, window=10)
+        assert signatures.search("marker" + "x" * 100) is not None
+        assert signatures.search("x" * 100 + "marker") is None
+
+    def test_no_window_scans_whole_body(self):
+        signatures = SignatureSet("demo", {"a": ("marker",)})
+        assert signatures.search("x" * 100_000 + "marker").pattern == "marker"
+
+
+class TestConfiguredSets:
+    def test_window_from_settings(self, settings):
+        settings.SIGNATURE_SCAN_WINDOWS = {"waf_block": 16}
+        assert signature_set("waf_block").window == 16
+        assert signature_set("waf_block") is signature_set("waf_block")
+
+    def test_waf_block_only_checks_head_of_page(self, settings):
+        settings.SIGNATURE_SCAN_WINDOWS = {"waf_block": 1024}
+        fetcher = CurlCffiFetcher()
+        assert fetcher._is_waf_block("<title>Just a moment...</title>")
+        # A CDN reference deep in a long article is not a challenge page.
+        article = "<p>story</p>" * 200 + '<script src="https://cdnjs.cloudflare.com/x.js">'
+        assert not fetcher._is_waf_block(article)
+
+    def test_paywall_labels(self):
+        matches = signature_set("paywall").matches(
+            '<div class="Paywall">Subscribe to continue reading</div>'
+        )
+        assert [m.label for m in matches] == [
+            "login_wall:subscribe to continue reading",
+            "paywall_class:paywall",
+        ]
@@ -0,0 +1,430 @@
+"""Tests for the incremental sitemap crawler and the SitemapEntry store."""
+
+import gzip
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from publishers.factories import PublisherFactory
+from publishers.fetchers.exceptions import AllStrategiesExhausted
+from publishers.fetchers.streaming import BodyStream
+from publishers.models import SitemapEntry, SitemapFile
+from publishers.sitemaps import (
+    SitemapCrawler,
+    SitemapRecord,
+    entry_dates,
+    iter_sitemap,
+    sitemap_config,
+)
+
+INDEX_URL = "https://example.com/sitemap.xml"
+
+
+def _urlset(urls, news=False):
+    """A <urlset> for (loc, lastmod) pairs; with *news* the lastmod is a news:publication_date."""
+    ns = ' xmlns:news="http://www.google.com/schemas/sitemap-news/0.9"' if news else ""
+    entries = []
+    for loc, lastmod in urls:
+        if news:
+            entries.append(
+                f"<url><loc>{loc}</loc><news:news><news:publication_date>{lastmod}"
+                "</news:publication_date></news:news></url>"
+            )
+        else:
+            entries.append(
+                f"<url><loc>{loc}</loc><lastmod>{lastmod}</lastmod>"
+                "<changefreq>Daily</changefreq></url>"
+            )
+    return (
+        '<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+        f"{ns}>{''.join(entries)}</urlset>"
+    )
+
+
+def _index(children):
+    entries = "".join(
+        f"<sitemap><loc>{loc}</loc>" + (f"<lastmod>{lastmod}</lastmod>" if lastmod else "")
+        + "</sitemap>"
+        for loc, lastmod in children
+    )
+    return (
+        '<?xml version="1.0"?><sitemapindex '
+        f'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>'
+    )
+
+
+def _stream(data, url, status_code=200, headers=None):
+    data = data.encode() if isinstance(data, str) else data
+    return BodyStream(
+        [data[i : i + 64] for i in range(0, len(data), 64)],
+        url=url,
+        status_code=status_code,
+        strategy_used="curl_cffi",
+        headers=headers or {},
+    )
+
+
+class _FakeManager:
+    """Serves sitemap documents by URL and honours If-None-Match like a server would."""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.requests: list[tuple[str, dict]] = []
+
+    def stream(self, url, publisher=None, max_bytes=None, headers=None):
+        self.requests.append((url, dict(headers or {})))
+        if url not in self.documents:
+            raise AllStrategiesExhausted(f"All strategies exhausted for {url}")
+        body, etag = self.documents[url]
+        if etag and (headers or {}).get("If-None-Match") == etag:
+            return _stream(b"", url, status_code=304, headers={"etag": etag})
+        return _stream(body, url, headers={"etag": etag} if etag else {})
+
+    @property
+    def urls(self):
+        return [url for url, _ in self.requests]
+
+
+def _day(n):
+    return f"2026-02-{n:02d}T12:00:00+00:00"
+
+
+def _site():
+    """An index with a news child and an archive child (3 and 2 entries)."""
+    return {
+        INDEX_URL: (
+            _index([
+                ("https://example.com/news.xml", _day(17)),
+                ("https://example.com/archive.xml.gz", _day(1)),
+            ]),
+            '"index-1"',
+        ),
+        "https://example.com/news.xml": (
+            _urlset([(f"https://example.com/n{i}", _day(17 - i)) for i in range(3)], news=True),
+            '"news-1"',
+        ),
+        "https://example.com/archive.xml.gz": (
+            gzip.compress(_urlset([
+                ("https://example.com/a1", _day(1)),
+                ("https://example.com/a2", "2026-01-20"),
+            ]).encode()),
+            '"archive-1"',
+        ),
+    }
+
+
+# ---------------------------------------------------------------------------
+# iter_sitemap
+# ---------------------------------------------------------------------------
+
+
+class TestIterSitemap:
+    def test_url_entries(self):
+        xml = _urlset([("https://example.com/a", _day(3)), ("https://example.com/b", "2026-02")])
+        records = list(iter_sitemap(_stream(xml, INDEX_URL)))
+        assert records == [
+            SitemapRecord("url", "https://example.com/a", _day(3), "Daily"),
+            SitemapRecord("url", "https://example.com/b", "2026-02", "Daily"),
+        ]
+
+    def test_news_publication_date(self):
+        xml = _urlset([("https://example.com/a", _day(3))], news=True)
+        (record,) = iter_sitemap(_stream(xml, INDEX_URL))
+        assert record.publication_date == _day(3)
+        assert record.lastmod is None
+
+    def test_index_children_from_gzip(self):
+        data = gzip.compress(_index([("https://example.com/s1.xml", _day(2))]).encode())
+        records = list(iter_sitemap(_stream(data, INDEX_URL)))
+        assert records == [SitemapRecord("sitemap", "https://example.com/s1.xml", _day(2))]
+
+    def test_truncated_xml_keeps_complete_entries(self):
+        xml = _urlset([("https://example.com/a", _day(3)), ("https://example.com/b", _day(2))])
+        records = list(iter_sitemap(_stream(xml[: xml.index("https://example.com/b")], INDEX_URL)))
+        assert [record.loc for record in records] == ["https://example.com/a"]
+
+    def test_reports_root_kind_and_news_namespace(self):
+        news = iter_sitemap(_stream(_urlset([], news=True), INDEX_URL))
+        assert list(news) == [] and news.has_news and not news.is_index
+
+        index = iter_sitemap(_stream(_index([("https://example.com/s1.xml", None)]), INDEX_URL))
+        next(index)
+        assert index.is_index and not index.has_news
+        index.close()
+
+    def test_closing_early_closes_body(self):
+        body = _stream(_urlset([("https://example.com/a", _day(3))] * 5), INDEX_URL)
+        records = iter_sitemap(body)
+        next(records)
+        records.close()
+        assert body.closed
+
+
+# ---------------------------------------------------------------------------
+# SitemapCrawler
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.django_db
+class TestSitemapCrawler:
+    def _crawl(self, publisher, manager, **config):
+        return SitemapCrawler(manager, {**sitemap_config(), **config}).crawl(publisher)
+
+    def test_first_crawl_ingests_whole_tree(self):
+        publisher = PublisherFactory(sitemap_urls=[INDEX_URL])
+        manager = _FakeManager(_site())
+
+        stats = self._crawl(publisher, manager)
+
+        assert manager.urls == [
+            INDEX_URL,
+            "https://example.com/news.xml",
+            "https://example.com/archive.xml.gz",
+        ]
+        assert stats["fetched"] == 3
+        assert stats["created"] == 5
+        news = SitemapEntry.objects.get(publisher=publisher, url="https://example.com/n0")
+        assert news.news_publication_date == datetime(2026, 2, 17, 12, tzinfo=timezone.utc)
+        archived = SitemapEntry.objects.get(publisher=publisher, url="https://example.com/a2")
+        assert archived.lastmod == datetime(2026, 1, 20, tzinfo=timezone.utc)
+        assert archived.changefreq == "daily"
+
+        index = SitemapFile.objects.get(publisher=publisher, url=INDEX_URL)
+        assert index.is_index is True
+        assert index.etag == '"index-1"'
+        assert index.entry_count == 2
+        child = SitemapFile.objects.get(publisher=publisher, url="https://example.com/news.xml")
+        assert child.lastmod == _day(17)
+        assert child.entry_count == 3
+
+    def test_unchanged_index_is_not_modified(self):
+        publisher = PublisherFactory(sitemap_urls=[INDEX_URL])
+        manager = _FakeManager(_site())
+        self._crawl(publisher, manager)
+        manager.requests.clear()
+
+        stats = self._crawl(publisher, manager)
+
+        assert manager.requests == [(INDEX_URL, {"If-None-Match": '"index-1"'})]
+        assert stats["not_modified"] == 1
+        assert stats["created"] == stats["updated"] == 0
+
+    def test_only_changed_children_are_fetched(self):
+        publisher = PublisherFactory(sitemap_urls=[INDEX_URL])
+        documents = _site()
+        manager = _FakeManager(documents)
+        self._crawl(publisher, manager)
+        manager.requests.clear()
+
+        documents[INDEX_URL] = (
+            _index([
+                ("https://example.com/news.xml", _day(18)),
+                ("https://example.com/archive.xml.gz", _day(1)),
+            ]),
+            '"index-2"',
+        )
+        documents["https://example.com/news.xml"] = (
+            _urlset(
+                [("https://example.com/n-new", _day(18))]
+                + [(f"https://example.com/n{i}", _day(17 - i)) for i in range(3)],
+                news=True,
+            ),
+            '"news-2"',
+        )
+
+        stats = self._crawl(publisher, manager)
+
+        assert manager.urls == [INDEX_URL, "https://example.com/news.xml"]
+        assert stats["skipped"] == 1
+        assert stats["created"] == 1
+        assert stats["updated"] == 0
+        assert SitemapEntry.objects.filter(publisher=publisher).count() == 6
+
+    def test_changed_entries_are_updated(self):
+        publisher = PublisherFactory(sitemap_urls=["https://example.com/pages.xml"])
+        documents = {
+            "https://example.com/pages.xml": (
+                _urlset([("https://example.com/a", _day(1)), ("https://example.com/b", _day(1))]),
+                None,
+            )
+        }
+        manager = _FakeManager(documents)
+        self._crawl(publisher, manager)
+        documents["https://example.com/pages.xml"] = (
+            _urlset([("https://example.com/a", _day(5)), ("https://example.com/b", _day(1))]),
+            None,
+        )
+
+        stats = self._crawl(publisher, manager, BATCH_SIZE=1)
+
+        assert (stats["created"], stats["updated"]) == (0, 1)
+        entry = SitemapEntry.objects.get(publisher=publisher, url="https://example.com/a")
+        assert entry.lastmod == datetime(2026, 2, 5, 12, tzinfo=timezone.utc)
+
+    def test_budget_defers_oldest_children(self):
+        children = [(f"https://example.com/s{day}.xml", _day(day)) for day in range(1, 6)]
+        documents = {INDEX_URL: (_index(children), None)}
+        for loc, lastmod in children:
+            documents[loc] = (_urlset([(loc.replace(".xml", ""), lastmod)]), None)
+        publisher = PublisherFactory(sitemap_urls=[INDEX_URL])
+        manager = _FakeManager(documents)
+
+        stats = self._crawl(publisher, manager, MAX_SITEMAPS=3)
+
+        assert manager.urls == [INDEX_URL, "https://example.com/s5.xml", "https://example.com/s4.xml"]
+        assert stats["deferred"] == 3
+
+        manager.requests.clear()
+        stats = self._crawl(publisher, manager, MAX_SITEMAPS=3)
+        assert manager.urls == [INDEX_URL, "https://example.com/s3.xml", "https://example.com/s2.xml"]
+        assert stats["skipped"] == 2
+
+    def test_deferred_children_of_unchanged_index_are_crawled(self):
+        children = [(f"https://example.com/s{day}.xml", _day(day)) for day in range(1, 6)]
+        documents = {INDEX_URL: (_index(children), '"i1"')}
+        for loc, lastmod in children:
+            documents[loc] = (_urlset([(loc.replace(".xml", ""), lastmod)]), None)
+        publisher = PublisherFactory(sitemap_urls=[INDEX_URL])
+        manager = _FakeManager(documents)
+
+        self._crawl(publisher, manager, MAX_SITEMAPS=3)
+        assert SitemapFile.objects.get(url=INDEX_URL).etag == ""
+
+        manager.requests.clear()
+        self._crawl(publisher, manager, MAX_SITEMAPS=10)
+
+        assert manager.urls == [
+            INDEX_URL,
+            "https://example.com/s3.xml",
+            "https://example.com/s2.xml",
+            "https://example.com/s1.xml",
+        ]
+        assert SitemapEntry.objects.filter(publisher=publisher).count() == 5
+        assert SitemapFile.objects.get(url=INDEX_URL).etag == '"i1"'
+
+        manager.requests.clear()
+        stats = self._crawl(publisher, manager, MAX_SITEMAPS=10)
+        assert manager.urls == [INDEX_URL]
+        assert stats["not_modified"] == 1
+
+    def test_file_cut_at_max_entries_resumes(self):
+        child = "https://example.com/big.xml"
+        urls = [(f"https://example.com/p{i}", _day(1 + i)) for i in range(5)]
+        documents = {
+            INDEX_URL: (_index([(child, _day(9))]), '"i1"'),
+            child: (_urlset(urls), '"b1"'),
+        }
+        publisher = PublisherFactory(sitemap_urls=[INDEX_URL])
+        manager = _FakeManager(documents)
+
+        self._crawl(publisher, manager, MAX_ENTRIES=3)
+        state = SitemapFile.objects.get(url=child)
+        assert (state.etag, state.lastmod, state.resume_offset) == ("", "", 3)
+        assert SitemapFile.objects.get(url=INDEX_URL).etag == ""
+
+        manager.requests.clear()
+        stats = self._crawl(publisher, manager, MAX_ENTRIES=3)
+
+        assert manager.urls == [INDEX_URL, child]
+        assert stats["created"] == 2
+        assert SitemapEntry.objects.filter(publisher=publisher).count() == 5
+        state = SitemapFile.objects.get(url=child)
+        assert (state.etag, state.lastmod, state.resume_offset) == ('"b1"', _day(9), 0)
+
+    def test_fetch_errors_are_counted_and_retried(self):
+        publisher = PublisherFactory(sitemap_urls=[INDEX_URL])
+        documents = _site()
+        del documents["https://example.com/news.xml"]
+        manager = _FakeManager(documents)
+
+        stats = self._crawl(publisher, manager)
+
+        assert stats["errors"] == 1
+        assert stats["created"] == 2
+        assert not SitemapFile.objects.filter(url="https://example.com/news.xml").exists()
+
+
+# ---------------------------------------------------------------------------
+# Store reads and the frequency step
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.django_db
+class TestEntryDates:
+    def test_prefers_news_date_and_ignores_future(self):
+        publisher = PublisherFactory()
+        now = datetime.now(timezone.utc)
+        SitemapEntry.objects.create(
+            publisher=publisher, url_hash="a", url="https://example.com/a",
+            lastmod=now - timedelta(hours=1), news_publication_date=now - timedelta(days=2),
+        )
+        SitemapEntry.objects.create(
+            publisher=publisher, url_hash="b", url="https://example.com/b",
+            lastmod=now - timedelta(days=1),
+        )
+        SitemapEntry.objects.create(
+            publisher=publisher, url_hash="c", url="https://example.com/c",
+            lastmod=now + timedelta(days=30),
+        )
+        SitemapEntry.objects.create(publisher=publisher, url_hash="d", url="https://example.com/d")
+
+        dates = entry_dates(publisher, limit=10)
+
+        assert dates == [now - timedelta(days=1), now - timedelta(days=2)]
+        assert entry_dates(publisher, limit=1) == [now - timedelta(days=1)]
+
+
+@pytest.mark.django_db
+class TestFrequencyFromStore:
+    def test_frequency_uses_crawled_store(self, monkeypatch, settings):
+        from publishers.pipeline import steps
+
+        settings.SITEMAP_CRAWLER = {"ENABLED": True}
+        urls = [(f"https://example.com/p{i}", f"2026-02-{1 + i // 4:02d}T{(i % 4) * 6:02d}:00:00Z")
+                for i in range(40)]
+        manager = _FakeManager({INDEX_URL: (_urlset(urls), None)})
+        monkeypatch.setattr(steps._fetch_manager, "stream", manager.stream)
+        publisher = PublisherFactory(rss_urls=[], sitemap_urls=[INDEX_URL])
+
+        result = steps.run_frequency_step(
+            publisher, sitemap_analysis_result={"lastmod_dates": ["2026-02-10", "2026-02-01"]}
+        )
+
+        assert result["source"] == "sitemap_store"
+        assert result["sample_size"] == 40
+        assert result["frequency_hours"] == 6.0
+        assert result["confidence"] == "high"
+
+    def test_deferred_files_left_to_background_crawl(self, monkeypatch, settings):
+        from publishers.pipeline import steps
+
+        settings.SITEMAP_CRAWLER = {"ENABLED": True, "INLINE_SITEMAPS": 2}
+        children = [(f"https://example.com/sitemap-{i}.xml", f"2026-02-0{i}") for i in range(1, 4)]
+        documents = {INDEX_URL: (_index(children), None)}
+        documents.update({loc: (_urlset([(f"{loc}#a", lastmod)]), None) for loc, lastmod in children})
+        manager = _FakeManager(documents)
+        monkeypatch.setattr(steps._fetch_manager, "stream", manager.stream)
+        crawl_sitemaps = MagicMock()
+        monkeypatch.setattr(steps, "crawl_sitemaps", crawl_sitemaps)
+        publisher = PublisherFactory(rss_urls=[], sitemap_urls=[INDEX_URL])
+
+        steps.run_frequency_step(publisher)
+
+        assert len(manager.requests) == 2
+        crawl_sitemaps.delay.assert_called_once_with(publisher.pk)
+
+    def test_crawl_disabled_falls_back_to_analysis(self, monkeypatch):
+        from publishers.pipeline import steps
+
+        def no_fetch(*args, **kwargs):
+            raise AssertionError("crawler should not run")
+
+        monkeypatch.setattr(steps._fetch_manager, "stream", no_fetch)
+        publisher = PublisherFactory(rss_urls=[], sitemap_urls=[INDEX_URL])
+
+        result = steps.run_frequency_step(
+            publisher, sitemap_analysis_result={"lastmod_dates": ["2026-02-10", "2026-02-01"]}
+        )
+
+        assert result["source"] == "sitemap"
@@ -0,0 +1,181 @@
+"""Tests for the content-hash cache of ToS evaluations (ingestion.terms_cache)."""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from django.core.management import call_command
+
+from ingestion import terms_evaluation
+from ingestion.terms_cache import (
+    build_terms_cache,
+    evaluator_version,
+    get_terms_cache,
+    text_fingerprint,
+)
+from ingestion.terms_evaluation import (
+    ActivityPermission,
+    PermissionStatus,
+    TermsEvaluationResult,
+)
+
+GANNETT_TOS = """<html><body><main>
+<h1>Terms of Service</h1>
+<p>You may not use robots, spiders or other automated means to access the “Services”.</p>
+<p>Content may not be used to train artificial intelligence models. {site}</p>
+</main></body></html>"""
+
+EVALUATION = TermsEvaluationResult(
+    permissions=[
+        ActivityPermission(
+            activity="Scraping & Crawling",
+            permission=PermissionStatus.EXPLICITLY_PROHIBITED,
+            notes="No robots or spiders.",
+        )
+    ],
+    document_type="Terms of Service",
+    confidence_score=0.9,
+)
+
+
+@pytest.fixture
+def terms_cache(settings, tmp_path):
+    settings.TERMS_CACHE = {"BACKEND": "disk", "DIRECTORY": str(tmp_path)}
+    return get_terms_cache()
+
+
+@pytest.fixture
+def agent(monkeypatch, settings):
+    # A locally trained classifier would answer some activities itself.
+    settings.TERMS_CLASSIFIER = {"ENABLED": False}
+    pages = {}
+    monkeypatch.setattr(
+        "ingestion.services.fetch_html_via_proxy",
+        lambda url, publisher=None, documents=None: pages[url],
+    )
+    run_sync = MagicMock(return_value=MagicMock(output=EVALUATION))
+    monkeypatch.setattr(terms_evaluation.terms_evaluation_agent, "run_sync", run_sync)
+    run_sync.pages = pages
+    return run_sync
+
+
+# ---------------------------------------------------------------------------
+# Keys
+# ---------------------------------------------------------------------------
+
+
+class TestKeys:
+    def test_fingerprint_ignores_presentation(self):
+        assert text_fingerprint("You may NOT use “robots” — ever.") == text_fingerprint(
+            'you may not use\n  "robots" - ever.'
+        )
+        assert text_fingerprint("You may use robots.") != text_fingerprint(
+            "You may not use robots."
+        )
+
+    def test_evaluator_version_covers_prompt_model_and_schema(self):
+        schema = TermsEvaluationResult.model_json_schema()
+        base = evaluator_version("prompt", "openai:gpt-5-mini", schema)
+
+        assert base == evaluator_version("prompt", "openai:gpt-5-mini", dict(schema))
+        assert base != evaluator_version("prompt v2", "openai:gpt-5-mini", schema)
+        assert base != evaluator_version("prompt", "openai:gpt-5", schema)
+        assert base != evaluator_version("prompt", "openai:gpt-5-mini", {})
+
+    def test_version_setting_changes_keys(self, tmp_path):
+        one = build_terms_cache({"BACKEND": "disk", "DIRECTORY": str(tmp_path)})
+        two = build_terms_cache({"BACKEND": "disk", "DIRECTORY": str(tmp_path), "VERSION": 2})
+        assert one.key("text", "e") != two.key("text", "e")
+
+    def test_unknown_backend(self):
+        assert build_terms_cache({"BACKEND": None}) is None
+        with pytest.raises(ValueError):
+            build_terms_cache({"BACKEND": "memcached"})
+
+
+# ---------------------------------------------------------------------------
+# Evaluation through the cache
+# ---------------------------------------------------------------------------
+
+
+class TestCachedEvaluation:
+    def test_identical_text_on_another_domain_is_a_hit(self, terms_cache, agent):
+        agent.pages["https://freep.com/terms"] = GANNETT_TOS.format(site="")
+        agent.pages["https://usatoday.com/terms"] = GANNETT_TOS.format(site="").replace(
+            "<p>", "<p>\n   "
+        )
+
+        first, first_doc = terms_evaluation.evaluate_terms_document("https://freep.com/terms")
+        second, second_doc = terms_evaluation.evaluate_terms_document(
+            "https://usatoday.com/terms"
+        )
+
+        assert agent.call_count == 1
+        assert (first_doc.cache_status, second_doc.cache_status) == ("miss", "hit")
+        assert second == first
+        assert terms_cache.stats() == {"hits": 1, "misses": 1, "stores": 1, "hit_ratio": 0.5}
+
+    def test_different_text_is_evaluated(self, terms_cache, agent):
+        agent.pages["https://a.example/terms"] = GANNETT_TOS.format(site="Site A.")
+        agent.pages["https://b.example/terms"] = GANNETT_TOS.format(site="Site B.")
+
+        terms_evaluation.evaluate_terms_document("https://a.example/terms")
+        terms_evaluation.evaluate_terms_document("https://b.example/terms")
+
+        assert agent.call_count == 2
+
+    def test_prompt_change_busts_cache(self, terms_cache, agent, monkeypatch):
+        agent.pages["https://a.example/terms"] = GANNETT_TOS.format(site="")
+        terms_evaluation.evaluate_terms_document("https://a.example/terms")
+
+        monkeypatch.setattr(
+            terms_evaluation,
+            "TERMS_EVALUATION_PROMPT",
+            terms_evaluation.TERMS_EVALUATION_PROMPT + "\n- Also flag robots meta tags.",
+        )
+        _, document = terms_evaluation.evaluate_terms_document("https://a.example/terms")
+
+        assert agent.call_count == 2
+        assert document.cache_status == "miss"
+
+    def test_disabled_cache(self, agent, settings):
+        settings.TERMS_CACHE = {"BACKEND": None}
+        agent.pages["https://a.example/terms"] = GANNETT_TOS.format(site="")
+
+        for _ in range(2):
+            _, document = terms_evaluation.evaluate_terms_document("https://a.example/terms")
+
+        assert agent.call_count == 2
+        assert document.cache_status == ""
+
+    def test_backend_errors_do_not_fail_evaluation(self, terms_cache, agent, monkeypatch):
+        def broken(*args, **kwargs):
+            raise ConnectionError("redis down")
+
+        monkeypatch.setattr(terms_cache.backend, "get", broken)
+        monkeypatch.setattr(terms_cache.backend, "set", broken)
+        agent.pages["https://a.example/terms"] = GANNETT_TOS.format(site="")
+
+        result, _ = terms_evaluation.evaluate_terms_document("https://a.example/terms")
+
+        assert result is EVALUATION
+
+
+# ---------------------------------------------------------------------------
+# Management command
+# ---------------------------------------------------------------------------
+
+
+class TestTermsCacheCommand:
+    def test_stats_and_clear(self, terms_cache, agent, capsys):
+        agent.pages["https://a.example/terms"] = GANNETT_TOS.format(site="")
+        terms_evaluation.evaluate_terms_document("https://a.example/terms")
+        terms_evaluation.evaluate_terms_document("https://a.example/terms")
+
+        call_command("terms_cache")
+        assert json.loads(capsys.readouterr().out)["hit_ratio"] == 0.5
+
+        call_command("terms_cache", clear=True)
+        assert json.loads(capsys.readouterr().out)["hits"] == 0
+        _, document = terms_evaluation.evaluate_terms_document("https://a.example/terms")
+        assert document.cache_status == "miss"
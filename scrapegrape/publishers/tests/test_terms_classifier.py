@@ -0,0 +1,343 @@
+"""Tests for the local first-pass ToS classifier (ingestion.terms_classifier)."""
+
+import asyncio
+import json
+import random
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from django.core.management import call_command
+
+from ingestion import terms_classifier, terms_evaluation
+from ingestion.terms_classifier import (
+    ACTIVITIES,
+    NOTE_PREFIX,
+    DEFAULT_CONFIG,
+    TermsClassifier,
+    activity_features,
+    canonical_activity,
+    document_labels,
+    get_terms_classifier,
+    train_classifier,
+)
+from ingestion.terms_evaluation import ActivityPermission, PermissionStatus, TermsEvaluationResult
+
+# Activity -> label -> clause variants.
+CLAUSES = {
+    "Scraping & Crawling": {
+        "explicitly_permitted": [
+            "Search engines and other crawlers may index our pages if they respect robots.txt.",
+            "You may crawl the site with automated tools that follow our robots.txt rules.",
+        ],
+        "explicitly_prohibited": [
+            "You may not use any robot, spider, scraper or other automated means to access the site.",
+            "Scraping, crawling or harvesting our pages by automated means is strictly forbidden.",
+        ],
+        "conditional_ambiguous": [
+            "Automated access to the site may be subject to additional rules we publish.",
+            "Crawlers are welcome only where a separate agreement with us says so.",
+        ],
+    },
+    "AI & Machine Learning": {
+        "explicitly_permitted": [
+            "Our articles may be used to train artificial intelligence models with attribution.",
+            "We allow machine learning training on our content under an open licence.",
+        ],
+        "explicitly_prohibited": [
+            "You may not use our content to train any artificial intelligence or machine learning model.",
+            "Training of generative AI or language models on our content is prohibited.",
+        ],
+        "conditional_ambiguous": [
+            "Use of content for machine learning requires a licence agreed with our syndication team.",
+            "Artificial intelligence uses of our content are considered case by case.",
+        ],
+    },
+}
+FILLER = [
+    "Subscription fees are billed monthly in advance and are non-refundable.",
+    "Our privacy policy explains how we process personal information.",
+    "We may suspend accounts that breach these terms.",
+    "Payments are handled by a third-party processor on our behalf.",
+    "You can unsubscribe from newsletters using the link in each email.",
+    "The services are provided as is without warranties of any kind.",
+]
+
+
+def _corpus(count, seed=0):
+    rng = random.Random(seed)
+    documents = []
+    for _ in range(count):
+        lines, labels = ["# Terms of Use"], {}
+        for activity, variants in CLAUSES.items():
+            label = rng.choice(list(variants))
+            labels[activity] = label
+            lines += rng.sample(FILLER, 2) + [rng.choice(variants[label])]
+        documents.append(("\n".join(lines), labels))
+    return documents
+
+
+class _FakeClassifier:
+    version = "test-1"
+    config = {"ACCEPT_CONFIDENCE": 0.9}
+    models = dict.fromkeys(ACTIVITIES)
+
+    def __init__(self, predictions):
+        self.predictions = predictions
+
+    def predict(self, text):
+        return self.predictions
+
+
+@pytest.fixture(scope="module")
+def trained():
+    return train_classifier(_corpus(80), {"EPOCHS": 8}, holdout=0.25)
+
+
+# ---------------------------------------------------------------------------
+# Labels
+# ---------------------------------------------------------------------------
+
+
+class TestLabels:
+    def test_canonical_activity(self):
+        assert canonical_activity("AI & Machine Learning") == "AI & Machine Learning"
+        assert canonical_activity("Automated web scraping") == "Scraping & Crawling"
+        assert canonical_activity("Text & Data Mining (TDM)") == "Text & Data Mining"
+        assert canonical_activity("User-Generated Content (UGC)") == "User-Generated Content"
+        assert canonical_activity("Manual reading for personal use") == "Manual Content Usage"
+        assert canonical_activity("Something else") is None
+
+    def test_document_labels_skip_classifier_answers(self):
+        labels = document_labels([
+            {"activity": "Scraping & Crawling", "permission": "explicitly_prohibited", "notes": "x"},
+            {"activity": "AI training", "permission": "PermissionStatus.EXPLICITLY_PERMITTED",
+             "notes": "y"},
+            {"activity": "Archiving", "permission": "explicitly_permitted",
+             "notes": f"{NOTE_PREFIX} v1 (confidence 0.95)."},
+            {"activity": "RSS", "permission": "unknown", "notes": ""},
+        ])
+
+        assert labels == {
+            "Scraping & Crawling": "explicitly_prohibited",
+            "AI & Machine Learning": "explicitly_permitted",
+        }
+
+
+# ---------------------------------------------------------------------------
+# Training, calibration and artifact
+# ---------------------------------------------------------------------------
+
+
+class TestTraining:
+    def test_holdout_benchmark(self, trained):
+        holdout = trained.metrics["holdout"]
+
+        assert trained.metrics["trained_on"] == 60
+        assert holdout["documents"] == 20
+        assert holdout["accuracy"] >= 0.9
+        assert holdout["latency_ms"] < 50
+        assert set(trained.models) == set(CLAUSES)
+
+    def test_predictions_on_new_documents(self, trained):
+        for text, labels in _corpus(10, seed=42):
+            prediction = trained.predict(text)
+            assert {a: label for a, (label, _) in prediction.items()} == labels
+
+    def test_calibrated_confidence(self, trained):
+        for model in trained.models.values():
+            assert 0.5 <= model.temperature <= 6.0
+        confidences = [c for _, c in trained.predict(_corpus(1, seed=3)[0][0]).values()]
+        assert all(1 / 3 < c <= 1.0 for c in confidences)
+
+    def test_artifact_round_trip(self, trained, tmp_path):
+        path = tmp_path / "model.json.gz"
+        trained.save(path)
+
+        loaded = TermsClassifier.load(path)
+
+        assert loaded.version == trained.version and len(loaded.version) == 23
+        text = _corpus(1, seed=5)[0][0]
+        expected = trained.predict(text)
+        for activity, (label, confidence) in loaded.predict(text).items():
+            assert label == expected[activity][0]
+            assert confidence == pytest.approx(expected[activity][1], abs=1e-4)
+
+    def test_loaded_once_per_process(self, trained, tmp_path, settings, monkeypatch):
+        path = tmp_path / "model.json.gz"
+        trained.save(path)
+        settings.TERMS_CLASSIFIER = {"MODEL_PATH": str(path), "ACCEPT_CONFIDENCE": 0.8}
+        loads = MagicMock(side_effect=TermsClassifier.load)
+        monkeypatch.setattr(terms_classifier.TermsClassifier, "load", loads)
+
+        first, second = get_terms_classifier(), get_terms_classifier()
+
+        assert first is second and loads.call_count == 1
+        assert first.config["ACCEPT_CONFIDENCE"] == 0.8
+
+    def test_missing_artifact(self, settings, tmp_path):
+        settings.TERMS_CLASSIFIER = {"MODEL_PATH": str(tmp_path / "none.json.gz")}
+        assert get_terms_classifier() is None
+
+
+# ---------------------------------------------------------------------------
+# Evaluation with the classifier
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setattr(
+        "ingestion.services.fetch_html_via_proxy",
+        lambda url, publisher=None, documents=None: "<p>Terms</p>",
+    )
+    output = TermsEvaluationResult(
+        permissions=[
+            ActivityPermission(
+                activity="Scraping & Crawling",
+                permission=PermissionStatus.CONDITIONAL_AMBIGUOUS,
+                notes="agent",
+            ),
+            ActivityPermission(
+                activity="Archiving & Caching",
+                permission=PermissionStatus.EXPLICITLY_PROHIBITED,
+                notes="agent",
+            ),
+        ],
+        arbitration_clauses="New York",
+        confidence_score=0.8,
+    )
+    run_sync = MagicMock(return_value=MagicMock(output=output))
+    monkeypatch.setattr(terms_evaluation.terms_evaluation_agent, "run_sync", run_sync)
+    return run_sync
+
+
+class TestEvaluateWithClassifier:
+    def test_confident_activities_skip_the_agent_question(self, monkeypatch, agent):
+        predictions = {activity: ("conditional_ambiguous", 0.5) for activity in ACTIVITIES}
+        predictions["Scraping & Crawling"] = ("explicitly_prohibited", 0.97)
+        monkeypatch.setattr(
+            terms_evaluation, "get_terms_classifier", lambda: _FakeClassifier(predictions)
+        )
+
+        result, document = terms_evaluation.evaluate_terms_document("https://example.com/tos")
+
+        assert "do not evaluate them: Scraping & Crawling." in agent.call_args.args[0]
+        assert document.classified == ["Scraping & Crawling"]
+        by_activity = {p.activity: p for p in result.permissions}
+        assert by_activity["Scraping & Crawling"].permission == PermissionStatus.EXPLICITLY_PROHIBITED
+        assert by_activity["Scraping & Crawling"].notes.startswith(NOTE_PREFIX)
+        assert by_activity["Archiving & Caching"].notes == "agent"
+        assert result.arbitration_clauses == "New York"
+
+    def test_all_confident_still_asks_for_document_fields(self, monkeypatch, agent):
+        predictions = {activity: ("explicitly_prohibited", 0.95) for activity in ACTIVITIES}
+        predictions["Manual Content Usage"] = ("explicitly_permitted", 0.92)
+        monkeypatch.setattr(
+            terms_evaluation, "get_terms_classifier", lambda: _FakeClassifier(predictions)
+        )
+
+        result, document = terms_evaluation.evaluate_terms_document("https://example.com/tos")
+
+        assert "return an empty permissions list" in agent.call_args.args[0]
+        assert len(result.permissions) == len(ACTIVITIES)
+        assert all(p.notes.startswith(NOTE_PREFIX) for p in result.permissions)
+        assert result.arbitration_clauses == "New York"
+        assert len(document.classified) == len(ACTIVITIES)
+
+    def test_partial_model_set_asks_for_missing_activities(self, monkeypatch, agent):
+        # Activities without training rows have no model and no prediction.
+        predictions = {activity: ("explicitly_prohibited", 0.95) for activity in ACTIVITIES[:3]}
+        classifier = _FakeClassifier(predictions)
+        classifier.models = dict.fromkeys(ACTIVITIES[:3])
+        monkeypatch.setattr(terms_evaluation, "get_terms_classifier", lambda: classifier)
+
+        result, document = terms_evaluation.evaluate_terms_document("https://example.com/tos")
+
+        assert "do not evaluate them" in agent.call_args.args[0]
+        assert "Archiving & Caching" not in document.classified
+        by_activity = {p.activity: p for p in result.permissions}
+        assert by_activity["Archiving & Caching"].notes == "agent"
+
+    def test_async_evaluation_awaits_agent(self, monkeypatch, agent):
+        predictions = {activity: ("conditional_ambiguous", 0.5) for activity in ACTIVITIES}
+        predictions["Scraping & Crawling"] = ("explicitly_prohibited", 0.97)
+        monkeypatch.setattr(
+            terms_evaluation, "get_terms_classifier", lambda: _FakeClassifier(predictions)
+        )
+        run = AsyncMock(return_value=agent.return_value)
+        monkeypatch.setattr(terms_evaluation.terms_evaluation_agent, "run", run)
+
+        result, document = asyncio.run(
+            terms_evaluation.aevaluate_terms_document("https://example.com/tos")
+        )
+
+        agent.assert_not_called()
+        assert "do not evaluate them: Scraping & Crawling." in run.await_args.args[0]
+        assert document.classified == ["Scraping & Crawling"]
+        by_activity = {p.activity: p for p in result.permissions}
+        assert by_activity["Scraping & Crawling"].notes.startswith(NOTE_PREFIX)
+        assert by_activity["Archiving & Caching"].notes == "agent"
+
+    def test_classifier_sees_training_text_of_long_document(self, monkeypatch, agent):
+        from ingestion.terms_text import html_to_text
+
+        text, _ = _corpus(1)[0]
+        html = "".join(f"<p>{line}</p>" for line in text.split("\n")) + "".join(
+            f"<p>{i}. {line}</p>" for i, line in enumerate(FILLER * 40)
+        )
+        monkeypatch.setattr(
+            "ingestion.services.fetch_html_via_proxy",
+            lambda url, publisher=None, documents=None: html,
+        )
+        seen = []
+        classifier = _FakeClassifier({})
+        classifier.predict = lambda text: seen.append(text) or {}
+        monkeypatch.setattr(terms_evaluation, "get_terms_classifier", lambda: classifier)
+
+        _, document = terms_evaluation.evaluate_terms_document("https://example.com/tos")
+
+        # Clause selection rewrote the prompt text, but the classifier got what
+        # train_terms_classifier trains on, so the features match training.
+        assert document.retrieval and document.text != seen[0]
+        top_k, bits = DEFAULT_CONFIG["TOP_K"], DEFAULT_CONFIG["HASH_BITS"]
+        assert activity_features(seen[0], top_k, bits) == activity_features(
+            html_to_text(html), top_k, bits
+        )
+
+    def test_without_classifier(self, agent, settings):
+        settings.TERMS_CLASSIFIER = {"ENABLED": False}
+        result, document = terms_evaluation.evaluate_terms_document("https://example.com/tos")
+
+        assert result is agent.return_value.output
+        assert document.classified == []
+
+
+# ---------------------------------------------------------------------------
+# Management command
+# ---------------------------------------------------------------------------
+
+
+class TestTrainCommand:
+    def test_train_and_benchmark_from_corpus(self, tmp_path, capsys):
+        corpus = tmp_path / "corpus"
+        corpus.mkdir()
+        for i, (text, labels) in enumerate(_corpus(40)):
+            (corpus / f"{i}.txt").write_text(text)
+            (corpus / f"{i}.json").write_text(json.dumps({
+                "permissions": [
+                    {"activity": a, "permission": label, "notes": ""} for a, label in labels.items()
+                ]
+            }))
+        output = tmp_path / "model.json.gz"
+
+        call_command("train_terms_classifier", corpus=str(corpus), output=str(output))
+        trained = json.loads(capsys.readouterr().out)
+        call_command(
+            "train_terms_classifier", corpus=str(corpus), output=str(output), benchmark=True
+        )
+        report = json.loads(capsys.readouterr().out)
+
+        assert output.exists()
+        assert trained["trained_on"] == 32
+        assert report["version"] == trained["version"]
+        assert report["documents"] == 40 and report["accuracy"] >= 0.9
@@ -0,0 +1,236 @@
+"""Tests for offline clause retrieval over long ToS (ingestion.terms_clauses)."""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from django.core.management import call_command
+
+from ingestion import terms_evaluation
+from ingestion.terms_clauses import (
+    DEFAULT_CONFIG,
+    ClauseIndex,
+    evidence_quotes,
+    retrieval_report,
+    retrieve_passages,
+    select_clauses,
+    split_clauses,
+)
+from ingestion.terms_text import clean_document, count_tokens
+
+FILLER_TOPICS = [
+    ("Accounts", "register an account with a valid email address and keep your password secret"),
+    ("Accounts", "notify us promptly of any unauthorised login to your account"),
+    ("Subscriptions", "subscription fees are billed monthly in advance and are non-refundable"),
+    ("Subscriptions", "we may change subscription prices with thirty days notice by email"),
+    ("Payments", "payments are processed by a third-party payment processor on our behalf"),
+    ("Payments", "you are responsible for taxes that apply to your purchases"),
+    ("Privacy", "our privacy policy explains how we collect and process personal information"),
+    ("Privacy", "you may request deletion of your account information at any time"),
+    ("Advertising", "the site displays advertising selected by our partners"),
+    ("Contests", "sweepstakes and contests are subject to their official rules"),
+    ("Newsletters", "you can unsubscribe from newsletters using the link in each email"),
+    ("Events", "tickets for live events are subject to availability and venue policies"),
+    ("Corrections", "we aim to correct factual errors promptly and publish corrections"),
+    ("Accessibility", "we strive to meet accessibility guidelines across our pages"),
+    ("Termination", "we may suspend or terminate accounts that breach these terms"),
+    ("Warranties", "the services are provided as is without warranties of any kind"),
+]
+
+TARGETS = {
+    "Scraping & Crawling": "You may not use any robot, spider, scraper or other automated means "
+    "to access the Services for any purpose.",
+    "AI & Machine Learning": "You may not use our content to train, fine-tune or evaluate "
+    "any artificial intelligence or machine learning model.",
+    "Text & Data Mining": "We expressly reserve our rights to text and data mining under "
+    "Article 4 of the EU Copyright Directive.",
+    "Manual Content Usage": "You may view and print articles for your personal, "
+    "non-commercial use only.",
+    "API & RSS Usage": "Our RSS feeds may be displayed by feed readers for personal use, "
+    "with a link back to the original article.",
+}
+GOVERNING_LAW = (
+    "These terms are governed by the laws of the State of New York, and any dispute "
+    "shall be resolved by binding arbitration in New York County."
+)
+
+
+def _tos(targets, seed=0):
+    """A long cleaned ToS: filler sections around the *targets* and a governing-law section."""
+    lines = ["# Terms of Use"]
+    section = 0
+    for i in range(72):
+        heading, text = FILLER_TOPICS[(i + seed) % len(FILLER_TOPICS)]
+        if i % 4 == 0:
+            section += 1
+            lines += ["", f"## {section}. {heading}"]
+        lines.append(f"Clause {i}: {text.capitalize()}, as described in section {section}.")
+        if i % 12 == 5 and targets:
+            lines.append(targets.pop(0))
+    lines += ["", f"## {section + 1}. Governing Law", GOVERNING_LAW]
+    return "\n".join(lines)
+
+
+def _evaluation(activities):
+    return {
+        "permissions": [
+            {
+                "activity": activity,
+                "permission": "explicitly_prohibited",
+                "notes": f'The terms state: "{TARGETS[activity]}"',
+            }
+            for activity in activities
+        ]
+    }
+
+
+CORPUS = [
+    ("news.txt", _tos([TARGETS[a] for a in TARGETS]), _evaluation(TARGETS)),
+    (
+        "magazine.txt",
+        _tos([TARGETS["AI & Machine Learning"], TARGETS["Manual Content Usage"]], seed=5),
+        _evaluation(["AI & Machine Learning", "Manual Content Usage"]),
+    ),
+    (
+        "local.txt",
+        _tos([TARGETS["Scraping & Crawling"], TARGETS["API & RSS Usage"]], seed=9),
+        _evaluation(["Scraping & Crawling", "API & RSS Usage"]),
+    ),
+]
+
+
+# ---------------------------------------------------------------------------
+# Clauses and scoring
+# ---------------------------------------------------------------------------
+
+
+class TestClauses:
+    def test_split_numbers_clauses_under_headings(self):
+        clauses = split_clauses("# Terms\nIntro.\n\n## 1. Use\nOne.\n- Two\n\n## 2. Law\nThree.")
+
+        assert [(c.number, c.heading, c.text) for c in clauses] == [
+            (1, "# Terms", "Intro."),
+            (2, "## 1. Use", "One."),
+            (3, "## 1. Use", "- Two"),
+            (4, "## 2. Law", "Three."),
+        ]
+
+    def test_long_paragraph_split_at_sentences(self):
+        paragraph = " ".join(f"Sentence {i} has five words." for i in range(10))
+
+        clauses = split_clauses(paragraph, max_words=12)
+
+        assert [c.text for c in clauses][:2] == [
+            "Sentence 0 has five words. Sentence 1 has five words.",
+            "Sentence 2 has five words. Sentence 3 has five words.",
+        ]
+        assert " ".join(c.text for c in clauses) == paragraph
+
+    def test_bm25_prefers_matching_clause_and_stems(self):
+        index = ClauseIndex(split_clauses(CORPUS[0][1]))
+
+        best = index.top("scrape crawler robot automated", ("automated means",), 1)
+
+        assert best[0].text == TARGETS["Scraping & Crawling"]
+
+    def test_heading_counts_towards_match(self):
+        index = ClauseIndex(split_clauses("## Governing Law\nNew York applies.\n## Other\nText."))
+
+        assert index.top("governing law", (), 1)[0].text == "New York applies."
+
+
+# ---------------------------------------------------------------------------
+# Selection
+# ---------------------------------------------------------------------------
+
+
+class TestSelection:
+    def test_selects_targets_and_governing_law(self):
+        selection = select_clauses(CORPUS[0][1], {"TOP_K": 2})
+
+        for activity, target in TARGETS.items():
+            assert target in selection.text, activity
+        assert GOVERNING_LAW in selection.text
+        assert "## 19. Governing Law\n[" in selection.text
+        assert selection.selected_tokens < selection.document_tokens / 2
+
+    def test_short_documents_are_sent_whole(self):
+        assert retrieve_passages("# Terms\nNo robots.", {"ENABLED": True, "MIN_TOKENS": 1500}) is None
+        assert retrieve_passages(CORPUS[0][1], {**DEFAULT_CONFIG, "ENABLED": False}) is None
+        assert retrieve_passages(CORPUS[0][1], DEFAULT_CONFIG) is not None
+
+    def test_clean_document_applies_retrieval_before_budget(self):
+        html = "<main>" + "".join(
+            f"<h2>{line[3:]}</h2>" if line.startswith("## ") else f"<p>{line}</p>"
+            for line in CORPUS[0][1].split("\n") if line
+        ) + "</main>"
+
+        document = clean_document(html, token_budget=400, retrieve=True)
+
+        assert document.retrieval["selected"] < document.retrieval["clauses"]
+        assert GOVERNING_LAW in document.text
+        assert document.stats()["retrieval"] == document.retrieval
+        assert "retrieval" not in clean_document(html, token_budget=400).stats()
+
+    def test_agent_sees_numbered_clauses(self, monkeypatch):
+        html = "<main>" + "".join(f"<p>{line}</p>" for line in CORPUS[0][1].split("\n")) + "</main>"
+        monkeypatch.setattr(
+            "ingestion.services.fetch_html_via_proxy",
+            lambda url, publisher=None, documents=None: html,
+        )
+        run_sync = MagicMock(return_value=MagicMock(output=MagicMock(permissions=[])))
+        monkeypatch.setattr(terms_evaluation.terms_evaluation_agent, "run_sync", run_sync)
+
+        _, document = terms_evaluation.evaluate_terms_document("https://example.com/terms")
+
+        prompt = run_sync.call_args.args[0]
+        assert "Document Clauses:\n" in prompt
+        assert TARGETS["Text & Data Mining"] in prompt
+        assert "Clause 0:" not in prompt
+        assert document.retrieval["selected_tokens"] < document.retrieval["document_tokens"]
+
+
+# ---------------------------------------------------------------------------
+# Corpus report
+# ---------------------------------------------------------------------------
+
+
+class TestReport:
+    def test_evidence_quotes(self):
+        assert evidence_quotes(_evaluation(["Manual Content Usage"])) == {
+            "Manual Content Usage": [TARGETS["Manual Content Usage"]]
+        }
+
+    def test_fixture_corpus(self):
+        report = retrieval_report(CORPUS)
+
+        assert report["agreement"] == 1.0
+        assert report["reduction"] > 0.5
+        assert all(row["missing"] == [] for row in report["documents"])
+        assert report["document_tokens"] == sum(count_tokens(text) for _, text, _ in CORPUS)
+
+    def test_disagreement_is_reported(self):
+        evaluation = _evaluation(["Scraping & Crawling"])
+        evaluation["permissions"][0]["notes"] = '"This sentence is not in the document at all."'
+
+        row = retrieval_report([("x.txt", CORPUS[0][1], evaluation)])["documents"][0]
+
+        assert (row["activities_quoted"], row["activities_agreeing"]) == (1, 0)
+        assert row["missing"] == ["Scraping & Crawling"]
+
+    def test_command(self, tmp_path, capsys):
+        for name, text, evaluation in CORPUS:
+            (tmp_path / name).write_text(text)
+            (tmp_path / name).with_suffix(".json").write_text(json.dumps(evaluation))
+
+        call_command("terms_retrieval_report", str(tmp_path))
+
+        report = json.loads(capsys.readouterr().out)
+        assert len(report["documents"]) == 3
+        assert report["agreement"] == 1.0
+
+    def test_command_needs_documents(self, tmp_path):
+        from django.core.management.base import CommandError
+
+        with pytest.raises(CommandError):
+            call_command("terms_retrieval_report", str(tmp_path))
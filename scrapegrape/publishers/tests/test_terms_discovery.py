@@ -0,0 +1,231 @@
+"""Tests for the rule-based ToS link resolver and path probe (ingestion.terms_discovery)."""
+
+import asyncio
+import threading
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from ingestion import terms_discovery
+from ingestion.terms_discovery import (
+    _parse_links,
+    probe_terms_paths,
+    rank_terms_links,
+    resolve_terms_link,
+    score_terms_link,
+)
+from publishers.fetchers.base import FetchResult
+from publishers.fetchers.exceptions import FetchError
+
+BASE = "https://www.example.com/"
+
+HOMEPAGE = """<html><body>
+<header><nav><a href="/news">News</a><a href="/subscribe">Subscribe</a></nav></header>
+<main><a href="/2026/02/story">A story about terms</a></main>
+<footer class="site-footer">
+  <div><ul>
+    <li><a href="/privacy-policy">Privacy Policy</a></li>
+    <li><a href="/cookie-policy">Cookie Settings</a></li>
+    <li><a href="/terms-of-service">Terms of Service</a></li>
+    <li><a href="/terms-of-sale">Terms of Sale</a></li>
+  </ul></div>
+  <p>&copy; 2026 Example</p>
+</footer>
+</body></html>"""
+
+
+def _link(text, href, footer=False):
+    return {"text": text, "href": href, "footer": footer}
+
+
+# ---------------------------------------------------------------------------
+# Link extraction and scoring
+# ---------------------------------------------------------------------------
+
+
+class TestLinks:
+    def test_footer_position(self):
+        links = {link["text"]: link["footer"] for link in _parse_links(HOMEPAGE)}
+
+        assert links["News"] is False
+        assert links["A story about terms"] is False
+        assert links["Terms of Service"] is True
+        assert terms_discovery._extract_links(HOMEPAGE).splitlines()[0] == "/news | News"
+
+    def test_scores(self):
+        assert score_terms_link(_link("Terms of Service", "/terms-of-service", footer=True)) == 1.0
+        assert score_terms_link(_link("Terms of Use", "/p/1234", footer=True)) == 0.8
+        assert score_terms_link(_link("Terms", "/legal/terms")) == 0.9
+        assert score_terms_link(_link("Legal", "/legal", footer=True)) == 0.55
+        assert score_terms_link(_link("Terms of Sale", "/terms-of-sale", footer=True)) == 0.3
+
+    def test_privacy_and_cookie_links_excluded(self):
+        assert score_terms_link(_link("Privacy Policy", "/privacy")) == 0.0
+        assert score_terms_link(_link("Cookie terms", "/cookies")) == 0.0
+        assert score_terms_link(_link("Privacy", "/terms#privacy")) == 0.0
+        assert score_terms_link(_link("Do Not Sell My Info", "/terms/ccpa")) == 0.0
+        assert score_terms_link(_link("Home", "/")) == 0.0
+
+    def test_rank_resolves_and_deduplicates(self):
+        ranked = rank_terms_links(
+            [
+                _link("Terms", "terms"),
+                _link("Terms of Use", "https://www.example.com/terms#top", footer=True),
+                _link("Terms", "javascript:void(0)"),
+                _link("Terms", "mailto:legal@example.com"),
+            ],
+            "https://www.example.com/news/",
+        )
+
+        assert [(score, url) for score, url, _ in ranked] == [
+            (1.0, "https://www.example.com/terms"),
+            (0.9, "https://www.example.com/news/terms"),
+        ]
+
+
+# ---------------------------------------------------------------------------
+# Resolution
+# ---------------------------------------------------------------------------
+
+
+class TestResolve:
+    def test_unambiguous_footer_link(self):
+        result = resolve_terms_link(_parse_links(HOMEPAGE), BASE)
+
+        assert str(result.terms_of_service_url) == "https://www.example.com/terms-of-service"
+        assert result.confidence_score == 1.0
+        assert "footer" in result.notes
+
+    def test_close_candidates_are_ambiguous(self):
+        links = [
+            _link("Terms of Use", "/terms-of-use", footer=True),
+            _link("Terms and Conditions", "/terms-and-conditions", footer=True),
+        ]
+        assert resolve_terms_link(links, BASE) is None
+
+    def test_weak_candidate_is_ambiguous(self):
+        assert resolve_terms_link([_link("Legal", "/legal", footer=True)], BASE) is None
+
+
+# ---------------------------------------------------------------------------
+# Path probe
+# ---------------------------------------------------------------------------
+
+
+class _ProbeFetcher:
+    def __init__(self, pages):
+        self.pages = pages
+        self.threads = set()
+
+    def fetch(self, url, headers=None):
+        self.threads.add(threading.current_thread().name)
+        if url not in self.pages:
+            raise FetchError("HTTP error 404", strategy="curl_cffi", status_code=404)
+        return FetchResult(html=self.pages[url], status_code=200, strategy_used="curl_cffi", url=url)
+
+
+class TestProbe:
+    def test_first_path_in_order_wins(self, monkeypatch):
+        fetcher = _ProbeFetcher({
+            "https://www.example.com/tos": "<title>Terms of Service | Example</title>",
+            "https://www.example.com/terms-of-use": "<h1 class='x'>Terms of Use</h1>",
+            "https://www.example.com/terms": "<title>Example - Home</title>",
+        })
+        monkeypatch.setattr(terms_discovery, "_probe_fetcher", fetcher)
+
+        result = probe_terms_paths(BASE, terms_discovery.DEFAULT_CONFIG)
+
+        assert str(result.terms_of_service_url) == "https://www.example.com/terms-of-use"
+        assert all(name.startswith("tos-probe") for name in fetcher.threads)
+
+    def test_nothing_found(self, monkeypatch):
+        monkeypatch.setattr(terms_discovery, "_probe_fetcher", _ProbeFetcher({}))
+        assert probe_terms_paths(BASE, terms_discovery.DEFAULT_CONFIG) is None
+
+
+# ---------------------------------------------------------------------------
+# discover_terms_and_privacy
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    output = MagicMock(terms_of_service_url="https://www.example.com/legal", confidence_score=0.6)
+    run_sync = MagicMock(return_value=MagicMock(output=output))
+    monkeypatch.setattr(terms_discovery.terms_discovery_agent, "run_sync", run_sync)
+    return run_sync
+
+
+def _serve(monkeypatch, html):
+    monkeypatch.setattr(
+        "ingestion.services.fetch_html_via_proxy",
+        lambda url, publisher=None, documents=None: html,
+    )
+
+
+class TestDiscover:
+    def test_rules_skip_the_agent(self, monkeypatch, agent):
+        _serve(monkeypatch, HOMEPAGE)
+
+        result = terms_discovery.discover_terms_and_privacy(BASE)
+
+        assert str(result.terms_of_service_url) == "https://www.example.com/terms-of-service"
+        agent.assert_not_called()
+
+    def test_ambiguous_links_go_to_agent(self, monkeypatch, agent):
+        _serve(monkeypatch, '<footer><a href="/legal">Legal</a></footer>')
+        monkeypatch.setattr(terms_discovery, "_probe_fetcher", _ProbeFetcher({}))
+
+        result = terms_discovery.discover_terms_and_privacy(BASE)
+
+        assert result is agent.return_value.output
+        assert "/legal | Legal" in agent.call_args.args[0]
+
+    def test_no_links_probes_paths(self, monkeypatch, agent):
+        _serve(monkeypatch, '<footer><a href="/about">About</a></footer>')
+        monkeypatch.setattr(
+            terms_discovery,
+            "_probe_fetcher",
+            _ProbeFetcher({"https://www.example.com/terms": "<title>Terms of Use</title>"}),
+        )
+
+        result = terms_discovery.discover_terms_and_privacy(BASE)
+
+        assert str(result.terms_of_service_url) == "https://www.example.com/terms"
+        assert result.confidence_score == 0.7
+        agent.assert_not_called()
+
+    def test_failed_probe_falls_back_to_agent(self, monkeypatch, agent):
+        _serve(monkeypatch, '<a href="/nutzungsbedingungen">Nutzungsbedingungen</a>')
+        monkeypatch.setattr(terms_discovery, "_probe_fetcher", _ProbeFetcher({}))
+
+        terms_discovery.discover_terms_and_privacy("https://example.de/")
+
+        agent.assert_called_once()
+
+    def test_async_discovery(self, monkeypatch, agent):
+        _serve(monkeypatch, '<footer><a href="/legal">Legal</a></footer>')
+        monkeypatch.setattr(terms_discovery, "_probe_fetcher", _ProbeFetcher({}))
+        run = AsyncMock(return_value=agent.return_value)
+        monkeypatch.setattr(terms_discovery.terms_discovery_agent, "run", run)
+
+        result = asyncio.run(terms_discovery.adiscover_terms_and_privacy(BASE))
+
+        assert result is agent.return_value.output
+        assert "/legal | Legal" in run.await_args.args[0]
+        agent.assert_not_called()
+
+    def test_async_discovery_by_rules(self, monkeypatch, agent):
+        _serve(monkeypatch, HOMEPAGE)
+
+        result = asyncio.run(terms_discovery.adiscover_terms_and_privacy(BASE))
+
+        assert str(result.terms_of_service_url) == "https://www.example.com/terms-of-service"
+
+    def test_rules_disabled(self, monkeypatch, agent, settings):
+        settings.TERMS_DISCOVERY = {"RULES_ENABLED": False}
+        _serve(monkeypatch, HOMEPAGE)
+
+        terms_discovery.discover_terms_and_privacy(BASE)
+
+        agent.assert_called_once()
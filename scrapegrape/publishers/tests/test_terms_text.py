@@ -0,0 +1,145 @@
+"""Tests for ToS page cleaning before evaluation (ingestion.terms_text)."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from ingestion import terms_evaluation
+from ingestion.terms_text import (
+    clean_document,
+    count_tokens,
+    html_to_text,
+    truncate_to_budget,
+)
+
+LEGAL = " ".join(
+    f"Clause {i}: you may not use automated means to access the service." for i in range(12)
+)
+
+TOS_PAGE = f"""<!doctype html>
+<html><head>
+<title>Terms</title>
+<style>body {{ font-family: sans-serif; }} .nav a {{ color: #333; }}</style>
+<script>window.dataLayer = [{{"event": "{'x' * 4000}"}}];</script>
+</head>
+<body class="page has-sidebar">
+<a class="skip-link" href="#content">Skip to content</a>
+<header><nav><ul><li><a href="/">Home</a></li><li><a href="/news">News</a></li></ul></nav></header>
+<div id="cookie-banner" class="cookie-consent">We use cookies. <button>Accept</button></div>
+<main id="content">
+  <article>
+    <header><h1>Terms of Service</h1></header>
+    <h2>1. Acceptance</h2>
+    <p>By using   this site
+       you agree to these terms.</p>
+    <h2>2. Restrictions</h2>
+    <ul><li>No scraping<li>No AI training</ul>
+    <p>{LEGAL}</p>
+    <div class="share-buttons"><a href="#">Share on X</a></div>
+  </article>
+  <aside><h3>Related</h3><p>Read our newsletter</p></aside>
+</main>
+<footer role="contentinfo"><p>&copy; 2026 Example Media</p><a href="/privacy">Privacy</a></footer>
+</body></html>"""
+
+
+# ---------------------------------------------------------------------------
+# html_to_text
+# ---------------------------------------------------------------------------
+
+
+class TestHtmlToText:
+    def test_keeps_sections_and_drops_boilerplate(self):
+        text = html_to_text(TOS_PAGE, min_main_chars=100)
+
+        assert text.startswith(
+            "# Terms of Service\n\n## 1. Acceptance\nBy using this site you agree to these terms."
+            "\n\n## 2. Restrictions\n- No scraping\n- No AI training\n"
+        )
+        for boilerplate in (
+            "Skip to content", "Home", "cookies", "Share on X", "Related", "newsletter",
+            "Example Media", "dataLayer", "font-family",
+        ):
+            assert boilerplate not in text
+
+    def test_small_main_falls_back_to_page(self):
+        html = (
+            "<body><main><p>Short.</p></main>"
+            "<div><h2>Legal</h2><p>Governing law: New York.</p></div></body>"
+        )
+        assert html_to_text(html, min_main_chars=100) == (
+            "Short.\n\n## Legal\nGoverning law: New York."
+        )
+
+    def test_unclosed_tags_and_entities(self):
+        html = "<div><p>One &amp; two<p>Three<br>Four</div><p>Five"
+        assert html_to_text(html, min_main_chars=0) == "One & two\nThree\nFour\nFive"
+
+    def test_keeps_text_before_a_parse_error(self):
+        html = "<p>Governing law: New York.</p><![bad section]><p>Lost"
+        assert html_to_text(html, min_main_chars=0) == "Governing law: New York."
+
+
+# ---------------------------------------------------------------------------
+# Token accounting and budget
+# ---------------------------------------------------------------------------
+
+
+class TestCleanDocument:
+    def test_counts_tokens_before_and_after(self):
+        document = clean_document(TOS_PAGE, token_budget=10_000)
+
+        assert document.truncated is False
+        assert document.html_tokens == count_tokens(TOS_PAGE)
+        assert document.text_tokens == count_tokens(document.text)
+        assert document.html_tokens > 5 * document.text_tokens
+        assert document.stats() == {
+            "html_tokens": document.html_tokens,
+            "text_tokens": document.text_tokens,
+            "truncated": False,
+        }
+
+    def test_budget_cuts_at_line_boundary(self):
+        document = clean_document(TOS_PAGE, token_budget=30)
+
+        assert document.truncated is True
+        assert document.text_tokens <= 30
+        full = clean_document(TOS_PAGE, token_budget=10_000).text
+        assert full.startswith(document.text + "\n")
+        assert document.text.endswith("## 2. Restrictions")
+
+    def test_single_long_line_is_cut_by_words(self):
+        text, truncated = truncate_to_budget("alpha beta gamma delta", 2)
+        assert (text, truncated) == ("alpha beta", True)
+
+
+# ---------------------------------------------------------------------------
+# Evaluation input
+# ---------------------------------------------------------------------------
+
+
+class TestEvaluateTermsDocument:
+    def test_agent_sees_clean_text(self, monkeypatch):
+        monkeypatch.setattr(
+            "ingestion.services.fetch_html_via_proxy",
+            lambda url, publisher=None, documents=None: TOS_PAGE,
+        )
+        output = MagicMock(permissions=[], confidence_score=0.9)
+        run_sync = MagicMock(return_value=MagicMock(output=output))
+        monkeypatch.setattr(terms_evaluation.terms_evaluation_agent, "run_sync", run_sync)
+
+        result, document = terms_evaluation.evaluate_terms_document("https://example.com/tos")
+
+        assert result is output
+        prompt = run_sync.call_args.args[0]
+        assert document.text in prompt
+        assert "<script" not in prompt and "cookies" not in prompt
+        assert terms_evaluation.evaluate_terms_and_conditions("https://example.com/tos") is output
+
+    def test_fetch_errors_propagate(self, monkeypatch):
+        def failing(url, publisher=None, documents=None):
+            raise ValueError("boom")
+
+        monkeypatch.setattr("ingestion.services.fetch_html_via_proxy", failing)
+        with pytest.raises(ValueError):
+            terms_evaluation.evaluate_terms_document("https://example.com/tos")
@@ -0,0 +1,150 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from publishers import waf_check
+from publishers.fetchers.base import FetchResult
+from publishers.fetchers.clients import http_clients
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b"<html><body>hello</body></html>"
+        self.send_response(200)
+        for name, value in self.server.extra_headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_site():
+    """Serve a tiny page on localhost; yields (url, headers dict to customise, hit counter)."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.extra_headers = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/", server.extra_headers
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class TestInProcessWafw00f:
+    def test_detects_cloudflare_from_headers(self, local_site):
+        url, headers = local_site
+        headers.update({"Server": "cloudflare", "CF-RAY": "8a1b2c3d4e5f-AMS"})
+
+        result = waf_check.scan_url_with_wafw00f(url)
+
+        assert result["base_url"] == url.rstrip("/")
+        report = result["report"][0]
+        assert report["detected"] is True
+        assert report["firewall"] == "Cloudflare"
+        assert report["manufacturer"] == "Cloudflare Inc."
+
+    def test_plain_site_reports_no_waf(self, local_site):
+        url, _ = local_site
+
+        report = waf_check.scan_url_with_wafw00f(url)["report"]
+
+        assert report == [
+            {
+                "url": url,
+                "detected": False,
+                "firewall": "None",
+                "manufacturer": "None",
+                "trigger_url": None,
+            }
+        ]
+
+    def test_requests_use_pooled_adapter(self, local_site):
+        url, _ = local_site
+        before = http_clients.stats().get("wafw00f", {"hits": 0, "misses": 0})
+
+        waf_check.scan_url_with_wafw00f(url)
+
+        after = http_clients.stats()["wafw00f"]
+        assert after["hits"] > before["hits"]
+
+    def test_unreachable_site_has_empty_report(self):
+        result = waf_check.scan_url_with_wafw00f("http://127.0.0.1:9/")
+        assert result["report"] == []
+
+
+def _fetched(headers=None, cookies=None, html="<html><body>hello</body></html>"):
+    return FetchResult(
+        html=html,
+        status_code=200,
+        strategy_used="curl_cffi",
+        url="https://example.com/",
+        headers=headers or {},
+        cookies=cookies or {},
+    )
+
+
+class TestFingerprintPassively:
+    def test_wafw00f_header_plugin(self):
+        report = waf_check.fingerprint_passively(
+            [_fetched(headers={"server": "cloudflare", "cf-ray": "8a1b2c3d4e5f-AMS"})]
+        )
+
+        assert report["detected"] is True
+        assert report["firewall"] == "Cloudflare"
+        assert report["url"] == "https://example.com/"
+
+    def test_wafw00f_cookie_plugin(self):
+        report = waf_check.fingerprint_passively([_fetched(cookies={"incap_ses_123": "abc"})])
+        assert report["firewall"] == "Incapsula"
+
+    @pytest.mark.parametrize(
+        "headers, cookies, firewall",
+        [
+            ({}, {"__cf_bm": "x"}, "Cloudflare"),
+            ({"x-akamai-transformed": "9 - 0 pmb=mRUM,1"}, {}, "Kona SiteDefender"),
+            ({}, {"_abck": "x", "bm_sz": "y"}, "Kona SiteDefender"),
+            ({}, {"datadome": "x"}, "DataDome"),
+            ({}, {"_pxhd": "x"}, "PerimeterX"),
+            ({"x-cdn": "Imperva"}, {}, "Incapsula"),
+        ],
+    )
+    def test_supplementary_signatures(self, headers, cookies, firewall):
+        report = waf_check.fingerprint_passively([_fetched(headers=headers, cookies=cookies)])
+        assert report["firewall"] == firewall
+
+    def test_plain_response_is_inconclusive(self):
+        plain = _fetched(headers={"server": "nginx", "x-cdn": "fastly"}, cookies={"session": "1"})
+        assert waf_check.fingerprint_passively([None, plain]) is None
+
+    def test_attack_only_checks_do_not_match(self):
+        """Body signatures describe block pages; an ordinary page must not trigger them."""
+        page = _fetched(html="<html>Attention Required! | Cloudflare</html>")
+        assert waf_check.fingerprint_passively([page]) is None
+
+
+class TestScanMany:
+    def test_results_in_input_order(self, monkeypatch):
+        monkeypatch.setattr(
+            waf_check,
+            "scan_url_with_wafw00f",
+            lambda url: None if "bad" in url else {"base_url": url, "report": []},
+        )
+        finished = []
+
+        results = waf_check.scan_many(
+            ["https://a.com", "https://bad.com", "https://c.com"],
+            concurrency=2,
+            on_result=lambda url, result: finished.append(url),
+        )
+
+        assert [r and r["base_url"] for r in results] == ["https://a.com", None, "https://c.com"]
+        assert sorted(finished) == ["https://a.com", "https://bad.com", "https://c.com"]
+
+    def test_empty_batch(self):
+        assert waf_check.scan_many([]) == []
@@ -2,10 +2,12 @@ import csv
 import json
 
 from django.conf import settings
-from django.http import HttpResponseNotFound, StreamingHttpResponse
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponseNotFound, JsonResponse, StreamingHttpResponse
 from django.shortcuts import redirect, get_object_or_404
 from inertia import render as inertia_render, defer
 
+from publishers.analytics import cached_fleet_summary
 from publishers.models import ArticleMetadata, Publisher, ResolutionJob
 from publishers.serializers import PublisherListSerializer
 from publishers.forms import PublisherForm, BulkUploadForm
@@ -312,3 +314,12 @@ async def job_stream(request, job_id):
     response["Cache-Control"] = "no-cache"
     response["X-Accel-Buffering"] = "no"
     return response
+
+
+@staff_member_required
+def fleet_analytics(request):
+    """Fleet-wide cadence, sitemap and AI-bot statistics (cached, see publishers.analytics).
+
+    Staff only, like the admin and django-rq pages.
+    """
+    return JsonResponse(cached_fleet_summary())
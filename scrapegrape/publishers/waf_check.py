@@ -1,12 +1,64 @@
+"""WAF fingerprinting with wafw00f's detection engine, run in-process.
+
+``scan_url_with_wafw00f`` drives wafw00f's ``WAFW00F`` class directly instead
+of forking the CLI: every request goes through the pooled requests adapter
+(``http_clients``), so connections are reused across scans and there is no
+interpreter start-up or temp-file round trip per scan.  Each scan still gets
+its own cookie jar, as a fresh CLI run would.  ``scan_many`` scans a batch of
+URLs concurrently; the per-domain politeness limiter keeps that from
+hammering any one host.
+
+``fingerprint_passively`` settles most publishers without any scan at all.
+It runs the same wafw00f plugins against responses the pipeline has already
+fetched (headers, cookies and body), skipping every check that needs the
+attack request, and adds a few CDN/bot-manager markers wafw00f does not
+know (``__cf_bm``, ``x-akamai-transformed``, ...).  Only when that is
+inconclusive does the WAF step send wafw00f's probe requests.
+"""
+
 import json
 import os
-import tempfile
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
-from typing import List, Dict, Any, Optional
+from typing import Callable, Iterable, List, Dict, Any, Optional
 
+import requests
+from requests.structures import CaseInsensitiveDict
 from loguru import logger
 from tqdm import tqdm
-from sh import xsv, wafw00f, ErrorReturnCode
+from sh import xsv
+from wafw00f.lib.evillib import MAX_RESPONSE_SIZE
+from wafw00f.main import WAFW00F, buildResultRecord
+
+from publishers.fetchers.base import FetchResult
+from publishers.fetchers.clients import http_clients
+from publishers.fetchers.politeness import politeness
+
+DEFAULT_SCAN_CONCURRENCY = 8
+
+# Markers wafw00f's plugins miss, as (wafw00f NAME, kind, name, value regex).
+# Most are set on every response by the CDN's bot manager, so they show up
+# on an ordinary homepage fetch.
+PASSIVE_SIGNATURES = (
+    ("Cloudflare (Cloudflare Inc.)", "cookie", "__cf_bm", None),
+    ("Cloudflare (Cloudflare Inc.)", "cookie", "cf_clearance", None),
+    ("Cloudflare (Cloudflare Inc.)", "cookie", "__cflb", None),
+    ("Cloudflare (Cloudflare Inc.)", "header", "cf-cache-status", None),
+    ("Cloudflare (Cloudflare Inc.)", "header", "cf-mitigated", None),
+    ("Kona SiteDefender (Akamai)", "header", "x-akamai-transformed", None),
+    ("Kona SiteDefender (Akamai)", "header", "akamai-grn", None),
+    ("Kona SiteDefender (Akamai)", "header", "x-akamai-request-id", None),
+    ("Kona SiteDefender (Akamai)", "cookie", "_abck", None),
+    ("Kona SiteDefender (Akamai)", "cookie", "ak_bmsc", None),
+    ("Kona SiteDefender (Akamai)", "cookie", "bm_sz", None),
+    ("DataDome (DataDome)", "cookie", "datadome", None),
+    ("DataDome (DataDome)", "header", "x-datadome", None),
+    ("PerimeterX (PerimeterX)", "cookie", r"_px\w*", None),
+    ("Incapsula (Imperva Inc.)", "header", "x-iinfo", None),
+    ("Incapsula (Imperva Inc.)", "header", "x-cdn", r"imperva|incapsula"),
+)
 
 
 def load_urls_from_csv(csv_file: str = "sites.csv", limit: int = 5) -> List[str]:
@@ -19,39 +71,190 @@ def load_urls_from_csv(csv_file: str = "sites.csv", limit: int = 5) -> List[str]
     return urls
 
 
-def scan_url_with_wafw00f(url: str) -> Optional[Dict[str, Any]]:
-    """Scan a single URL with wafw00f and return the result."""
-    try:
-        with tempfile.NamedTemporaryFile(delete_on_close=False) as tf:
-            tf.close()
+class PooledWAFW00F(WAFW00F):
+    """wafw00f's engine with requests sent through our pooled HTTP adapter."""
 
-            wafw00f("-f", "json", "-o", tf.name, url)
+    def __init__(self, target: str, session: requests.Session, **kwargs):
+        # WAFW00F.__init__ already sends the baseline request.
+        self.session = session
+        super().__init__(target, **kwargs)
 
-            if not os.path.exists(tf.name):
-                logger.error(f"wafw00f output file not created for {url}")
-                return None
+    def Request(self, headers=None, path=None, params=None, delay=0):
+        """Same request as ``waftoolsengine.Request``, over the shared pool.
 
-            with open(tf.name, "r") as f:
-                result = json.load(f)
+        Like upstream, *path* is ignored and the target URL is always used,
+        so results match the wafw00f CLI.
+        """
+        try:
+            time.sleep(delay)
+            http_clients.record("wafw00f", self.target)
+            req = self.session.get(
+                self.target,
+                proxies=self.proxies,
+                headers=headers or self.headers,
+                timeout=self.timeout,
+                allow_redirects=self.allowredir,
+                params=params,
+                # Fingerprinting reads headers and error pages, never trusts
+                # the content; upstream skips verification too, so sites with
+                # broken or self-signed certificates can still be identified.
+                verify=False,
+                stream=True,
+            )
+            chunks = []
+            bytes_read = 0
+            start_time = time.time()
+            for chunk in req.iter_content(chunk_size=8192):
+                chunks.append(chunk)
+                bytes_read += len(chunk)
+                if bytes_read >= MAX_RESPONSE_SIZE or time.time() - start_time > self.timeout:
+                    break
+            req._content = b"".join(chunks)
+            req.close()
+            self.requestnumber += 1
+            return req
+        except requests.exceptions.RequestException as e:
+            # wafw00f treats a None response as "no answer to this probe"
+            # (and a None baseline as a site that is down), so a failed
+            # request must not abort the remaining probes.
+            self.log.error(f"Something went wrong {e}")
 
-            os.remove(tf.name)
 
-            bits = urlparse(url)
-            return {
-                "base_url": f"{bits.scheme}://{bits.netloc}",
-                "report": result,
-            }
-    except ErrorReturnCode as e:
-        logger.error(f"wafw00f command failed for {url}: {e}")
-        return None
-    except json.JSONDecodeError as e:
-        logger.error(f"Invalid JSON output for {url}: {e}")
+class _FetchedResponse:
+    """The parts of a ``requests.Response`` wafw00f's plugins read, from a FetchResult."""
+
+    def __init__(self, result: FetchResult):
+        self.headers = CaseInsensitiveDict(result.headers)
+        if result.cookies and "set-cookie" not in self.headers:
+            self.headers["set-cookie"] = ", ".join(
+                f"{name}={value}" for name, value in result.cookies.items()
+            )
+        self.status_code = result.status_code
+        self.reason = ""
+        self.text = result.html[:MAX_RESPONSE_SIZE]
+
+
+class PassiveWAFW00F(WAFW00F):
+    """wafw00f's plugins evaluated against one already-fetched response.
+
+    No request is sent: ``rq`` is the fetched response and there is no
+    attack response, so plugin checks that need one never match.
+    """
+
+    def __init__(self, result: FetchResult):
+        # WAFW00F.__init__ would send the baseline request; skip it.
+        self.rq = _FetchedResponse(result)
+        self.attackres = None
+
+    def identify(self) -> Optional[str]:
+        """The first wafw00f NAME (in wafw00f's priority order) that matches."""
+        for name in self.checklist:
+            if self.wafdetections[name](self):
+                return name
         return None
+
+
+def _match_passive_signatures(result: FetchResult) -> Optional[str]:
+    for waf, kind, name, value in PASSIVE_SIGNATURES:
+        if kind == "header":
+            found = [result.headers[name]] if name in result.headers else []
+        else:
+            found = [val for key, val in result.cookies.items() if re.fullmatch(name, key, re.I)]
+        if any(value is None or re.search(value, val, re.I) for val in found):
+            return waf
+    return None
+
+
+def fingerprint_passively(results: Iterable[Optional[FetchResult]]) -> Optional[Dict[str, Any]]:
+    """Identify a WAF/CDN from responses we already have, without new traffic.
+
+    Returns a wafw00f result record (as in ``scan_url_with_wafw00f``'s
+    report) for the first response that matches, or None when nothing
+    matches, which is inconclusive: many WAFs only show themselves when
+    provoked.
+    """
+    for result in results:
+        if result is None:
+            continue
+        waf = _match_passive_signatures(result) or PassiveWAFW00F(result).identify()
+        if waf:
+            return buildResultRecord(result.url, waf)
+    return None
+
+
+def _scan_session() -> requests.Session:
+    """A session with its own cookie jar that borrows the pooled adapter.
+
+    Never close it: closing a session closes its adapters, and the adapter
+    (and its connection pool) belongs to ``http_clients``.
+    """
+    adapter = http_clients.requests_session().get_adapter("https://")
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _identify(target: str) -> List[Dict[str, Any]]:
+    """Run wafw00f's detection like the CLI does; returns its JSON records."""
+    attacker = PooledWAFW00F(target, session=_scan_session(), path=urlparse(target).path)
+    if attacker.rq is None:
+        logger.error(f"Site {urlparse(target).hostname} appears to be down")
+        return []
+
+    waf, xurl = attacker.identwaf()
+    results = [buildResultRecord(target, name, xurl) for name in waf]
+    if not waf:
+        generic_url = attacker.genericdetect()
+        if generic_url:
+            results.append(buildResultRecord(target, "generic", generic_url))
+        else:
+            results.append(buildResultRecord(target, None, None))
+    return results
+
+
+def scan_url_with_wafw00f(url: str) -> Optional[Dict[str, Any]]:
+    """Scan a single URL with wafw00f and return the result."""
+    target = url if url.startswith("http") else f"https://{url}"
+    try:
+        with politeness.slot(target, strategy="wafw00f"):
+            result = _identify(target)
+
+        bits = urlparse(url)
+        return {
+            "base_url": f"{bits.scheme}://{bits.netloc}",
+            "report": result,
+        }
     except Exception as e:
         logger.error(f"Unexpected error scanning {url}: {e}")
         return None
 
 
+def scan_many(
+    urls: List[str],
+    concurrency: int = DEFAULT_SCAN_CONCURRENCY,
+    on_result: Optional[Callable[[str, Optional[Dict[str, Any]]], None]] = None,
+) -> List[Optional[Dict[str, Any]]]:
+    """Scan *urls* with up to *concurrency* scans in flight.
+
+    Returns one ``scan_url_with_wafw00f`` result (or None) per URL, in order.
+    *on_result* is called as each scan finishes, e.g. to drive a progress bar.
+    """
+
+    def scan(url: str) -> Optional[Dict[str, Any]]:
+        result = scan_url_with_wafw00f(url)
+        if on_result is not None:
+            on_result(url, result)
+        return result
+
+    if not urls:
+        return []
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(concurrency, len(urls))), thread_name_prefix="wafw00f"
+    ) as executor:
+        return list(executor.map(scan, urls))
+
+
 def save_reports_to_json(
     reports: List[Dict[str, Any]], output_file: str = "reports.json"
 ) -> None:
@@ -68,17 +271,11 @@ def save_reports_to_json(
 def main() -> None:
     """Main function to orchestrate the WAF checking workflow."""
     try:
-        urls = load_urls_from_csv()
-        reports = []
-
-        with tqdm(urls) as pbar:
-            for url in urls:
-                pbar.set_description(url[:50])
-                if url:
-                    report = scan_url_with_wafw00f(url)
-                    if report:
-                        reports.append(report)
-                pbar.update(1)
+        urls = [url for url in load_urls_from_csv() if url]
+
+        with tqdm(total=len(urls)) as pbar:
+            results = scan_many(urls, on_result=lambda url, result: pbar.update(1))
+        reports = [report for report in results if report]
 
         save_reports_to_json(reports)
     except Exception as e:
@@ -150,6 +150,229 @@ RQ_QUEUES = {
 PUBLISHER_FRESHNESS_TTL = timedelta(hours=24)
 ARTICLE_FRESHNESS_TTL = timedelta(hours=24)
 
+# Upper bound on pipeline steps running concurrently within one job
+PIPELINE_MAX_WORKERS = int(os.environ.get("PIPELINE_MAX_WORKERS", 5))
+
+# Await the LLM agents on the shared pipeline event loop (publishers.pipeline.loop)
+# instead of blocking a worker thread per call
+PIPELINE_ASYNC_AGENTS = os.environ.get("PIPELINE_ASYNC_AGENTS", "true").lower() == "true"
+
+# Shared keep-alive HTTP client pools (publishers.fetchers.clients)
+HTTP_CLIENT_LIMITS = {
+    "max_connections": int(os.environ.get("HTTP_MAX_CONNECTIONS", 100)),
+    "max_connections_per_host": int(os.environ.get("HTTP_MAX_CONNECTIONS_PER_HOST", 10)),
+    "keepalive_expiry": 30.0,
+    "http2": True,
+}
+
+# Per-domain politeness limiter shared by all workers (publishers.fetchers.politeness).
+# RATE is requests/second per domain; robots.txt Crawl-delay lowers it further.
+POLITENESS = {
+    "ENABLED": os.environ.get("POLITENESS_ENABLED", "true").lower() == "true",
+    "RATE": float(os.environ.get("POLITENESS_RATE", 1.0)),
+    "BURST": int(os.environ.get("POLITENESS_BURST", 3)),
+    "MAX_CONCURRENCY": int(os.environ.get("POLITENESS_MAX_CONCURRENCY", 2)),
+    "LEASE_SECONDS": 60,
+    "MAX_WAIT_SECONDS": int(os.environ.get("POLITENESS_MAX_WAIT_SECONDS", 60)),
+    "CRAWL_DELAY_TTL": 24 * 3600,
+}
+
+# Cluster-wide LLM rate governor shared by all workers (publishers.llm_governor).
+# RPM/TPM are the provider's per-model limits; HEADROOM keeps the cluster just under them.
+LLM_RATE_LIMITS = {
+    "ENABLED": os.environ.get("LLM_RATE_LIMITS_ENABLED", "true").lower() == "true",
+    "MODELS": {
+        "openai:gpt-5-mini": {
+            "RPM": int(os.environ.get("LLM_GPT5_MINI_RPM", 500)),
+            "TPM": int(os.environ.get("LLM_GPT5_MINI_TPM", 500_000)),
+        },
+        "openai:gpt-4.1-nano": {
+            "RPM": int(os.environ.get("LLM_GPT41_NANO_RPM", 500)),
+            "TPM": int(os.environ.get("LLM_GPT41_NANO_TPM", 200_000)),
+        },
+    },
+    "DEFAULT_RPM": 500,
+    "DEFAULT_TPM": 200_000,
+    "HEADROOM": float(os.environ.get("LLM_RATE_HEADROOM", 0.9)),
+    "OUTPUT_TOKENS": 1024,
+    "MAX_WAIT_SECONDS": int(os.environ.get("LLM_RATE_MAX_WAIT_SECONDS", 300)),
+    "MAX_RETRIES": 3,
+    "DEFAULT_RETRY_AFTER": 5.0,
+    "TICKET_TTL": 30,
+}
+
+# Hedged fetches (publishers.fetchers.hedging): when the preferred strategy is
+# slower than the domain's PERCENTILE latency, race the next strategy.  Hedged
+# attempts run on an event loop so the loser can be cancelled: in
+# AsyncFetchStrategyManager, and for pipeline document fetches on pipeline_loop().
+FETCH_HEDGING = {
+    "ENABLED": os.environ.get("FETCH_HEDGING_ENABLED", "false").lower() == "true",
+    "PERCENTILE": 95,
+    "DEFAULT_DELAY": float(os.environ.get("FETCH_HEDGING_DEFAULT_DELAY", 5.0)),
+    "MIN_DELAY": 0.5,
+    "MAX_DELAY": 20.0,
+    "MIN_SAMPLES": 5,
+    "WINDOW": 100,
+}
+
+# Fetch attempt telemetry and adaptive strategy ordering
+# (publishers.fetchers.telemetry).  Attempts are written to FetchAttempt in
+# batches; HALF_LIFE_HOURS controls how fast old outcomes stop mattering.
+FETCH_TELEMETRY = {
+    "ENABLED": os.environ.get("FETCH_TELEMETRY_ENABLED", "true").lower() == "true",
+    "BATCH_SIZE": 100,
+    "FLUSH_INTERVAL": 30.0,
+    "ADAPTIVE_ORDERING": os.environ.get("FETCH_ADAPTIVE_ORDERING", "true").lower() == "true",
+    "HALF_LIFE_HOURS": 24.0,
+    "LOOKBACK_DAYS": 7,
+    "REFRESH_SECONDS": 600.0,
+    "PRIOR_LATENCY": 5.0,
+    "COST_SECONDS": {"zyte": 2.0},
+}
+
+# Per-content-type response body caps in bytes (publishers.fetchers.streaming).
+# Larger bodies are truncated; robots.txt follows RFC 9309's 500 KiB minimum.
+FETCH_MAX_BYTES = {
+    "robots.txt": 500 * 1024,
+    "text/plain": 500 * 1024,
+    "xml": 50 * 1024 * 1024,
+    "text/html": 5 * 1024 * 1024,
+    "default": 10 * 1024 * 1024,
+}
+
+# Leading characters of a body scanned per signature set (publishers.signatures);
+# None scans the whole body.
+SIGNATURE_SCAN_WINDOWS = {
+    "waf_block": 64 * 1024,
+    "paywall": 1024 * 1024,
+}
+
+# HTTP response cache for FetchStrategyManager (publishers.fetchers.cache).
+# BACKEND is "redis", "disk" (needs DIRECTORY) or None to disable.
+FETCH_CACHE = {
+    "BACKEND": os.environ.get("FETCH_CACHE_BACKEND", "redis") or None,
+    "DIRECTORY": os.environ.get("FETCH_CACHE_DIR", str(BASE_DIR / ".fetch-cache")),
+    "MAX_BYTES": int(os.environ.get("FETCH_CACHE_MAX_BYTES", 256 * 1024 * 1024)),
+    "MAX_ENTRY_BYTES": 5 * 1024 * 1024,
+    "TTLS": {
+        "text/plain": 24 * 3600,
+        "xml": 6 * 3600,
+        "text/html": 3600,
+        "default": 3600,
+    },
+}
+
+# Common Crawl presence lookups (publishers.commoncrawl). run_cc_step checks the
+# HISTORY_DEPTH newest collections listed in collinfo.json (cached COLLINFO_TTL
+# seconds; COLLECTIONS pins the list). With LOCAL_INDEX on and COLLECTION's
+# cluster.idx downloaded (manage.py download_cc_index), that collection is searched
+# locally instead of through the CDX API. READ_BLOCKS allows one ranged read of a
+# CDX block for domains too small to have an index line of their own.
+COMMON_CRAWL = {
+    "COLLECTION": os.environ.get("COMMON_CRAWL_COLLECTION", "CC-MAIN-2026-04"),
+    "COLLECTIONS": None,
+    "COLLINFO_TTL": 24 * 3600,
+    "HISTORY_DEPTH": int(os.environ.get("COMMON_CRAWL_HISTORY_DEPTH", 3)),
+    "HISTORY_LENGTH": 24,
+    "RESULT_TTL": 30 * 24 * 3600,
+    "CONCURRENCY": 4,
+    "LOCAL_INDEX": os.environ.get("COMMON_CRAWL_LOCAL_INDEX", "false").lower() == "true",
+    "INDEX_DIR": os.environ.get("COMMON_CRAWL_INDEX_DIR", str(BASE_DIR / ".cc-index")),
+    "READ_BLOCKS": True,
+    "BLOCK_CONCURRENCY": 8,
+}
+
+# Incremental RSS/Atom polling (publishers.feeds), run by the frequency step. Up to
+# MAX_FEEDS of a publisher's feeds are fetched CONCURRENCY at a time with conditional
+# GETs; the newest WINDOW entry dates are kept on the publisher and the last
+# SEEN_IDS entry keys per feed. The step itself polls only INLINE_FEEDS feeds and
+# enqueues the full poll (publishers.tasks.poll_feeds) when there are more.
+FEEDS = {
+    "ENABLED": os.environ.get("FEEDS_ENABLED", "true").lower() == "true",
+    "MAX_FEEDS": 10,
+    "INLINE_FEEDS": 2,
+    "CONCURRENCY": 4,
+    "WINDOW": 500,
+    "SEEN_IDS": 500,
+}
+
+# Incremental sitemap crawling into SitemapEntry (publishers.sitemaps), run by the
+# frequency step. Per publisher and cycle at most MAX_SITEMAPS files are fetched
+# (conditional GETs; children whose index lastmod is unchanged are skipped) and
+# at most MAX_ENTRIES <url> entries read per file. The frequency estimate uses
+# the FREQUENCY_SAMPLE most recent dated entries. The step itself fetches only
+# INLINE_SITEMAPS files and leaves any deferred ones to publishers.tasks.crawl_sitemaps.
+SITEMAP_CRAWLER = {
+    "ENABLED": os.environ.get("SITEMAP_CRAWLER_ENABLED", "true").lower() == "true",
+    "MAX_SITEMAPS": int(os.environ.get("SITEMAP_CRAWLER_MAX_SITEMAPS", 10)),
+    "INLINE_SITEMAPS": 2,
+    "MAX_ENTRIES": 50_000,
+    "BATCH_SIZE": 1000,
+    "FREQUENCY_SAMPLE": 2000,
+}
+
+# ToS URL discovery (ingestion.terms_discovery): homepage links are scored by rules
+# and the best one is used without the agent when it scores at least ACCEPT_SCORE
+# and leads the next candidate by MARGIN. With no candidate link at all, PROBE_PATHS
+# are fetched concurrently before falling back to the agent.
+TERMS_DISCOVERY = {
+    "RULES_ENABLED": os.environ.get("TERMS_DISCOVERY_RULES_ENABLED", "true").lower() == "true",
+    "ACCEPT_SCORE": 0.8,
+    "MARGIN": 0.15,
+    "PROBE_PATHS": ["/terms", "/terms-of-service", "/terms-of-use", "/tos", "/legal"],
+}
+
+# ToS text preparation (ingestion.terms_text): pages are reduced to clean text
+# before evaluation and held to TOKEN_BUDGET (estimated tokens). A <main>/<article>
+# with at least MIN_MAIN_CHARS characters of text replaces the whole page.
+TERMS_TEXT = {
+    "TOKEN_BUDGET": int(os.environ.get("TERMS_TOKEN_BUDGET", 16_000)),
+    "MIN_MAIN_CHARS": 500,
+}
+
+# Clause retrieval for long ToS (ingestion.terms_clauses): cleaned text of at least
+# MIN_TOKENS is split into clauses (long paragraphs at MAX_CLAUSE_WORDS) and only the
+# TOP_K best BM25 matches per evaluated activity plus GOVERNING_LAW_K governing-law
+# clauses are sent to the agent.
+TERMS_RETRIEVAL = {
+    "ENABLED": os.environ.get("TERMS_RETRIEVAL_ENABLED", "true").lower() == "true",
+    "MIN_TOKENS": 1500,
+    "TOP_K": 4,
+    "GOVERNING_LAW_K": 2,
+    "MAX_CLAUSE_WORDS": 120,
+}
+
+# Local first-pass ToS classifier (ingestion.terms_classifier), trained with
+# manage.py train_terms_classifier. When the artifact at MODEL_PATH exists, activities
+# predicted with at least ACCEPT_CONFIDENCE (calibrated) are not sent to the agent.
+TERMS_CLASSIFIER = {
+    "ENABLED": os.environ.get("TERMS_CLASSIFIER_ENABLED", "true").lower() == "true",
+    "MODEL_PATH": os.environ.get(
+        "TERMS_CLASSIFIER_PATH", str(BASE_DIR / ".terms-classifier" / "model.json.gz")
+    ),
+    "ACCEPT_CONFIDENCE": float(os.environ.get("TERMS_CLASSIFIER_ACCEPT_CONFIDENCE", 0.9)),
+}
+
+# ToS evaluation result cache (ingestion.terms_cache), keyed by a fingerprint of the
+# cleaned text plus a hash of the prompt, model and output schema. BACKEND is
+# "redis", "disk" (needs DIRECTORY) or None to disable; bump VERSION to discard
+# all entries (or run manage.py terms_cache --clear).
+TERMS_CACHE = {
+    "BACKEND": os.environ.get("TERMS_CACHE_BACKEND", "redis") or None,
+    "DIRECTORY": os.environ.get("TERMS_CACHE_DIR", str(BASE_DIR / ".terms-cache")),
+    "MAX_BYTES": 64 * 1024 * 1024,
+    "VERSION": 1,
+}
+
+# Fleet statistics (publishers.analytics): publishers whose last two frequency
+# results differ by CADENCE_CHANGE_FACTOR are reported; the summary view is
+# cached for CACHE_TTL seconds.
+FLEET_ANALYTICS = {
+    "CADENCE_CHANGE_FACTOR": 2.0,
+    "CACHE_TTL": int(os.environ.get("FLEET_ANALYTICS_CACHE_TTL", 15 * 60)),
+    "CHUNK_SIZE": 10_000,
+}
+
 # Django Vite configuration
 DJANGO_VITE = {
     "default": {
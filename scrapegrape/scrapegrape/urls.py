@@ -30,5 +30,6 @@ urlpatterns = [
     path("submit", publishers.views.submit_url, name="submit-url"),
     path("jobs/<uuid:job_id>", publishers.views.job_show, name="job-show"),
     path("api/jobs/<uuid:job_id>/stream", publishers.views.job_stream, name="job-stream"),
+    path("api/analytics/fleet", publishers.views.fleet_analytics, name="fleet-analytics"),
     path("", publishers.views.table, name="table"),
 ]